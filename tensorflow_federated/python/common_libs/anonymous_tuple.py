@@ -61,7 +61,8 @@ class AnonymousTuple(object):
   Also note that the user will not be creating such tuples. They are a hidden
   part of the impementation designed to work together with function decorators.
   """
-  __slots__ = ('_hash', '_element_array', '_name_to_index')
+  __slots__ = ('_hash', '_element_array', '_element_names', '_name_to_index',
+               '_pack_plan')
 
   # TODO(b/113112108): Define more magic methods for convenience in handling
   # anonymous tuples. Possibly move out to a more generic location or replace
@@ -86,6 +87,7 @@ class AnonymousTuple(object):
             'element is a string, found {}.'.format(repr(e)))
 
     self._element_array = tuple(e[1] for e in elements)
+    self._element_names = tuple(e[0] for e in elements)
     self._name_to_index = {}
     for idx, e in enumerate(elements):
       name = e[0]
@@ -99,6 +101,7 @@ class AnonymousTuple(object):
                          'names, but found ' + str([e[0] for e in elements]))
       self._name_to_index[name] = idx
     self._hash = None
+    self._pack_plan = None
 
   def __len__(self):
     return len(self._element_array)
@@ -138,8 +141,8 @@ class AnonymousTuple(object):
   def __eq__(self, other):
     # pylint: disable=protected-access
     return (isinstance(other, AnonymousTuple) and
-            (self._element_array == other._element_array) and
-            (self._name_to_index == other._name_to_index))
+            (self._element_names == other._element_names) and
+            (self._element_array == other._element_array))
     # pylint: enable=protected-access
 
   def __ne__(self, other):
@@ -159,7 +162,7 @@ class AnonymousTuple(object):
       self._hash = hash((
           'anonymous_tuple',  # salting to avoid type mismatch.
           self._element_array,
-          tuple(self._name_to_index.items())))
+          self._element_names))
     return self._hash
 
   def _asdict(self, recursive=False):
@@ -193,12 +196,32 @@ def to_elements(an_anonymous_tuple):
   """
   py_typecheck.check_type(an_anonymous_tuple, AnonymousTuple)
   # pylint: disable=protected-access
-  index_to_name = {
-      idx: name
-      for name, idx in six.iteritems(an_anonymous_tuple._name_to_index)
+  return list(
+      zip(an_anonymous_tuple._element_names,
+          an_anonymous_tuple._element_array))
+  # pylint: enable=protected-access
+
+
+def _from_names_and_values(names, values):
+  """Returns a new `AnonymousTuple` with the given element names and values.
+
+  Unlike the constructor, this function does not validate its arguments, it is
+  only used to reconstruct the tuples from the names of existing ones.
+
+  Args:
+    names: A tuple of the names of the elements, each a string or `None`.
+    values: A list of the values of the elements, of the same length.
+  """
+  # pylint: disable=protected-access
+  result = AnonymousTuple.__new__(AnonymousTuple)
+  result._element_array = tuple(values)
+  result._element_names = names
+  result._name_to_index = {
+      name: idx for idx, name in enumerate(names) if name is not None
   }
-  return [(index_to_name.get(idx), val)
-          for idx, val in enumerate(an_anonymous_tuple._element_array)]
+  result._hash = None
+  result._pack_plan = None
+  return result
   # pylint: enable=protected-access
 
 
@@ -245,11 +268,47 @@ def flatten(structure):
   """
   if not isinstance(structure, AnonymousTuple):
     return tf.nest.flatten(structure)
-  else:
-    result = []
-    for _, v in to_elements(structure):
-      result.extend(flatten(v))
-    return result
+  # The nested tuples are walked with a stack of iterators over their elements,
+  # rather than recursively, so that no intermediate lists are constructed.
+  result = []
+  stack = [iter(structure._element_array)]  # pylint: disable=protected-access
+  while stack:
+    for value in stack[-1]:
+      if isinstance(value, AnonymousTuple):
+        stack.append(iter(value._element_array))  # pylint: disable=protected-access
+        break
+      result.extend(tf.nest.flatten(value))
+    else:
+      stack.pop()
+  return result
+
+
+def _get_pack_plan(structure):
+  """Returns the plan for packing flat sequences as `structure`.
+
+  The plan lists the leaves and the nested tuples of `structure` in postorder:
+  each leaf as `None`, and each tuple as the tuple of the names of its elements.
+  It is computed once per `structure`, and cached on it.
+
+  Args:
+    structure: An instance of `AnonymousTuple`.
+  """
+  # pylint: disable=protected-access
+  if structure._pack_plan is None:
+    plan = []
+    stack = [(structure, False)]
+    while stack:
+      value, visited = stack.pop()
+      if not isinstance(value, AnonymousTuple):
+        plan.append(None)
+      elif visited:
+        plan.append(value._element_names)
+      else:
+        stack.append((value, True))
+        stack.extend((v, False) for v in reversed(value._element_array))
+    structure._pack_plan = tuple(plan)
+  return structure._pack_plan
+  # pylint: enable=protected-access
 
 
 def pack_sequence_as(structure, flat_sequence):
@@ -266,19 +325,22 @@ def pack_sequence_as(structure, flat_sequence):
     with the same contents as `flat_sequence`.
   """
   py_typecheck.check_type(flat_sequence, list)
-
-  def _pack(structure, flat_sequence, position):
-    if not isinstance(structure, AnonymousTuple):
-      return flat_sequence[position], position + 1
+  if not isinstance(structure, AnonymousTuple):
+    return flat_sequence[0]
+  # Executes the cached plan, keeping the packed values on a stack, from which
+  # each tuple takes the values of its elements.
+  stack = []
+  position = 0
+  for names in _get_pack_plan(structure):
+    if names is None:
+      stack.append(flat_sequence[position])
+      position += 1
     else:
-      elements = []
-      for k, v in to_elements(structure):
-        packed_v, position = _pack(v, flat_sequence, position)
-        elements.append((k, packed_v))
-      return AnonymousTuple(elements), position
-
-  result, _ = _pack(structure, flat_sequence, 0)
-  return result
+      start = len(stack) - len(names)
+      values = stack[start:]
+      del stack[start:]
+      stack.append(_from_names_and_values(names, values))
+  return stack[0]
 
 
 def is_same_structure(a, b):
@@ -299,24 +361,26 @@ def is_same_structure(a, b):
   """
   py_typecheck.check_type(a, AnonymousTuple)
   py_typecheck.check_type(b, AnonymousTuple)
-  elems_a = to_elements(a)
-  elems_b = to_elements(b)
-  if len(elems_a) != len(elems_b):
-    return False
-  for elem_a, elem_b in zip(elems_a, elems_b):
-    val_a = elem_a[1]
-    val_b = elem_b[1]
-    if elem_a[0] != elem_b[0]:
-      return False
-    if isinstance(val_a, AnonymousTuple) and isinstance(val_b, AnonymousTuple):
-      return is_same_structure(val_a, val_b)
-    elif isinstance(val_a, AnonymousTuple) or isinstance(val_b, AnonymousTuple):
+  # The nested tuples are compared with an explicit stack of pairs, rather than
+  # recursively.
+  stack = [(a, b)]
+  while stack:
+    elems_a, elems_b = (to_elements(t) for t in stack.pop())
+    if len(elems_a) != len(elems_b):
       return False
-    else:
-      try:
-        tf.nest.assert_same_structure(val_a, val_b, check_types=True)
-      except (ValueError, TypeError):
+    for (name_a, val_a), (name_b, val_b) in zip(elems_a, elems_b):
+      if name_a != name_b:
         return False
+      if isinstance(val_a, AnonymousTuple) and isinstance(val_b, AnonymousTuple):
+        stack.append((val_a, val_b))
+      elif isinstance(val_a, AnonymousTuple) or isinstance(val_b,
+                                                           AnonymousTuple):
+        return False
+      else:
+        try:
+          tf.nest.assert_same_structure(val_a, val_b, check_types=True)
+        except (ValueError, TypeError):
+          return False
   return True
 
 
@@ -376,61 +440,62 @@ def from_container(value, recursive=False):
     TypeError: If the `value` is not of one of the supported container types.
   """
 
-  def _convert(value, recursive, must_be_container=False):
-    """The actual conversion function.
+  elements = _get_container_elements(value)
+  if elements is None:
+    raise TypeError('Unable to convert a Python object of type {} into '
+                    'an `AnonymousTuple`.'.format(
+                        py_typecheck.type_string(type(value))))
+  if not recursive:
+    if isinstance(value, AnonymousTuple):
+      return value
+    return AnonymousTuple(elements)
+  # The nested containers are converted postorder with an explicit stack rather
+  # than recursively. Each entry on the stack holds the elements of a container,
+  # and the values of those elements converted so far.
+  stack = [(elements, [])]
+  while True:
+    elements, converted = stack[-1]
+    if len(converted) < len(elements):
+      element_value = elements[len(converted)][1]
+      element_elements = _get_container_elements(element_value)
+      if element_elements is None:
+        converted.append(element_value)
+      else:
+        stack.append((element_elements, []))
+      continue
+    stack.pop()
+    result = AnonymousTuple([
+        (k, v) for (k, _), v in zip(elements, converted)
+    ])
+    if not stack:
+      return result
+    stack[-1][1].append(result)
 
-    Args:
-      value: Same as in `from_container`.
-      recursive: Same as in `from_container`.
-      must_be_container: When set to `True`, causes an exception to be raised if
-        `value` is not a container.
 
-    Returns:
-      The result of conversion.
+def _get_container_elements(value):
+  """Returns the `(name, value)` elements of a Python container `value`.
 
-    Raises:
-      TypeError: If `value` is not a container and `must_be_container` has
-        been set to `True`.
-    """
-    if isinstance(value, AnonymousTuple):
-      if recursive:
-        return AnonymousTuple([
-            (k, _convert(v, True)) for k, v in to_elements(value)
-        ])
-      else:
-        return value
-    elif py_typecheck.is_attrs(value):
-      return _convert(
-          attr.asdict(
-              value, dict_factory=collections.OrderedDict, recurse=False),
-          recursive, must_be_container)
-    elif py_typecheck.is_named_tuple(value):
-      return _convert(value._asdict(), recursive, must_be_container)
-    elif isinstance(value, collections.OrderedDict):
-      items = six.iteritems(value)
-      if recursive:
-        return AnonymousTuple([(k, _convert(v, True)) for k, v in items])
-      else:
-        return AnonymousTuple(list(items))
-    elif isinstance(value, dict):
-      items = sorted(list(six.iteritems(value)))
-      if recursive:
-        return AnonymousTuple([(k, _convert(v, True)) for k, v in items])
-      else:
-        return AnonymousTuple(items)
-    elif isinstance(value, (tuple, list)):
-      if recursive:
-        return AnonymousTuple([(None, _convert(v, True)) for v in value])
-      else:
-        return AnonymousTuple([(None, v) for v in value])
-    elif must_be_container:
-      raise TypeError('Unable to convert a Python object of type {} into '
-                      'an `AnonymousTuple`.'.format(
-                          py_typecheck.type_string(type(value))))
-    else:
-      return value
+  Args:
+    value: A value that may be a container supported by `from_container`.
 
-  return _convert(value, recursive, must_be_container=True)
+  Returns:
+    The list of elements, or `None` if `value` is not a supported container.
+  """
+  if isinstance(value, AnonymousTuple):
+    return to_elements(value)
+  elif py_typecheck.is_attrs(value):
+    return _get_container_elements(
+        attr.asdict(value, dict_factory=collections.OrderedDict, recurse=False))
+  elif py_typecheck.is_named_tuple(value):
+    return _get_container_elements(value._asdict())
+  elif isinstance(value, collections.OrderedDict):
+    return list(six.iteritems(value))
+  elif isinstance(value, dict):
+    return sorted(list(six.iteritems(value)))
+  elif isinstance(value, (tuple, list)):
+    return [(None, v) for v in value]
+  else:
+    return None
 
 
 def to_container_recursive(value, container_fn):
@@ -198,6 +198,42 @@ class AnonymousTupleTest(absltest.TestCase):
     z = anonymous_tuple.pack_sequence_as(x, y)
     self.assertEqual(str(z), '<a=10,b=<x=<p=40>,y=30,z=<q=50,r=60>>,c=20>')
 
+  def test_pack_sequence_as_with_empty_and_non_tuple_structures(self):
+    x = anonymous_tuple.AnonymousTuple([
+        ('a', anonymous_tuple.AnonymousTuple([])),
+        (None, 10),
+    ])
+    y = anonymous_tuple.pack_sequence_as(x, [20])
+    self.assertEqual(y, anonymous_tuple.AnonymousTuple([
+        ('a', anonymous_tuple.AnonymousTuple([])),
+        (None, 20),
+    ]))
+    self.assertEqual(anonymous_tuple.pack_sequence_as(10, [20]), 20)
+
+  def test_pack_sequence_as_reuses_structure(self):
+    x = anonymous_tuple.AnonymousTuple([
+        ('a', 10),
+        ('b', anonymous_tuple.AnonymousTuple([('x', 20), ('y', 30)])),
+    ])
+    y = anonymous_tuple.pack_sequence_as(x, [1, 2, 3])
+    z = anonymous_tuple.pack_sequence_as(x, [4, 5, 6])
+    self.assertEqual(str(y), '<a=1,b=<x=2,y=3>>')
+    self.assertEqual(str(z), '<a=4,b=<x=5,y=6>>')
+    self.assertEqual(z.b.y, 6)
+    self.assertEqual(dir(z.b), ['x', 'y'])
+
+  def test_flatten_and_pack_sequence_as_with_deep_and_wide_structure(self):
+    x = anonymous_tuple.AnonymousTuple([
+        ('v{}'.format(i), i) for i in range(10000)
+    ])
+    for _ in range(200):
+      x = anonymous_tuple.AnonymousTuple([('a', x), ('b', -1)])
+    y = anonymous_tuple.flatten(x)
+    self.assertLen(y, 10200)
+    self.assertEqual(y[:3], [0, 1, 2])
+    z = anonymous_tuple.pack_sequence_as(x, y)
+    self.assertEqual(z, x)
+
   def test_is_same_structure_check_types(self):
     self.assertTrue(
         anonymous_tuple.is_same_structure(
@@ -233,6 +269,18 @@ class AnonymousTupleTest(absltest.TestCase):
           {'x': 5.0},  # not an AnonymousTuple
           anonymous_tuple.AnonymousTuple([('x', 5.0)]))
 
+  def test_is_same_structure_compares_elements_after_nested_tuples(self):
+    self.assertFalse(
+        anonymous_tuple.is_same_structure(
+            anonymous_tuple.AnonymousTuple([
+                ('a', anonymous_tuple.AnonymousTuple([('z', 5)])),
+                ('b', 10),
+            ]),
+            anonymous_tuple.AnonymousTuple([
+                ('a', anonymous_tuple.AnonymousTuple([('z', 5)])),
+                ('c', 10),
+            ])))
+
   def test_map_structure(self):
     x = anonymous_tuple.AnonymousTuple([
         ('a', 10),
@@ -328,6 +376,16 @@ class AnonymousTupleTest(absltest.TestCase):
         recursive=True)
     self.assertEqual(str(x), '<x=<a=10,b=20>,y=<c=30,d=40>>')
 
+  def test_from_container_with_deeply_nested_lists_recursive(self):
+    value = 10
+    for _ in range(5000):
+      value = [value]
+    x = anonymous_tuple.from_container(value, recursive=True)
+    for _ in range(5000):
+      self.assertIsInstance(x, anonymous_tuple.AnonymousTuple)
+      x = x[0]
+    self.assertEqual(x, 10)
+
   def test_to_container_recursive(self):
 
     def odict(**kwargs):
@@ -20,6 +20,9 @@ from __future__ import print_function
 
 import abc
 import collections
+import itertools
+import threading
+import weakref
 
 import attr
 import six
@@ -28,12 +31,34 @@ import tensorflow as tf
 from tensorflow_federated.python.common_libs import anonymous_tuple
 from tensorflow_federated.python.common_libs import py_typecheck
 from tensorflow_federated.python.core.impl import placement_literals
-from tensorflow_federated.python.tensorflow_libs import tensor_utils
+
+
+# Maps the structural keys of the interned types (see
+# `Type._get_structural_key`) to their canonical types, i.e., the first type
+# with each key to be interned, which holds the canonical id shared by all the
+# types with that key. Equal types have equal canonical ids, which makes
+# comparing and hashing them cheap, once the ids are computed. Each interned
+# type holds a reference to its canonical type, so an entry is dropped from the
+# table once no type with its key is alive anymore, and a later type with that
+# key gets a new id.
+_canonical_types = weakref.WeakValueDictionary()
+_canonical_types_lock = threading.Lock()
+_canonical_id_sequence = itertools.count()
 
 
 @six.add_metaclass(abc.ABCMeta)
 class Type(object):
-  """An abstract interface for all classes that represent TFF types."""
+  """An abstract interface for all classes that represent TFF types.
+
+  Types are immutable. Each type is interned on first comparison or hashing,
+  i.e., it is assigned the canonical id shared by all types with the same
+  structure, so that the subsequent comparisons take constant time, regardless
+  of the size of the types.
+  """
+
+  _canonical_id = None
+  # The canonical type of this type, if it is not canonical itself.
+  _canonical_type = None
 
   def compact_representation(self):
     """Returns the compact string representation of this type."""
@@ -53,6 +78,31 @@ class Type(object):
     return self.compact_representation()
 
   @abc.abstractmethod
+  def _get_structural_key(self):
+    """Returns a hashable key identifying the structure of this type.
+
+    The keys of two types are equal iff their definitions are syntactically
+    identical. Nested types are represented in the key by their canonical ids.
+
+    Raises:
+      NotImplementedError: If not implemented in the derived class.
+    """
+    raise NotImplementedError
+
+  def _get_canonical_id(self):
+    """Returns the integer id shared by all types identical to this one."""
+    if self._canonical_id is None:
+      key = self._get_structural_key()
+      with _canonical_types_lock:
+        canonical_type = _canonical_types.get(key)
+        if canonical_type is None:
+          self._canonical_id = next(_canonical_id_sequence)
+          _canonical_types[key] = self
+        else:
+          self._canonical_type = canonical_type
+          self._canonical_id = canonical_type._canonical_id  # pylint: disable=protected-access
+    return self._canonical_id
+
   def __eq__(self, other):
     """Determines whether two type definitions are identical.
 
@@ -66,15 +116,20 @@ class Type(object):
     Returns:
       `True` iff type definitions are syntatically identical (as defined above),
       or `False` otherwise.
-
-    Raises:
-      NotImplementedError: If not implemented in the derived class.
     """
-    raise NotImplementedError
+    if self is other:
+      return True
+    # pylint: disable=protected-access
+    return (isinstance(other, Type) and
+            self._get_canonical_id() == other._get_canonical_id())
+    # pylint: enable=protected-access
 
   def __ne__(self, other):
     return not self == other
 
+  def __hash__(self):
+    return self._get_canonical_id()
+
 
 class TensorType(Type):
   """An implementation of `tff.Type` representing types of tensors in TFF."""
@@ -125,9 +180,12 @@ class TensorType(Type):
     else:
       return 'TensorType({})'.format(repr(self._dtype))
 
-  def __eq__(self, other):
-    return (isinstance(other, TensorType) and self._dtype == other.dtype and
-            tensor_utils.same_shape(self._shape, other.shape))
+  def _get_structural_key(self):
+    if self._shape.ndims is None:
+      dims = None
+    else:
+      dims = tuple(dim.value for dim in self._shape.dims)
+    return ('tensor', self._dtype, dims)
 
 
 class NamedTupleType(anonymous_tuple.AnonymousTuple, Type):
@@ -180,9 +238,20 @@ class NamedTupleType(anonymous_tuple.AnonymousTuple, Type):
     return 'NamedTupleType([{}])'.format(', '.join(
         [_element_repr(e) for e in anonymous_tuple.to_elements(self)]))
 
-  def __eq__(self, other):
-    return (isinstance(other, NamedTupleType) and
-            super(NamedTupleType, self).__eq__(other))
+  def _get_structural_key(self):
+    # The Python container type of `NamedTupleTypeWithPyContainerType` is not
+    # part of the key, it does not affect equality.
+    # pylint: disable=protected-access
+    return ('named_tuple',) + tuple(
+        (name, value._get_canonical_id())
+        for name, value in anonymous_tuple.to_elements(self))
+    # pylint: enable=protected-access
+
+  # The comparisons and hashing of `anonymous_tuple.AnonymousTuple` are replaced
+  # with the ones of `Type`, which does not compare the elements one by one.
+  __eq__ = Type.__eq__
+  __ne__ = Type.__ne__
+  __hash__ = Type.__hash__
 
 
 # While this lives in the `api` diretory, `NamedTupleTypeWithPyContainerType` is
@@ -219,8 +288,8 @@ class SequenceType(Type):
   def __repr__(self):
     return 'SequenceType({})'.format(repr(self._element))
 
-  def __eq__(self, other):
-    return isinstance(other, SequenceType) and self._element == other.element
+  def _get_structural_key(self):
+    return ('sequence', self._element._get_canonical_id())  # pylint: disable=protected-access
 
 
 class FunctionType(Type):
@@ -250,9 +319,14 @@ class FunctionType(Type):
     return 'FunctionType({}, {})'.format(
         repr(self._parameter), repr(self._result))
 
-  def __eq__(self, other):
-    return (isinstance(other, FunctionType) and
-            self._parameter == other.parameter and self._result == other.result)
+  def _get_structural_key(self):
+    # pylint: disable=protected-access
+    if self._parameter is not None:
+      parameter_id = self._parameter._get_canonical_id()
+    else:
+      parameter_id = None
+    return ('function', parameter_id, self._result._get_canonical_id())
+    # pylint: enable=protected-access
 
 
 class AbstractType(Type):
@@ -275,8 +349,8 @@ class AbstractType(Type):
   def __repr__(self):
     return 'AbstractType(\'{}\')'.format(self._label)
 
-  def __eq__(self, other):
-    return isinstance(other, AbstractType) and self._label == other.label
+  def _get_structural_key(self):
+    return ('abstract', self._label)
 
 
 class PlacementType(Type):
@@ -290,8 +364,8 @@ class PlacementType(Type):
   def __repr__(self):
     return 'PlacementType()'
 
-  def __eq__(self, other):
-    return isinstance(other, PlacementType)
+  def _get_structural_key(self):
+    return ('placement',)
 
 
 class FederatedType(Type):
@@ -346,11 +420,9 @@ class FederatedType(Type):
     return 'FederatedType({}, {}, {})'.format(
         repr(self._member), repr(self._placement), repr(self._all_equal))
 
-  def __eq__(self, other):
-    return (isinstance(other, FederatedType) and
-            self._member == other.member and
-            self._placement == other.placement and
-            self._all_equal == other.all_equal)
+  def _get_structural_key(self):
+    return ('federated', self._member._get_canonical_id(), self._placement.uri,  # pylint: disable=protected-access
+            self._all_equal)
 
 
 def to_type(spec):
@@ -19,6 +19,7 @@ from __future__ import division
 from __future__ import print_function
 
 import collections
+import gc
 
 from absl.testing import absltest
 import attr
@@ -256,6 +257,67 @@ class AbstractTypeTest(absltest.TestCase):
     self.assertNotEqual(t1, t3)
 
 
+class HashingTest(absltest.TestCase):
+
+  def test_equal_types_have_equal_hashes(self):
+    type_specs = [
+        lambda: computation_types.TensorType(tf.int32, [None, 10]),
+        lambda: computation_types.to_type([('a', tf.int32), tf.bool]),
+        lambda: computation_types.SequenceType(tf.int32),
+        lambda: computation_types.FunctionType(tf.int32, tf.bool),
+        lambda: computation_types.FunctionType(None, tf.bool),
+        lambda: computation_types.AbstractType('T'),
+        computation_types.PlacementType,
+        lambda: computation_types.FederatedType(tf.int32, placements.CLIENTS),
+    ]
+    for type_spec_fn in type_specs:
+      t1 = type_spec_fn()
+      t2 = type_spec_fn()
+      self.assertIsNot(t1, t2)
+      self.assertEqual(t1, t2)
+      self.assertEqual(hash(t1), hash(t2))
+
+  def test_types_can_be_used_as_keys(self):
+    t1 = computation_types.FederatedType([tf.int32], placements.CLIENTS)
+    t2 = computation_types.FederatedType([tf.int32], placements.SERVER)
+    t3 = computation_types.FederatedType([tf.int32], placements.CLIENTS)
+    values = {t1: 1, t2: 2}
+    self.assertLen(values, 2)
+    self.assertEqual(values[t3], 1)
+
+  def test_named_tuple_types_ignore_container_type(self):
+    t1 = computation_types.NamedTupleType([('a', tf.int32)])
+    t2 = computation_types.NamedTupleTypeWithPyContainerType(
+        [('a', tf.int32)], collections.OrderedDict)
+    self.assertEqual(t1, t2)
+    self.assertEqual(hash(t1), hash(t2))
+
+  def test_types_are_not_equal_to_other_values(self):
+    t = computation_types.NamedTupleType([('a', tf.int32)])
+    self.assertNotEqual(t, anonymous_tuple.AnonymousTuple([('a', t.a)]))
+    self.assertNotEqual(t, None)
+
+  def test_interning_does_not_keep_types_alive(self):
+    t = computation_types.SequenceType(
+        computation_types.TensorType(tf.int32, [17, 23]))
+    hash(t)
+    key = t._get_structural_key()  # pylint: disable=protected-access
+    self.assertIn(key, computation_types._canonical_types)  # pylint: disable=protected-access
+    del t
+    gc.collect()
+    self.assertNotIn(key, computation_types._canonical_types)  # pylint: disable=protected-access
+
+  def test_equal_types_stay_equal_after_first_type_is_released(self):
+    t1 = computation_types.TensorType(tf.int32, [19, 29])
+    t2 = computation_types.TensorType(tf.int32, [19, 29])
+    self.assertEqual(t1, t2)
+    del t1
+    gc.collect()
+    t3 = computation_types.TensorType(tf.int32, [19, 29])
+    self.assertEqual(t2, t3)
+    self.assertEqual(hash(t2), hash(t3))
+
+
 class PlacementTypeTest(absltest.TestCase):
 
   def test_construction(self):
@@ -22,6 +22,7 @@ import itertools
 
 import six
 
+from tensorflow_federated.proto.v0 import computation_pb2 as pb
 from tensorflow_federated.python.common_libs import py_typecheck
 from tensorflow_federated.python.core import api as tff
 from tensorflow_federated.python.core import framework as tff_framework
@@ -584,14 +585,64 @@ def extract_update(after_aggregate, canonical_form_types):
   return update
 
 
-def get_canonical_form_for_iterative_process(iterative_process):
+# The version of the output of `get_canonical_form_for_iterative_process`, which
+# must be incremented whenever a change may change the output for the same
+# input, in order to invalidate the canonical forms cached by earlier versions.
+_CANONICAL_FORM_VERSION = 1
+
+# The names of the computations in a `CanonicalForm`, in the order they are
+# passed to its constructor.
+_CANONICAL_FORM_COMPUTATION_NAMES = [
+    'initialize',
+    'prepare',
+    'work',
+    'zero',
+    'accumulate',
+    'merge',
+    'report',
+    'update',
+]
+
+
+def _canonical_form_to_proto(cf):
+  """Packs the computations in `cf` into a tuple `pb.Computation`."""
+  elements = []
+  for name in _CANONICAL_FORM_COMPUTATION_NAMES:
+    comp = getattr(cf, name)
+    elements.append(
+        pb.Computation.Tuple.Element(
+            name=name, value=comp._computation_proto))  # pylint: disable=protected-access
+  return pb.Computation(tuple=pb.Computation.Tuple(element=elements))
+
+
+def _canonical_form_from_proto(proto):
+  """Unpacks a `CanonicalForm` packed by `_canonical_form_to_proto`."""
+  elements = {e.name: e.value for e in proto.tuple.element}
+  if set(elements) != set(_CANONICAL_FORM_COMPUTATION_NAMES):
+    raise ValueError('Expected the computations {}, found {}.'.format(
+        _CANONICAL_FORM_COMPUTATION_NAMES, list(elements)))
+  return canonical_form.CanonicalForm(*[
+      tff_framework.building_block_to_computation(
+          tff_framework.ComputationBuildingBlock.from_proto(elements[name]))
+      for name in _CANONICAL_FORM_COMPUTATION_NAMES
+  ])
+
+
+def get_canonical_form_for_iterative_process(iterative_process, cache=None):
   """Constructs `tff.backends.mapreduce.CanonicalForm` given iterative process.
 
   This function transforms computations from the input `iterative_process` into
   an instance of `tff.backends.mapreduce.CanonicalForm`.
 
+  The result can be persisted in a `tff.framework.CompilationCache`, keyed by
+  the computations in `iterative_process`, so that the same process is not
+  compiled again in subsequent runs of the same program.
+
   Args:
     iterative_process: An instance of `tff.utils.IterativeProcess`.
+    cache: An optional instance of `tff.framework.CompilationCache` to store the
+      result in. If `None`, the default cache set with
+      `tff.framework.set_default_compilation_cache`, if any, is used.
 
   Returns:
     An instance of `tff.backends.mapreduce.CanonicalForm` equivalent to this
@@ -603,7 +654,27 @@ def get_canonical_form_for_iterative_process(iterative_process):
       process fails.
   """
   py_typecheck.check_type(iterative_process, tff_utils.IterativeProcess)
+  if cache is None:
+    cache = tff_framework.get_default_compilation_cache()
+  else:
+    py_typecheck.check_type(cache, tff_framework.CompilationCache)
+  if cache is None:
+    return _get_canonical_form_for_iterative_process(iterative_process)
+  cache_key = tff_framework.make_cache_key(
+      'canonical_form', _CANONICAL_FORM_VERSION, [
+          iterative_process.initialize._computation_proto,  # pylint: disable=protected-access
+          iterative_process.next._computation_proto,  # pylint: disable=protected-access
+      ])
+  proto = cache.get_computation(cache_key)
+  if proto is not None:
+    return _canonical_form_from_proto(proto)
+  cf = _get_canonical_form_for_iterative_process(iterative_process)
+  cache.put_computation(cache_key, _canonical_form_to_proto(cf))
+  return cf
+
 
+def _get_canonical_form_for_iterative_process(iterative_process):
+  """Implements `get_canonical_form_for_iterative_process` without a cache."""
   initialize_comp = tff_framework.ComputationBuildingBlock.from_proto(
       iterative_process.initialize._computation_proto)  # pylint: disable=protected-access
 
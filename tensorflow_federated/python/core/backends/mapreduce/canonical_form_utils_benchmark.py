@@ -0,0 +1,85 @@
+# Lint as: python3
+# Copyright 2019, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark for compiling the examples in test_utils.py."""
+
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from tensorflow_federated.python.core.backends.mapreduce import canonical_form_utils
+from tensorflow_federated.python.core.backends.mapreduce import test_utils
+from tensorflow_federated.python.core.impl import intrinsic_reductions
+from tensorflow_federated.python.core.impl import transformations
+from tensorflow_federated.python.core.impl.compiler import tree_analysis
+
+_EXAMPLES = [
+    ('temperature sensor', test_utils.get_temperature_sensor_example),
+    ('mnist training', test_utils.get_mnist_training_example),
+]
+
+
+def _get_iterative_process(example_fn):
+  return canonical_form_utils.get_iterative_process_for_canonical_form(
+      example_fn())
+
+
+class CanonicalFormUtilsBenchmark(tf.test.Benchmark):
+  """Measures the compile time of the examples in `test_utils`."""
+
+  def _report(self, name, execution_array, **extras):
+    extras['std_dev'] = np.std(execution_array)
+    self.report_benchmark(
+        name=name,
+        wall_time=np.mean(execution_array),
+        iters=len(execution_array),
+        extras=extras)
+
+  def benchmark_remove_duplicate_computations(self):
+    for example_name, example_fn in _EXAMPLES:
+      iterative_process = _get_iterative_process(example_fn)
+      comp = test_utils.computation_to_building_block(iterative_process.next)
+      comp = intrinsic_reductions.replace_intrinsics_with_bodies(comp)
+      comp, _ = transformations.uniquify_reference_names(comp)
+      comp, _ = transformations.extract_computations(comp)
+      execution_array = []
+      for _ in range(10):
+        start = time.time()
+        transformed_comp, _ = transformations.remove_duplicate_computations(
+            comp)
+        stop = time.time()
+        execution_array.append(stop - start)
+      self._report(
+          'remove_duplicate_computations, {}'.format(example_name),
+          execution_array,
+          num_nodes=tree_analysis.count(comp),
+          num_nodes_after=tree_analysis.count(transformed_comp))
+
+  def benchmark_get_canonical_form_for_iterative_process(self):
+    for example_name, example_fn in _EXAMPLES:
+      iterative_process = _get_iterative_process(example_fn)
+      execution_array = []
+      for _ in range(3):
+        start = time.time()
+        canonical_form_utils.get_canonical_form_for_iterative_process(
+            iterative_process)
+        stop = time.time()
+        execution_array.append(stop - start)
+      self._report('get_canonical_form_for_iterative_process, {}'.format(
+          example_name), execution_array)
+
+
+if __name__ == '__main__':
+  tf.test.main()
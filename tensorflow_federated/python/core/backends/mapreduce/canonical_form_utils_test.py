@@ -18,6 +18,8 @@ from __future__ import division
 from __future__ import print_function
 
 import collections
+import shutil
+import tempfile
 
 from absl.testing import absltest
 import numpy as np
@@ -28,6 +30,7 @@ from tensorflow_federated.python.core.api import placements
 from tensorflow_federated.python.core.backends.mapreduce import canonical_form
 from tensorflow_federated.python.core.backends.mapreduce import canonical_form_utils
 from tensorflow_federated.python.core.backends.mapreduce import test_utils
+from tensorflow_federated.python.core.impl import compilation_cache
 from tensorflow_federated.python.core.impl import computation_wrapper_instances
 from tensorflow_federated.python.core.impl.compiler import building_blocks
 from tensorflow_federated.python.core.utils import computation_utils
@@ -88,6 +91,27 @@ class CanonicalFormUtilsTest(absltest.TestCase):
     cf = canonical_form_utils.get_canonical_form_for_iterative_process(it)
     self.assertIsInstance(cf, canonical_form.CanonicalForm)
 
+  def test_get_canonical_form_for_iterative_process_with_cache(self):
+    root_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, root_dir)
+    cache = compilation_cache.CompilationCache(root_dir)
+    it = canonical_form_utils.get_iterative_process_for_canonical_form(
+        test_utils.get_temperature_sensor_example())
+
+    cf = canonical_form_utils.get_canonical_form_for_iterative_process(
+        it, cache=cache)
+    cached_cf = canonical_form_utils.get_canonical_form_for_iterative_process(
+        it, cache=cache)
+
+    self.assertEqual(cache.stats.misses, 1)
+    self.assertEqual(cache.stats.hits, 1)
+    self.assertIsInstance(cached_cf, canonical_form.CanonicalForm)
+    for name in ['initialize', 'prepare', 'work', 'zero', 'accumulate', 'merge',
+                 'report', 'update']:
+      self.assertEqual(
+          getattr(cached_cf, name)._computation_proto,  # pylint: disable=protected-access
+          getattr(cf, name)._computation_proto)  # pylint: disable=protected-access
+
   def test_temperature_example_round_trip_(self):
     it = canonical_form_utils.get_iterative_process_for_canonical_form(
         test_utils.get_temperature_sensor_example())
@@ -20,6 +20,10 @@ from __future__ import print_function
 
 import six
 
+from tensorflow_federated.python.core.impl.compilation_cache import CompilationCache
+from tensorflow_federated.python.core.impl.compilation_cache import get_default_compilation_cache
+from tensorflow_federated.python.core.impl.compilation_cache import make_cache_key
+from tensorflow_federated.python.core.impl.compilation_cache import set_default_compilation_cache
 from tensorflow_federated.python.core.impl.compiler.building_block_analysis import is_called_intrinsic
 from tensorflow_federated.python.core.impl.compiler.building_blocks import Block
 from tensorflow_federated.python.core.impl.compiler.building_blocks import Call
@@ -74,6 +78,7 @@ if six.PY3:
     from tensorflow_federated.python.core.impl.caching_executor import CachingExecutor
     from tensorflow_federated.python.core.impl.concurrent_executor import ConcurrentExecutor
     from tensorflow_federated.python.core.impl.eager_executor import EagerExecutor
+    from tensorflow_federated.python.core.impl.elastic_executor import ElasticExecutor
     from tensorflow_federated.python.core.impl.executor_base import Executor
     from tensorflow_federated.python.core.impl.executor_service import ExecutorService
     from tensorflow_federated.python.core.impl.executor_stacks import create_local_executor
@@ -92,10 +97,12 @@ _allowed_symbols = [
     "Block",
     "CachingExecutor",
     "Call",
+    "CompilationCache",
     "CompiledComputation",
     "ComputationBuildingBlock",
     "ConcurrentExecutor",
     "EagerExecutor",
+    "ElasticExecutor",
     "Executor",
     "ExecutorService",
     "ExecutorValue",
@@ -123,17 +130,20 @@ _allowed_symbols = [
     "create_federated_map_or_apply",
     "create_federated_zip",
     "create_local_executor",
+    "get_default_compilation_cache",
     "get_map_of_unbound_references",
     "inline_block_locals",
     "insert_called_tf_identity_at_leaves",
     "is_assignable_from",
     "is_called_intrinsic",
     "is_tensorflow_compatible_type",
+    "make_cache_key",
     "merge_tuple_intrinsics",
     "remove_lambdas_and_blocks",
     "remove_mapped_or_applied_identity",
     "replace_called_lambda_with_block",
     "replace_intrinsics_with_bodies",
+    "set_default_compilation_cache",
     "set_default_executor",
     "transform_postorder",
     "transform_type_postorder",
@@ -16,6 +16,11 @@
 
 import asyncio
 import collections
+import hashlib
+import sys
+import time
+import weakref
+
 import cachetools
 import numpy as np
 import tensorflow as tf
@@ -73,10 +78,14 @@ def _get_hashable_key(value, type_spec):
     else:
       return tuple([_get_hashable_key(x, type_spec.member) for x in value])
   elif isinstance(value, pb.Computation):
-    return str(value)
+    return ('computation', _digest(value.SerializeToString(deterministic=True)))
   elif isinstance(value, np.ndarray):
-    return '<dtype={},shape={},items={}>'.format(value.dtype, value.shape,
-                                                 value.flatten())
+    if value.dtype.hasobject:
+      # Arrays of Python objects (e.g., strings) have no meaningful buffer.
+      return ('ndarray', value.dtype.str, value.shape,
+              tuple(value.flatten().tolist()))
+    return ('ndarray', value.dtype.str, value.shape,
+            _digest(memoryview(np.ascontiguousarray(value)).cast('B')))
   elif (isinstance(value, collections.Hashable) and
         not isinstance(value, (tf.Tensor, tf.Variable))):
     # TODO(b/139200385): Currently Tensor and Variable returns True for
@@ -87,27 +96,121 @@ def _get_hashable_key(value, type_spec):
     return HashableWrapper(value)
 
 
+def _digest(*parts):
+  """Returns a compact 128-bit integer digest of a sequence of `parts`.
+
+  Args:
+    *parts: Objects to digest. Objects of type `bytes` or `memoryview` are
+      digested directly, and all other objects via their string representation.
+      Each part is length-prefixed, so that distinct sequences produce distinct
+      input to the hash function.
+
+  Returns:
+    A non-negative Python integer.
+  """
+  hasher = hashlib.blake2b(digest_size=16)
+  for part in parts:
+    if not isinstance(part, (bytes, memoryview)):
+      part = str(part).encode('utf-8')
+    hasher.update(len(part).to_bytes(8, 'little'))
+    hasher.update(part)
+  return int.from_bytes(hasher.digest(), 'little')
+
+
 class CachedValueIdentifier(collections.Hashable):
-  """An identifier for a cached value."""
+  """An identifier for a cached value.
+
+  Identifiers are structural: the identifier of a call, tuple, or selection is
+  a Merkle-style digest computed from the digests of the identifiers of its
+  constituents, so that the size of an identifier, and the cost of hashing and
+  comparing identifiers, does not grow with the depth or width of the structure
+  they identify. The human-readable string representation is only constructed
+  on demand.
+  """
+
+  __slots__ = ('_kind', '_label', '_children', '_digest')
 
   def __init__(self, identifier):
+    """Creates an identifier for a leaf value created with `create_value()`.
+
+    Args:
+      identifier: A string that uniquely identifies the value.
+    """
     py_typecheck.check_type(identifier, str)
-    self._identifier = identifier
+    self._init('value', identifier, ())
+
+  def _init(self, kind, label, children):
+    self._kind = kind
+    self._label = label
+    self._children = children
+    self._digest = _digest(kind, label, *[c.digest for c in children])
+
+  @classmethod
+  def _create(cls, kind, label, children):
+    identifier = cls.__new__(cls)
+    identifier._init(kind, label, children)  # pylint: disable=protected-access
+    return identifier
+
+  @classmethod
+  def for_call(cls, comp, arg=None):
+    """Returns an identifier for a call to `comp` with optional `arg`."""
+    py_typecheck.check_type(comp, CachedValueIdentifier)
+    if arg is None:
+      return cls._create('call', None, (comp,))
+    py_typecheck.check_type(arg, CachedValueIdentifier)
+    return cls._create('call', None, (comp, arg))
+
+  @classmethod
+  def for_tuple(cls, names, elements):
+    """Returns an identifier for a tuple of `elements` with `names`."""
+    for e in elements:
+      py_typecheck.check_type(e, CachedValueIdentifier)
+    return cls._create('tuple', tuple(names), tuple(elements))
+
+  @classmethod
+  def for_selection(cls, source, index=None, name=None):
+    """Returns an identifier for a selection from `source`."""
+    py_typecheck.check_type(source, CachedValueIdentifier)
+    if index is not None:
+      return cls._create('index', index, (source,))
+    return cls._create('name', name, (source,))
+
+  @property
+  def digest(self):
+    return self._digest
 
   def __hash__(self):
-    return hash(self._identifier)
+    return hash(self._digest)
 
   def __eq__(self, other):
     # pylint: disable=protected-access
     return (isinstance(other, CachedValueIdentifier) and
-            self._identifier == other._identifier)
+            self._digest == other._digest)
     # pylint: enable=protected-access
 
   def __repr__(self):
-    return 'CachedValueIdentifier({})'.format(self._identifier)
+    return 'CachedValueIdentifier({})'.format(str(self))
 
   def __str__(self):
-    return self._identifier
+    if self._kind == 'value':
+      return self._label
+    elif self._kind == 'call':
+      return '{}({})'.format(
+          self._children[0],
+          str(self._children[1]) if len(self._children) > 1 else '')
+    elif self._kind == 'tuple':
+      return '<{}>'.format(','.join(
+          '{}={}'.format(k, v) if k is not None else str(v)
+          for k, v in zip(self._label, self._children)))
+    elif self._kind == 'index':
+      return '{}[{}]'.format(self._children[0], self._label)
+    else:
+      return '{}.{}'.format(self._children[0], self._label)
+
+
+CacheStatistics = collections.namedtuple(
+    'CacheStatistics',
+    ['hits', 'misses', 'lookup_seconds', 'num_entries', 'key_bytes'])
 
 
 class CachedValue(executor_value_base.ExecutorValue):
@@ -163,6 +266,211 @@ class CachedValue(executor_value_base.ExecutorValue):
     return self._computed_result
 
 
+# The assumed size of values whose footprint cannot be determined from their
+# type signature alone (e.g., sequences or functions), and the overhead of each
+# cache entry, both in bytes.
+_DEFAULT_OPAQUE_VALUE_BYTES = 1024
+_CACHE_ENTRY_OVERHEAD_BYTES = 256
+
+
+def estimate_value_bytes(type_spec):
+  """Returns an estimate of the memory footprint of a value of type `type_spec`.
+
+  The estimate for tensors is the size of the dtype multiplied by the number of
+  elements (with unknown dimensions counting as 1), summed over the elements of
+  named tuples. The footprint of federated values is estimated as that of a
+  single member, since the members themselves are held by the executors that
+  the federated values are embedded in. Values of all other types are counted
+  as `_DEFAULT_OPAQUE_VALUE_BYTES`.
+
+  Args:
+    type_spec: An instance of `tff.Type`.
+
+  Returns:
+    The estimated number of bytes.
+  """
+  py_typecheck.check_type(type_spec, computation_types.Type)
+  if isinstance(type_spec, computation_types.TensorType):
+    num_elements = 1
+    for dim in type_spec.shape.as_list() if type_spec.shape.dims else []:
+      num_elements *= dim if dim is not None else 1
+    return num_elements * type_spec.dtype.size
+  elif isinstance(type_spec, computation_types.NamedTupleType):
+    return sum(
+        estimate_value_bytes(t) for _, t in anonymous_tuple.to_elements(type_spec))
+  elif isinstance(type_spec, computation_types.FederatedType):
+    return estimate_value_bytes(type_spec.member)
+  else:
+    return _DEFAULT_OPAQUE_VALUE_BYTES
+
+
+def _get_cache_entry_bytes(entry):
+  """Returns the number of bytes to account for a cache `entry`."""
+  if isinstance(entry, CachedValue):
+    return _CACHE_ENTRY_OVERHEAD_BYTES + estimate_value_bytes(
+        entry.type_signature)
+  else:
+    return _CACHE_ENTRY_OVERHEAD_BYTES
+
+
+def _get_key_bytes(key, seen):
+  """Returns the number of bytes occupied by a cache `key`.
+
+  The size includes the objects that make up the key, such as the elements of
+  tuples and the children of identifiers, except those whose ids are already
+  in `seen`, so that objects shared between keys are only counted once. The
+  values wrapped by `HashableWrapper`s are not owned by the keys, and are not
+  counted.
+
+  Args:
+    key: A cache key.
+    seen: A set of the ids of the objects that have already been counted, to
+      which the ids of the objects counted for `key` are added.
+
+  Returns:
+    The number of bytes.
+  """
+  if id(key) in seen:
+    return 0
+  seen.add(id(key))
+  size = sys.getsizeof(key)
+  if isinstance(key, CachedValueIdentifier):
+    # pylint: disable=protected-access
+    parts = [key._kind, key._label, key._children, key._digest]
+    # pylint: enable=protected-access
+  elif isinstance(key, anonymous_tuple.AnonymousTuple):
+    parts = anonymous_tuple.to_elements(key)
+  elif isinstance(key, (tuple, list)):
+    parts = key
+  else:
+    parts = []
+  return size + sum(_get_key_bytes(p, seen) for p in parts)
+
+
+class SizeAwareLRUCache(cachetools.Cache):
+  """An LRU cache bounded by the estimated memory footprint of its entries.
+
+  In contrast to `cachetools.LRUCache`, which counts entries, this cache
+  estimates the footprint of each `CachedValue` from its type signature (see
+  `estimate_value_bytes()`), and evicts the least recently used entries once
+  their total exceeds `max_bytes`. Entries that are still being computed are
+  pinned and skipped during eviction, so the budget may be temporarily exceeded
+  if everything in the cache is still being computed.
+
+  Evicted `CachedValue`s are only weakly referenced by the cache afterwards.
+  Those still referenced from outside of the cache (and thus kept in memory
+  regardless) can still be looked up, and are reinstated in the cache when they
+  are, so that the same value is reused for as long as it is in use, without
+  counting against the budget in the meantime.
+  """
+
+  def __init__(self, max_bytes, is_pinned=None):
+    """Creates a new cache.
+
+    Args:
+      max_bytes: The budget for the total estimated size of the entries.
+      is_pinned: An optional function that accepts an entry and returns whether
+        it should be pinned, in addition to the entries still being computed.
+
+    Raises:
+      ValueError: If `max_bytes` is not positive.
+    """
+    py_typecheck.check_type(max_bytes, int)
+    if is_pinned is not None:
+      py_typecheck.check_callable(is_pinned)
+    if max_bytes < 1:
+      raise ValueError('The cache budget must be >= 1, found {}.'.format(
+          max_bytes))
+    super(SizeAwareLRUCache, self).__init__(
+        maxsize=float('inf'), getsizeof=_get_cache_entry_bytes)
+    self._max_bytes = max_bytes
+    self._is_pinned = is_pinned
+    self._order = collections.OrderedDict()
+    self._evicted_values = weakref.WeakValueDictionary()
+    self._num_evictions = 0
+    self._evicted_bytes = 0
+
+  @property
+  def max_bytes(self):
+    return self._max_bytes
+
+  @property
+  def num_evictions(self):
+    return self._num_evictions
+
+  @property
+  def evicted_bytes(self):
+    return self._evicted_bytes
+
+  def __contains__(self, key):
+    return (super(SizeAwareLRUCache, self).__contains__(key) or
+            key in self._evicted_values)
+
+  def __missing__(self, key):
+    # The entry has been evicted, but is still referenced from elsewhere.
+    value = self._evicted_values.pop(key, None)
+    if value is None:
+      raise KeyError(key)
+    self[key] = value
+    return value
+
+  def __getitem__(self, key):
+    value = super(SizeAwareLRUCache, self).__getitem__(key)
+    if key in self._order:
+      self._order.move_to_end(key)
+    return value
+
+  def __setitem__(self, key, value):
+    self._evicted_values.pop(key, None)
+    super(SizeAwareLRUCache, self).__setitem__(key, value)
+    self._order[key] = None
+    self._order.move_to_end(key)
+    self._evict()
+
+  def __delitem__(self, key):
+    super(SizeAwareLRUCache, self).__delitem__(key)
+    del self._order[key]
+
+  def popitem(self):
+    """Removes and returns the least recently used unpinned `(key, value)`."""
+    for key in self._order:
+      value = super(SizeAwareLRUCache, self).__getitem__(key)
+      if not self._is_in_use(value):
+        del self[key]
+        return key, value
+    raise KeyError('There are no unpinned entries in the cache.')
+
+  def _is_in_use(self, value):
+    """Returns whether an entry `value` should be pinned.
+
+    Args:
+      value: The entry.
+
+    Returns:
+      `True` iff `value` is a `CachedValue` that is still being computed, or it
+      is pinned by `is_pinned`.
+    """
+    if self._is_pinned is not None and self._is_pinned(value):
+      return True
+    return isinstance(value, CachedValue) and not value.target_future.done()
+
+  def _evict(self):
+    """Evicts unpinned entries in the LRU order until within the budget."""
+    if self.currsize <= self._max_bytes:
+      return
+    for key in list(self._order):
+      if self.currsize <= self._max_bytes:
+        break
+      value = super(SizeAwareLRUCache, self).__getitem__(key)
+      if self._is_in_use(value):
+        continue
+      self._evicted_bytes += self.getsizeof(value)
+      self._num_evictions += 1
+      del self[key]
+      if isinstance(value, CachedValue):
+        self._evicted_values[key] = value
+
+
 _DEFAULT_CACHE_SIZE = 1000
 
 
@@ -172,17 +480,15 @@ class CachingExecutor(executor_base.Executor):
   # TODO(b/134543154): Factor out default cache settings to supply elsewhere,
   # possibly as a part of executor stack configuration.
 
-  # TODO(b/134543154): It might be desirable to still keep aorund things that
-  # are currently in use (referenced) regardless of what's in the cache. This
-  # can be added later on.
-
   def __init__(self, target_executor, cache=None):
     """Creates a new instance of this executor.
 
     Args:
       target_executor: An instance of `executor_base.Executor`.
       cache: The cache to use (must be an instance of `cachetools.Cache`).
-        If unspecified, by default we construct a 1000-element LRU cache.
+        If unspecified, by default we construct a 1000-element LRU cache. To
+        bound the cache by the memory footprint of the cached values rather
+        than their number, supply an instance of `SizeAwareLRUCache`.
     """
     py_typecheck.check_type(target_executor, executor_base.Executor)
     if cache is not None:
@@ -192,11 +498,50 @@ class CachingExecutor(executor_base.Executor):
     self._target_executor = target_executor
     self._cache = cache
     self._num_values_created = 0
+    self._num_hits = 0
+    self._num_misses = 0
+    self._lookup_seconds = 0.0
 
   def __del__(self):
     for k in list(self._cache):
       del self._cache[k]
 
+  def get_cache_statistics(self):
+    """Returns an instance of `CacheStatistics` for this executor.
+
+    The `hits`, `misses`, and `lookup_seconds` count all the cache lookups
+    performed by this executor, and the total time spent in them. The
+    `num_entries` and `key_bytes` describe the current contents of the cache,
+    with the latter being the memory occupied by the keys, including the
+    objects they are made of.
+    """
+    seen = set()
+    return CacheStatistics(
+        hits=self._num_hits,
+        misses=self._num_misses,
+        lookup_seconds=self._lookup_seconds,
+        num_entries=len(self._cache),
+        key_bytes=sum(_get_key_bytes(k, seen) for k in list(self._cache)))
+
+  def _lookup(self, key):
+    """Returns the entry for `key` in the cache, or `None` if absent.
+
+    The lookup is not counted in the statistics, since a single operation of
+    this executor may need several lookups; see `_record_lookup`.
+    """
+    start_time = time.perf_counter()
+    try:
+      return self._cache.get(key)
+    finally:
+      self._lookup_seconds += time.perf_counter() - start_time
+
+  def _record_lookup(self, hit):
+    """Counts one cache lookup of an operation, as a hit if `hit` is true."""
+    if hit:
+      self._num_hits += 1
+    else:
+      self._num_misses += 1
+
   async def create_value(self, value, type_spec=None):
     type_spec = computation_types.to_type(type_spec)
     if isinstance(value, computation_impl.ComputationImpl):
@@ -206,28 +551,27 @@ class CachingExecutor(executor_base.Executor):
     py_typecheck.check_type(type_spec, computation_types.Type)
     hashable_key = _get_hashable_key(value, type_spec)
     try:
-      identifier = self._cache[hashable_key]
-    except KeyError:
-      identifier = None
+      identifier = self._lookup(hashable_key)
     except TypeError as err:
       raise RuntimeError(
           'Failed to perform a has table lookup with a value of Python '
           'type {} and TFF type {}, and payload {}: {}'.format(
               py_typecheck.type_string(type(value)), type_spec, value, err))
     if isinstance(identifier, CachedValueIdentifier):
-      try:
-        cached_value = self._cache[identifier]
-      except KeyError:
-        cached_value = None
+      cached_value = self._lookup(identifier)
       # If may be that the same payload appeared with a mismatching type spec,
       # which may be a legitimate use case if (as it happens) the payload alone
       # does not uniquely determine the type, so we simply opt not to reuse the
       # cache value and fallback on the regular behavior.
-      if type_spec is not None and not type_utils.are_equivalent_types(
-          cached_value.type_signature, type_spec):
+      # It may also be that the cached value has been evicted while the key
+      # that maps to its identifier has not.
+      if cached_value is None or (
+          type_spec is not None and not type_utils.are_equivalent_types(
+              cached_value.type_signature, type_spec)):
         identifier = None
     else:
       identifier = None
+    self._record_lookup(identifier is not None)
     if identifier is None:
       self._num_values_created = self._num_values_created + 1
       identifier = CachedValueIdentifier(str(self._num_values_created))
@@ -252,15 +596,15 @@ class CachingExecutor(executor_base.Executor):
       type_utils.check_assignable_from(comp.type_signature.parameter,
                                        arg.type_signature)
       to_gather.append(arg.target_future)
-      identifier_str = '{}({})'.format(comp.identifier, arg.identifier)
+      identifier = CachedValueIdentifier.for_call(comp.identifier,
+                                                  arg.identifier)
     else:
-      identifier_str = '{}()'.format(comp.identifier)
+      identifier = CachedValueIdentifier.for_call(comp.identifier)
     gathered = await asyncio.gather(*to_gather)
     type_spec = comp.type_signature.result
-    identifier = CachedValueIdentifier(identifier_str)
-    try:
-      cached_value = self._cache[identifier]
-    except KeyError:
+    cached_value = self._lookup(identifier)
+    self._record_lookup(cached_value is not None)
+    if cached_value is None:
       target_future = asyncio.ensure_future(
           self._target_executor.create_call(*gathered))
       cached_value = CachedValue(identifier, None, type_spec, target_future)
@@ -272,26 +616,28 @@ class CachingExecutor(executor_base.Executor):
   async def create_tuple(self, elements):
     if not isinstance(elements, anonymous_tuple.AnonymousTuple):
       elements = anonymous_tuple.from_container(elements)
-    element_strings = []
+    element_names = []
+    element_identifiers = []
     element_kv_pairs = anonymous_tuple.to_elements(elements)
     to_gather = []
     type_elements = []
     for k, v in element_kv_pairs:
       py_typecheck.check_type(v, CachedValue)
       to_gather.append(v.target_future)
+      element_names.append(k)
+      element_identifiers.append(v.identifier)
       if k is not None:
         py_typecheck.check_type(k, str)
-        element_strings.append('{}={}'.format(k, str(v.identifier)))
         type_elements.append((k, v.type_signature))
       else:
-        element_strings.append(str(v.identifier))
         type_elements.append(v.type_signature)
     type_spec = computation_types.NamedTupleType(type_elements)
     gathered = await asyncio.gather(*to_gather)
-    identifier = CachedValueIdentifier('<{}>'.format(','.join(element_strings)))
-    try:
-      cached_value = self._cache[identifier]
-    except KeyError:
+    identifier = CachedValueIdentifier.for_tuple(element_names,
+                                                 element_identifiers)
+    cached_value = self._lookup(identifier)
+    self._record_lookup(cached_value is not None)
+    if cached_value is None:
       target_future = asyncio.ensure_future(
           self._target_executor.create_tuple(
               anonymous_tuple.AnonymousTuple([
@@ -310,16 +656,15 @@ class CachingExecutor(executor_base.Executor):
     source_val = await source.target_future
     if index is not None:
       py_typecheck.check_none(name)
-      identifier_str = '{}[{}]'.format(source.identifier, index)
       type_spec = source.type_signature[index]
     else:
       py_typecheck.check_not_none(name)
-      identifier_str = '{}.{}'.format(source.identifier, name)
       type_spec = getattr(source.type_signature, name)
-    identifier = CachedValueIdentifier(identifier_str)
-    try:
-      cached_value = self._cache[identifier]
-    except KeyError:
+    identifier = CachedValueIdentifier.for_selection(
+        source.identifier, index=index, name=name)
+    cached_value = self._lookup(identifier)
+    self._record_lookup(cached_value is not None)
+    if cached_value is None:
       target_future = asyncio.ensure_future(
           self._target_executor.create_selection(
               source_val, index=index, name=name))
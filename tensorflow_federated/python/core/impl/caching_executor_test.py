@@ -16,6 +16,7 @@
 
 import asyncio
 import collections
+import sys
 
 from absl.testing import absltest
 import numpy as np
@@ -24,6 +25,7 @@ import tensorflow as tf
 from tensorflow_federated.python.common_libs import anonymous_tuple
 from tensorflow_federated.python.core.api import computation_types
 from tensorflow_federated.python.core.api import computations
+from tensorflow_federated.python.core.api import placements
 from tensorflow_federated.python.core.impl import caching_executor
 from tensorflow_federated.python.core.impl import computation_impl
 from tensorflow_federated.python.core.impl import eager_executor
@@ -199,6 +201,92 @@ class CachingExecutorTest(absltest.TestCase):
         ex.create_value(np.array([10]), (tf.int32, [1])))
     self.assertIs(v2, v1)
 
+  def test_with_numpy_arrays_of_different_contents(self):
+    ex, _ = _make_executor_and_tracer_for_test()
+    loop = asyncio.get_event_loop()
+    v1 = loop.run_until_complete(
+        ex.create_value(np.array([10, 20]), (tf.int32, [2])))
+    v2 = loop.run_until_complete(
+        ex.create_value(np.array([10, 30]), (tf.int32, [2])))
+    self.assertIsNot(v2, v1)
+    self.assertNotEqual(v1.identifier, v2.identifier)
+
+  def test_identifiers_of_nested_tuples_do_not_grow(self):
+    ex, _ = _make_executor_and_tracer_for_test()
+    loop = asyncio.get_event_loop()
+    v = loop.run_until_complete(ex.create_value(10, tf.int32))
+    for _ in range(100):
+      v = loop.run_until_complete(ex.create_tuple([v]))
+    self.assertLess(sys.getsizeof(v.identifier.digest), 64)
+    v2 = loop.run_until_complete(ex.create_value(10, tf.int32))
+    for _ in range(100):
+      v2 = loop.run_until_complete(ex.create_tuple([v2]))
+    self.assertIs(v2, v)
+
+  def test_cache_statistics(self):
+    ex, _ = _make_executor_and_tracer_for_test()
+    loop = asyncio.get_event_loop()
+    v1 = loop.run_until_complete(ex.create_value(10, tf.int32))
+    loop.run_until_complete(ex.create_value(10, tf.int32))
+    loop.run_until_complete(ex.create_tuple([v1, v1]))
+    stats = ex.get_cache_statistics()
+    self.assertIsInstance(stats, caching_executor.CacheStatistics)
+    # Each operation counts as one lookup. First value: a miss. Second value:
+    # a hit. Tuple: a miss.
+    self.assertEqual(stats.hits, 1)
+    self.assertEqual(stats.misses, 2)
+    self.assertEqual(stats.num_entries, 3)
+    # The keys are counted with the objects they are made of.
+    keys = list(ex._cache)  # pylint: disable=protected-access
+    self.assertGreater(stats.key_bytes, sum(sys.getsizeof(k) for k in keys))
+    self.assertGreaterEqual(stats.lookup_seconds, 0.0)
+
+  def test_estimate_value_bytes(self):
+    self.assertEqual(
+        caching_executor.estimate_value_bytes(
+            computation_types.TensorType(tf.float32, [10, 20])), 800)
+    self.assertEqual(
+        caching_executor.estimate_value_bytes(
+            computation_types.NamedTupleType([('a', (tf.int64, [3])),
+                                              ('b', tf.int8)])), 25)
+    self.assertEqual(
+        caching_executor.estimate_value_bytes(
+            computation_types.FederatedType((tf.float32, [5]),
+                                            placements.CLIENTS)), 20)
+
+  def test_size_aware_cache_evicts_unreferenced_values(self):
+    cache = caching_executor.SizeAwareLRUCache(4000)
+    tracer = executor_test_utils.TracingExecutor(eager_executor.EagerExecutor())
+    ex = caching_executor.CachingExecutor(tracer, cache=cache)
+    loop = asyncio.get_event_loop()
+    for idx in range(10):
+      loop.run_until_complete(
+          ex.create_value(np.zeros([250], dtype=np.float32) + idx,
+                          (tf.float32, [250])))
+    self.assertLessEqual(cache.currsize, cache.max_bytes)
+    self.assertGreater(cache.num_evictions, 0)
+    self.assertGreater(cache.evicted_bytes, 0)
+
+  def test_size_aware_cache_keeps_referenced_values_reachable(self):
+    cache = caching_executor.SizeAwareLRUCache(2000)
+    tracer = executor_test_utils.TracingExecutor(eager_executor.EagerExecutor())
+    ex = caching_executor.CachingExecutor(tracer, cache=cache)
+    loop = asyncio.get_event_loop()
+    held = [
+        loop.run_until_complete(
+            ex.create_value(np.zeros([250], dtype=np.float32) + idx,
+                            (tf.float32, [250]))) for idx in range(5)
+    ]
+    self.assertLessEqual(cache.currsize, cache.max_bytes)
+    self.assertGreater(cache.num_evictions, 0)
+    for v in held:
+      self.assertIn(v.identifier, cache)
+      self.assertIs(cache[v.identifier], v)
+
+  def test_size_aware_cache_raises_with_zero_budget(self):
+    with self.assertRaises(ValueError):
+      caching_executor.SizeAwareLRUCache(0)
+
   def test_with_eager_dataset(self):
     ex, _ = _make_executor_and_tracer_for_test()
     loop = asyncio.get_event_loop()
@@ -0,0 +1,292 @@
+# Lint as: python3
+# Copyright 2019, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A persistent, content-addressed cache of compiled computations."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+import errno
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+
+from absl import logging
+from google.protobuf import message
+import six
+
+from tensorflow_federated.proto.v0 import computation_pb2 as pb
+from tensorflow_federated.python.common_libs import py_typecheck
+
+# The default limit on the total size of the entries in a cache directory.
+DEFAULT_MAX_SIZE_BYTES = 1 << 30
+
+_ENTRY_SUFFIX = '.pb'
+_TEMP_PREFIX = '.tmp-'
+
+CompilationCacheStats = collections.namedtuple('CompilationCacheStats', [
+    'hits',
+    'misses',
+    'writes',
+    'evictions',
+])
+CompilationCacheStats.__doc__ = """Statistics of a `CompilationCache`.
+
+Attributes:
+  hits: The number of lookups which found an entry.
+  misses: The number of lookups which did not find an entry (including the ones
+    which found a corrupted entry).
+  writes: The number of entries written.
+  evictions: The number of entries removed to stay within the size limit.
+"""
+
+
+def make_cache_key(namespace, version, computations):
+  """Returns a key for the result of compiling `computations`.
+
+  The key is a fingerprint of the deterministic serialization of the
+  `computations`, qualified by the `namespace` and `version` of the compiler
+  which produces the result, so that bumping the version whenever the output of
+  the compiler might change for the same input invalidates the cached results.
+
+  Args:
+    namespace: A string identifying the compiler, e.g., `'compiler_pipeline'`.
+    version: An integer version of the compiler.
+    computations: An instance of `pb.Computation`, or a list thereof, the
+      inputs to the compiler.
+
+  Returns:
+    A string of hexadecimal digits.
+
+  Raises:
+    TypeError: If the arguments are of the wrong types.
+  """
+  py_typecheck.check_type(namespace, six.string_types)
+  py_typecheck.check_type(version, int)
+  if isinstance(computations, pb.Computation):
+    computations = [computations]
+  fingerprint = hashlib.sha256()
+  fingerprint.update(namespace.encode('utf-8'))
+  fingerprint.update(struct.pack('<q', version))
+  for comp in computations:
+    py_typecheck.check_type(comp, pb.Computation)
+    serialized_comp = comp.SerializeToString(deterministic=True)
+    # The lengths are included to make the encoding of the list unambiguous.
+    fingerprint.update(struct.pack('<q', len(serialized_comp)))
+    fingerprint.update(serialized_comp)
+  return fingerprint.hexdigest()
+
+
+class CompilationCache(object):
+  """A cache of compiled computations, persisted in a directory.
+
+  Each entry is stored in a separate file named after its key (see
+  `make_cache_key`), written to a temporary file and atomically renamed into
+  place, so that multiple processes can share the same directory, and a process
+  interrupted while writing never leaves a partial entry behind.
+
+  The total size of the entries is kept under `max_size_bytes` by removing the
+  least recently used entries after each write, using the modification times of
+  the files, which are updated whenever an entry is found.
+  """
+
+  def __init__(self, root_dir, max_size_bytes=DEFAULT_MAX_SIZE_BYTES):
+    """Constructs a cache persisted in `root_dir`.
+
+    Args:
+      root_dir: The path to the directory to hold the entries, created if it
+        does not exist.
+      max_size_bytes: The limit on the total size of the entries in `root_dir`,
+        in bytes. Entries larger than this limit are never written.
+
+    Raises:
+      TypeError: If the arguments are of the wrong types.
+      ValueError: If `max_size_bytes` is not positive.
+    """
+    py_typecheck.check_type(root_dir, six.string_types)
+    py_typecheck.check_type(max_size_bytes, int)
+    if max_size_bytes <= 0:
+      raise ValueError('The maximum size must be positive, found {}.'.format(
+          max_size_bytes))
+    try:
+      os.makedirs(root_dir)
+    except OSError as e:
+      if e.errno != errno.EEXIST:
+        raise
+    self._root_dir = root_dir
+    self._max_size_bytes = max_size_bytes
+    self._lock = threading.Lock()
+    self._hits = 0
+    self._misses = 0
+    self._writes = 0
+    self._evictions = 0
+
+  @property
+  def root_dir(self):
+    return self._root_dir
+
+  @property
+  def stats(self):
+    """The `CompilationCacheStats` of this instance."""
+    with self._lock:
+      return CompilationCacheStats(
+          hits=self._hits,
+          misses=self._misses,
+          writes=self._writes,
+          evictions=self._evictions)
+
+  def _get_path(self, key):
+    py_typecheck.check_type(key, six.string_types)
+    return os.path.join(self._root_dir, key + _ENTRY_SUFFIX)
+
+  def get_computation(self, key):
+    """Returns the computation cached under `key`, or `None` if there is none.
+
+    Args:
+      key: The string key of the entry, as returned by `make_cache_key`.
+
+    Returns:
+      An instance of `pb.Computation`, or `None`.
+    """
+    path = self._get_path(key)
+    comp = None
+    try:
+      with open(path, 'rb') as f:
+        serialized_comp = f.read()
+      comp = pb.Computation.FromString(serialized_comp)
+      os.utime(path, None)
+    except (IOError, OSError) as e:
+      if e.errno != errno.ENOENT:
+        logging.warning('Failed to read compilation cache entry %s: %s', path,
+                        e)
+    except message.DecodeError as e:
+      logging.warning('Removing corrupted compilation cache entry %s: %s',
+                      path, e)
+      _remove_if_exists(path)
+    with self._lock:
+      if comp is None:
+        self._misses += 1
+      else:
+        self._hits += 1
+    return comp
+
+  def put_computation(self, key, comp):
+    """Caches `comp` under `key`, replacing any existing entry.
+
+    Failures to write the entry are logged, but otherwise ignored.
+
+    Args:
+      key: The string key of the entry, as returned by `make_cache_key`.
+      comp: An instance of `pb.Computation` to cache.
+
+    Raises:
+      TypeError: If the arguments are of the wrong types.
+    """
+    path = self._get_path(key)
+    py_typecheck.check_type(comp, pb.Computation)
+    serialized_comp = comp.SerializeToString()
+    if len(serialized_comp) > self._max_size_bytes:
+      logging.info(
+          'Not caching a compiled computation of %d bytes, above the limit of '
+          '%d bytes.', len(serialized_comp), self._max_size_bytes)
+      return
+    try:
+      fd, temp_path = tempfile.mkstemp(
+          prefix=_TEMP_PREFIX, dir=self._root_dir)
+      renamed = False
+      try:
+        with os.fdopen(fd, 'wb') as f:
+          f.write(serialized_comp)
+        # Renaming is atomic on POSIX systems, so concurrent readers see either
+        # the old entry, or the complete new one.
+        os.rename(temp_path, path)
+        renamed = True
+      finally:
+        if not renamed:
+          _remove_if_exists(temp_path)
+    except (IOError, OSError) as e:
+      logging.warning('Failed to write compilation cache entry %s: %s', path,
+                      e)
+      return
+    with self._lock:
+      self._writes += 1
+      self._evict_least_recently_used()
+
+  def _evict_least_recently_used(self):
+    """Removes the oldest entries until the total size is within the limit."""
+    entries = []
+    total_size = 0
+    for name in os.listdir(self._root_dir):
+      if not name.endswith(_ENTRY_SUFFIX) or name.startswith(_TEMP_PREFIX):
+        continue
+      path = os.path.join(self._root_dir, name)
+      try:
+        stat = os.stat(path)
+      except OSError:
+        # The entry was removed concurrently, e.g., by another process.
+        continue
+      entries.append((stat.st_mtime, stat.st_size, path))
+      total_size += stat.st_size
+    entries.sort()
+    for _, size, path in entries:
+      if total_size <= self._max_size_bytes:
+        break
+      _remove_if_exists(path)
+      total_size -= size
+      self._evictions += 1
+
+  def clear(self):
+    """Removes all the entries from the cache directory."""
+    with self._lock:
+      for name in os.listdir(self._root_dir):
+        if name.endswith(_ENTRY_SUFFIX):
+          _remove_if_exists(os.path.join(self._root_dir, name))
+
+
+def _remove_if_exists(path):
+  try:
+    os.remove(path)
+  except OSError as e:
+    if e.errno != errno.ENOENT:
+      raise
+
+
+_default_compilation_cache = None
+
+
+def set_default_compilation_cache(cache=None):
+  """Sets the cache used by default to store compiled computations.
+
+  The default cache is used by the compiler pipeline of the default (reference)
+  execution context, and by
+  `tff.backends.mapreduce.get_canonical_form_for_iterative_process`, unless
+  they are explicitly given a cache of their own.
+
+  Args:
+    cache: An instance of `CompilationCache`, or `None` to disable caching (as
+      is the default).
+  """
+  global _default_compilation_cache
+  if cache is not None:
+    py_typecheck.check_type(cache, CompilationCache)
+  _default_compilation_cache = cache
+
+
+def get_default_compilation_cache():
+  """Returns the cache set by `set_default_compilation_cache`, or `None`."""
+  return _default_compilation_cache
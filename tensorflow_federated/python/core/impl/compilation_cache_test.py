@@ -0,0 +1,181 @@
+# Lint as: python3
+# Copyright 2019, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for compilation_cache.py."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+
+from absl.testing import absltest
+
+from tensorflow_federated.proto.v0 import computation_pb2 as pb
+from tensorflow_federated.python.core.impl import compilation_cache
+
+
+def _create_computation(uri):
+  return pb.Computation(data=pb.Data(uri=uri))
+
+
+class MakeCacheKeyTest(absltest.TestCase):
+
+  def test_raises_type_error_with_non_computation(self):
+    with self.assertRaises(TypeError):
+      compilation_cache.make_cache_key('namespace', 1, ['not a computation'])
+
+  def test_returns_same_key_for_equal_computations(self):
+    key_1 = compilation_cache.make_cache_key('namespace', 1,
+                                             _create_computation('a'))
+    key_2 = compilation_cache.make_cache_key('namespace', 1,
+                                             [_create_computation('a')])
+    self.assertEqual(key_1, key_2)
+
+  def test_returns_different_keys(self):
+    keys = [
+        compilation_cache.make_cache_key('namespace', 1,
+                                         _create_computation('a')),
+        compilation_cache.make_cache_key('namespace', 1,
+                                         _create_computation('b')),
+        compilation_cache.make_cache_key('namespace', 2,
+                                         _create_computation('a')),
+        compilation_cache.make_cache_key('other', 1, _create_computation('a')),
+        compilation_cache.make_cache_key(
+            'namespace', 1,
+            [_create_computation('a'),
+             _create_computation('a')]),
+    ]
+    self.assertLen(set(keys), len(keys))
+
+
+class CompilationCacheTest(absltest.TestCase):
+
+  def setUp(self):
+    super(CompilationCacheTest, self).setUp()
+    self._root_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, self._root_dir)
+
+  def test_raises_value_error_with_non_positive_size(self):
+    with self.assertRaises(ValueError):
+      compilation_cache.CompilationCache(self._root_dir, max_size_bytes=0)
+
+  def test_creates_root_dir(self):
+    root_dir = os.path.join(self._root_dir, 'a', 'b')
+    compilation_cache.CompilationCache(root_dir)
+    self.assertTrue(os.path.isdir(root_dir))
+
+  def test_get_computation_returns_none_on_miss(self):
+    cache = compilation_cache.CompilationCache(self._root_dir)
+
+    self.assertIsNone(cache.get_computation('key'))
+    self.assertEqual(cache.stats,
+                     compilation_cache.CompilationCacheStats(0, 1, 0, 0))
+
+  def test_put_and_get_computation(self):
+    cache = compilation_cache.CompilationCache(self._root_dir)
+    comp = _create_computation('a')
+
+    cache.put_computation('key', comp)
+
+    self.assertEqual(cache.get_computation('key'), comp)
+    self.assertEqual(cache.stats,
+                     compilation_cache.CompilationCacheStats(1, 0, 1, 0))
+
+  def test_entries_persist_across_instances(self):
+    comp = _create_computation('a')
+    compilation_cache.CompilationCache(self._root_dir).put_computation(
+        'key', comp)
+
+    cache = compilation_cache.CompilationCache(self._root_dir)
+
+    self.assertEqual(cache.get_computation('key'), comp)
+
+  def test_put_computation_leaves_no_temporary_files(self):
+    cache = compilation_cache.CompilationCache(self._root_dir)
+
+    cache.put_computation('key', _create_computation('a'))
+    cache.put_computation('key', _create_computation('b'))
+
+    self.assertEqual(os.listdir(self._root_dir), ['key.pb'])
+    self.assertEqual(cache.get_computation('key'), _create_computation('b'))
+
+  def test_get_computation_removes_corrupted_entry(self):
+    cache = compilation_cache.CompilationCache(self._root_dir)
+    with open(os.path.join(self._root_dir, 'key.pb'), 'wb') as f:
+      f.write(b'\xff\xff\xff')
+
+    self.assertIsNone(cache.get_computation('key'))
+    self.assertEqual(os.listdir(self._root_dir), [])
+    self.assertEqual(cache.stats.misses, 1)
+
+  def test_evicts_least_recently_used_entries(self):
+    comp = _create_computation('a' * 100)
+    entry_size = comp.ByteSize()
+    cache = compilation_cache.CompilationCache(
+        self._root_dir, max_size_bytes=2 * entry_size)
+    cache.put_computation('key_1', comp)
+    cache.put_computation('key_2', comp)
+    os.utime(os.path.join(self._root_dir, 'key_1.pb'), (0, 0))
+    os.utime(os.path.join(self._root_dir, 'key_2.pb'), (1, 1))
+
+    cache.put_computation('key_3', comp)
+
+    self.assertCountEqual(os.listdir(self._root_dir), ['key_2.pb', 'key_3.pb'])
+    self.assertEqual(cache.stats.evictions, 1)
+
+  def test_does_not_put_computation_above_size_limit(self):
+    comp = _create_computation('a' * 100)
+    cache = compilation_cache.CompilationCache(
+        self._root_dir, max_size_bytes=comp.ByteSize() - 1)
+
+    cache.put_computation('key', comp)
+
+    self.assertIsNone(cache.get_computation('key'))
+    self.assertEqual(cache.stats.writes, 0)
+
+  def test_clear(self):
+    cache = compilation_cache.CompilationCache(self._root_dir)
+    cache.put_computation('key', _create_computation('a'))
+
+    cache.clear()
+
+    self.assertIsNone(cache.get_computation('key'))
+
+
+class DefaultCompilationCacheTest(absltest.TestCase):
+
+  def test_set_and_get_default_compilation_cache(self):
+    self.assertIsNone(compilation_cache.get_default_compilation_cache())
+    root_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, root_dir)
+    cache = compilation_cache.CompilationCache(root_dir)
+
+    compilation_cache.set_default_compilation_cache(cache)
+    try:
+      self.assertIs(compilation_cache.get_default_compilation_cache(), cache)
+    finally:
+      compilation_cache.set_default_compilation_cache()
+
+    self.assertIsNone(compilation_cache.get_default_compilation_cache())
+
+  def test_set_default_compilation_cache_raises_type_error(self):
+    with self.assertRaises(TypeError):
+      compilation_cache.set_default_compilation_cache('not a cache')
+
+
+if __name__ == '__main__':
+  absltest.main()
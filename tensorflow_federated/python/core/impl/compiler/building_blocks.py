@@ -58,6 +58,7 @@ class ComputationBuildingBlock(typed_object.TypedObject):
   """
 
   _deserializer_dict = None  # Defined at the end of this file.
+  _composite_deserializer_dict = None  # Defined at the end of this file.
 
   @classmethod
   def from_proto(cls, computation_proto):
@@ -76,22 +77,57 @@ class ComputationBuildingBlock(typed_object.TypedObject):
       ValueError: if deserialization failed due to the argument being invalid.
     """
     py_typecheck.check_type(computation_proto, pb.Computation)
-    computation_oneof = computation_proto.WhichOneof('computation')
-    deserializer = cls._deserializer_dict.get(computation_oneof)
-    if deserializer is not None:
-      deserialized = deserializer(computation_proto)
-      type_spec = type_serialization.deserialize_type(computation_proto.type)
+    # The computations are deserialized postorder using an explicit stack
+    # rather than recursion, so that deep computations can be deserialized.
+    # Each entry on the stack holds a proto, the class deserializing it if it
+    # has children, the protos of its children, and the children deserialized
+    # so far.
+    stack = [cls._get_deserialization_frame(computation_proto)]
+    while True:
+      proto, composite_cls, child_protos, children = stack[-1]
+      if len(children) < len(child_protos):
+        stack.append(
+            cls._get_deserialization_frame(child_protos[len(children)]))
+        continue
+      stack.pop()
+      if composite_cls is not None:
+        deserialized = composite_cls._from_proto_with_children(proto, children)  # pylint: disable=protected-access
+      else:
+        deserializer = cls._deserializer_dict[proto.WhichOneof('computation')]
+        deserialized = deserializer(proto)
+      type_spec = type_serialization.deserialize_type(proto.type)
       if not type_utils.are_equivalent_types(deserialized.type_signature,
                                              type_spec):
         raise ValueError(
             'The type {} derived from the computation structure does not '
             'match the type {} declared in its signature'.format(
                 str(deserialized.type_signature), str(type_spec)))
-      return deserialized
+      if not stack:
+        return deserialized
+      stack[-1][3].append(deserialized)
+
+  @classmethod
+  def _get_deserialization_frame(cls, computation_proto):
+    """Returns the entry for `computation_proto` on the stack of `from_proto`.
+
+    Args:
+      computation_proto: An instance of pb.Computation.
+
+    Raises:
+      NotImplementedError: if computation_proto contains a kind of computation
+        for which deserialization has not been implemented yet.
+    """
+    computation_oneof = computation_proto.WhichOneof('computation')
+    composite_cls = cls._composite_deserializer_dict.get(computation_oneof)
+    if composite_cls is not None:
+      child_protos = composite_cls._get_child_protos(computation_proto)  # pylint: disable=protected-access
+    elif computation_oneof in cls._deserializer_dict:
+      child_protos = []
     else:
       raise NotImplementedError(
           'Deserialization for computations of type {} has not been '
           'implemented yet.'.format(computation_oneof))
+    return (computation_proto, composite_cls, child_protos, [])
 
   def __init__(self, type_spec):
     """Constructs a computation building block with the given TFF type.
@@ -103,6 +139,10 @@ class ComputationBuildingBlock(typed_object.TypedObject):
     type_signature = computation_types.to_type(type_spec)
     type_utils.check_well_formed(type_signature)
     self._type_signature = type_signature
+    # The serialized form and the structural hash are computed lazily, at most
+    # once, since building blocks are immutable.
+    self._proto = None
+    self._structural_hash = None
 
   @property
   def type_signature(self):
@@ -120,13 +160,68 @@ class ComputationBuildingBlock(typed_object.TypedObject):
     """Returns the structural string representation of this building block."""
     return _structural_representation(self)
 
-  @abc.abstractproperty
+  @property
   def proto(self):
-    """Returns a serialized form of this object as a pb.Computation instance."""
+    """Returns a serialized form of this object as a pb.Computation instance.
+
+    The proto is constructed on first access and reused afterwards, so it must
+    not be modified.
+    """
+    if self._proto is None:
+      # The nested building blocks are serialized top-down, with an explicit
+      # stack rather than recursion, directly into their places in a single
+      # message, so that each part of it is only written once. Only the protos
+      # that have already been constructed are copied in.
+      proto = pb.Computation()
+      stack = [(self, proto)]
+      while stack:
+        comp, comp_proto = stack.pop()
+        if comp._proto is not None:  # pylint: disable=protected-access
+          comp_proto.CopyFrom(comp._proto)  # pylint: disable=protected-access
+        else:
+          comp_proto.type.CopyFrom(
+              type_serialization.serialize_type(comp.type_signature))
+          stack.extend(comp._fill_proto(comp_proto))  # pylint: disable=protected-access
+      self._proto = proto
+    return self._proto
+
+  @abc.abstractmethod
+  def _fill_proto(self, proto):
+    """Fills in the serialized form of this object, see `proto`.
+
+    Args:
+      proto: The `pb.Computation` to fill in, with its `type` already set.
+
+    Returns:
+      A list of pairs of the nested building blocks, and the (empty) messages
+      within `proto` that they are to be serialized into.
+    """
     raise NotImplementedError
 
-  # TODO(b/113112885): Add memoization after identifying a suitable externally
-  # available standard library that works in Python 2/3.
+  @property
+  def structural_hash(self):
+    """Returns a hash of the structure of this building block.
+
+    Building blocks that consist of the same kinds of nodes, with the same
+    names, URIs and type signatures, have equal structural hashes, regardless
+    of whether they are the same Python objects. The hash is computed on first
+    access from the hashes of the nested building blocks, and reused afterwards.
+    """
+    if self._structural_hash is None:
+      for comp in _postorder(self, lambda comp: comp._structural_hash is None):  # pylint: disable=protected-access
+        comp._structural_hash = hash(  # pylint: disable=protected-access
+            (type(comp).__name__, str(comp.type_signature)) +
+            tuple(comp._structural_hash_components()))  # pylint: disable=protected-access
+    return self._structural_hash
+
+  @abc.abstractmethod
+  def _structural_hash_components(self):
+    """Returns a list of hashable components specific to this building block."""
+    raise NotImplementedError
+
+  def _children(self):
+    """Returns the list of building blocks nested directly in this one."""
+    return []
 
   @abc.abstractmethod
   def __repr__(self):
@@ -179,11 +274,12 @@ class Reference(ComputationBuildingBlock):
     self._name = name
     self._context = context
 
-  @property
-  def proto(self):
-    return pb.Computation(
-        type=type_serialization.serialize_type(self.type_signature),
-        reference=pb.Reference(name=self._name))
+  def _fill_proto(self, proto):
+    proto.reference.name = self._name
+    return []
+
+  def _structural_hash_components(self):
+    return [self._name]
 
   @property
   def name(self):
@@ -210,8 +306,18 @@ class Selection(ComputationBuildingBlock):
   @classmethod
   def from_proto(cls, computation_proto):
     _check_computation_oneof(computation_proto, 'selection')
-    selection = ComputationBuildingBlock.from_proto(
-        computation_proto.selection.source)
+    return cls._from_proto_with_children(computation_proto, [
+        ComputationBuildingBlock.from_proto(child_proto)
+        for child_proto in cls._get_child_protos(computation_proto)
+    ])
+
+  @classmethod
+  def _get_child_protos(cls, computation_proto):
+    return [computation_proto.selection.source]
+
+  @classmethod
+  def _from_proto_with_children(cls, computation_proto, children):
+    selection, = children
     selection_oneof = computation_proto.selection.WhichOneof('selection')
     if selection_oneof == 'name':
       return cls(selection, name=str(computation_proto.selection.name))
@@ -276,15 +382,18 @@ class Selection(ComputationBuildingBlock):
             'valid range 0..{} determined by the source type '
             'signature.'.format(index, str(len(elements) - 1)))
 
-  @property
-  def proto(self):
+  def _fill_proto(self, proto):
     if self._name is not None:
-      selection = pb.Selection(source=self._source.proto, name=self._name)
+      proto.selection.name = self._name
     else:
-      selection = pb.Selection(source=self._source.proto, index=self._index)
-    return pb.Computation(
-        type=type_serialization.serialize_type(self.type_signature),
-        selection=selection)
+      proto.selection.index = self._index
+    return [(self._source, proto.selection.source)]
+
+  def _structural_hash_components(self):
+    return [self._source.structural_hash, self._name, self._index]
+
+  def _children(self):
+    return [self._source]
 
   @property
   def source(self):
@@ -322,9 +431,19 @@ class Tuple(ComputationBuildingBlock, anonymous_tuple.AnonymousTuple):
   @classmethod
   def from_proto(cls, computation_proto):
     _check_computation_oneof(computation_proto, 'tuple')
-    return cls([(str(e.name) if e.name else None,
-                 ComputationBuildingBlock.from_proto(e.value))
-                for e in computation_proto.tuple.element])
+    return cls._from_proto_with_children(computation_proto, [
+        ComputationBuildingBlock.from_proto(child_proto)
+        for child_proto in cls._get_child_protos(computation_proto)
+    ])
+
+  @classmethod
+  def _get_child_protos(cls, computation_proto):
+    return [e.value for e in computation_proto.tuple.element]
+
+  @classmethod
+  def _from_proto_with_children(cls, computation_proto, children):
+    return cls([(str(e.name) if e.name else None, value)
+                for e, value in zip(computation_proto.tuple.element, children)])
 
   def __init__(self, elements):
     """Constructs a tuple from the given list of elements.
@@ -363,18 +482,23 @@ class Tuple(ComputationBuildingBlock, anonymous_tuple.AnonymousTuple):
         ]))
     anonymous_tuple.AnonymousTuple.__init__(self, elements)
 
-  @property
-  def proto(self):
-    elements = []
+  def _fill_proto(self, proto):
+    proto.tuple.SetInParent()
+    children = []
     for k, v in anonymous_tuple.to_elements(self):
+      element = proto.tuple.element.add()
       if k is not None:
-        element = pb.Tuple.Element(name=k, value=v.proto)
-      else:
-        element = pb.Tuple.Element(value=v.proto)
-      elements.append(element)
-    return pb.Computation(
-        type=type_serialization.serialize_type(self.type_signature),
-        tuple=pb.Tuple(element=elements))
+        element.name = k
+      children.append((v, element.value))
+    return children
+
+  def _structural_hash_components(self):
+    return [
+        (k, v.structural_hash) for k, v in anonymous_tuple.to_elements(self)
+    ]
+
+  def _children(self):
+    return [v for _, v in anonymous_tuple.to_elements(self)]
 
   def __repr__(self):
     return 'Tuple([{}])'.format(', '.join(
@@ -398,13 +522,22 @@ class Call(ComputationBuildingBlock):
   @classmethod
   def from_proto(cls, computation_proto):
     _check_computation_oneof(computation_proto, 'call')
-    fn = ComputationBuildingBlock.from_proto(computation_proto.call.function)
+    return cls._from_proto_with_children(computation_proto, [
+        ComputationBuildingBlock.from_proto(child_proto)
+        for child_proto in cls._get_child_protos(computation_proto)
+    ])
+
+  @classmethod
+  def _get_child_protos(cls, computation_proto):
     arg_proto = computation_proto.call.argument
     if arg_proto.WhichOneof('computation') is not None:
-      arg = ComputationBuildingBlock.from_proto(arg_proto)
-    else:
-      arg = None
-    return cls(fn, arg)
+      return [computation_proto.call.function, arg_proto]
+    return [computation_proto.call.function]
+
+  @classmethod
+  def _from_proto_with_children(cls, computation_proto, children):
+    del computation_proto  # Unused.
+    return cls(*children)
 
   def __init__(self, fn, arg=None):
     """Creates a call to 'fn' with argument 'arg'.
@@ -446,15 +579,23 @@ class Call(ComputationBuildingBlock):
     self._function = fn
     self._argument = arg
 
-  @property
-  def proto(self):
+  def _fill_proto(self, proto):
     if self._argument is not None:
-      call = pb.Call(
-          function=self._function.proto, argument=self._argument.proto)
-    else:
-      call = pb.Call(function=self._function.proto)
-    return pb.Computation(
-        type=type_serialization.serialize_type(self.type_signature), call=call)
+      return [(self._function, proto.call.function),
+              (self._argument, proto.call.argument)]
+    return [(self._function, proto.call.function)]
+
+  def _structural_hash_components(self):
+    return [
+        self._function.structural_hash,
+        (self._argument.structural_hash
+         if self._argument is not None else None)
+    ]
+
+  def _children(self):
+    if self._argument is not None:
+      return [self._function, self._argument]
+    return [self._function]
 
   @property
   def function(self):
@@ -483,12 +624,23 @@ class Lambda(ComputationBuildingBlock):
   @classmethod
   def from_proto(cls, computation_proto):
     _check_computation_oneof(computation_proto, 'lambda')
+    return cls._from_proto_with_children(computation_proto, [
+        ComputationBuildingBlock.from_proto(child_proto)
+        for child_proto in cls._get_child_protos(computation_proto)
+    ])
+
+  @classmethod
+  def _get_child_protos(cls, computation_proto):
+    return [getattr(computation_proto, 'lambda').result]
+
+  @classmethod
+  def _from_proto_with_children(cls, computation_proto, children):
+    result, = children
     the_lambda = getattr(computation_proto, 'lambda')
     return cls(
         str(the_lambda.parameter_name),
         type_serialization.deserialize_type(
-            computation_proto.type.function.parameter),
-        ComputationBuildingBlock.from_proto(the_lambda.result))
+            computation_proto.type.function.parameter), result)
 
   def __init__(self, parameter_name, parameter_type, result):
     """Creates a lambda expression.
@@ -517,16 +669,16 @@ class Lambda(ComputationBuildingBlock):
     self._parameter_type = parameter_type
     self._result = result
 
-  @property
-  def proto(self):
-    return pb.Computation(
-        type=type_serialization.serialize_type(self.type_signature),
-        **{
-            'lambda':
-                pb.Lambda(
-                    parameter_name=self._parameter_name,
-                    result=self._result.proto)
-        })
+  def _fill_proto(self, proto):
+    the_lambda = getattr(proto, 'lambda')
+    the_lambda.parameter_name = self._parameter_name
+    return [(self._result, the_lambda.result)]
+
+  def _structural_hash_components(self):
+    return [self._parameter_name, self._result.structural_hash]
+
+  def _children(self):
+    return [self._result]
 
   @property
   def parameter_name(self):
@@ -590,10 +742,20 @@ class Block(ComputationBuildingBlock):
   @classmethod
   def from_proto(cls, computation_proto):
     _check_computation_oneof(computation_proto, 'block')
-    return cls([(str(loc.name), ComputationBuildingBlock.from_proto(loc.value))
-                for loc in computation_proto.block.local],
-               ComputationBuildingBlock.from_proto(
-                   computation_proto.block.result))
+    return cls._from_proto_with_children(computation_proto, [
+        ComputationBuildingBlock.from_proto(child_proto)
+        for child_proto in cls._get_child_protos(computation_proto)
+    ])
+
+  @classmethod
+  def _get_child_protos(cls, computation_proto):
+    return ([loc.value for loc in computation_proto.block.local] +
+            [computation_proto.block.result])
+
+  @classmethod
+  def _from_proto_with_children(cls, computation_proto, children):
+    return cls([(str(loc.name), value) for loc, value in zip(
+        computation_proto.block.local, children[:-1])], children[-1])
 
   def __init__(self, local_symbols, result):
     """Creates a block of TFF code.
@@ -627,18 +789,21 @@ class Block(ComputationBuildingBlock):
     self._locals = updated_locals
     self._result = result
 
-  @property
-  def proto(self):
-    return pb.Computation(
-        type=type_serialization.serialize_type(self.type_signature),
-        block=pb.Block(
-            **{
-                'local': [
-                    pb.Block.Local(name=k, value=v.proto)
-                    for k, v in self._locals
-                ],
-                'result': self._result.proto
-            }))
+  def _fill_proto(self, proto):
+    children = []
+    for k, v in self._locals:
+      local = proto.block.local.add()
+      local.name = k
+      children.append((v, local.value))
+    children.append((self._result, proto.block.result))
+    return children
+
+  def _structural_hash_components(self):
+    return [(k, v.structural_hash) for k, v in self._locals
+           ] + [self._result.structural_hash]
+
+  def _children(self):
+    return [v for _, v in self._locals] + [self._result]
 
   @property
   def locals(self):
@@ -699,11 +864,12 @@ class Intrinsic(ComputationBuildingBlock):
     super(Intrinsic, self).__init__(type_spec)
     self._uri = uri
 
-  @property
-  def proto(self):
-    return pb.Computation(
-        type=type_serialization.serialize_type(self.type_signature),
-        intrinsic=pb.Intrinsic(uri=self._uri))
+  def _fill_proto(self, proto):
+    proto.intrinsic.uri = self._uri
+    return []
+
+  def _structural_hash_components(self):
+    return [self._uri]
 
   @property
   def uri(self):
@@ -749,11 +915,12 @@ class Data(ComputationBuildingBlock):
     super(Data, self).__init__(type_spec)
     self._uri = uri
 
-  @property
-  def proto(self):
-    return pb.Computation(
-        type=type_serialization.serialize_type(self.type_signature),
-        data=pb.Data(uri=self._uri))
+  def _fill_proto(self, proto):
+    proto.data.uri = self._uri
+    return []
+
+  def _structural_hash_components(self):
+    return [self._uri]
 
   @property
   def uri(self):
@@ -797,9 +964,12 @@ class CompiledComputation(ComputationBuildingBlock):
       self._name = '{:x}'.format(
           zlib.adler32(six.b(repr(self._proto))) & 0xFFFFFFFF)
 
-  @property
-  def proto(self):
-    return self._proto
+  def _fill_proto(self, proto):
+    proto.CopyFrom(self._proto)
+    return []
+
+  def _structural_hash_components(self):
+    return [self._proto.SerializeToString(deterministic=True)]
 
   @property
   def name(self):
@@ -839,11 +1009,12 @@ class Placement(ComputationBuildingBlock):
     super(Placement, self).__init__(computation_types.PlacementType())
     self._literal = literal
 
-  @property
-  def proto(self):
-    return pb.Computation(
-        type=type_serialization.serialize_type(self.type_signature),
-        placement=pb.Placement(uri=self._literal.uri))
+  def _fill_proto(self, proto):
+    proto.placement.uri = self._literal.uri
+    return []
+
+  def _structural_hash_components(self):
+    return [self._literal.uri]
 
   @property
   def uri(self):
@@ -853,6 +1024,34 @@ class Placement(ComputationBuildingBlock):
     return 'Placement(\'{}\')'.format(self.uri)
 
 
+def _postorder(comp, should_visit):
+  """Yields `comp` and the building blocks nested in it, postorder.
+
+  The building blocks are traversed with an explicit stack rather than with
+  recursion, so the depth of `comp` is not limited by the Python recursion
+  limit.
+
+  Args:
+    comp: The `ComputationBuildingBlock` to traverse.
+    should_visit: A Python function that accepts a building block nested in
+      `comp`, and returns `False` if neither it nor the building blocks nested
+      in it should be yielded.
+
+  Yields:
+    The building blocks, each after the building blocks nested in it.
+  """
+  stack = [(comp, iter(comp._children()))]  # pylint: disable=protected-access
+  while stack:
+    node, children = stack[-1]
+    for child in children:
+      if should_visit(child):
+        stack.append((child, iter(child._children())))  # pylint: disable=protected-access
+        break
+    else:
+      stack.pop()
+      yield node
+
+
 def _string_representation(comp, formatted):
   """Returns the string representation of a `ComputationBuildingBlock`.
 
@@ -1356,4 +1555,13 @@ ComputationBuildingBlock._deserializer_dict = {
     'placement': Placement.from_proto,
     'tensorflow': CompiledComputation,
 }
+# The classes of the computations which contain other computations, which
+# `ComputationBuildingBlock.from_proto` deserializes without recursion.
+ComputationBuildingBlock._composite_deserializer_dict = {
+    'selection': Selection,
+    'tuple': Tuple,
+    'call': Call,
+    'lambda': Lambda,
+    'block': Block,
+}
 # pylint: enable=protected-access
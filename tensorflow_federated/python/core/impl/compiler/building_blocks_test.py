@@ -320,6 +320,80 @@ class ComputationBuildingBlocksTest(absltest.TestCase):
     self.assertEqual(x_proto.placement.uri, x.uri)
     self._serialize_deserialize_roundtrip_test(x)
 
+  def test_proto_is_memoized(self):
+    ref = building_blocks.Reference('x', tf.int32)
+    fn = building_blocks.Lambda('x', tf.int32, ref)
+    call = building_blocks.Call(fn, building_blocks.Reference('y', tf.int32))
+    call_proto = call.proto
+    self.assertIs(call.proto, call_proto)
+    self.assertIs(fn.proto, fn.proto)
+    self.assertEqual(call_proto.call.function, fn.proto)
+    self.assertEqual(call_proto.call.argument.reference.name, 'y')
+
+  def test_proto_of_nested_computation(self):
+    comp = building_blocks.Reference('x', tf.int32)
+    for _ in range(100):
+      comp = building_blocks.Selection(
+          building_blocks.Tuple([building_blocks.Tuple([]), comp]), index=1)
+    comp_proto = comp.proto
+    self.assertEqual(comp_proto.selection.index, 1)
+    self.assertEqual(
+        comp_proto.selection.source.tuple.element[0].value.WhichOneof(
+            'computation'), 'tuple')
+    self.assertEqual(
+        building_blocks.ComputationBuildingBlock.from_proto(comp_proto).proto,
+        comp_proto)
+
+  def test_structural_hash_of_equal_computations(self):
+
+    def _make_computation():
+      ref = building_blocks.Reference('x', [tf.int32, tf.bool])
+      sel = building_blocks.Selection(ref, index=0)
+      tup = building_blocks.Tuple([('a', sel), ('b', sel)])
+      fn = building_blocks.Lambda('x', ref.type_signature, tup)
+      return building_blocks.Block([('y', fn)],
+                                   building_blocks.Reference(
+                                       'y', fn.type_signature))
+
+    comp_1 = _make_computation()
+    comp_2 = _make_computation()
+    self.assertIsNot(comp_1, comp_2)
+    self.assertEqual(comp_1.structural_hash, comp_2.structural_hash)
+
+  def test_structural_hash_of_different_computations(self):
+    comps = [
+        building_blocks.Reference('x', tf.int32),
+        building_blocks.Reference('y', tf.int32),
+        building_blocks.Reference('x', tf.float32),
+        building_blocks.Data('x', tf.int32),
+        building_blocks.Selection(
+            building_blocks.Reference('x', [tf.int32, tf.int32]), index=0),
+        building_blocks.Selection(
+            building_blocks.Reference('x', [tf.int32, tf.int32]), index=1),
+        building_blocks.Lambda('x', tf.int32,
+                               building_blocks.Reference('x', tf.int32)),
+        building_blocks.Lambda('y', tf.int32,
+                               building_blocks.Reference('y', tf.int32)),
+    ]
+    hashes = set(comp.structural_hash for comp in comps)
+    self.assertLen(hashes, len(comps))
+
+  def test_serializes_and_deserializes_deep_computation(self):
+    fn = building_blocks.Reference(
+        'f', computation_types.FunctionType(tf.int32, tf.int32))
+    comp = building_blocks.Data('x', tf.int32)
+    # Deeper than the default recursion limit of Python.
+    for _ in range(3000):
+      comp = building_blocks.Call(fn, comp)
+
+    deserialized_comp = building_blocks.ComputationBuildingBlock.from_proto(
+        comp.proto)
+
+    self.assertEqual(deserialized_comp.structural_hash, comp.structural_hash)
+    while isinstance(deserialized_comp, building_blocks.Call):
+      deserialized_comp = deserialized_comp.argument
+    self.assertEqual(deserialized_comp.uri, 'x')
+
   def _serialize_deserialize_roundtrip_test(self, target):
     """Performs roundtrip serialization/deserialization of the given target.
 
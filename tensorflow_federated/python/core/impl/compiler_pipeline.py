@@ -21,12 +21,19 @@ from __future__ import print_function
 from tensorflow_federated.proto.v0 import computation_pb2 as pb
 from tensorflow_federated.python.common_libs import py_typecheck
 from tensorflow_federated.python.core.api import computation_base
+from tensorflow_federated.python.core.impl import compilation_cache
 from tensorflow_federated.python.core.impl import computation_impl
 from tensorflow_federated.python.core.impl import context_stack_base
+from tensorflow_federated.python.core.impl import pass_manager
 from tensorflow_federated.python.core.impl import transformations
 from tensorflow_federated.python.core.impl import value_transformations
 from tensorflow_federated.python.core.impl.compiler import building_blocks
 
+# The version of the output of the pipeline, which must be incremented whenever
+# a change to the pipeline may change the output for the same input, in order
+# to invalidate the results of compilation cached by earlier versions.
+PIPELINE_VERSION = 1
+
 
 class CompilerPipeline(object):
   """The compiler pipeline.
@@ -37,16 +44,73 @@ class CompilerPipeline(object):
 
   1. Replacing occurrences of a subset of intrinsics with their definitions in
      terms of other intrinsics, as defined in `intrinsic_bodies.py`.
+  2. Replacing called lambdas with blocks, and removing mapped or applied
+     identities.
+  3. Removing duplicate computations.
+
+  The conversions are run by a `pass_manager.PassManager`, which records the
+  time taken by each of them and the sizes of the computations, available as
+  `pass_stats` after each compilation.
+
+  The results of compilation can be persisted in a
+  `compilation_cache.CompilationCache`, keyed by the input computation and
+  `PIPELINE_VERSION`, so that the same computations are not compiled again in
+  subsequent runs of the same program.
   """
 
-  def __init__(self, context_stack):
+  def __init__(self, context_stack, cache=None):
     """Constructs this pipeline with the given dictionary of intrinsic bodies.
 
     Args:
       context_stack: The context stack to use.
+      cache: An optional instance of `compilation_cache.CompilationCache` to
+        store the compiled computations in. If `None`, the default cache set
+        with `compilation_cache.set_default_compilation_cache` at the time of
+        compilation, if any, is used.
     """
     py_typecheck.check_type(context_stack, context_stack_base.ContextStack)
+    if cache is not None:
+      py_typecheck.check_type(cache, compilation_cache.CompilationCache)
     self._context_stack = context_stack
+    self._cache = cache
+    self._pass_manager = pass_manager.PassManager()
+
+    # Replace intrinsics with their bodies, for now manually in a fixed order.
+    # TODO(b/113123410): Replace this with a more automated implementation that
+    # does not rely on manual maintenance.
+    def _replace_all_intrinsics_with_bodies(comp):
+      return value_transformations.replace_all_intrinsics_with_bodies(
+          comp, self._context_stack)
+
+    self._pass_manager.add_pass('replace_all_intrinsics_with_bodies',
+                                _replace_all_intrinsics_with_bodies)
+
+    # Replaces called lambdas with LET constructs with a single local symbol,
+    # and removes maped or applied identities, in a single walk.
+    def _local_transforms(comp):
+      return [
+          transformations.ReplaceCalledLambdaWithBlock(comp),
+          transformations.RemoveMappedOrAppliedIdentity(comp),
+      ]
+
+    self._pass_manager.add_transform_specs('local_transforms',
+                                           _local_transforms)
+
+    # Remove duplicate computations. This is important! otherwise the semantics
+    # non-deterministic computations (e.g. a `tff.tf_computation` depending on
+    # `tf.random`) will give unexpected behavior. Additionally, this may reduce
+    # the amount of calls into TF for some ASTs.
+    self._pass_manager.add_pass('uniquify_reference_names',
+                                transformations.uniquify_reference_names)
+    self._pass_manager.add_pass('extract_computations',
+                                transformations.extract_computations)
+    self._pass_manager.add_pass('remove_duplicate_computations',
+                                transformations.remove_duplicate_computations)
+
+  @property
+  def pass_stats(self):
+    """The list of `pass_manager.PassStats` for the most recent compilation."""
+    return self._pass_manager.stats
 
   def compile(self, computation_to_compile):
     """Compiles `computation_to_compile`.
@@ -63,6 +127,15 @@ class CompilerPipeline(object):
     computation_proto = computation_impl.ComputationImpl.get_proto(
         computation_to_compile)
     py_typecheck.check_type(computation_proto, pb.Computation)
+    cache = self._cache or compilation_cache.get_default_compilation_cache()
+    if cache is not None:
+      cache_key = compilation_cache.make_cache_key('compiler_pipeline',
+                                                   PIPELINE_VERSION,
+                                                   computation_proto)
+      compiled_proto = cache.get_computation(cache_key)
+      if compiled_proto is not None:
+        return computation_impl.ComputationImpl(compiled_proto,
+                                                self._context_stack)
     comp = building_blocks.ComputationBuildingBlock.from_proto(
         computation_proto)
 
@@ -70,25 +143,7 @@ class CompilerPipeline(object):
     # desired form of the output. To be driven by what the specific backend the
     # pipeline is targeting is able to understand. Pending a more fleshed out
     # design of the backend API.
-
-    # Replace intrinsics with their bodies, for now manually in a fixed order.
-    # TODO(b/113123410): Replace this with a more automated implementation that
-    # does not rely on manual maintenance.
-    comp, _ = value_transformations.replace_all_intrinsics_with_bodies(
-        comp, self._context_stack)
-
-    # Replaces called lambdas with LET constructs with a single local symbol.
-    comp, _ = transformations.replace_called_lambda_with_block(comp)
-
-    # Removes maped or applied identities.
-    comp, _ = transformations.remove_mapped_or_applied_identity(comp)
-
-    # Remove duplicate computations. This is important! otherwise the semantics
-    # non-deterministic computations (e.g. a `tff.tf_computation` depending on
-    # `tf.random`) will give unexpected behavior. Additionally, this may reduce
-    # the amount of calls into TF for some ASTs.
-    comp, _ = transformations.uniquify_reference_names(comp)
-    comp, _ = transformations.extract_computations(comp)
-    comp, _ = transformations.remove_duplicate_computations(comp)
-
+    comp, _ = self._pass_manager.run(comp)
+    if cache is not None:
+      cache.put_computation(cache_key, comp.proto)
     return computation_impl.ComputationImpl(comp.proto, self._context_stack)
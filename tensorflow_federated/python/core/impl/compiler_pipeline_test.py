@@ -18,6 +18,9 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import shutil
+import tempfile
+
 from absl.testing import absltest
 import tensorflow as tf
 
@@ -25,6 +28,7 @@ from tensorflow_federated.python.core.api import computation_types
 from tensorflow_federated.python.core.api import computations
 from tensorflow_federated.python.core.api import intrinsics
 from tensorflow_federated.python.core.api import placements
+from tensorflow_federated.python.core.impl import compilation_cache
 from tensorflow_federated.python.core.impl import compiler_pipeline
 from tensorflow_federated.python.core.impl import computation_impl
 from tensorflow_federated.python.core.impl import context_stack_impl
@@ -67,6 +71,57 @@ class CompilerPipelineTest(absltest.TestCase):
 
     # TODO(b/113123410): Expand the test with more structural invariants.
 
+  def test_compile_records_pass_stats(self):
+
+    @computations.federated_computation(
+        computation_types.FederatedType(tf.float32, placements.CLIENTS))
+    def foo(temperatures):
+      return intrinsics.federated_sum(temperatures)
+
+    pipeline = compiler_pipeline.CompilerPipeline(
+        context_stack_impl.context_stack)
+
+    self.assertEqual(pipeline.pass_stats, [])
+    pipeline.compile(foo)
+
+    self.assertEqual([stats.name for stats in pipeline.pass_stats], [
+        'replace_all_intrinsics_with_bodies',
+        'local_transforms',
+        'uniquify_reference_names',
+        'extract_computations',
+        'remove_duplicate_computations',
+    ])
+    for previous_stats, stats in zip(pipeline.pass_stats,
+                                     pipeline.pass_stats[1:]):
+      self.assertEqual(stats.num_nodes_before, previous_stats.num_nodes_after)
+
+  def test_compile_with_cache(self):
+
+    @computations.federated_computation(
+        computation_types.FederatedType(tf.float32, placements.CLIENTS))
+    def foo(temperatures):
+      return intrinsics.federated_sum(temperatures)
+
+    root_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, root_dir)
+    cache = compilation_cache.CompilationCache(root_dir)
+    pipeline = compiler_pipeline.CompilerPipeline(
+        context_stack_impl.context_stack, cache=cache)
+
+    compiled_foo = pipeline.compile(foo)
+    self.assertEqual(cache.stats.misses, 1)
+    self.assertEqual(cache.stats.writes, 1)
+
+    # A new pipeline, e.g., in a subsequent run of the same program, finds the
+    # compiled computation in the cache.
+    pipeline = compiler_pipeline.CompilerPipeline(
+        context_stack_impl.context_stack, cache=cache)
+    cached_foo = pipeline.compile(foo)
+    self.assertEqual(cache.stats.hits, 1)
+    self.assertEqual(
+        computation_impl.ComputationImpl.get_proto(cached_foo),
+        computation_impl.ComputationImpl.get_proto(compiled_foo))
+
 
 if __name__ == '__main__':
   absltest.main()
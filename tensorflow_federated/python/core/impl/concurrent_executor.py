@@ -16,45 +16,134 @@
 
 import asyncio
 import functools
+import itertools
 import threading
 
 from tensorflow_federated.python.common_libs import py_typecheck
 from tensorflow_federated.python.core.impl import executor_base
 
 
+def _start_event_loop_thread():
+  """Starts a new thread running a fresh event loop.
+
+  Returns:
+    A tuple `(loop, thread)` with the event loop and the thread running it.
+  """
+  loop = asyncio.new_event_loop()
+
+  def run_loop(loop):
+    loop.run_forever()
+    loop.close()
+
+  thread = threading.Thread(target=functools.partial(run_loop, loop))
+  thread.start()
+  return loop, thread
+
+
+class ThreadPool(object):
+  """A bounded pool of worker threads shared among concurrent executors.
+
+  Each worker thread runs its own event loop. Every `ConcurrentExecutor`
+  constructed with a pool is pinned to a single one of these loops (assigned in
+  a round-robin fashion), so that the operations issued through any given
+  executor are started in the order in which they were issued, while the total
+  number of threads stays bounded irrespective of the number of executors.
+
+  NOTE: This component is only available in Python 3.
+  """
+
+  def __init__(self, num_threads):
+    """Creates a pool of `num_threads` worker threads.
+
+    Args:
+      num_threads: The number of worker threads, an integer >= 1.
+
+    Raises:
+      ValueError: If `num_threads` is not a positive integer.
+    """
+    py_typecheck.check_type(num_threads, int)
+    if num_threads < 1:
+      raise ValueError('The number of threads must be >= 1, found {}.'.format(
+          num_threads))
+    self._loops_and_threads = [
+        _start_event_loop_thread() for _ in range(num_threads)
+    ]
+    self._next_index = itertools.cycle(range(num_threads))
+    self._lock = threading.Lock()
+
+  def __del__(self):
+    # The last reference may be dropped on one of the worker threads, which
+    # cannot join itself, so the threads are only signalled to stop.
+    self._stop()
+
+  @property
+  def num_threads(self):
+    return len(self._loops_and_threads)
+
+  def acquire_event_loop(self):
+    """Returns the event loop to pin the next executor to."""
+    with self._lock:
+      loop, _ = self._loops_and_threads[next(self._next_index)]
+    return loop
+
+  def _stop(self):
+    """Signals all the worker threads to stop, and returns them."""
+    # Not set if the constructor raised.
+    loops_and_threads = getattr(self, '_loops_and_threads', [])
+    self._loops_and_threads = []
+    for loop, _ in loops_and_threads:
+      loop.call_soon_threadsafe(loop.stop)
+    return [thread for _, thread in loops_and_threads]
+
+  def close(self):
+    """Stops all the worker threads in this pool, and waits for them to exit.
+
+    If called on one of the worker threads, that thread is not waited for.
+    """
+    current_thread = threading.current_thread()
+    for thread in self._stop():
+      if thread is not current_thread:
+        thread.join()
+
+
 class ConcurrentExecutor(executor_base.Executor):
   """The concurrent executor delegates work to a separate thread.
 
   This executor only handles threading. It delegates all execution to an
   underlying pool of target executors.
 
+  By default, each instance of this executor starts its own thread. If a shared
+  `ThreadPool` is supplied, the executor instead schedules work on one of the
+  pool's threads, which allows large numbers of executors (e.g., one per client
+  in a simulation) to run on a bounded number of threads.
+
   NOTE: This component is only available in Python 3.
   """
 
-  # TODO(b/134543154): Upgrade this to a threadpool with multiple workers,
-  # possibly one that could be shared among multiple of these executors.
-
-  def __init__(self, target_executor):
+  def __init__(self, target_executor, thread_pool=None):
     """Creates a concurrent executor backed by a target executor.
 
     Args:
       target_executor: The executor that does all the work.
+      thread_pool: An optional instance of `ThreadPool` to share with other
+        executors. If `None`, this executor runs its own dedicated thread.
     """
     py_typecheck.check_type(target_executor, executor_base.Executor)
     self._target_executor = target_executor
-    self._event_loop = asyncio.new_event_loop()
-
-    def run_loop(loop):
-      loop.run_forever()
-      loop.close()
-
-    self._thread = threading.Thread(
-        target=functools.partial(run_loop, self._event_loop))
-    self._thread.start()
+    self._thread_pool = thread_pool
+    if thread_pool is not None:
+      py_typecheck.check_type(thread_pool, ThreadPool)
+      self._event_loop = thread_pool.acquire_event_loop()
+      self._thread = None
+    else:
+      self._event_loop, self._thread = _start_event_loop_thread()
 
   def __del__(self):
-    self._event_loop.call_soon_threadsafe(self._event_loop.stop)
-    self._thread.join()
+    # The shared pool (if any) owns its threads, and stops them when it is no
+    # longer referenced by any of the executors.
+    if self._thread is not None:
+      self._event_loop.call_soon_threadsafe(self._event_loop.stop)
+      self._thread.join()
 
   def _delegate(self, coro):
     return asyncio.wrap_future(
@@ -97,6 +97,78 @@ class ConcurrentExecutorTest(absltest.TestCase):
     self.assertIsInstance(result, eager_executor.EagerValue)
     self.assertEqual(result.internal_representation.numpy(), 11)
 
+  def test_with_shared_thread_pool(self):
+
+    @computations.tf_computation(tf.int32)
+    def add_one(x):
+      return tf.add(x, 1)
+
+    pool = concurrent_executor.ThreadPool(2)
+    executors = [
+        concurrent_executor.ConcurrentExecutor(
+            eager_executor.EagerExecutor(), thread_pool=pool) for _ in range(10)
+    ]
+    self.assertEqual(pool.num_threads, 2)
+
+    async def compute(ex, x):
+      result = await ex.create_call(await ex.create_value(add_one), await
+                                    ex.create_value(x, tf.int32))
+      return await result.compute()
+
+    results = asyncio.get_event_loop().run_until_complete(
+        asyncio.gather(*[compute(ex, x) for x, ex in enumerate(executors)]))
+    self.assertEqual([r.numpy() for r in results], list(range(1, 11)))
+
+  def test_shared_thread_pool_preserves_order_within_executor(self):
+
+    class FakeExecutor(executor_base.Executor):
+
+      def __init__(self):
+        self.values = []
+
+      async def create_value(self, value, type_spec=None):
+        del type_spec
+        self.values.append(value)
+        return value
+
+      async def create_call(self, comp, arg=None):
+        raise NotImplementedError
+
+      async def create_tuple(self, elements):
+        raise NotImplementedError
+
+      async def create_selection(self, source, index=None, name=None):
+        raise NotImplementedError
+
+    pool = concurrent_executor.ThreadPool(3)
+    targets = [FakeExecutor() for _ in range(5)]
+    executors = [
+        concurrent_executor.ConcurrentExecutor(t, thread_pool=pool)
+        for t in targets
+    ]
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(
+        asyncio.gather(*[
+            ex.create_value(idx) for idx in range(100) for ex in executors
+        ]))
+    for t in targets:
+      self.assertEqual(t.values, list(range(100)))
+
+  def test_thread_pool_closes_from_worker_thread(self):
+    pool = concurrent_executor.ThreadPool(2)
+    loop = pool.acquire_event_loop()
+
+    async def close_pool():
+      pool.close()
+
+    # Must not try to join the worker thread it is running on.
+    asyncio.run_coroutine_threadsafe(close_pool(), loop).result()
+    self.assertEqual(pool.num_threads, 0)
+
+  def test_thread_pool_raises_with_zero_threads(self):
+    with self.assertRaises(ValueError):
+      concurrent_executor.ThreadPool(0)
+
 
 if __name__ == '__main__':
   tf.compat.v1.enable_v2_behavior()
@@ -14,6 +14,10 @@
 # limitations under the License.
 """A simple executor that operates synchronously in eager TensorFlow mode."""
 
+import hashlib
+import threading
+
+import cachetools
 import numpy as np
 import tensorflow as tf
 
@@ -33,9 +37,145 @@ from tensorflow_federated.python.core.impl.utils import graph_utils
 from tensorflow_federated.python.tensorflow_libs import graph_merge
 
 
+class EmbeddedFunctionCache(object):
+  """A thread-safe LRU cache of TensorFlow computations embedded in eager mode.
+
+  Embedding a TensorFlow computation involves importing and wrapping its graph,
+  which is expensive and, in a federated setting, repeated by every client in
+  every round for the same `pb.Computation`. This cache keeps the results of
+  `embed_tensorflow_computation()`, keyed by a content hash of the serialized
+  computation, the type signature, and the device, and keeps track of the
+  number of hits and misses.
+
+  Embedded functions of computations with an initialization op are not shared
+  across threads. Their stateful ops (e.g., variables) are bound to shared
+  resource names that are made unique per embedding, so invoking the same
+  embedded function concurrently from multiple threads would let those
+  invocations interfere with one another. Functions of computations without an
+  initialization op do not own any such resources, and are shared by all
+  threads.
+
+  NOTE: This component is only available in Python 3.
+  """
+
+  def __init__(self, maxsize):
+    """Creates a new cache that holds at most `maxsize` embedded functions.
+
+    Args:
+      maxsize: The maximum number of entries, an integer >= 1.
+
+    Raises:
+      ValueError: If `maxsize` is not a positive integer.
+    """
+    py_typecheck.check_type(maxsize, int)
+    if maxsize < 1:
+      raise ValueError('The cache size must be >= 1, found {}.'.format(maxsize))
+    self._cache = cachetools.LRUCache(maxsize)
+    self._lock = threading.Lock()
+    self._hits = 0
+    self._misses = 0
+
+  @property
+  def maxsize(self):
+    return self._cache.maxsize
+
+  @property
+  def currsize(self):
+    return self._cache.currsize
+
+  @property
+  def hits(self):
+    return self._hits
+
+  @property
+  def misses(self):
+    return self._misses
+
+  def get_or_create(self, key, create_fn):
+    """Returns the cached entry for `key`, creating it with `create_fn` if absent.
+
+    Args:
+      key: A hashable key.
+      create_fn: A no-argument callable that constructs the entry.
+
+    Returns:
+      The cached or newly constructed entry.
+    """
+    with self._lock:
+      try:
+        entry = self._cache[key]
+        self._hits += 1
+        return entry
+      except KeyError:
+        self._misses += 1
+    # The entry is constructed outside of the lock, so that embedding one
+    # computation does not block lookups of others. In the rare event of a race,
+    # both threads construct (equivalent) entries, and the last one wins.
+    entry = create_fn()
+    with self._lock:
+      self._cache[key] = entry
+    return entry
+
+  def clear(self):
+    """Removes all entries, and resets the hit and miss counters."""
+    with self._lock:
+      self._cache.clear()
+      self._hits = 0
+      self._misses = 0
+
+
+_DEFAULT_EMBEDDED_FUNCTION_CACHE_SIZE = 100
+
+_embedded_function_cache = EmbeddedFunctionCache(
+    _DEFAULT_EMBEDDED_FUNCTION_CACHE_SIZE)
+
+
+def get_embedded_function_cache():
+  """Returns the process-wide `EmbeddedFunctionCache` used by this module."""
+  return _embedded_function_cache
+
+
+_FINGERPRINT_CACHE_SIZE = 1000
+
+# Maps `id(comp)` to `(comp, fingerprint)`, where the reference to `comp`
+# prevents the id from being reused while the entry is in the cache.
+_fingerprint_cache = cachetools.LRUCache(_FINGERPRINT_CACHE_SIZE)
+_fingerprint_cache_lock = threading.Lock()
+
+
+def _get_computation_fingerprint(comp):
+  """Returns a content hash of the serialized `pb.Computation` `comp`.
+
+  The fingerprint is computed once per `pb.Computation` instance (for as long
+  as it stays in a bounded cache), since the same instance is typically embedded
+  by many executors. Computations are assumed not to be mutated afterwards.
+
+  Args:
+    comp: An instance of `pb.Computation`.
+
+  Returns:
+    The hex digest of the SHA-256 hash of the serialized `comp`.
+  """
+  with _fingerprint_cache_lock:
+    entry = _fingerprint_cache.get(id(comp))
+  if entry is not None and entry[0] is comp:
+    return entry[1]
+  fingerprint = hashlib.sha256(
+      comp.SerializeToString(deterministic=True)).hexdigest()
+  with _fingerprint_cache_lock:
+    _fingerprint_cache[id(comp)] = (comp, fingerprint)
+  return fingerprint
+
+
 def embed_tensorflow_computation(comp, type_spec=None, device=None):
   """Embeds a TensorFlow computation for use in the eager context.
 
+  The embedded functions are cached process-wide (see
+  `get_embedded_function_cache()`), so repeated embedding of the same
+  computation with the same type signature on the same device (and, for
+  computations with an initialization op, in the same thread) does not
+  re-import the graph.
+
   Args:
     comp: An instance of `pb.Computation`.
     type_spec: An optional `tff.Type` instance or something convertible to it.
@@ -67,6 +207,26 @@ def embed_tensorflow_computation(comp, type_spec=None, device=None):
     raise TypeError('Expected a TensorFlow computation, found {}.'.format(
         which_computation))
 
+  key = (_get_computation_fingerprint(comp), str(type_spec), device)
+  if comp.tensorflow.initialize_op:
+    key += (threading.get_ident(),)
+  return _embedded_function_cache.get_or_create(
+      key, lambda: _embed_tensorflow_computation(comp, type_spec, device))
+
+
+def _embed_tensorflow_computation(comp, type_spec, device):
+  """Implements `embed_tensorflow_computation()` without any caching.
+
+  Args:
+    comp: An instance of `pb.Computation` that has already been verified to be
+      a TensorFlow computation of type `type_spec`.
+    type_spec: An instance of `tff.Type`.
+    device: An optional device name.
+
+  Returns:
+    Either a one-argument or a zero-argument callable that executes the
+    computation in eager mode.
+  """
   if isinstance(type_spec, computation_types.FunctionType):
     param_type = type_spec.parameter
     result_type = type_spec.result
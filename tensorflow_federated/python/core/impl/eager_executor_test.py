@@ -16,6 +16,7 @@
 
 import asyncio
 import collections
+import threading
 
 from absl.testing import absltest
 from absl.testing import parameterized
@@ -163,6 +164,58 @@ class EagerExecutorTest(parameterized.TestCase):
     self.assertAlmostEqual(results[0].numpy(), 1.1)
     self.assertAlmostEqual(results[1].numpy(), 1.2)
 
+  def test_embed_tensorflow_computation_reuses_cached_function(self):
+
+    @computations.tf_computation(tf.int32)
+    def comp(x):
+      return x + 3
+
+    cache = eager_executor.get_embedded_function_cache()
+    cache.clear()
+    proto = computation_impl.ComputationImpl.get_proto(comp)
+    fn1 = eager_executor.embed_tensorflow_computation(proto)
+    fn2 = eager_executor.embed_tensorflow_computation(proto)
+    self.assertIs(fn1, fn2)
+    self.assertEqual(cache.misses, 1)
+    self.assertEqual(cache.hits, 1)
+    self.assertEqual(fn2(10).numpy(), 13)
+
+  def test_embed_tensorflow_computation_shares_function_across_threads(self):
+
+    @computations.tf_computation(tf.int32)
+    def comp(x):
+      return x + 3
+
+    cache = eager_executor.get_embedded_function_cache()
+    cache.clear()
+    proto = computation_impl.ComputationImpl.get_proto(comp)
+    fns = []
+    threads = [
+        threading.Thread(
+            target=lambda: fns.append(
+                eager_executor.embed_tensorflow_computation(proto)))
+        for _ in range(3)
+    ]
+    for t in threads:
+      t.start()
+      t.join()
+    self.assertIs(fns[0], fns[1])
+    self.assertIs(fns[0], fns[2])
+    self.assertEqual(cache.misses, 1)
+    self.assertEqual(cache.hits, 2)
+
+  def test_embedded_function_cache_evicts_least_recently_used(self):
+    cache = eager_executor.EmbeddedFunctionCache(2)
+    for key in ['a', 'b', 'a', 'c', 'b']:
+      cache.get_or_create(key, lambda k=key: k)
+    self.assertEqual(cache.currsize, 2)
+    self.assertEqual(cache.hits, 1)
+    self.assertEqual(cache.misses, 4)
+
+  def test_embedded_function_cache_raises_with_zero_size(self):
+    with self.assertRaises(ValueError):
+      eager_executor.EmbeddedFunctionCache(0)
+
   def test_to_representation_for_type_with_int(self):
     v = eager_executor.to_representation_for_type(10, tf.int32)
     self.assertIsInstance(v, tf.Tensor)
@@ -0,0 +1,359 @@
+# Lint as: python3
+# Copyright 2019, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""An executor that infers the number of clients from the values it is given."""
+
+import asyncio
+import collections
+import weakref
+
+from tensorflow_federated.proto.v0 import computation_pb2 as pb
+from tensorflow_federated.python.common_libs import anonymous_tuple
+from tensorflow_federated.python.common_libs import py_typecheck
+from tensorflow_federated.python.core.api import computation_types
+from tensorflow_federated.python.core.impl import executor_base
+from tensorflow_federated.python.core.impl import executor_value_base
+from tensorflow_federated.python.core.impl import placement_literals
+from tensorflow_federated.python.core.impl import type_serialization
+from tensorflow_federated.python.core.impl import type_utils
+
+# The default number of target executors (one per number of clients) to keep.
+DEFAULT_MAX_NUM_EXECUTORS = 10
+
+# A value passed to `create_value`, not yet embedded in a target executor.
+_RawValue = collections.namedtuple('_RawValue', ['value'])
+
+
+class ElasticExecutorValue(executor_value_base.ExecutorValue):
+  """Represents a value embedded in the elastic executor."""
+
+  def __init__(self,
+               owner,
+               value,
+               type_spec,
+               target_executor=None,
+               cardinality=None):
+    """Creates an embedded instance of a value in the elastic executor.
+
+    The kinds of supported internal representations (`value`) are as follows:
+
+    * An instance of `executor_value_base.ExecutorValue` embedded in the
+      `target_executor`, which has been created for `cardinality` clients.
+
+    * A raw value passed to `create_value`, wrapped in a `_RawValue`, not yet
+      embedded in any of the target executors.
+
+    * An instance of `anonymous_tuple.AnonymousTuple` with values being
+      instances of `ElasticExecutorValue`, as created by `create_tuple`.
+
+    Args:
+      owner: The instance of `ElasticExecutor` this value belongs to.
+      value: An internal value representation (of one of the allowed types, as
+        defined above).
+      type_spec: An instance of `tff.Type` or something convertible to it that
+        is compatible with `value` (as defined above).
+      target_executor: The target executor `value` is embedded in, if any.
+      cardinality: The number of clients `target_executor` was created for.
+    """
+    py_typecheck.check_type(owner, ElasticExecutor)
+    self._owner = owner
+    self._value = value
+    self._type_signature = computation_types.to_type(type_spec)
+    self._target_executor = target_executor
+    self._cardinality = cardinality
+    # Futures for the embeddings of this value in the target executors, so that
+    # a value not created in a target executor is only embedded in each of them
+    # once, no matter how many times it is used.
+    self._embeddings = weakref.WeakKeyDictionary()
+
+  @property
+  def internal_representation(self):
+    return self._value
+
+  @property
+  def type_signature(self):
+    return self._type_signature
+
+  @property
+  def target_executor(self):
+    return self._target_executor
+
+  @property
+  def cardinality(self):
+    return self._cardinality
+
+  @property
+  def embeddings(self):
+    return self._embeddings
+
+  async def compute(self):
+    return await self._owner._compute(self)  # pylint: disable=protected-access
+
+
+class ElasticExecutor(executor_base.Executor):
+  """An executor that infers the number of clients from the values it is given.
+
+  NOTE: This component is only available in Python 3.
+
+  Values created in this executor are not embedded in any target executor until
+  they are used in a call, selection, or computed. At that point, the number of
+  clients is inferred from the sizes of the federated values placed at
+  `tff.CLIENTS` that are involved, and the values are embedded in a target
+  executor created for that number of clients by the `executor_fn` supplied at
+  construction time. Values involving no clients at all use a target executor
+  for `default_cardinality` clients (unless they are combined with values that
+  have already been embedded).
+
+  Target executors are reused for subsequent calls with the same number of
+  clients. Only the `max_num_executors` most recently used ones are kept around
+  for reuse; the values embedded in the others remain usable for as long as they
+  are referenced.
+  """
+
+  def __init__(self,
+               executor_fn,
+               max_num_executors=DEFAULT_MAX_NUM_EXECUTORS,
+               default_cardinality=1):
+    """Creates an elastic executor backed by target executors from a factory.
+
+    Args:
+      executor_fn: A callable that accepts the number of clients, and returns
+        an instance of `executor_base.Executor` for that number of clients.
+      max_num_executors: The maximum number of target executors to keep for
+        reuse.
+      default_cardinality: The number of clients to use for values that do not
+        involve any clients.
+
+    Raises:
+      TypeError: If the arguments are of the wrong types.
+      ValueError: If `max_num_executors` or `default_cardinality` is not a
+        positive integer.
+    """
+    py_typecheck.check_callable(executor_fn)
+    py_typecheck.check_type(max_num_executors, int)
+    py_typecheck.check_type(default_cardinality, int)
+    if max_num_executors < 1:
+      raise ValueError(
+          'The maximum number of executors must be >= 1, found {}.'.format(
+              max_num_executors))
+    if default_cardinality < 1:
+      raise ValueError('The default cardinality must be >= 1, found {}.'.format(
+          default_cardinality))
+    self._executor_fn = executor_fn
+    self._max_num_executors = max_num_executors
+    self._default_cardinality = default_cardinality
+    self._executors = collections.OrderedDict()
+
+  def _get_executor_for_cardinality(self, cardinality):
+    """Returns the target executor for `cardinality` clients."""
+    executor = self._executors.pop(cardinality, None)
+    if executor is None:
+      executor = self._executor_fn(cardinality)
+      py_typecheck.check_type(executor, executor_base.Executor)
+      while len(self._executors) >= self._max_num_executors:
+        self._executors.popitem(last=False)
+    self._executors[cardinality] = executor
+    return executor
+
+  def _get_target_executor(self, values):
+    """Returns the target executor in which to embed all of the `values`.
+
+    Args:
+      values: A list of `ElasticExecutorValue`s, or `None`s, which are ignored.
+
+    Returns:
+      A tuple (executor, cardinality) with the target executor, and the number
+      of clients it was created for.
+
+    Raises:
+      ValueError: If the `values` involve different numbers of clients, or are
+        embedded in different target executors.
+    """
+    embedded = []
+    cardinalities = set()
+    stack = [v for v in values if v is not None]
+    while stack:
+      value = stack.pop()
+      py_typecheck.check_type(value, ElasticExecutorValue)
+      if value.target_executor is not None:
+        embedded.append((value.target_executor, value.cardinality))
+        cardinalities.add(value.cardinality)
+      elif isinstance(value.internal_representation, _RawValue):
+        cardinality = _infer_cardinality(value.internal_representation.value,
+                                         value.type_signature)
+        if cardinality is not None:
+          cardinalities.add(cardinality)
+      else:
+        stack.extend(
+            v for _, v in anonymous_tuple.to_elements(
+                value.internal_representation))
+    if len(cardinalities) > 1:
+      raise ValueError(
+          'Cannot combine values for different numbers of clients: {}.'.format(
+              sorted(cardinalities)))
+    if embedded:
+      executor, cardinality = embedded[0]
+      if any(e is not executor for e, _ in embedded[1:]):
+        raise ValueError(
+            'Cannot combine values embedded in different target executors.')
+      return executor, cardinality
+    if cardinalities:
+      cardinality = cardinalities.pop()
+    else:
+      cardinality = self._default_cardinality
+    return self._get_executor_for_cardinality(cardinality), cardinality
+
+  async def _embed(self, value, target_executor):
+    """Embeds `value` in `target_executor`.
+
+    The embedding is memoized per target executor, so repeated uses of the same
+    value in calls, selections, or computations do not embed it again.
+
+    Args:
+      value: An instance of `ElasticExecutorValue`.
+      target_executor: The target executor returned by `_get_target_executor`.
+
+    Returns:
+      An instance of `executor_value_base.ExecutorValue` embedded in the
+      `target_executor`.
+    """
+    if value.target_executor is not None:
+      return value.internal_representation
+    embedding = value.embeddings.get(target_executor)
+    if embedding is None:
+      embedding = asyncio.ensure_future(
+          self._embed_uncached(value, target_executor))
+      value.embeddings[target_executor] = embedding
+    try:
+      return await embedding
+    except Exception:
+      # Do not memoize failures, so that a later use can try again.
+      if value.embeddings.get(target_executor) is embedding:
+        del value.embeddings[target_executor]
+      raise
+
+  async def _embed_uncached(self, value, target_executor):
+    """Embeds `value` in `target_executor` without consulting the memo."""
+    if isinstance(value.internal_representation, _RawValue):
+      return await target_executor.create_value(
+          value.internal_representation.value, value.type_signature)
+    else:
+      elements = anonymous_tuple.to_elements(value.internal_representation)
+      embedded_elements = await asyncio.gather(
+          *[self._embed(v, target_executor) for _, v in elements])
+      return await target_executor.create_tuple(
+          anonymous_tuple.AnonymousTuple(
+              list(zip([k for k, _ in elements], embedded_elements))))
+
+  async def _compute(self, value):
+    target_executor, _ = self._get_target_executor([value])
+    embedded_value = await self._embed(value, target_executor)
+    return await embedded_value.compute()
+
+  async def create_value(self, value, type_spec=None):
+    if isinstance(value, pb.Computation) and type_spec is None:
+      type_spec = type_serialization.deserialize_type(value.type)
+    else:
+      type_spec = type_utils.reconcile_value_with_type_spec(value, type_spec)
+    return ElasticExecutorValue(self, _RawValue(value), type_spec)
+
+  async def create_call(self, comp, arg=None):
+    py_typecheck.check_type(comp, ElasticExecutorValue)
+    if arg is not None:
+      py_typecheck.check_type(arg, ElasticExecutorValue)
+    target_executor, cardinality = self._get_target_executor([comp, arg])
+    if arg is not None:
+      embedded_comp, embedded_arg = await asyncio.gather(
+          self._embed(comp, target_executor), self._embed(arg, target_executor))
+    else:
+      embedded_comp = await self._embed(comp, target_executor)
+      embedded_arg = None
+    result = await target_executor.create_call(embedded_comp, embedded_arg)
+    return ElasticExecutorValue(self, result, result.type_signature,
+                                target_executor, cardinality)
+
+  async def create_tuple(self, elements):
+    elem = anonymous_tuple.to_elements(anonymous_tuple.from_container(elements))
+    for _, v in elem:
+      py_typecheck.check_type(v, ElasticExecutorValue)
+    return ElasticExecutorValue(
+        self, anonymous_tuple.AnonymousTuple(elem),
+        computation_types.NamedTupleType([
+            (k, v.type_signature) if k else v.type_signature for k, v in elem
+        ]))
+
+  async def create_selection(self, source, index=None, name=None):
+    py_typecheck.check_type(source, ElasticExecutorValue)
+    target_executor, cardinality = self._get_target_executor([source])
+    embedded_source = await self._embed(source, target_executor)
+    result = await target_executor.create_selection(
+        embedded_source, index=index, name=name)
+    return ElasticExecutorValue(self, result, result.type_signature,
+                                target_executor, cardinality)
+
+
+def _infer_cardinality(value, type_spec):
+  """Infers the number of clients from a raw `value` of type `type_spec`.
+
+  Args:
+    value: A raw value, as passed to `create_value`.
+    type_spec: An instance of `tff.Type`.
+
+  Returns:
+    The number of clients, or `None` if `value` does not contain any federated
+    values placed at `tff.CLIENTS` that are not `all_equal`.
+
+  Raises:
+    ValueError: If `value` contains federated values with different numbers of
+      clients.
+  """
+  if isinstance(type_spec, computation_types.FederatedType):
+    if (type_spec.placement == placement_literals.CLIENTS and
+        not type_spec.all_equal):
+      py_typecheck.check_type(value, (list, tuple, set, frozenset))
+      return len(value)
+    return None
+  elif isinstance(type_spec, computation_types.NamedTupleType):
+    if not isinstance(value, anonymous_tuple.AnonymousTuple):
+      try:
+        value = anonymous_tuple.from_container(value)
+      except TypeError:
+        # Not a structure this executor knows how to look into, so the target
+        # executor will decide whether it is valid.
+        return None
+    elements = anonymous_tuple.to_elements(value)
+    # Dictionaries are converted with their keys sorted, so the elements are
+    # matched by name where possible.
+    elements_by_name = {k: v for k, v in elements if k is not None}
+    result = None
+    for idx, (name, elem_type) in enumerate(
+        anonymous_tuple.to_elements(type_spec)):
+      if name is not None and name in elements_by_name:
+        elem = elements_by_name[name]
+      elif idx < len(elements):
+        elem = elements[idx][1]
+      else:
+        continue
+      cardinality = _infer_cardinality(elem, elem_type)
+      if cardinality is None:
+        continue
+      elif result is None:
+        result = cardinality
+      elif result != cardinality:
+        raise ValueError(
+            'Federated values contain different numbers of clients: {} and '
+            '{}.'.format(result, cardinality))
+    return result
+  else:
+    return None
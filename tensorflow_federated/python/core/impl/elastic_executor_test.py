@@ -0,0 +1,182 @@
+# Lint as: python3
+# Copyright 2019, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for elastic_executor.py."""
+
+import asyncio
+
+from absl.testing import absltest
+import tensorflow as tf
+
+from tensorflow_federated.python.core.api import computations
+from tensorflow_federated.python.core.api import intrinsics
+from tensorflow_federated.python.core.api import placements
+from tensorflow_federated.python.core.impl import eager_executor
+from tensorflow_federated.python.core.impl import elastic_executor
+from tensorflow_federated.python.core.impl import federated_executor
+from tensorflow_federated.python.core.impl import lambda_executor
+from tensorflow_federated.python.core.impl import set_default_executor
+from tensorflow_federated.python.core.impl import type_constructors
+
+
+def _create_executor_fn(cardinalities):
+  """Returns an `executor_fn` that appends the cardinalities to a list."""
+
+  def _executor_fn(num_clients):
+    cardinalities.append(num_clients)
+    bottom_ex = eager_executor.EagerExecutor()
+    return lambda_executor.LambdaExecutor(
+        federated_executor.FederatedExecutor({
+            None: bottom_ex,
+            placements.SERVER: bottom_ex,
+            placements.CLIENTS: [bottom_ex for _ in range(num_clients)]
+        }))
+
+  return _executor_fn
+
+
+class _CountingLambdaExecutor(lambda_executor.LambdaExecutor):
+  """A lambda executor that counts the calls to `create_value`."""
+
+  def __init__(self, target_executor):
+    super(_CountingLambdaExecutor, self).__init__(target_executor)
+    self.num_create_value_calls = 0
+
+  async def create_value(self, value, type_spec=None):
+    self.num_create_value_calls += 1
+    return await super(_CountingLambdaExecutor,
+                       self).create_value(value, type_spec)
+
+
+@computations.federated_computation(type_constructors.at_clients(tf.int32))
+def _sum_over_clients(x):
+  return intrinsics.federated_sum(x)
+
+
+@computations.federated_computation
+def _sum_of_tens_over_clients():
+  return intrinsics.federated_sum(
+      intrinsics.federated_value(10, placements.CLIENTS))
+
+
+class ElasticExecutorTest(absltest.TestCase):
+
+  def setUp(self):
+    super(ElasticExecutorTest, self).setUp()
+    self.addCleanup(set_default_executor.set_default_executor)
+
+  def test_raises_with_invalid_arguments(self):
+    with self.assertRaises(TypeError):
+      elastic_executor.ElasticExecutor('not a callable')
+    with self.assertRaises(ValueError):
+      elastic_executor.ElasticExecutor(
+          _create_executor_fn([]), max_num_executors=0)
+    with self.assertRaises(ValueError):
+      elastic_executor.ElasticExecutor(
+          _create_executor_fn([]), default_cardinality=0)
+
+  def test_infers_cardinality_from_argument(self):
+    cardinalities = []
+    set_default_executor.set_default_executor(
+        elastic_executor.ElasticExecutor(_create_executor_fn(cardinalities)))
+
+    self.assertEqual(_sum_over_clients([1, 2, 3]), 6)
+    self.assertEqual(_sum_over_clients([1, 2, 3, 4, 5]), 15)
+    self.assertEqual(_sum_over_clients([4, 5, 6]), 15)
+    self.assertEqual(cardinalities, [3, 5])
+
+  def test_infers_cardinality_from_argument_in_tuple(self):
+
+    @computations.federated_computation([
+        ('x', type_constructors.at_clients(tf.int32)),
+        ('y', type_constructors.at_server(tf.int32)),
+    ])
+    def comp(x, y):
+      del y  # Unused.
+      return intrinsics.federated_sum(x)
+
+    cardinalities = []
+    set_default_executor.set_default_executor(
+        elastic_executor.ElasticExecutor(_create_executor_fn(cardinalities)))
+
+    self.assertEqual(comp([1, 2, 3, 4], 10), 10)
+    self.assertEqual(cardinalities, [4])
+
+  def test_uses_default_cardinality_without_clients(self):
+    cardinalities = []
+    set_default_executor.set_default_executor(
+        elastic_executor.ElasticExecutor(
+            _create_executor_fn(cardinalities), default_cardinality=2))
+
+    self.assertEqual(_sum_of_tens_over_clients(), 20)
+    self.assertEqual(cardinalities, [2])
+
+  def test_evicts_least_recently_used_executors(self):
+    cardinalities = []
+    set_default_executor.set_default_executor(
+        elastic_executor.ElasticExecutor(
+            _create_executor_fn(cardinalities), max_num_executors=2))
+
+    for num_clients in [1, 2, 1, 3, 1, 2]:
+      self.assertEqual(_sum_over_clients([1] * num_clients), num_clients)
+    self.assertEqual(cardinalities, [1, 2, 3, 2])
+
+  def test_raises_with_different_numbers_of_clients(self):
+
+    @computations.federated_computation(
+        type_constructors.at_clients(tf.int32),
+        type_constructors.at_clients(tf.int32))
+    def comp(x, y):
+      return intrinsics.federated_zip([x, y])
+
+    set_default_executor.set_default_executor(
+        elastic_executor.ElasticExecutor(_create_executor_fn([])))
+
+    with self.assertRaises(ValueError):
+      comp([1, 2], [1, 2, 3])
+
+  def test_computes_values_without_a_call(self):
+    loop = asyncio.get_event_loop()
+    ex = elastic_executor.ElasticExecutor(_create_executor_fn([]))
+
+    val = loop.run_until_complete(
+        ex.create_value([1, 2, 3], type_constructors.at_clients(tf.int32)))
+    self.assertIsInstance(val, elastic_executor.ElasticExecutorValue)
+    self.assertEqual(str(val.type_signature), '{int32}@CLIENTS')
+    result = loop.run_until_complete(val.compute())
+    self.assertEqual([x.numpy() for x in result], [1, 2, 3])
+
+  def test_embeds_values_once_per_target_executor(self):
+    loop = asyncio.get_event_loop()
+    target_executors = []
+
+    def _executor_fn(num_clients):
+      ex = _CountingLambdaExecutor(_create_executor_fn([])(num_clients))
+      target_executors.append(ex)
+      return ex
+
+    ex = elastic_executor.ElasticExecutor(_executor_fn)
+    comp = loop.run_until_complete(ex.create_value(_sum_over_clients))
+    arg = loop.run_until_complete(
+        ex.create_value([1, 2, 3], type_constructors.at_clients(tf.int32)))
+    for _ in range(3):
+      result = loop.run_until_complete(ex.create_call(comp, arg))
+      self.assertEqual(loop.run_until_complete(result.compute()).numpy(), 6)
+    self.assertLen(target_executors, 1)
+    self.assertEqual(target_executors[0].num_create_value_calls, 2)
+
+
+if __name__ == '__main__':
+  tf.compat.v1.enable_v2_behavior()
+  absltest.main()
@@ -15,8 +15,11 @@
 """A service wrapper around an executor that makes it accessible over gRPC."""
 
 import asyncio
+import collections
 import functools
+import queue
 import threading
+import time
 import traceback
 import uuid
 
@@ -27,28 +30,82 @@ from tensorflow_federated.proto.v0 import executor_pb2
 from tensorflow_federated.proto.v0 import executor_pb2_grpc
 from tensorflow_federated.python.common_libs import anonymous_tuple
 from tensorflow_federated.python.common_libs import py_typecheck
+from tensorflow_federated.python.core.impl import caching_executor
 from tensorflow_federated.python.core.impl import executor_base
 from tensorflow_federated.python.core.impl import executor_service_utils
 from tensorflow_federated.python.core.impl import executor_value_base
 
+# Marks the end of the requests in a bidi stream, after the given number of
+# requests have been dispatched.
+_EndOfRequests = collections.namedtuple('_EndOfRequests', ['num_requests'])
+
+# Marks that the handling of an untagged request in a bidi stream is complete.
+_UntaggedRequestDone = collections.namedtuple('_UntaggedRequestDone', [])
+
+
+class _ValueRecord(object):
+  """The bookkeeping for a single value held by the service."""
+
+  __slots__ = ['future', 'refcount', 'last_used']
+
+  def __init__(self, future):
+    # The `concurrent.futures.Future` that resolves to the `ExecutorValue`.
+    self.future = future
+    # One reference is held by the client until the value is disposed of, and
+    # one more by each request being handled that uses the value.
+    self.refcount = 1
+    self.last_used = time.monotonic()
+
+
+def _report_invalid_argument(err, context):
+  logging.error(traceback.format_exc())
+  context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+  context.set_details(str(err))
+
 
 class ExecutorService(executor_pb2_grpc.ExecutorServicer):
   """A wrapper around a target executor that makes it into a gRPC service.
 
+  Each value created by the service is held until the client disposes of it
+  with a call to `Dispose()` (or, optionally, until it has not been used for
+  a given amount of time), so that long-running services have a stable memory
+  footprint. Values that are being used by requests still being handled are
+  only released after those requests complete.
+
   NOTE: This component is only available in Python 3.
   """
 
-  def __init__(self, executor, *args, **kwargs):
+  def __init__(self, executor, *args, value_ttl_seconds=None, **kwargs):
+    """Creates the service.
+
+    Args:
+      executor: The target executor, an instance of `executor_base.Executor`.
+      *args: Positional arguments for `executor_pb2_grpc.ExecutorServicer`.
+      value_ttl_seconds: The optional number of seconds after which a value
+        that has not been used by any request is disposed of, as if the client
+        called `Dispose()`. If `None`, values are only ever disposed of on
+        request.
+      **kwargs: Keyword arguments for `executor_pb2_grpc.ExecutorServicer`.
+
+    Raises:
+      ValueError: If `value_ttl_seconds` is not positive.
+    """
     py_typecheck.check_type(executor, executor_base.Executor)
+    if value_ttl_seconds is not None:
+      py_typecheck.check_type(value_ttl_seconds, (int, float))
+      if value_ttl_seconds <= 0:
+        raise ValueError(
+            'Invalid value_ttl_seconds: {}'.format(value_ttl_seconds))
     super(ExecutorService, self).__init__(*args, **kwargs)
     self._executor = executor
     self._lock = threading.Lock()
 
     # The keys in this dictionary are value ids (the same as what we return
-    # in the gRPC responses), and the values are `concurrent.futures.Future`
-    # instances (this may, and probably will change as we flesh out the rest
-    # of this implementation).
+    # in the gRPC responses), and the values are `_ValueRecord`s.
     self._values = {}
+    self._value_ttl_seconds = value_ttl_seconds
+    self._num_disposed_values = 0
+    self._num_expired_values = 0
 
     def run_loop(loop):
       loop.run_forever()
@@ -58,28 +115,243 @@ class ExecutorService(executor_pb2_grpc.ExecutorServicer):
     self._thread = threading.Thread(
         target=functools.partial(run_loop, self._event_loop))
     self._thread.start()
+    if value_ttl_seconds is not None:
+      self._event_loop.call_soon_threadsafe(self._schedule_expiry)
 
   def __del__(self):
     self._event_loop.call_soon_threadsafe(self._event_loop.stop)
     self._thread.join()
 
   def Execute(self, request_iter, context):
-    for v in request_iter:
-      which = v.WhichOneof('request')
-      if not which:
-        raise RuntimeError('Must set a request type')
-      if which == 'create_value':
-        yield executor_pb2.ExecuteResponse(
-            create_value=self.CreateValue(v.create_value, context))
-      elif which == 'create_call':
-        yield executor_pb2.ExecuteResponse(
-            create_call=self.CreateCall(v.create_call, context))
-      elif which == 'create_tuple':
-        yield executor_pb2.ExecuteResponse(
-            create_tuple=self.CreateTuple(v.create_tuple, context))
-      elif which == 'compute':
-        yield executor_pb2.ExecuteResponse(
-            compute=self.Compute(v.compute, context))
+    """Handles a bidi stream of requests.
+
+    Requests are dispatched concurrently onto the event loop as they arrive.
+    The responses to requests with a nonzero `request_id` are sent back in the
+    order in which they become ready, tagged with the `request_id`, so a
+    long-running `compute` does not hold up other requests sent after it. The
+    responses to untagged requests (with a `request_id` of 0), which the
+    client can only match to requests by their order, are sent back in the
+    order in which the requests were received, relative to one another.
+
+    Args:
+      request_iter: An iterator of `executor_pb2.ExecuteRequest`s.
+      context: An instance of `grpc.ServicerContext`.
+
+    Yields:
+      Instances of `executor_pb2.ExecuteResponse`.
+    """
+    responses = queue.Queue()
+    # The futures of the untagged requests, in the order they were received.
+    untagged_futures = collections.deque()
+    untagged_futures_lock = threading.Lock()
+
+    def put_response(future):
+      try:
+        responses.put(future.result())
+      except Exception as err:  # pylint: disable=broad-except
+        responses.put(err)
+
+    def put_untagged_request_done(_):
+      responses.put(_UntaggedRequestDone())
+
+    def pop_done_untagged_futures():
+      done_futures = []
+      with untagged_futures_lock:
+        while untagged_futures and untagged_futures[0].done():
+          done_futures.append(untagged_futures.popleft())
+      return done_futures
+
+    def read_requests():
+      num_requests = 0
+      try:
+        for request in request_iter:
+          future = asyncio.run_coroutine_threadsafe(
+              self._execute(request, context), self._event_loop)
+          if request.request_id:
+            future.add_done_callback(put_response)
+          else:
+            # The future is queued before the callback is added, so that it is
+            # found when the callback fires.
+            with untagged_futures_lock:
+              untagged_futures.append(future)
+            future.add_done_callback(put_untagged_request_done)
+          num_requests += 1
+      except Exception:  # pylint: disable=broad-except
+        # The stream was broken on the client side, so there is no one left to
+        # report this to, but the responses in flight still need to be drained.
+        logging.error(traceback.format_exc())
+      finally:
+        responses.put(_EndOfRequests(num_requests))
+
+    threading.Thread(target=read_requests, daemon=True).start()
+    num_requests = None
+    num_responses = 0
+    while num_requests is None or num_responses < num_requests:
+      response = responses.get()
+      if isinstance(response, _EndOfRequests):
+        num_requests = response.num_requests
+      elif isinstance(response, _UntaggedRequestDone):
+        # Only the responses not preceded by any still pending are sent back.
+        for future in pop_done_untagged_futures():
+          num_responses += 1
+          yield future.result()
+      elif isinstance(response, Exception):
+        raise response
+      else:
+        num_responses += 1
+        yield response
+
+  async def _execute(self, request, context):
+    """Handles a single request received over the bidi stream.
+
+    Args:
+      request: An instance of `executor_pb2.ExecuteRequest`.
+      context: An instance of `grpc.ServicerContext`.
+
+    Returns:
+      An instance of `executor_pb2.ExecuteResponse`.
+
+    Raises:
+      RuntimeError: If the request type is not set.
+    """
+    which = request.WhichOneof('request')
+    if not which:
+      raise RuntimeError('Must set a request type')
+    handler_fn, response_type = {
+        'create_value': (self._create_value_off_event_loop,
+                         executor_pb2.CreateValueResponse),
+        'create_call': (self._create_call, executor_pb2.CreateCallResponse),
+        'create_tuple': (self._create_tuple, executor_pb2.CreateTupleResponse),
+        'create_selection': (self._create_selection,
+                             executor_pb2.CreateSelectionResponse),
+        'compute': (self._compute, executor_pb2.ComputeResponse),
+    }[which]
+    try:
+      response = await handler_fn(getattr(request, which))
+    except (ValueError, TypeError) as err:
+      _report_invalid_argument(err, context)
+      response = response_type()
+    return executor_pb2.ExecuteResponse(
+        request_id=request.request_id, **{which: response})
+
+  async def _handle(self, coro, response_type, context):
+    """Awaits a request handler, reporting errors as in the unary methods."""
+    try:
+      return await coro
+    except (ValueError, TypeError) as err:
+      _report_invalid_argument(err, context)
+      return response_type()
+
+  def _run_handler(self, coro, response_type, context):
+    """Runs a request handler on the event loop, and waits for its result."""
+    return asyncio.run_coroutine_threadsafe(
+        self._handle(coro, response_type, context), self._event_loop).result()
+
+  def _add_value(self, coro):
+    """Schedules `coro` to create a value, and returns a reference to it.
+
+    Args:
+      coro: A coroutine that returns an instance of `ExecutorValue`.
+
+    Returns:
+      An instance of `executor_pb2.ValueRef` to be returned to the client.
+    """
+    value_id = str(uuid.uuid4())
+    future_val = asyncio.run_coroutine_threadsafe(coro, self._event_loop)
+    with self._lock:
+      self._values[value_id] = _ValueRecord(future_val)
+    return executor_pb2.ValueRef(id=value_id)
+
+  def _acquire_value(self, value_id):
+    """Adds a reference to the value with the given id, and returns its future.
+
+    Args:
+      value_id: The id of the value, as returned to the client.
+
+    Returns:
+      The `concurrent.futures.Future` that resolves to the value.
+
+    Raises:
+      ValueError: If there is no value with the given id.
+    """
+    with self._lock:
+      record = self._values.get(value_id)
+      if record is None:
+        raise ValueError(
+            'No value with id {} (it may have been disposed of).'.format(
+                value_id))
+      record.refcount += 1
+      record.last_used = time.monotonic()
+      return record.future
+
+  def _release_value(self, value_id):
+    """Drops a reference to the value with the given id, if it still exists.
+
+    Args:
+      value_id: The id of the value, as returned to the client.
+    """
+    with self._lock:
+      record = self._values.get(value_id)
+      if record is None:
+        return
+      record.refcount -= 1
+      record.last_used = time.monotonic()
+      if record.refcount <= 0:
+        del self._values[value_id]
+        self._num_disposed_values += 1
+
+  async def _get_value(self, value_ref):
+    """Awaits and returns the value referenced by `value_ref`."""
+    value_id = str(value_ref.id)
+    future_val = self._acquire_value(value_id)
+    try:
+      return await asyncio.wrap_future(future_val)
+    finally:
+      self._release_value(value_id)
+
+  def _schedule_expiry(self):
+    self._event_loop.call_later(self._value_ttl_seconds / 2,
+                                self._expire_idle_values)
+
+  def _expire_idle_values(self):
+    """Disposes of values that have not been used for longer than the TTL."""
+    deadline = time.monotonic() - self._value_ttl_seconds
+    with self._lock:
+      # Values still being created or used by requests are never expired.
+      expired_ids = [
+          value_id for value_id, record in self._values.items()
+          if (record.refcount == 1 and record.future.done() and
+              record.last_used < deadline)
+      ]
+      for value_id in expired_ids:
+        del self._values[value_id]
+      self._num_expired_values += len(expired_ids)
+    if expired_ids:
+      logging.info('Expired %d idle values.', len(expired_ids))
+    self._schedule_expiry()
+
+  def get_metrics(self):
+    """Returns metrics about the values held by this service.
+
+    Returns:
+      An instance of `executor_pb2.GetMetricsResponse`.
+    """
+    with self._lock:
+      futures = [record.future for record in self._values.values()]
+      num_disposed_values = self._num_disposed_values
+      num_expired_values = self._num_expired_values
+    num_bytes_held = 0
+    for future_val in futures:
+      # Values that are still being created are not accounted for.
+      if (future_val.done() and not future_val.cancelled() and
+          future_val.exception() is None):
+        num_bytes_held += caching_executor.estimate_value_bytes(
+            future_val.result().type_signature)
+    return executor_pb2.GetMetricsResponse(
+        num_live_values=len(futures),
+        num_bytes_held=num_bytes_held,
+        num_disposed_values=num_disposed_values,
+        num_expired_values=num_expired_values)
 
   def CreateValue(self, request, context):
     """Creates a value embedded in the executor.
@@ -92,20 +364,48 @@ class ExecutorService(executor_pb2_grpc.ExecutorServicer):
       An instance of `executor_pb2.CreateValueResponse`.
     """
     py_typecheck.check_type(request, executor_pb2.CreateValueRequest)
+    try:
+      return self._create_value(request)
+    except (ValueError, TypeError) as err:
+      _report_invalid_argument(err, context)
+      return executor_pb2.CreateValueResponse()
+
+  async def _create_value_off_event_loop(self, request):
+    # Deserializing the value may take a while, and must not block the event
+    # loop on which the other requests in the stream are being handled.
+    return await self._event_loop.run_in_executor(None, self._create_value,
+                                                  request)
+
+  def _create_value(self, request):
+    # Creating a value does not need to wait for any other values, so unlike
+    # the other handlers, this one does not need to run on the event loop.
+    value, value_type = (
+        executor_service_utils.deserialize_value(request.value))
+    return executor_pb2.CreateValueResponse(
+        value_ref=self._add_value(
+            self._executor.create_value(value, value_type)))
+
+  def CreateValueStream(self, request_iter, context):
+    """Creates a value embedded in the executor from a stream of chunks.
+
+    The value is reassembled incrementally as the chunks arrive, so it never
+    has to fit in a single gRPC message.
+
+    Args:
+      request_iter: An iterator of `executor_pb2.ValueChunk`s.
+      context: An instance of `grpc.ServicerContext`.
+
+    Returns:
+      An instance of `executor_pb2.CreateValueResponse`.
+    """
     try:
       value, value_type = (
-          executor_service_utils.deserialize_value(request.value))
-      value_id = str(uuid.uuid4())
-      future_val = asyncio.run_coroutine_threadsafe(
-          self._executor.create_value(value, value_type), self._event_loop)
-      with self._lock:
-        self._values[value_id] = future_val
+          executor_service_utils.deserialize_value_from_chunks(request_iter))
       return executor_pb2.CreateValueResponse(
-          value_ref=executor_pb2.ValueRef(id=value_id))
+          value_ref=self._add_value(
+              self._executor.create_value(value, value_type)))
     except (ValueError, TypeError) as err:
-      logging.error(traceback.format_exc())
-      context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-      context.set_details(str(err))
+      _report_invalid_argument(err, context)
       return executor_pb2.CreateValueResponse()
 
   def CreateCall(self, request, context):
@@ -119,26 +419,18 @@ class ExecutorService(executor_pb2_grpc.ExecutorServicer):
       An instance of `executor_pb2.CreateCallResponse`.
     """
     py_typecheck.check_type(request, executor_pb2.CreateCallRequest)
-    try:
-      function_id = str(request.function_ref.id)
-      argument_id = str(request.argument_ref.id)
-      with self._lock:
-        function_val = self._values[function_id]
-        argument_val = self._values[argument_id] if argument_id else None
-      function = function_val.result()
-      argument = argument_val.result() if argument_val is not None else None
-      result_val = asyncio.run_coroutine_threadsafe(
-          self._executor.create_call(function, argument), self._event_loop)
-      result_id = str(uuid.uuid4())
-      with self._lock:
-        self._values[result_id] = result_val
-      return executor_pb2.CreateCallResponse(
-          value_ref=executor_pb2.ValueRef(id=result_id))
-    except (ValueError, TypeError) as err:
-      logging.error(traceback.format_exc())
-      context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-      context.set_details(str(err))
-      return executor_pb2.CreateCallResponse()
+    return self._run_handler(
+        self._create_call(request), executor_pb2.CreateCallResponse, context)
+
+  async def _create_call(self, request):
+    function = await self._get_value(request.function_ref)
+    if request.argument_ref.id:
+      argument = await self._get_value(request.argument_ref)
+    else:
+      argument = None
+    return executor_pb2.CreateCallResponse(
+        value_ref=self._add_value(
+            self._executor.create_call(function, argument)))
 
   def CreateTuple(self, request, context):
     """Creates a tuple embedded in the executor.
@@ -151,26 +443,18 @@ class ExecutorService(executor_pb2_grpc.ExecutorServicer):
       An instance of `executor_pb2.CreateTupleResponse`.
     """
     py_typecheck.check_type(request, executor_pb2.CreateTupleRequest)
-    try:
-      with self._lock:
-        element_vals = [self._values[e.value_ref.id] for e in request.element]
-      elements = []
-      for idx, elem in enumerate(request.element):
-        elements.append(
-            (str(elem.name) if elem.name else None, element_vals[idx].result()))
-      anon_tuple = anonymous_tuple.AnonymousTuple(elements)
-      result_val = asyncio.run_coroutine_threadsafe(
-          self._executor.create_tuple(anon_tuple), self._event_loop)
-      result_id = str(uuid.uuid4())
-      with self._lock:
-        self._values[result_id] = result_val
-      return executor_pb2.CreateTupleResponse(
-          value_ref=executor_pb2.ValueRef(id=result_id))
-    except (ValueError, TypeError) as err:
-      logging.error(traceback.format_exc())
-      context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-      context.set_details(str(err))
-      return executor_pb2.CreateTupleResponse()
+    return self._run_handler(
+        self._create_tuple(request), executor_pb2.CreateTupleResponse, context)
+
+  async def _create_tuple(self, request):
+    element_vals = await asyncio.gather(
+        *[self._get_value(e.value_ref) for e in request.element])
+    elements = []
+    for elem, elem_val in zip(request.element, element_vals):
+      elements.append((str(elem.name) if elem.name else None, elem_val))
+    anon_tuple = anonymous_tuple.AnonymousTuple(elements)
+    return executor_pb2.CreateTupleResponse(
+        value_ref=self._add_value(self._executor.create_tuple(anon_tuple)))
 
   def CreateSelection(self, request, context):
     """Creates a selection embedded in the executor.
@@ -183,26 +467,19 @@ class ExecutorService(executor_pb2_grpc.ExecutorServicer):
       An instance of `executor_pb2.CreateSelectionResponse`.
     """
     py_typecheck.check_type(request, executor_pb2.CreateSelectionRequest)
-    try:
-      with self._lock:
-        source_val = self._values[request.source_ref.id]
-      source = source_val.result()
-      which_selection = request.WhichOneof('selection')
-      if which_selection == 'name':
-        coro = self._executor.create_selection(source, name=request.name)
-      else:
-        coro = self._executor.create_selection(source, index=request.index)
-      result_val = asyncio.run_coroutine_threadsafe(coro, self._event_loop)
-      result_id = str(uuid.uuid4())
-      with self._lock:
-        self._values[result_id] = result_val
-      return executor_pb2.CreateSelectionResponse(
-          value_ref=executor_pb2.ValueRef(id=result_id))
-    except (ValueError, TypeError) as err:
-      logging.error(traceback.format_exc())
-      context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-      context.set_details(str(err))
-      return executor_pb2.CreateSelectionResponse()
+    return self._run_handler(
+        self._create_selection(request), executor_pb2.CreateSelectionResponse,
+        context)
+
+  async def _create_selection(self, request):
+    source = await self._get_value(request.source_ref)
+    which_selection = request.WhichOneof('selection')
+    if which_selection == 'name':
+      coro = self._executor.create_selection(source, name=request.name)
+    else:
+      coro = self._executor.create_selection(source, index=request.index)
+    return executor_pb2.CreateSelectionResponse(
+        value_ref=self._add_value(coro))
 
   def Compute(self, request, context):
     """Computes a value embedded in the executor.
@@ -215,20 +492,82 @@ class ExecutorService(executor_pb2_grpc.ExecutorServicer):
       An instance of `executor_pb2.ComputeResponse`.
     """
     py_typecheck.check_type(request, executor_pb2.ComputeRequest)
+    return self._run_handler(
+        self._compute(request), executor_pb2.ComputeResponse, context)
+
+  async def _compute(self, request):
+    result_val, val_type = await self._compute_value(request.value_ref)
+    value_proto, _ = executor_service_utils.serialize_value(
+        result_val, val_type, request.accept_raw_tensors)
+    return executor_pb2.ComputeResponse(value=value_proto)
+
+  async def _compute_value(self, value_ref):
+    # The value stays referenced for as long as it is being computed.
+    value_id = str(value_ref.id)
+    future_val = self._acquire_value(value_id)
     try:
-      value_id = str(request.value_ref.id)
-      with self._lock:
-        future_val = self._values[value_id]
-      val = future_val.result()
+      val = await asyncio.wrap_future(future_val)
       py_typecheck.check_type(val, executor_value_base.ExecutorValue)
-      result = asyncio.run_coroutine_threadsafe(val.compute(), self._event_loop)
-      result_val = result.result()
-      val_type = val.type_signature
-      value_proto, _ = executor_service_utils.serialize_value(
-          result_val, val_type)
-      return executor_pb2.ComputeResponse(value=value_proto)
+      return await val.compute(), val.type_signature
+    finally:
+      self._release_value(value_id)
+
+  def ComputeStream(self, request, context):
+    """Computes a value embedded in the executor, and streams it back.
+
+    Args:
+      request: An instance of `executor_pb2.ComputeRequest`.
+      context: An instance of `grpc.ServicerContext`.
+
+    Yields:
+      Instances of `executor_pb2.ValueChunk` that represent the result.
+    """
+    py_typecheck.check_type(request, executor_pb2.ComputeRequest)
+    try:
+      result_val, val_type = asyncio.run_coroutine_threadsafe(
+          self._compute_value(request.value_ref), self._event_loop).result()
+      chunk_size = (
+          request.chunk_size or executor_service_utils.DEFAULT_CHUNK_SIZE)
+      chunks = executor_service_utils.serialize_value_to_chunks(
+          result_val, val_type, chunk_size)
+      # The first chunk is produced eagerly, so that serialization errors in
+      # the common case can be reported before anything is sent.
+      first_chunk = next(chunks)
     except (ValueError, TypeError) as err:
-      logging.error(traceback.format_exc())
-      context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-      context.set_details(str(err))
-      return executor_pb2.ComputeResponse()
+      _report_invalid_argument(err, context)
+      return
+    yield first_chunk
+    for chunk in chunks:
+      yield chunk
+
+  def Dispose(self, request, context):
+    """Disposes of values embedded in the executor.
+
+    Each value is released once it is no longer used by any of the requests
+    being handled. Ids of values that no longer exist (e.g., because they have
+    already expired) are ignored.
+
+    Args:
+      request: An instance of `executor_pb2.DisposeRequest`.
+      context: An instance of `grpc.ServicerContext`.
+
+    Returns:
+      An instance of `executor_pb2.DisposeResponse`.
+    """
+    py_typecheck.check_type(request, executor_pb2.DisposeRequest)
+    for value_ref in request.value_ref:
+      self._release_value(str(value_ref.id))
+    return executor_pb2.DisposeResponse()
+
+  def GetMetrics(self, request, context):
+    """Reports metrics about the values held by the service.
+
+    Args:
+      request: An instance of `executor_pb2.GetMetricsRequest`.
+      context: An instance of `grpc.ServicerContext`.
+
+    Returns:
+      An instance of `executor_pb2.GetMetricsResponse`.
+    """
+    py_typecheck.check_type(request, executor_pb2.GetMetricsRequest)
+    return self.get_metrics()
@@ -14,11 +14,16 @@
 # limitations under the License.
 """Tests for executor_service.py."""
 
+import asyncio
+import collections
+import queue
 import threading
+import time
 
 from absl.testing import absltest
 import grpc
 from grpc.framework.foundation import logging_pool
+import numpy as np
 import portpicker
 import tensorflow as tf
 
@@ -73,6 +78,42 @@ class TestEnv(object):
     return value
 
 
+class SlowComputeValue(executor_value_base.ExecutorValue):
+  """A value whose computation blocks until `release` is set."""
+
+  def __init__(self, v, t, release):
+    self._v = v
+    self._t = t
+    self._release = release
+
+  @property
+  def type_signature(self):
+    return self._t
+
+  async def compute(self):
+    await asyncio.get_event_loop().run_in_executor(None, self._release.wait)
+    return self._v
+
+
+class SlowComputeExecutor(executor_base.Executor):
+  """An executor of `SlowComputeValue`s, all released by `release`."""
+
+  def __init__(self):
+    self.release = threading.Event()
+
+  async def create_value(self, value, type_spec=None):
+    return SlowComputeValue(value, type_spec, self.release)
+
+  async def create_call(self, comp, arg=None):
+    raise NotImplementedError
+
+  async def create_tuple(self, elements):
+    raise NotImplementedError
+
+  async def create_selection(self, source, index=None, name=None):
+    raise NotImplementedError
+
+
 class ExecutorServiceTest(absltest.TestCase):
 
   def test_executor_service_slowly_create_tensor_value(self):
@@ -224,6 +265,181 @@ class ExecutorServiceTest(absltest.TestCase):
 
     del env
 
+  def test_executor_service_execute_does_not_block_on_slow_compute(self):
+    ex = SlowComputeExecutor()
+    env = TestEnv(ex)
+    value_proto, _ = executor_service_utils.serialize_value(10, tf.int32)
+    requests = queue.Queue()
+    responses = env.stub.Execute(iter(requests.get, None))
+    requests.put(
+        executor_pb2.ExecuteRequest(
+            create_value=executor_pb2.CreateValueRequest(value=value_proto),
+            request_id=1))
+    response = next(responses)
+    self.assertEqual(response.request_id, 1)
+    value_ref = response.create_value.value_ref
+    requests.put(
+        executor_pb2.ExecuteRequest(
+            compute=executor_pb2.ComputeRequest(value_ref=value_ref),
+            request_id=2))
+    requests.put(
+        executor_pb2.ExecuteRequest(
+            create_value=executor_pb2.CreateValueRequest(value=value_proto),
+            request_id=3))
+    # The value created after the slow computation gets sent back first.
+    response = next(responses)
+    self.assertEqual(response.request_id, 3)
+    self.assertEqual(response.WhichOneof('response'), 'create_value')
+    ex.release.set()
+    response = next(responses)
+    self.assertEqual(response.request_id, 2)
+    value, _ = executor_service_utils.deserialize_value(response.compute.value)
+    self.assertEqual(value, 10)
+    requests.put(None)
+    self.assertEmpty(list(responses))
+    del env
+
+  def test_executor_service_execute_answers_untagged_requests_in_order(self):
+    ex = SlowComputeExecutor()
+    env = TestEnv(ex)
+    value_proto, _ = executor_service_utils.serialize_value(10, tf.int32)
+    requests = queue.Queue()
+    responses = env.stub.Execute(iter(requests.get, None))
+    requests.put(
+        executor_pb2.ExecuteRequest(
+            create_value=executor_pb2.CreateValueRequest(value=value_proto)))
+    value_ref = next(responses).create_value.value_ref
+    requests.put(
+        executor_pb2.ExecuteRequest(
+            compute=executor_pb2.ComputeRequest(value_ref=value_ref)))
+    requests.put(
+        executor_pb2.ExecuteRequest(
+            create_value=executor_pb2.CreateValueRequest(value=value_proto)))
+    # The fast request completes first, but its response must wait for the
+    # response to the slow one that was received before it.
+    threading.Timer(0.5, ex.release.set).start()
+    response = next(responses)
+    self.assertEqual(response.WhichOneof('response'), 'compute')
+    value, _ = executor_service_utils.deserialize_value(response.compute.value)
+    self.assertEqual(value, 10)
+    response = next(responses)
+    self.assertEqual(response.WhichOneof('response'), 'create_value')
+    requests.put(None)
+    self.assertEmpty(list(responses))
+    del env
+
+  def test_executor_service_execute_with_selection(self):
+    env = TestEnv(eager_executor.EagerExecutor())
+    value_proto, _ = executor_service_utils.serialize_value(
+        collections.OrderedDict([('a', 10), ('b', 20)]),
+        [('a', tf.int32), ('b', tf.int32)])
+    requests = queue.Queue()
+    responses = env.stub.Execute(iter(requests.get, None))
+    requests.put(
+        executor_pb2.ExecuteRequest(
+            create_value=executor_pb2.CreateValueRequest(value=value_proto),
+            request_id=1))
+    tuple_ref = next(responses).create_value.value_ref
+    requests.put(
+        executor_pb2.ExecuteRequest(
+            create_selection=executor_pb2.CreateSelectionRequest(
+                source_ref=tuple_ref, name='b'),
+            request_id=2))
+    response = next(responses)
+    self.assertEqual(response.request_id, 2)
+    self.assertEqual(response.WhichOneof('response'), 'create_selection')
+    requests.put(None)
+    self.assertEmpty(list(responses))
+    self.assertEqual(
+        env.get_value(response.create_selection.value_ref.id), 20)
+    del env
+
+  def test_executor_service_create_value_stream_and_compute_stream(self):
+    env = TestEnv(eager_executor.EagerExecutor())
+    x = np.arange(1000, dtype=np.float32)
+    chunks = executor_service_utils.serialize_value_to_chunks(
+        x, (tf.float32, [1000]), chunk_size=256)
+    response = env.stub.CreateValueStream(chunks)
+    self.assertIsInstance(response, executor_pb2.CreateValueResponse)
+    chunks = list(
+        env.stub.ComputeStream(
+            executor_pb2.ComputeRequest(
+                value_ref=response.value_ref, chunk_size=512)))
+    # A header, followed by 4000 bytes of content in chunks of 512 bytes.
+    self.assertLen(chunks, 9)
+    value, type_spec = executor_service_utils.deserialize_value_from_chunks(
+        chunks)
+    self.assertEqual(str(type_spec), 'float32[1000]')
+    self.assertTrue(np.array_equal(value, x))
+    del env
+
+  def test_executor_service_dispose(self):
+    env = TestEnv(eager_executor.EagerExecutor())
+    value_proto, _ = executor_service_utils.serialize_value(
+        np.zeros([10], dtype=np.float32), (tf.float32, [10]))
+    value_refs = []
+    for _ in range(3):
+      response = env.stub.CreateValue(
+          executor_pb2.CreateValueRequest(value=value_proto))
+      value_refs.append(response.value_ref)
+    for value_ref in value_refs:
+      env.get_value(value_ref.id)
+    metrics = env.stub.GetMetrics(executor_pb2.GetMetricsRequest())
+    self.assertEqual(metrics.num_live_values, 3)
+    self.assertEqual(metrics.num_bytes_held, 120)
+    env.stub.Dispose(executor_pb2.DisposeRequest(value_ref=value_refs[:2]))
+    metrics = env.stub.GetMetrics(executor_pb2.GetMetricsRequest())
+    self.assertEqual(metrics.num_live_values, 1)
+    self.assertEqual(metrics.num_bytes_held, 40)
+    self.assertEqual(metrics.num_disposed_values, 2)
+    # Disposing of values that no longer exist has no effect.
+    env.stub.Dispose(executor_pb2.DisposeRequest(value_ref=value_refs[:2]))
+    self.assertEqual(
+        env.stub.GetMetrics(executor_pb2.GetMetricsRequest()).num_live_values,
+        1)
+    with self.assertRaises(grpc.RpcError) as cm:
+      env.get_value(value_refs[0].id)
+    self.assertEqual(cm.exception.code(), grpc.StatusCode.INVALID_ARGUMENT)
+    self.assertEqual(env.get_value(value_refs[2].id).shape, (10,))
+    del env
+
+  def test_executor_service_defers_disposal_of_values_in_use(self):
+    ex = SlowComputeExecutor()
+    service = executor_service.ExecutorService(ex)
+    value_proto, _ = executor_service_utils.serialize_value(10, tf.int32)
+    value_ref = service.CreateValue(
+        executor_pb2.CreateValueRequest(value=value_proto), None).value_ref
+    compute_thread = threading.Thread(
+        target=service.Compute,
+        args=(executor_pb2.ComputeRequest(value_ref=value_ref), None))
+    compute_thread.start()
+    service.Dispose(executor_pb2.DisposeRequest(value_ref=[value_ref]), None)
+    self.assertEqual(service.get_metrics().num_live_values, 1)
+    ex.release.set()
+    compute_thread.join()
+    metrics = service.get_metrics()
+    self.assertEqual(metrics.num_live_values, 0)
+    self.assertEqual(metrics.num_disposed_values, 1)
+
+  def test_executor_service_expires_idle_values(self):
+    service = executor_service.ExecutorService(
+        eager_executor.EagerExecutor(), value_ttl_seconds=0.1)
+    value_proto, _ = executor_service_utils.serialize_value(10, tf.int32)
+    service.CreateValue(
+        executor_pb2.CreateValueRequest(value=value_proto), None)
+    for _ in range(100):
+      metrics = service.get_metrics()
+      if metrics.num_live_values == 0:
+        break
+      time.sleep(0.05)
+    self.assertEqual(metrics.num_live_values, 0)
+    self.assertEqual(metrics.num_expired_values, 1)
+
+  def test_executor_service_raises_with_invalid_value_ttl(self):
+    with self.assertRaises(ValueError):
+      executor_service.ExecutorService(
+          eager_executor.EagerExecutor(), value_ttl_seconds=0)
+
 
 if __name__ == '__main__':
   tf.compat.v1.enable_v2_behavior()
@@ -28,13 +28,113 @@ from tensorflow_federated.python.core.impl import type_serialization
 from tensorflow_federated.python.core.impl import type_utils
 
 
-def serialize_tensor_value(value, type_spec=None):
+# The dtypes of tensors that can be serialized in the raw encoding, i.e., those
+# that have a fixed-size in-memory representation in Numpy.
+_RAW_TENSOR_DTYPES = frozenset([
+    tf.bool, tf.int8, tf.int16, tf.int32, tf.int64, tf.uint8, tf.uint16,
+    tf.uint32, tf.uint64, tf.float16, tf.float32, tf.float64, tf.complex64,
+    tf.complex128
+])
+
+
+def _to_raw_tensor_array(value, type_spec):
+  """Converts `value` into an array that can be used in the raw encoding.
+
+  Args:
+    value: A Numpy array or a Numpy scalar.
+    type_spec: An optional `tff.TensorType`.
+
+  Returns:
+    A tuple `(array, ret_type_spec)`, in which `array` is a contiguous Numpy
+    array with elements in the little-endian byte order, and `ret_type_spec` is
+    the type of the value, as in `serialize_tensor_value()`, or `None` if
+    `value` cannot be represented in the raw encoding.
+
+  Raises:
+    TypeError: If `value` does not match `type_spec`.
+  """
+  dtype = type_spec.dtype if type_spec is not None else tf.as_dtype(value.dtype)
+  if dtype not in _RAW_TENSOR_DTYPES:
+    return None
+  # This is a no-op on little-endian machines for contiguous arrays that are
+  # already of the right dtype.
+  array = np.asarray(
+      value, dtype=np.dtype(dtype.as_numpy_dtype).newbyteorder('<'), order='C')
+  value_type = computation_types.TensorType(dtype, array.shape)
+  if type_spec is not None:
+    type_utils.check_assignable_from(type_spec, value_type)
+  else:
+    type_spec = value_type
+  return array, type_spec
+
+
+def _get_raw_tensor_dtype(raw_tensor):
+  """Returns the `tf.DType` and the Numpy dtype of `raw_tensor`."""
+  dtype = tf.as_dtype(raw_tensor.dtype)
+  if dtype not in _RAW_TENSOR_DTYPES:
+    raise ValueError('Unsupported raw tensor dtype {}.'.format(dtype.name))
+  return dtype, np.dtype(dtype.as_numpy_dtype).newbyteorder('<')
+
+
+def _serialize_raw_tensor_value(value, type_spec):
+  """Serializes a Numpy array into `executor_pb2.Value` in the raw encoding.
+
+  Args:
+    value: A Numpy array or a Numpy scalar.
+    type_spec: An optional `tff.TensorType`.
+
+  Returns:
+    A tuple `(value_proto, ret_type_spec)` as in `serialize_tensor_value()`, or
+    `None` if `value` cannot be represented in the raw encoding, in which case
+    the caller should fall back on the default encoding.
+  """
+  result = _to_raw_tensor_array(value, type_spec)
+  if result is None:
+    return None
+  array, type_spec = result
+  raw_tensor = executor_pb2.RawTensor(
+      dtype=type_spec.dtype.name, shape=array.shape, content=array.tobytes())
+  return executor_pb2.Value(raw_tensor=raw_tensor), type_spec
+
+
+def _deserialize_raw_tensor_value(raw_tensor):
+  """Deserializes a tensor value from `executor_pb2.RawTensor`.
+
+  The returned Numpy array is a read-only view of the buffer of `raw_tensor`,
+  with no intermediate copies being made.
+
+  Args:
+    raw_tensor: An instance of `executor_pb2.RawTensor`.
+
+  Returns:
+    A tuple `(value, type_spec)` as in `deserialize_tensor_value()`.
+
+  Raises:
+    ValueError: If the value is malformed.
+  """
+  dtype, np_dtype = _get_raw_tensor_dtype(raw_tensor)
+  shape = tuple(raw_tensor.shape)
+  tensor_value = np.frombuffer(raw_tensor.content, dtype=np_dtype)
+  num_elements = int(np.prod(shape, dtype=np.int64))
+  if tensor_value.size != num_elements:
+    raise ValueError('Expected {} elements in a raw tensor of shape {}, found '
+                     '{}.'.format(num_elements, shape, tensor_value.size))
+  tensor_value = tensor_value.reshape(shape)
+  return tensor_value, computation_types.TensorType(dtype, shape)
+
+
+def serialize_tensor_value(value, type_spec=None, use_raw_encoding=False):
   """Serializes a tensor value into `executor_pb2.Value`.
 
   Args:
     value: A Numpy array or other object understood by `tf.make_tensor_proto`.
     type_spec: An optional type spec, a `tff.TensorType` or something
       convertible to it.
+    use_raw_encoding: Whether to serialize dense numeric Numpy arrays in the raw
+      encoding (as `executor_pb2.RawTensor`), which avoids the intermediate
+      copies made by `tf.make_tensor_proto`. This must only be used if the peer
+      that receives the serialized value is known to support this encoding.
+      Other values are always serialized in the default encoding.
 
   Returns:
     A tuple `(value_proto, ret_type_spec)` in which `value_proto` is an instance
@@ -55,6 +155,11 @@ def serialize_tensor_value(value, type_spec=None):
   if type_spec is not None:
     type_spec = computation_types.to_type(type_spec)
     py_typecheck.check_type(type_spec, computation_types.TensorType)
+  if use_raw_encoding and isinstance(value, (np.ndarray, np.generic)):
+    result = _serialize_raw_tensor_value(value, type_spec)
+    if result is not None:
+      return result
+  if type_spec is not None:
     if isinstance(value, np.ndarray):
       tensor_proto = tf.make_tensor_proto(
           value, dtype=type_spec.dtype, verify_shape=False)
@@ -88,7 +193,8 @@ def deserialize_tensor_value(value_proto):
   Returns:
     A tuple `(value, type_spec)`, where `value` is a Numpy array that represents
     the deserialized value, and `type_spec` is an instance of `tff.TensorType`
-    that represents its type.
+    that represents its type. Arrays deserialized from the raw encoding are
+    read-only.
 
   Raises:
     TypeError: If the arguments are of the wrong types.
@@ -96,6 +202,8 @@ def deserialize_tensor_value(value_proto):
   """
   py_typecheck.check_type(value_proto, executor_pb2.Value)
   which_value = value_proto.WhichOneof('value')
+  if which_value == 'raw_tensor':
+    return _deserialize_raw_tensor_value(value_proto.raw_tensor)
   if which_value != 'tensor':
     raise ValueError('Not a tensor value: {}'.format(which_value))
 
@@ -114,12 +222,14 @@ def deserialize_tensor_value(value_proto):
   return tensor_value, value_type
 
 
-def serialize_value(value, type_spec=None):
+def serialize_value(value, type_spec=None, use_raw_encoding=False):
   """Serializes a value into `executor_pb2.Value`.
 
   Args:
     value: A value to be serialized.
     type_spec: Optional type spec, a `tff.Type` or something convertible to it.
+    use_raw_encoding: Whether to serialize tensors in the raw encoding where
+      possible, as in `serialize_tensor_value()`.
 
   Returns:
     A tuple `(value_proto, ret_type_spec)` where `value_proto` is an instance
@@ -141,14 +251,14 @@ def serialize_value(value, type_spec=None):
         computation_impl.ComputationImpl.get_proto(value),
         type_utils.reconcile_value_with_type_spec(value, type_spec))
   elif isinstance(type_spec, computation_types.TensorType):
-    return serialize_tensor_value(value, type_spec)
+    return serialize_tensor_value(value, type_spec, use_raw_encoding)
   elif isinstance(type_spec, computation_types.NamedTupleType):
     type_elements = anonymous_tuple.to_elements(type_spec)
     val_elements = anonymous_tuple.to_elements(
         anonymous_tuple.from_container(value))
     tup_elems = []
     for (e_name, e_type), (_, e_val) in zip(type_elements, val_elements):
-      e_proto, _ = serialize_value(e_val, e_type)
+      e_proto, _ = serialize_value(e_val, e_type, use_raw_encoding)
       tup_elems.append(
           executor_pb2.Value.Tuple.Element(
               name=e_name if e_name else None, value=e_proto))
@@ -180,7 +290,7 @@ def deserialize_value(value_proto):
   """
   py_typecheck.check_type(value_proto, executor_pb2.Value)
   which_value = value_proto.WhichOneof('value')
-  if which_value == 'tensor':
+  if which_value in ['tensor', 'raw_tensor']:
     return deserialize_tensor_value(value_proto)
   elif which_value == 'computation':
     return (value_proto.computation,
@@ -198,3 +308,138 @@ def deserialize_value(value_proto):
   else:
     raise ValueError(
         'Unable to deserialize a value of type {}.'.format(which_value))
+
+
+# The default maximum number of bytes of tensor content in a single chunk, well
+# below the default 4 MB limit on the size of gRPC messages.
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def serialize_value_to_chunks(value, type_spec=None,
+                              chunk_size=DEFAULT_CHUNK_SIZE):
+  """Serializes a value into a stream of `executor_pb2.ValueChunk`s.
+
+  Unlike `serialize_value()`, this never materializes the serialized form of
+  the entire value at once. Dense numeric tensors are sent in the raw encoding,
+  split into chunks of at most `chunk_size` bytes of content, so only a single
+  chunk is held in memory at any given time in addition to the value itself.
+
+  Args:
+    value: A value to be serialized.
+    type_spec: Optional type spec, a `tff.Type` or something convertible to it.
+    chunk_size: The maximum number of bytes of tensor content in a chunk.
+
+  Yields:
+    Instances of `executor_pb2.ValueChunk` that represent the value, to be
+    reassembled with `deserialize_value_from_chunks()`.
+
+  Raises:
+    TypeError: If the arguments are of the wrong types.
+    ValueError: If the value is malformed, or `chunk_size` is not positive.
+  """
+  py_typecheck.check_type(chunk_size, int)
+  if chunk_size < 1:
+    raise ValueError('Invalid chunk size: {}'.format(chunk_size))
+  type_spec = computation_types.to_type(type_spec)
+  if isinstance(value, computation_pb2.Computation) or isinstance(
+      value, computation_impl.ComputationImpl):
+    # Computations are always sent as a single chunk.
+    pass
+  elif isinstance(type_spec, computation_types.NamedTupleType):
+    type_elements = anonymous_tuple.to_elements(type_spec)
+    val_elements = anonymous_tuple.to_elements(
+        anonymous_tuple.from_container(value))
+    yield executor_pb2.ValueChunk(
+        tuple_start=executor_pb2.ValueChunk.TupleStart(
+            name=[e_name if e_name else '' for e_name, _ in type_elements]))
+    for (_, e_type), (_, e_val) in zip(type_elements, val_elements):
+      for chunk in serialize_value_to_chunks(e_val, e_type, chunk_size):
+        yield chunk
+    return
+  elif type_spec is None or isinstance(type_spec,
+                                       computation_types.TensorType):
+    if isinstance(value, tf.Tensor):
+      value = value.numpy()
+    if isinstance(value, (np.ndarray, np.generic)):
+      result = _to_raw_tensor_array(value, type_spec)
+      if result is not None:
+        array, type_spec = result
+        yield executor_pb2.ValueChunk(
+            raw_tensor_start=executor_pb2.RawTensor(
+                dtype=type_spec.dtype.name, shape=array.shape))
+        content = array.reshape([-1]).view(np.uint8)
+        for offset in range(0, content.size, chunk_size):
+          yield executor_pb2.ValueChunk(
+              raw_tensor_content=content[offset:offset + chunk_size].tobytes())
+        return
+  value_proto, _ = serialize_value(value, type_spec)
+  yield executor_pb2.ValueChunk(value=value_proto)
+
+
+def _deserialize_value_from_chunk_iterator(chunks):
+  """Consumes the chunks of a single value from the iterator `chunks`."""
+  chunk = next(chunks, None)
+  if chunk is None:
+    raise ValueError('The stream of chunks ended before the end of the value.')
+  py_typecheck.check_type(chunk, executor_pb2.ValueChunk)
+  which_chunk = chunk.WhichOneof('chunk')
+  if which_chunk == 'value':
+    return deserialize_value(chunk.value)
+  elif which_chunk == 'tuple_start':
+    val_elems = []
+    type_elems = []
+    for name in chunk.tuple_start.name:
+      name = name if name else None
+      e_val, e_type = _deserialize_value_from_chunk_iterator(chunks)
+      val_elems.append((name, e_val))
+      type_elems.append((name, e_type) if name else e_type)
+    return (anonymous_tuple.AnonymousTuple(val_elems),
+            computation_types.NamedTupleType(type_elems))
+  elif which_chunk == 'raw_tensor_start':
+    dtype, np_dtype = _get_raw_tensor_dtype(chunk.raw_tensor_start)
+    shape = tuple(chunk.raw_tensor_start.shape)
+    tensor_value = np.empty(shape, dtype=np_dtype)
+    # A view of the content of `tensor_value` that gets filled in place.
+    content = tensor_value.reshape([-1]).view(np.uint8)
+    offset = 0
+    while offset < content.size:
+      chunk = next(chunks, None)
+      if chunk is None or chunk.WhichOneof('chunk') != 'raw_tensor_content':
+        raise ValueError(
+            'Expected {} more bytes of content of a raw tensor.'.format(
+                content.size - offset))
+      num_bytes = len(chunk.raw_tensor_content)
+      if offset + num_bytes > content.size:
+        raise ValueError('Received more than {} bytes of content of a raw '
+                         'tensor of shape {}.'.format(content.size, shape))
+      content[offset:offset + num_bytes] = np.frombuffer(
+          chunk.raw_tensor_content, dtype=np.uint8)
+      offset += num_bytes
+    return tensor_value, computation_types.TensorType(dtype, shape)
+  else:
+    raise ValueError(
+        'Unable to deserialize a value chunk of type {}.'.format(which_chunk))
+
+
+def deserialize_value_from_chunks(chunks):
+  """Deserializes a value from a stream of `executor_pb2.ValueChunk`s.
+
+  The chunks are consumed one at a time, with the content of tensors copied
+  directly into preallocated Numpy arrays as it arrives.
+
+  Args:
+    chunks: An iterable of `executor_pb2.ValueChunk`s, as produced by
+      `serialize_value_to_chunks()`.
+
+  Returns:
+    A tuple `(value, type_spec)` as in `deserialize_value()`.
+
+  Raises:
+    TypeError: If the arguments are of the wrong types.
+    ValueError: If the stream of chunks is malformed.
+  """
+  chunks = iter(chunks)
+  result = _deserialize_value_from_chunk_iterator(chunks)
+  if next(chunks, None) is not None:
+    raise ValueError('Unexpected chunks after the end of the value.')
+  return result
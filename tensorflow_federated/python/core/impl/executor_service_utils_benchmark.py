@@ -0,0 +1,75 @@
+# Lint as: python3
+# Copyright 2019, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark for executor_service_utils.py."""
+
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from tensorflow_federated.proto.v0 import executor_pb2
+from tensorflow_federated.python.core.impl import executor_service_utils
+
+
+class ExecutorServiceUtilsBenchmark(tf.test.Benchmark):
+  """Compares the default and the raw encoding of large tensors."""
+
+  def _benchmark_roundtrip(self, num_bytes, use_raw_encoding, num_iters):
+    num_elements = num_bytes // 4
+    value = np.random.random_sample([num_elements]).astype(np.float32)
+    serialize_times = []
+    deserialize_times = []
+    for _ in range(num_iters):
+      start = time.time()
+      value_proto, _ = executor_service_utils.serialize_tensor_value(
+          value, (tf.float32, [num_elements]),
+          use_raw_encoding=use_raw_encoding)
+      # Going through the wire format, as the executor service would.
+      serialized = value_proto.SerializeToString()
+      serialize_times.append(time.time() - start)
+      start = time.time()
+      value_proto = executor_pb2.Value.FromString(serialized)
+      executor_service_utils.deserialize_tensor_value(value_proto)
+      deserialize_times.append(time.time() - start)
+      del value_proto, serialized
+    encoding = 'raw' if use_raw_encoding else 'default'
+    self.report_benchmark(
+        name='Serialize, {} MB, {} encoding'.format(num_bytes >> 20, encoding),
+        wall_time=np.mean(serialize_times),
+        iters=num_iters,
+        extras={'std_dev': np.std(serialize_times)})
+    self.report_benchmark(
+        name='Deserialize, {} MB, {} encoding'.format(num_bytes >> 20,
+                                                     encoding),
+        wall_time=np.mean(deserialize_times),
+        iters=num_iters,
+        extras={'std_dev': np.std(deserialize_times)})
+
+  def benchmark_default_encoding(self):
+    # The default encoding cannot represent tensors of 2 GB or more, as these
+    # exceed the size limit of a single serialized protocol buffer.
+    for num_megabytes in [1, 16, 256, 1024]:
+      self._benchmark_roundtrip(
+          num_megabytes << 20, use_raw_encoding=False, num_iters=3)
+
+  def benchmark_raw_encoding(self):
+    for num_megabytes in [1, 16, 256, 1024]:
+      self._benchmark_roundtrip(
+          num_megabytes << 20, use_raw_encoding=True, num_iters=3)
+
+
+if __name__ == '__main__':
+  tf.compat.v1.enable_v2_behavior()
+  tf.test.main()
@@ -73,6 +73,60 @@ class ExecutorServiceUtilsTest(absltest.TestCase):
     with self.assertRaises(TypeError):
       executor_service_utils.serialize_tensor_value(x, tf.int32)
 
+  def test_serialize_deserialize_tensor_value_with_raw_encoding(self):
+    x = np.arange(12, dtype=np.float32).reshape([3, 4])
+    value_proto, value_type = executor_service_utils.serialize_tensor_value(
+        x, (tf.float32, [3, 4]), use_raw_encoding=True)
+    self.assertIsInstance(value_proto, executor_pb2.Value)
+    self.assertEqual(value_proto.WhichOneof('value'), 'raw_tensor')
+    self.assertEqual(value_proto.raw_tensor.dtype, 'float32')
+    self.assertEqual(list(value_proto.raw_tensor.shape), [3, 4])
+    self.assertLen(value_proto.raw_tensor.content, 48)
+    self.assertEqual(str(value_type), 'float32[3,4]')
+    y, type_spec = executor_service_utils.deserialize_tensor_value(value_proto)
+    self.assertEqual(str(type_spec), 'float32[3,4]')
+    self.assertEqual(y.dtype, np.float32)
+    self.assertTrue(np.array_equal(x, y))
+
+  def test_serialize_deserialize_tensor_value_with_raw_encoding_and_scalar(
+      self):
+    x = tf.constant(10.0).numpy()
+    value_proto, value_type = executor_service_utils.serialize_tensor_value(
+        x, tf.int32, use_raw_encoding=True)
+    self.assertEqual(value_proto.WhichOneof('value'), 'raw_tensor')
+    self.assertEqual(str(value_type), 'int32')
+    y, type_spec = executor_service_utils.deserialize_tensor_value(value_proto)
+    self.assertEqual(str(type_spec), 'int32')
+    self.assertEqual(y, 10)
+
+  def test_serialize_tensor_value_with_raw_encoding_and_bad_shape(self):
+    x = np.array([10, 20, 30], dtype=np.int32)
+    with self.assertRaises(TypeError):
+      executor_service_utils.serialize_tensor_value(
+          x, tf.int32, use_raw_encoding=True)
+
+  def test_serialize_tensor_value_with_raw_encoding_falls_back_for_strings(
+      self):
+    x = np.array([b'a', b'bc'], dtype=np.object)
+    value_proto, value_type = executor_service_utils.serialize_tensor_value(
+        x, (tf.string, [2]), use_raw_encoding=True)
+    self.assertEqual(value_proto.WhichOneof('value'), 'tensor')
+    self.assertEqual(str(value_type), 'string[2]')
+    y, _ = executor_service_utils.deserialize_tensor_value(value_proto)
+    self.assertEqual(list(y), [b'a', b'bc'])
+
+  def test_serialize_tensor_value_with_raw_encoding_falls_back_for_lists(self):
+    value_proto, _ = executor_service_utils.serialize_tensor_value(
+        [1, 2, 3], (tf.int32, [3]), use_raw_encoding=True)
+    self.assertEqual(value_proto.WhichOneof('value'), 'tensor')
+
+  def test_deserialize_tensor_value_with_malformed_raw_encoding(self):
+    value_proto = executor_pb2.Value(
+        raw_tensor=executor_pb2.RawTensor(
+            dtype='float32', shape=[3], content=b'\x00' * 8))
+    with self.assertRaises(ValueError):
+      executor_service_utils.deserialize_tensor_value(value_proto)
+
   def test_serialize_deserialize_computation_value(self):
 
     @computations.tf_computation
@@ -110,6 +164,97 @@ class ExecutorServiceUtilsTest(absltest.TestCase):
     self.assertEqual(str(type_spec), str(x_type))
     self.assertCountEqual(y, (10, 20))
 
+  def test_serialize_deserialize_nested_tuple_value_with_raw_encoding(self):
+    x = collections.OrderedDict([('a', np.array([1.0, 2.0], dtype=np.float32)),
+                                 ('b', np.int64(5))])
+    x_type = [('a', (tf.float32, [2])), ('b', tf.int64)]
+    value_proto, value_type = executor_service_utils.serialize_value(
+        x, x_type, use_raw_encoding=True)
+    self.assertEqual(str(value_type), '<a=float32[2],b=int64>')
+    for element in value_proto.tuple.element:
+      self.assertEqual(element.value.WhichOneof('value'), 'raw_tensor')
+    y, type_spec = executor_service_utils.deserialize_value(value_proto)
+    self.assertEqual(str(type_spec), '<a=float32[2],b=int64>')
+    self.assertTrue(np.array_equal(y.a, [1.0, 2.0]))
+    self.assertEqual(y.b, 5)
+
+  def test_serialize_deserialize_tensor_value_to_chunks(self):
+    x = np.arange(100, dtype=np.float32).reshape([10, 10])
+    chunks = list(
+        executor_service_utils.serialize_value_to_chunks(
+            x, (tf.float32, [10, 10]), chunk_size=64))
+    self.assertEqual(chunks[0].WhichOneof('chunk'), 'raw_tensor_start')
+    self.assertEqual(chunks[0].raw_tensor_start.dtype, 'float32')
+    self.assertEqual(list(chunks[0].raw_tensor_start.shape), [10, 10])
+    self.assertEmpty(chunks[0].raw_tensor_start.content)
+    # 400 bytes of content in chunks of 64 bytes.
+    self.assertLen(chunks, 8)
+    self.assertLen(chunks[-1].raw_tensor_content, 16)
+    y, type_spec = executor_service_utils.deserialize_value_from_chunks(chunks)
+    self.assertEqual(str(type_spec), 'float32[10,10]')
+    self.assertTrue(np.array_equal(x, y))
+
+  def test_serialize_deserialize_scalar_value_to_chunks(self):
+    chunks = list(
+        executor_service_utils.serialize_value_to_chunks(
+            np.int32(10), tf.int32))
+    self.assertLen(chunks, 2)
+    y, type_spec = executor_service_utils.deserialize_value_from_chunks(chunks)
+    self.assertEqual(str(type_spec), 'int32')
+    self.assertEqual(y, 10)
+
+  def test_serialize_deserialize_nested_tuple_value_to_chunks(self):
+    x = collections.OrderedDict([
+        ('a', np.array([1.0, 2.0], dtype=np.float32)),
+        ('b', [np.array(True), 'foo']),
+    ])
+    x_type = [('a', (tf.float32, [2])), ('b', [tf.bool, tf.string])]
+    chunks = list(
+        executor_service_utils.serialize_value_to_chunks(
+            x, x_type, chunk_size=4))
+    self.assertEqual([c.WhichOneof('chunk') for c in chunks], [
+        'tuple_start', 'raw_tensor_start', 'raw_tensor_content',
+        'raw_tensor_content', 'tuple_start', 'raw_tensor_start',
+        'raw_tensor_content', 'value'
+    ])
+    y, type_spec = executor_service_utils.deserialize_value_from_chunks(chunks)
+    self.assertEqual(str(type_spec), '<a=float32[2],b=<bool,string>>')
+    self.assertTrue(np.array_equal(y.a, [1.0, 2.0]))
+    self.assertEqual(y.b[0], True)
+    self.assertEqual(y.b[1], b'foo')
+
+  def test_serialize_deserialize_computation_value_to_chunks(self):
+
+    @computations.tf_computation
+    def comp():
+      return tf.constant(10)
+
+    chunks = list(executor_service_utils.serialize_value_to_chunks(comp))
+    self.assertLen(chunks, 1)
+    y, type_spec = executor_service_utils.deserialize_value_from_chunks(chunks)
+    self.assertIsInstance(y, computation_pb2.Computation)
+    self.assertEqual(str(type_spec), '( -> int32)')
+
+  def test_serialize_value_to_chunks_with_invalid_chunk_size(self):
+    with self.assertRaises(ValueError):
+      list(
+          executor_service_utils.serialize_value_to_chunks(
+              np.int32(10), tf.int32, chunk_size=0))
+
+  def test_deserialize_value_from_truncated_chunks(self):
+    chunks = list(
+        executor_service_utils.serialize_value_to_chunks(
+            np.arange(10, dtype=np.int64), (tf.int64, [10]), chunk_size=16))
+    with self.assertRaises(ValueError):
+      executor_service_utils.deserialize_value_from_chunks(chunks[:-1])
+
+  def test_deserialize_value_from_chunks_with_trailing_chunks(self):
+    chunks = list(
+        executor_service_utils.serialize_value_to_chunks(
+            np.int32(10), tf.int32))
+    with self.assertRaises(ValueError):
+      executor_service_utils.deserialize_value_from_chunks(chunks + chunks)
+
 
 if __name__ == '__main__':
   tf.compat.v1.enable_v2_behavior()
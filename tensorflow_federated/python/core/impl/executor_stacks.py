@@ -18,55 +18,117 @@ from tensorflow_federated.python.common_libs import py_typecheck
 from tensorflow_federated.python.core.impl import caching_executor
 from tensorflow_federated.python.core.impl import concurrent_executor
 from tensorflow_federated.python.core.impl import eager_executor
+from tensorflow_federated.python.core.impl import elastic_executor
 from tensorflow_federated.python.core.impl import federated_executor
 from tensorflow_federated.python.core.impl import lambda_executor
 from tensorflow_federated.python.core.impl import placement_literals
 
 
-def create_local_executor(num_clients=None):
+def create_local_executor(num_clients=None,
+                          num_worker_threads=None,
+                          aggregation_fanout=None,
+                          vectorize_federated_map=False,
+                          max_num_client_stacks=None,
+                          infer_num_clients=False):
   """Constructs an executor to execute computations on the local machine.
 
-  The initial temporary implementation requires that the number of clients be
-  specified in advance. This limitation will be removed in the near future.
+  If `infer_num_clients` is set, the number of clients is inferred from the
+  arguments of each invoked computation, and the single-worker stacks for the
+  clients are only created when first needed, so that the startup time and memory grow with
+  the number of clients per invocation, rather than with the size of the whole
+  population of clients that might be sampled from. The stacks are kept in a
+  pool, and reused across invocations.
 
   NOTE: This function is only available in Python 3.
 
   Args:
-    num_clients: The number of clients. If not specified (`None`), then this
-      executor is not federated (can only execute unplaced computations).
+    num_clients: The optional number of clients. If not specified (`None`),
+      and `infer_num_clients` is not set, then a single-worker stack is created
+      that does not support federated computations.
+    num_worker_threads: The optional number of worker threads to share among
+      all the single-worker stacks. If not specified (`None`), each stack runs
+      in its own dedicated thread. Specifying a bounded number of threads is
+      recommended for simulations with a large number of clients.
+    aggregation_fanout: The optional number of client values to accumulate on
+      each client stack before merging partial aggregates in a tree, as defined
+      in `federated_executor.FederatedExecutor`. If not specified (`None`),
+      client values are aggregated linearly on the server stack.
+    vectorize_federated_map: Whether to perform `federated_map`s of TensorFlow
+      computations as single vectorized invocations on the stack for unplaced
+      computations, where possible, as defined in
+      `federated_executor.FederatedExecutor`.
+    max_num_client_stacks: The optional maximum number of single-worker stacks
+      to create for the clients. If there are more clients than that, the
+      stacks are shared by multiple clients each. If not specified (`None`),
+      there is a stack for each client.
+    infer_num_clients: Whether to infer the number of clients from the arguments
+      of each invoked computation, as in `elastic_executor.ElasticExecutor`.
+      Cannot be combined with `num_clients`.
 
   Returns:
     An instance of `tff.framework.Executor` for single-machine use only.
 
   Raises:
-    ValueError: If the number of clients is not one or larger.
+    ValueError: If the number of clients, the number of worker threads, or the
+      maximum number of client stacks is not one or larger, or if the number of
+      clients is specified together with `infer_num_clients`.
   """
+  if num_worker_threads is not None:
+    py_typecheck.check_type(num_worker_threads, int)
+    if num_worker_threads < 1:
+      raise ValueError(
+          'If the number of worker threads is present, it must be >= 1.')
+    thread_pool = concurrent_executor.ThreadPool(num_worker_threads)
+  else:
+    thread_pool = None
+  if max_num_client_stacks is not None:
+    py_typecheck.check_type(max_num_client_stacks, int)
+    if max_num_client_stacks < 1:
+      raise ValueError(
+          'If the maximum number of client stacks is present, it must be >= 1.')
+  py_typecheck.check_type(infer_num_clients, bool)
+  if infer_num_clients and num_clients is not None:
+    raise ValueError(
+        'The number of clients cannot be specified when it is to be inferred.')
 
   def _create_single_worker_stack():
     ex = eager_executor.EagerExecutor()
-    ex = concurrent_executor.ConcurrentExecutor(ex)
+    ex = concurrent_executor.ConcurrentExecutor(ex, thread_pool=thread_pool)
     ex = caching_executor.CachingExecutor(ex)
     return lambda_executor.LambdaExecutor(ex)
 
-  if num_clients is None:
+  if num_clients is None and not infer_num_clients:
     return _create_single_worker_stack()
+
+  unplaced_stack = _create_single_worker_stack()
+  server_stack = _create_single_worker_stack()
+  client_stacks = []
+
+  def _get_client_stacks(num_clients):
+    if max_num_client_stacks is None:
+      num_stacks = num_clients
+    else:
+      num_stacks = min(num_clients, max_num_client_stacks)
+    while len(client_stacks) < num_stacks:
+      client_stacks.append(_create_single_worker_stack())
+    return [client_stacks[idx % num_stacks] for idx in range(num_clients)]
+
+  def _create_federated_stack(num_clients):
+    federated_ex = federated_executor.FederatedExecutor(
+        {
+            None: unplaced_stack,
+            placement_literals.SERVER: server_stack,
+            placement_literals.CLIENTS: _get_client_stacks(num_clients)
+        },
+        aggregation_fanout=aggregation_fanout,
+        vectorize_federated_map=vectorize_federated_map)
+    return lambda_executor.LambdaExecutor(
+        caching_executor.CachingExecutor(federated_ex))
+
+  if infer_num_clients:
+    return elastic_executor.ElasticExecutor(_create_federated_stack)
   else:
-    # TODO(b/134543154): We shouldn't have to specif the number of clients; this
-    # needs to go away once we flesh out all the remaining bits ad pieces.
     py_typecheck.check_type(num_clients, int)
     if num_clients < 1:
       raise ValueError('If the number of clients is present, it must be >= 1.')
-
-    def _create_multiple_worker_stacks(num_workers):
-      return [_create_single_worker_stack() for _ in range(num_workers)]
-
-    return lambda_executor.LambdaExecutor(
-        caching_executor.CachingExecutor(
-            federated_executor.FederatedExecutor({
-                None:
-                    _create_multiple_worker_stacks(1),
-                placement_literals.SERVER:
-                    _create_multiple_worker_stacks(1),
-                placement_literals.CLIENTS:
-                    (_create_multiple_worker_stacks(num_clients))
-            })))
+    return _create_federated_stack(num_clients)
@@ -0,0 +1,83 @@
+# Lint as: python3
+# Copyright 2019, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark for executor_stacks.py."""
+
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from tensorflow_federated.python.core.api import computations
+from tensorflow_federated.python.core.api import intrinsics
+from tensorflow_federated.python.core.impl import executor_stacks
+from tensorflow_federated.python.core.impl import set_default_executor
+from tensorflow_federated.python.core.impl import type_constructors
+
+
+def _make_round_computation():
+  """Returns a computation that maps over and sums a value on all clients."""
+
+  @computations.tf_computation(tf.float32)
+  def add_one(x):
+    return x + 1.0
+
+  @computations.federated_computation(type_constructors.at_clients(tf.float32))
+  def round_comp(x):
+    return intrinsics.federated_sum(intrinsics.federated_map(add_one, x))
+
+  return round_comp
+
+
+class ExecutorStacksBenchmark(tf.test.Benchmark):
+  """Measures round latency of local executor stacks as the clients scale."""
+
+  def _benchmark_round_latency(self, num_clients, num_worker_threads,
+                               num_rounds):
+    round_comp = _make_round_computation()
+    set_default_executor.set_default_executor(
+        executor_stacks.create_local_executor(
+            num_clients, num_worker_threads=num_worker_threads))
+    client_values = [float(x) for x in range(num_clients)]
+    round_comp(client_values)
+    execution_array = []
+    for _ in range(num_rounds):
+      round_start = time.time()
+      round_comp(client_values)
+      round_stop = time.time()
+      execution_array.append(round_stop - round_start)
+    set_default_executor.set_default_executor()
+    self.report_benchmark(
+        name='Average round latency, {} clients, {} worker threads'.format(
+            num_clients, num_worker_threads or 'dedicated'),
+        wall_time=np.mean(execution_array),
+        iters=num_rounds,
+        extras={'std_dev': np.std(execution_array)})
+
+  def benchmark_dedicated_threads(self):
+    # Beyond a thousand clients, one thread per client typically runs into the
+    # limits of the operating system.
+    for num_clients in [10, 100, 1000]:
+      self._benchmark_round_latency(
+          num_clients, num_worker_threads=None, num_rounds=5)
+
+  def benchmark_shared_thread_pool(self):
+    for num_clients in [10, 100, 1000, 10000]:
+      self._benchmark_round_latency(
+          num_clients, num_worker_threads=16, num_rounds=5)
+
+
+if __name__ == '__main__':
+  tf.compat.v1.enable_v2_behavior()
+  tf.test.main()
@@ -72,6 +72,50 @@ class ExecutorStacksTest(absltest.TestCase):
     executor_test_utils.test_mnist_training(
         self, executor_stacks.create_local_executor(1))
 
+  def test_with_mnist_training_example_and_shared_threads(self):
+    executor_test_utils.test_mnist_training(
+        self,
+        executor_stacks.create_local_executor(10, num_worker_threads=2))
+
+  def test_with_mnist_training_example_and_aggregation_fanout(self):
+    executor_test_utils.test_mnist_training(
+        self, executor_stacks.create_local_executor(5, aggregation_fanout=2))
+
+  def test_with_mnist_training_example_and_vectorized_federated_map(self):
+    executor_test_utils.test_mnist_training(
+        self,
+        executor_stacks.create_local_executor(3, vectorize_federated_map=True))
+
+  def test_with_mnist_training_example_and_inferred_number_of_clients(self):
+    executor_test_utils.test_mnist_training(
+        self, executor_stacks.create_local_executor(infer_num_clients=True))
+
+  def test_with_varying_number_of_clients(self):
+
+    @computations.federated_computation(type_constructors.at_clients(tf.int32))
+    def comp(x):
+      return intrinsics.federated_sum(x)
+
+    set_default_executor.set_default_executor(
+        executor_stacks.create_local_executor(
+            max_num_client_stacks=3, infer_num_clients=True))
+    for num_clients in [1, 5, 2, 10]:
+      self.assertEqual(comp(list(range(num_clients))),
+                       sum(range(num_clients)))
+    set_default_executor.set_default_executor()
+
+  def test_raises_with_zero_client_stacks(self):
+    with self.assertRaises(ValueError):
+      executor_stacks.create_local_executor(max_num_client_stacks=0)
+
+  def test_raises_with_number_of_clients_and_inferred_number_of_clients(self):
+    with self.assertRaises(ValueError):
+      executor_stacks.create_local_executor(10, infer_num_clients=True)
+
+  def test_raises_with_zero_worker_threads(self):
+    with self.assertRaises(ValueError):
+      executor_stacks.create_local_executor(10, num_worker_threads=0)
+
   def test_with_no_args(self):
     set_default_executor.set_default_executor(
         executor_stacks.create_local_executor())
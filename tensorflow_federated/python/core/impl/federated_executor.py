@@ -16,11 +16,14 @@
 
 import asyncio
 
+from absl import logging
+import cachetools
 import tensorflow as tf
 
 from tensorflow_federated.proto.v0 import computation_pb2 as pb
 from tensorflow_federated.python.common_libs import anonymous_tuple
 from tensorflow_federated.python.common_libs import py_typecheck
+from tensorflow_federated.python.common_libs import serialization_utils
 from tensorflow_federated.python.core.api import computation_types
 from tensorflow_federated.python.core.impl import computation_constructing_utils
 from tensorflow_federated.python.core.impl import computation_impl
@@ -28,9 +31,14 @@ from tensorflow_federated.python.core.impl import executor_base
 from tensorflow_federated.python.core.impl import executor_value_base
 from tensorflow_federated.python.core.impl import intrinsic_defs
 from tensorflow_federated.python.core.impl import placement_literals
+from tensorflow_federated.python.core.impl import tensorflow_deserialization
 from tensorflow_federated.python.core.impl import type_constructors
 from tensorflow_federated.python.core.impl import type_serialization
 from tensorflow_federated.python.core.impl import type_utils
+from tensorflow_federated.python.core.impl.utils import graph_utils
+
+# The maximum number of vectorized forms of mapping functions to keep around.
+_VECTORIZED_MAP_CACHE_SIZE = 100
 
 
 class FederatedExecutorValue(executor_value_base.ExecutorValue):
@@ -136,21 +144,42 @@ class FederatedExecutor(executor_base.Executor):
   of placements (SERVER and CLIENTS), and does not have a built-in concept of
   intermediate aggregation, partitioning placements, clustering clients, etc.
 
+  By default, aggregations such as `federated_aggregate` and `federated_sum`
+  move all client values to the SERVER executor and fold them there one by one.
+  If `aggregation_fanout` is specified, these are instead performed in a tree:
+  groups of up to `aggregation_fanout` client values are accumulated in
+  parallel on the executors of the clients in each group, and the partial
+  aggregates are then merged pairwise in a log-depth tree, so that the latency
+  grows sub-linearly with the number of clients.
+
+  If `vectorize_federated_map` is `True`, a `federated_map` of a TensorFlow
+  computation over client values of fully defined shapes is performed as a
+  single vectorized invocation (see `tf.vectorized_map`) on the executor for
+  unplaced computations, with the client values stacked along a new leading
+  axis, and the results unstacked and moved back to the client executors. If
+  the computation cannot be vectorized (e.g., because it contains variables or
+  sequences, or ops that cannot be vectorized), or if the vectorized
+  invocation fails, the mapping falls back to invoking the computation on each
+  of the client executors.
+
   The initial implementation also does not attempt at performing optimizations
   in case when the constituents of this executor are either located on the same
   machine (where marshaling/unmarshaling could be avoided), or when they have
   the `all_equal` property (and a single value could be shared by them all).
   """
 
-  # TODO(b/134543154): Extend this executor to support intermediate aggregation
-  # and other optimizations hinted above.
+  # TODO(b/134543154): Extend this executor to support other optimizations
+  # hinted above.
 
   # TODO(b/134543154): Add support for `data` as a building block.
 
   # TODO(b/134543154): Implement the commonly used aggregation intrinsics so we
   # can begin to use this executor in integration tests.
 
-  def __init__(self, target_executors):
+  def __init__(self,
+               target_executors,
+               aggregation_fanout=None,
+               vectorize_federated_map=False):
     """Creates a federated executor backed by a collection of target executors.
 
     Args:
@@ -161,11 +190,29 @@ class FederatedExecutor(executor_base.Executor):
         there only is a single participant associated with that placement, as
         would typically be the case with `tff.SERVER`) or lists of target
         executors.
+      aggregation_fanout: The optional number of client values to accumulate
+        on each of the client executors before merging the partial aggregates
+        in a tree. If `None` (default), client values are aggregated linearly
+        on the SERVER executor.
+      vectorize_federated_map: Whether to perform `federated_map`s of
+        TensorFlow computations as single vectorized invocations, where
+        possible, as opposed to invoking the computation once per client
+        (default).
 
     Raises:
-      ValueError: If the value is unrecognized (e.g., a nonexistent intrinsic).
+      ValueError: If the value is unrecognized (e.g., a nonexistent intrinsic),
+        or if `aggregation_fanout` is not a positive integer.
     """
     py_typecheck.check_type(target_executors, dict)
+    if aggregation_fanout is not None:
+      py_typecheck.check_type(aggregation_fanout, int)
+      if aggregation_fanout < 1:
+        raise ValueError('The aggregation fanout must be >= 1, found {}.'.format(
+            aggregation_fanout))
+    py_typecheck.check_type(vectorize_federated_map, bool)
+    self._aggregation_fanout = aggregation_fanout
+    self._vectorize_federated_map = vectorize_federated_map
+    self._vectorized_map_cache = cachetools.LRUCache(_VECTORIZED_MAP_CACHE_SIZE)
     self._target_executors = {}
     for k, v in target_executors.items():
       if k is not None:
@@ -421,6 +468,13 @@ class FederatedExecutor(executor_base.Executor):
     for v in val:
       py_typecheck.check_type(v, executor_value_base.ExecutorValue)
     children = self._target_executors[val_type.placement]
+    if self._vectorize_federated_map and not val_type.all_equal:
+      results = await self._map_vectorized(fn, fn_type, val, children)
+      if results is not None:
+        return FederatedExecutorValue(
+            results,
+            computation_types.FederatedType(
+                fn_type.result, val_type.placement, all_equal=all_equal))
     fns = await asyncio.gather(*[c.create_value(fn, fn_type) for c in children])
     results = await asyncio.gather(*[
         c.create_call(f, v) for c, (f, v) in zip(children, list(zip(fns, val)))
@@ -430,6 +484,74 @@ class FederatedExecutor(executor_base.Executor):
         computation_types.FederatedType(
             fn_type.result, val_type.placement, all_equal=all_equal))
 
+  async def _get_vectorized_map(self, key, fn, fn_type, batch_size):
+    """Returns the vectorized form of `fn`, or `None` if it cannot be created.
+
+    Args:
+      key: The key of the vectorized form of `fn` in the cache.
+      fn: An instance of `pb.Computation` with the mapping function.
+      fn_type: The type of `fn`.
+      batch_size: The number of values to map `fn` over.
+
+    Returns:
+      A tuple (proto, type) with the `pb.Computation` that maps `fn` over the
+      values stacked along a leading axis of size `batch_size`, and its type,
+      or `None` if `fn` cannot be vectorized.
+    """
+    try:
+      return self._vectorized_map_cache[key]
+    except KeyError:
+      pass
+    # Tracing the computation can take a while, so it happens off the event
+    # loop. Concurrent maps of the same function may each create it.
+    vectorized_map = await asyncio.get_event_loop().run_in_executor(
+        None, _create_vectorized_map, fn, fn_type, batch_size)
+    self._vectorized_map_cache[key] = vectorized_map
+    return vectorized_map
+
+  async def _map_vectorized(self, fn, fn_type, val, children):
+    """Maps `fn` over the client values `val` in a single vectorized call.
+
+    Args:
+      fn: An instance of `pb.Computation` with the mapping function.
+      fn_type: The type of `fn`.
+      val: A list of values embedded in the `children`, one per child.
+      children: The list of client executors.
+
+    Returns:
+      A list of the results embedded in the `children`, or `None` if `fn`
+      cannot be vectorized, in which case the caller is expected to map it over
+      the values one at a time.
+    """
+    unplaced_executors = self._target_executors.get(None)
+    if (len(val) < 2 or not unplaced_executors or
+        fn.WhichOneof('computation') != 'tensorflow'):
+      return None
+    key = (fn.SerializeToString(deterministic=True), len(val))
+    vectorized_map = await self._get_vectorized_map(key, fn, fn_type, len(val))
+    if vectorized_map is None:
+      return None
+    vectorized_fn, vectorized_fn_type = vectorized_map
+    child_vals = await asyncio.gather(*[v.compute() for v in val])
+    executor = unplaced_executors[0]
+    try:
+      stacked_val = _stack_structures(child_vals)
+      embedded_fn, embedded_arg = await asyncio.gather(
+          executor.create_value(vectorized_fn, vectorized_fn_type),
+          executor.create_value(stacked_val, vectorized_fn_type.parameter))
+      result = await executor.create_call(embedded_fn, embedded_arg)
+      result_vals = _unstack_structure(await result.compute(), len(val))
+    except Exception as e:  # pylint: disable=broad-except
+      # Some ops can only be found not to work when vectorized once they run,
+      # in which case `fn` is not vectorized again.
+      logging.info('Unable to run a vectorized mapping function: %s', e)
+      self._vectorized_map_cache[key] = None
+      return None
+    return await asyncio.gather(*[
+        c.create_value(v, fn_type.result)
+        for c, v in zip(children, result_vals)
+    ])
+
   async def _zip(self, arg, placement, all_equal):
     py_typecheck.check_type(arg.type_signature,
                             computation_types.NamedTupleType)
@@ -460,6 +582,86 @@ class FederatedExecutor(executor_base.Executor):
             placement,
             all_equal=all_equal))
 
+  async def _aggregate_in_tree(self, val, item_type, zero, zero_type,
+                               accumulate, accumulate_type, merge, merge_type):
+    """Aggregates the client values `val` in a tree of client executors.
+
+    The client values are partitioned into groups of up to
+    `self._aggregation_fanout` consecutive clients. The values in each group are
+    accumulated on the executor of the first client in the group, starting from
+    `zero`, with all groups processed in parallel. The resulting partial
+    aggregates are then combined pairwise with `merge` in a log-depth tree, and
+    the final result is moved to the SERVER executor.
+
+    Args:
+      val: A non-empty list of client values embedded in the CLIENTS executors,
+        in the same order as the executors.
+      item_type: The type of the members of `val`.
+      zero: An instance of `executor_value_base.ExecutorValue` representing the
+        zero of the aggregation.
+      zero_type: The type of `zero` (and of all the partial aggregates).
+      accumulate: A `pb.Computation` with the accumulation operator.
+      accumulate_type: The type of `accumulate`.
+      merge: A `pb.Computation` with the merge operator.
+      merge_type: The type of `merge`.
+
+    Returns:
+      An instance of `FederatedExecutorValue` with the aggregate at SERVER.
+    """
+    py_typecheck.check_type(val, list)
+    children = self._target_executors[placement_literals.CLIENTS]
+    fanout = self._aggregation_fanout
+    zero_val = await zero.compute()
+
+    async def _move(executor, value, type_spec):
+      return await executor.create_value(await value.compute(), type_spec)
+
+    async def _accumulate_group(executor, items):
+      # The first item in each group already lives in `executor`.
+      moved_items = await asyncio.gather(
+          *[_move(executor, item, item_type) for item in items[1:]])
+      accumulate_fn, result = await asyncio.gather(
+          executor.create_value(accumulate, accumulate_type),
+          executor.create_value(zero_val, zero_type))
+      for item in [items[0]] + list(moved_items):
+        result = await executor.create_call(
+            accumulate_fn, await executor.create_tuple(
+                anonymous_tuple.AnonymousTuple([(None, result), (None, item)])))
+      return executor, result
+
+    async def _merge_pair(first, second):
+      executor, first_val = first
+      _, second_val = second
+      merge_fn, second_val = await asyncio.gather(
+          executor.create_value(merge, merge_type),
+          _move(executor, second_val, zero_type))
+      result = await executor.create_call(
+          merge_fn, await executor.create_tuple(
+              anonymous_tuple.AnonymousTuple([(None, first_val),
+                                              (None, second_val)])))
+      return executor, result
+
+    partials = await asyncio.gather(*[
+        _accumulate_group(children[idx], val[idx:idx + fanout])
+        for idx in range(0, len(val), fanout)
+    ])
+    while len(partials) > 1:
+      merged = await asyncio.gather(*[
+          _merge_pair(partials[idx], partials[idx + 1])
+          for idx in range(0, len(partials) - 1, 2)
+      ])
+      if len(partials) % 2:
+        merged.append(partials[-1])
+      partials = merged
+    _, result = partials[0]
+    server = self._target_executors[placement_literals.SERVER][0]
+    result = await _move(server, result, zero_type)
+    return FederatedExecutorValue([result],
+                                  computation_types.FederatedType(
+                                      result.type_signature,
+                                      placement_literals.SERVER,
+                                      all_equal=True))
+
   async def _compute_intrinsic_federated_value_at_server(self, arg):
     return await self._place(arg, placement_literals.SERVER)
 
@@ -560,23 +762,27 @@ class FederatedExecutor(executor_base.Executor):
     py_typecheck.check_type(report_type, computation_types.FunctionType)
     type_utils.check_equivalent_types(report_type.parameter, zero_type)
 
-    # NOTE: This is a simple initial implementation that simply forwards this
-    # to `federated_reduce()`. The more complete implementation would be able
-    # to take advantage of the parallelism afforded by `merge` to reduce the
-    # cost from liner (with respect to the number of clients) to sub-linear.
-
-    # TODO(b/134543154): Expand this implementation to take advantage of the
-    # parallelism afforded by `merge`.
+    # NOTE: Unless the executor is configured with an aggregation fanout, this
+    # simply forwards to `federated_reduce()`, at a cost linear with respect to
+    # the number of clients. With an aggregation fanout, the parallelism that
+    # `merge` affords is used to reduce the cost to sub-linear.
 
     val = arg.internal_representation[0]
     zero = arg.internal_representation[1]
     accumulate = arg.internal_representation[2]
-    pre_report = await self._compute_intrinsic_federated_reduce(
-        FederatedExecutorValue(
-            anonymous_tuple.AnonymousTuple([(None, val), (None, zero),
-                                            (None, accumulate)]),
-            computation_types.NamedTupleType(
-                [val_type, zero_type, accumulate_type])))
+    if self._aggregation_fanout is not None and val:
+      pre_report = await self._aggregate_in_tree(val, item_type, zero,
+                                                 zero_type, accumulate,
+                                                 accumulate_type,
+                                                 arg.internal_representation[3],
+                                                 merge_type)
+    else:
+      pre_report = await self._compute_intrinsic_federated_reduce(
+          FederatedExecutorValue(
+              anonymous_tuple.AnonymousTuple([(None, val), (None, zero),
+                                              (None, accumulate)]),
+              computation_types.NamedTupleType(
+                  [val_type, zero_type, accumulate_type])))
 
     py_typecheck.check_type(pre_report.type_signature,
                             computation_types.FederatedType)
@@ -598,6 +804,16 @@ class FederatedExecutor(executor_base.Executor):
         _embed_tf_scalar_constant(self, arg.type_signature.member, 0),
         _embed_tf_binary_operator(self, arg.type_signature.member, tf.add)
     ]))
+    if self._aggregation_fanout is not None and arg.internal_representation:
+      member_type = arg.type_signature.member
+      return await self._aggregate_in_tree(arg.internal_representation,
+                                           member_type,
+                                           zero.internal_representation,
+                                           member_type,
+                                           plus.internal_representation,
+                                           plus.type_signature,
+                                           plus.internal_representation,
+                                           plus.type_signature)
     return await self._compute_intrinsic_federated_reduce(
         FederatedExecutorValue(
             anonymous_tuple.AnonymousTuple([
@@ -664,6 +880,117 @@ class FederatedExecutor(executor_base.Executor):
                 [divide_blk.type_signature, divide_arg.type_signature])))
 
 
+def _add_leading_dimension(type_spec, size):
+  """Returns `type_spec` with a leading dimension of `size` in all tensors."""
+  if isinstance(type_spec, computation_types.TensorType):
+    return computation_types.TensorType(
+        type_spec.dtype,
+        tf.TensorShape([size]).concatenate(type_spec.shape))
+  else:
+    py_typecheck.check_type(type_spec, computation_types.NamedTupleType)
+    return computation_types.NamedTupleType([
+        (k, _add_leading_dimension(v, size)) if k else _add_leading_dimension(
+            v, size) for k, v in anonymous_tuple.to_elements(type_spec)
+    ])
+
+
+def _is_fully_defined_tensor_structure(type_spec):
+  if isinstance(type_spec, computation_types.TensorType):
+    return type_spec.shape.is_fully_defined()
+  elif isinstance(type_spec, computation_types.NamedTupleType):
+    return all(
+        _is_fully_defined_tensor_structure(v)
+        for _, v in anonymous_tuple.to_elements(type_spec))
+  else:
+    return False
+
+
+def _create_vectorized_map(fn, fn_type, batch_size):
+  """Creates a TensorFlow computation that maps `fn` over a batch of values.
+
+  The parameter of the created computation is that of `fn`, with a leading
+  dimension of size `batch_size` added to all of its tensors, and so is the
+  result. The values are mapped in a single invocation of `tf.vectorized_map`.
+
+  Args:
+    fn: An instance of `pb.Computation` with a TensorFlow computation.
+    fn_type: The type of `fn`, an instance of `computation_types.FunctionType`.
+    batch_size: The size of the batch.
+
+  Returns:
+    A tuple (proto, type) with the created `pb.Computation` and its type, or
+    `None` if `fn` does not have a parameter made of tensors of fully defined
+    shapes, has a result that contains anything other than tensors, has an
+    initialization op, or contains ops that cannot be vectorized.
+  """
+  py_typecheck.check_type(fn, pb.Computation)
+  py_typecheck.check_type(fn_type, computation_types.FunctionType)
+  if (fn_type.parameter is None or
+      not _is_fully_defined_tensor_structure(fn_type.parameter) or
+      not type_utils.is_generic_op_compatible_type(fn_type.result) or
+      fn.tensorflow.initialize_op):
+    return None
+  parameter_type = _add_leading_dimension(fn_type.parameter, batch_size)
+  with tf.Graph().as_default() as graph:
+    stacked_arg, parameter_binding = graph_utils.stamp_parameter_in_graph(
+        'x', parameter_type, graph)
+    result_structures = []
+
+    def _map_fn(flat_arg):
+      arg = anonymous_tuple.pack_sequence_as(stacked_arg, flat_arg)
+      _, result = (
+          tensorflow_deserialization.deserialize_and_call_tf_computation(
+              fn, arg, tf.compat.v1.get_default_graph()))
+      result_structures.append(result)
+      return anonymous_tuple.flatten(result)
+
+    try:
+      flat_result = tf.vectorized_map(_map_fn,
+                                      anonymous_tuple.flatten(stacked_arg))
+    except (ValueError, TypeError, NotImplementedError) as e:
+      logging.info('Unable to vectorize a mapping function: %s', e)
+      return None
+    result = anonymous_tuple.pack_sequence_as(result_structures[0],
+                                              flat_result)
+    result_type, result_binding = graph_utils.capture_result_from_graph(
+        result, graph)
+  vectorized_fn_type = computation_types.FunctionType(parameter_type,
+                                                      result_type)
+  vectorized_fn = pb.Computation(
+      type=type_serialization.serialize_type(vectorized_fn_type),
+      tensorflow=pb.TensorFlow(
+          graph_def=serialization_utils.pack_graph_def(graph.as_graph_def()),
+          parameter=parameter_binding,
+          result=result_binding))
+  return vectorized_fn, vectorized_fn_type
+
+
+def _stack_structures(values):
+  """Stacks the tensors in a list of identically structured `values`."""
+  if isinstance(values[0], anonymous_tuple.AnonymousTuple):
+    return anonymous_tuple.AnonymousTuple([
+        (k, _stack_structures([v[idx] for v in values]))
+        for idx, (k, _) in enumerate(anonymous_tuple.to_elements(values[0]))
+    ])
+  else:
+    return tf.stack(values)
+
+
+def _unstack_structure(value, num):
+  """Unstacks the tensors in `value` into a list of `num` structures."""
+  if isinstance(value, anonymous_tuple.AnonymousTuple):
+    elements = anonymous_tuple.to_elements(value)
+    unstacked_elements = [_unstack_structure(v, num) for _, v in elements]
+    return [
+        anonymous_tuple.AnonymousTuple([
+            (k, unstacked_elements[elem_idx][idx])
+            for elem_idx, (k, _) in enumerate(elements)
+        ]) for idx in range(num)
+    ]
+  else:
+    return tf.unstack(value, num=num)
+
+
 async def _embed_tf_scalar_constant(executor, type_spec, val):
   """Embeds a constant `val` of TFF type `type_spec` in `executor`.
 
@@ -0,0 +1,149 @@
+# Lint as: python3
+# Copyright 2019, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark for aggregation and mapping in federated_executor.py."""
+
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from tensorflow_federated.python.core.api import computation_types
+from tensorflow_federated.python.core.api import computations
+from tensorflow_federated.python.core.api import intrinsics
+from tensorflow_federated.python.core.impl import executor_stacks
+from tensorflow_federated.python.core.impl import set_default_executor
+from tensorflow_federated.python.core.impl import type_constructors
+
+_VECTOR_SIZE = 1000
+
+
+def _make_aggregation_computation():
+  """Returns a computation that aggregates a vector from all clients."""
+  vector_type = computation_types.TensorType(tf.float32, [_VECTOR_SIZE])
+
+  @computations.tf_computation(vector_type, vector_type)
+  def add_vectors(x, y):
+    return x + y
+
+  @computations.tf_computation(vector_type)
+  def identity(x):
+    return tf.identity(x)
+
+  @computations.federated_computation(type_constructors.at_clients(vector_type))
+  def aggregate(x):
+    return intrinsics.federated_aggregate(
+        x, np.zeros([_VECTOR_SIZE], dtype=np.float32), add_vectors,
+        add_vectors, identity)
+
+  return aggregate
+
+
+def _make_map_computation():
+  """Returns a computation that maps a small function over all clients."""
+  vector_type = computation_types.TensorType(tf.float32, [_VECTOR_SIZE])
+
+  @computations.tf_computation(vector_type)
+  def scale_and_shift(x):
+    return 2.0 * x + 1.0
+
+  @computations.federated_computation(type_constructors.at_clients(vector_type))
+  def map_over_clients(x):
+    return intrinsics.federated_map(scale_and_shift, x)
+
+  return map_over_clients
+
+
+class FederatedExecutorBenchmark(tf.test.Benchmark):
+  """Compares the ways of aggregating and mapping over client values."""
+
+  def _benchmark_aggregation(self, num_clients, aggregation_fanout,
+                             num_rounds):
+    aggregate = _make_aggregation_computation()
+    set_default_executor.set_default_executor(
+        executor_stacks.create_local_executor(
+            num_clients,
+            num_worker_threads=16,
+            aggregation_fanout=aggregation_fanout))
+    client_values = [
+        np.random.random_sample([_VECTOR_SIZE]).astype(np.float32)
+        for _ in range(num_clients)
+    ]
+    aggregate(client_values)
+    execution_array = []
+    for _ in range(num_rounds):
+      round_start = time.time()
+      aggregate(client_values)
+      round_stop = time.time()
+      execution_array.append(round_stop - round_start)
+    set_default_executor.set_default_executor()
+    self.report_benchmark(
+        name='Average aggregation latency, {} clients, {}'.format(
+            num_clients, 'fanout {}'.format(aggregation_fanout)
+            if aggregation_fanout else 'linear fold'),
+        wall_time=np.mean(execution_array),
+        iters=num_rounds,
+        extras={'std_dev': np.std(execution_array)})
+
+  def benchmark_linear_aggregation(self):
+    for num_clients in [10, 100, 1000]:
+      self._benchmark_aggregation(
+          num_clients, aggregation_fanout=None, num_rounds=5)
+
+  def benchmark_tree_aggregation(self):
+    for num_clients in [10, 100, 1000]:
+      self._benchmark_aggregation(
+          num_clients, aggregation_fanout=4, num_rounds=5)
+
+  def _benchmark_map(self, num_clients, vectorize_federated_map, num_rounds):
+    map_over_clients = _make_map_computation()
+    set_default_executor.set_default_executor(
+        executor_stacks.create_local_executor(
+            num_clients,
+            num_worker_threads=16,
+            vectorize_federated_map=vectorize_federated_map))
+    client_values = [
+        np.random.random_sample([_VECTOR_SIZE]).astype(np.float32)
+        for _ in range(num_clients)
+    ]
+    map_over_clients(client_values)
+    execution_array = []
+    for _ in range(num_rounds):
+      round_start = time.time()
+      map_over_clients(client_values)
+      round_stop = time.time()
+      execution_array.append(round_stop - round_start)
+    set_default_executor.set_default_executor()
+    self.report_benchmark(
+        name='Average federated_map latency, {} clients, {}'.format(
+            num_clients,
+            'vectorized' if vectorize_federated_map else 'per client'),
+        wall_time=np.mean(execution_array),
+        iters=num_rounds,
+        extras={'std_dev': np.std(execution_array)})
+
+  def benchmark_per_client_map(self):
+    for num_clients in [10, 100, 1000]:
+      self._benchmark_map(
+          num_clients, vectorize_federated_map=False, num_rounds=5)
+
+  def benchmark_vectorized_map(self):
+    for num_clients in [10, 100, 1000]:
+      self._benchmark_map(
+          num_clients, vectorize_federated_map=True, num_rounds=5)
+
+
+if __name__ == '__main__':
+  tf.compat.v1.enable_v2_behavior()
+  tf.test.main()
@@ -38,15 +38,38 @@ from tensorflow_federated.python.core.impl import type_serialization
 from tensorflow_federated.python.core.impl.compiler import building_blocks
 
 
-def _make_test_executor(num_clients=1, use_lambda_executor=False):
+def _make_test_executor(num_clients=1,
+                        use_lambda_executor=False,
+                        aggregation_fanout=None,
+                        vectorize_federated_map=False):
   bottom_ex = eager_executor.EagerExecutor()
   if use_lambda_executor:
     bottom_ex = lambda_executor.LambdaExecutor(bottom_ex)
-  return federated_executor.FederatedExecutor({
-      placements.SERVER: bottom_ex,
-      placements.CLIENTS: [bottom_ex for _ in range(num_clients)],
-      None: bottom_ex
-  })
+  return federated_executor.FederatedExecutor(
+      {
+          placements.SERVER: bottom_ex,
+          placements.CLIENTS: [bottom_ex for _ in range(num_clients)],
+          None: bottom_ex
+      },
+      aggregation_fanout=aggregation_fanout,
+      vectorize_federated_map=vectorize_federated_map)
+
+
+def _run_federated_map(ex, fn, client_values):
+  loop = asyncio.get_event_loop()
+  fn_type = fn.type_signature
+  map_type = computation_types.FunctionType(
+      [fn_type, type_constructors.at_clients(fn_type.parameter)],
+      type_constructors.at_clients(fn_type.result))
+  map_val, fn_val, arg_val = loop.run_until_complete(
+      asyncio.gather(
+          ex.create_value(intrinsic_defs.FEDERATED_MAP, map_type),
+          ex.create_value(fn),
+          ex.create_value(client_values,
+                          type_constructors.at_clients(fn_type.parameter))))
+  map_arg = loop.run_until_complete(ex.create_tuple([fn_val, arg_val]))
+  result = loop.run_until_complete(ex.create_call(map_val, map_arg))
+  return loop.run_until_complete(result.compute())
 
 
 class FederatedExecutorTest(parameterized.TestCase):
@@ -275,6 +298,72 @@ class FederatedExecutorTest(parameterized.TestCase):
       self.assertIsInstance(v, eager_executor.EagerValue)
       self.assertEqual(v.internal_representation.numpy(), 11)
 
+  def test_federated_map_vectorized(self):
+    ex = _make_test_executor(3, vectorize_federated_map=True)
+
+    @computations.tf_computation([('a', tf.int32),
+                                  ('b', computation_types.TensorType(
+                                      tf.float32, [2]))])
+    def fn(a, b):
+      return a + 1, tf.reduce_sum(b)
+
+    result = _run_federated_map(ex, fn, [
+        anonymous_tuple.AnonymousTuple([('a', i), ('b', [i, 2.0 * i])])
+        for i in range(3)
+    ])
+
+    self.assertEqual([
+        [v.numpy() for v in anonymous_tuple.flatten(x)] for x in result
+    ], [[1, 0.0], [2, 3.0], [3, 6.0]])
+    vectorized_maps = list(ex._vectorized_map_cache.values())
+    self.assertLen(vectorized_maps, 1)
+    self.assertIsNotNone(vectorized_maps[0])
+
+  def test_federated_map_vectorized_falls_back_with_undefined_shape(self):
+    ex = _make_test_executor(3, vectorize_federated_map=True)
+
+    @computations.tf_computation(computation_types.TensorType(tf.int32, [None]))
+    def fn(x):
+      return tf.reduce_sum(x)
+
+    result = _run_federated_map(ex, fn, [[1], [2, 3], [4, 5, 6]])
+
+    self.assertEqual([x.numpy() for x in result], [1, 5, 15])
+    self.assertEqual(list(ex._vectorized_map_cache.values()), [None])
+
+  def test_federated_map_vectorized_falls_back_when_vectorized_call_fails(self):
+
+    class FailingCallExecutor(eager_executor.EagerExecutor):
+
+      def __init__(self):
+        super(FailingCallExecutor, self).__init__()
+        self.num_calls = 0
+
+      async def create_call(self, comp, arg=None):
+        self.num_calls += 1
+        raise RuntimeError('The computation failed.')
+
+    bottom_ex = eager_executor.EagerExecutor()
+    unplaced_ex = FailingCallExecutor()
+    ex = federated_executor.FederatedExecutor(
+        {
+            placements.SERVER: bottom_ex,
+            placements.CLIENTS: [bottom_ex for _ in range(3)],
+            None: unplaced_ex
+        },
+        vectorize_federated_map=True)
+
+    @computations.tf_computation(tf.int32)
+    def fn(x):
+      return x + 1
+
+    for _ in range(2):
+      result = _run_federated_map(ex, fn, [1, 2, 3])
+      self.assertEqual([x.numpy() for x in result], [2, 3, 4])
+    # The failure is recorded, so the vectorized call is only attempted once.
+    self.assertEqual(unplaced_ex.num_calls, 1)
+    self.assertEqual(list(ex._vectorized_map_cache.values()), [None])
+
   def test_federated_broadcast(self):
     loop = asyncio.get_event_loop()
     ex = _make_test_executor(3)
@@ -385,6 +474,52 @@ class FederatedExecutorTest(parameterized.TestCase):
     result = loop.run_until_complete(val.compute())
     self.assertEqual(result.numpy(), 30)
 
+  @parameterized.parameters((1, 1), (1, 5), (2, 5), (3, 7), (10, 4))
+  def test_federated_aggregate_in_tree(self, fanout, num_clients):
+    loop = asyncio.get_event_loop()
+    ex = lambda_executor.LambdaExecutor(
+        _make_test_executor(num_clients, aggregation_fanout=fanout))
+
+    @computations.tf_computation(tf.int32, tf.int32)
+    def add_numbers(x, y):
+      return x + y
+
+    @computations.tf_computation(tf.int32)
+    def add_one_because_why_not(x):
+      return x + 1
+
+    @computations.federated_computation(type_constructors.at_clients(tf.int32))
+    def comp(x):
+      return intrinsics.federated_aggregate(x, 0, add_numbers, add_numbers,
+                                            add_one_because_why_not)
+
+    fn = loop.run_until_complete(ex.create_value(comp))
+    arg = loop.run_until_complete(
+        ex.create_value(
+            list(range(num_clients)), type_constructors.at_clients(tf.int32)))
+    val = loop.run_until_complete(ex.create_call(fn, arg))
+    result = loop.run_until_complete(val.compute())
+    self.assertEqual(result.numpy(), sum(range(num_clients)) + 1)
+
+  @parameterized.parameters((1, 3), (2, 3), (2, 8))
+  def test_federated_sum_in_tree(self, fanout, num_clients):
+    loop = asyncio.get_event_loop()
+    ex = _make_test_executor(num_clients, aggregation_fanout=fanout)
+
+    @computations.federated_computation
+    def comp():
+      x = intrinsics.federated_value(10, placements.CLIENTS)
+      return intrinsics.federated_sum(x)
+
+    val = loop.run_until_complete(ex.create_value(comp))
+    self.assertIsInstance(val, federated_executor.FederatedExecutorValue)
+    result = loop.run_until_complete(val.compute())
+    self.assertEqual(result.numpy(), 10 * num_clients)
+
+  def test_raises_with_invalid_aggregation_fanout(self):
+    with self.assertRaises(ValueError):
+      _make_test_executor(3, aggregation_fanout=0)
+
   def test_federated_mean_with_floats(self):
     loop = asyncio.get_event_loop()
     ex = _make_test_executor(4)
@@ -449,6 +584,14 @@ class FederatedExecutorTest(parameterized.TestCase):
   def test_with_mnist_training_example(self):
     executor_test_utils.test_mnist_training(self, _make_test_executor(1))
 
+  def test_with_mnist_training_example_with_aggregation_fanout(self):
+    executor_test_utils.test_mnist_training(
+        self, _make_test_executor(3, aggregation_fanout=2))
+
+  def test_with_mnist_training_example_with_vectorized_federated_map(self):
+    executor_test_utils.test_mnist_training(
+        self, _make_test_executor(3, vectorize_federated_map=True))
+
   def test_with_mnist_training_example_with_lambda_executor(self):
     executor_test_utils.test_mnist_training(
         self, _make_test_executor(1, use_lambda_executor=True))
@@ -0,0 +1,154 @@
+# Lint as: python3
+# Copyright 2019, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A utility for running a sequence of compiler passes over a computation."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+import time
+
+from absl import logging
+import six
+
+from tensorflow_federated.python.common_libs import py_typecheck
+from tensorflow_federated.python.core.impl import transformations
+from tensorflow_federated.python.core.impl.compiler import building_blocks
+from tensorflow_federated.python.core.impl.compiler import tree_analysis
+
+PassStats = collections.namedtuple('PassStats', [
+    'name',
+    'wall_time',
+    'num_nodes_before',
+    'num_nodes_after',
+    'modified',
+])
+PassStats.__doc__ = """The statistics recorded for a single run of a pass.
+
+Attributes:
+  name: The name of the pass.
+  wall_time: The time it took to run the pass, in seconds.
+  num_nodes_before: The number of nodes in the computation the pass was run on.
+  num_nodes_after: The number of nodes in the computation the pass returned.
+  modified: Whether the pass reported changing the computation.
+"""
+
+
+class PassManager(object):
+  """Runs a sequence of compiler passes over a computation.
+
+  Each pass is a Python function which takes an instance of
+  `building_blocks.ComputationBuildingBlock`, and returns the transformed
+  computation and a boolean indicating whether it has changed, the convention
+  followed by the functions in `transformations`. Passes can also be built from
+  a list of local `transformation_utils.TransformSpec`s with
+  `add_transform_specs`, in which case all of them are applied in a single walk
+  of the computation, to a fixed point.
+
+  For each run, the `PassManager` records the time taken by each pass, and the
+  sizes of the computations it was given and returned, available as `stats`.
+  """
+
+  def __init__(self):
+    self._passes = []
+    self._stats = []
+
+  def add_pass(self, name, pass_fn):
+    """Appends a pass to the sequence.
+
+    Args:
+      name: The string name of the pass, used in the statistics.
+      pass_fn: A Python function which takes a computation, and returns the
+        transformed computation and a boolean indicating whether it has changed.
+
+    Returns:
+      This `PassManager`, so that calls can be chained.
+
+    Raises:
+      TypeError: If the arguments are of the wrong types.
+    """
+    py_typecheck.check_type(name, six.string_types)
+    py_typecheck.check_callable(pass_fn)
+    self._passes.append((name, pass_fn))
+    return self
+
+  def add_transform_specs(self, name, transform_specs_fn):
+    """Appends a pass fusing a list of local transformations.
+
+    Args:
+      name: The string name of the pass, used in the statistics.
+      transform_specs_fn: A Python function which takes the computation the pass
+        is run on, and returns a list of local
+        `transformation_utils.TransformSpec`s to apply to it with
+        `transformations.apply_transforms_to_fixed_point`.
+
+    Returns:
+      This `PassManager`, so that calls can be chained.
+
+    Raises:
+      TypeError: If the arguments are of the wrong types.
+    """
+    py_typecheck.check_callable(transform_specs_fn)
+
+    def _pass_fn(comp):
+      return transformations.apply_transforms_to_fixed_point(
+          comp, transform_specs_fn(comp))
+
+    return self.add_pass(name, _pass_fn)
+
+  @property
+  def stats(self):
+    """The list of `PassStats` for each pass in the most recent run."""
+    return list(self._stats)
+
+  def run(self, comp):
+    """Runs all the passes over `comp`, in sequence.
+
+    Args:
+      comp: An instance of `building_blocks.ComputationBuildingBlock` to
+        transform.
+
+    Returns:
+      A tuple of the transformed computation and a boolean indicating whether
+      any of the passes has changed it.
+
+    Raises:
+      TypeError: If the arguments are of the wrong types.
+    """
+    py_typecheck.check_type(comp, building_blocks.ComputationBuildingBlock)
+    self._stats = []
+    modified = False
+    num_nodes = tree_analysis.count(comp)
+    for name, pass_fn in self._passes:
+      start = time.time()
+      comp, pass_modified = pass_fn(comp)
+      wall_time = time.time() - start
+      py_typecheck.check_type(comp, building_blocks.ComputationBuildingBlock)
+      num_nodes_before = num_nodes
+      if pass_modified:
+        num_nodes = tree_analysis.count(comp)
+      stats = PassStats(
+          name=name,
+          wall_time=wall_time,
+          num_nodes_before=num_nodes_before,
+          num_nodes_after=num_nodes,
+          modified=bool(pass_modified))
+      logging.debug('Compiler pass %s took %.3f seconds, %d -> %d nodes.',
+                    stats.name, stats.wall_time, stats.num_nodes_before,
+                    stats.num_nodes_after)
+      self._stats.append(stats)
+      modified = modified or pass_modified
+    return comp, modified
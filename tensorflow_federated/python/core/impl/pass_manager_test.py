@@ -0,0 +1,131 @@
+# Lint as: python3
+# Copyright 2019, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for pass_manager.py."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from absl.testing import absltest
+import tensorflow as tf
+
+from tensorflow_federated.python.core.impl import pass_manager
+from tensorflow_federated.python.core.impl import transformation_utils
+from tensorflow_federated.python.core.impl.compiler import building_blocks
+
+
+class _ReplaceData(transformation_utils.TransformSpec):
+  """Replaces `Data` with the given `uri` with the given computation."""
+
+  def __init__(self, uri, replacement):
+    super(_ReplaceData, self).__init__()
+    self._uri = uri
+    self._replacement = replacement
+
+  def should_transform(self, comp):
+    return isinstance(comp, building_blocks.Data) and comp.uri == self._uri
+
+  def transform(self, comp):
+    if not self.should_transform(comp):
+      return comp, False
+    return self._replacement, True
+
+
+def _wrap_in_tuple(comp):
+  return building_blocks.Tuple([comp]), True
+
+
+def _identity(comp):
+  return comp, False
+
+
+class PassManagerTest(absltest.TestCase):
+
+  def test_raises_type_error_with_none(self):
+    with self.assertRaises(TypeError):
+      pass_manager.PassManager().run(None)
+
+  def test_add_pass_raises_type_error_with_non_callable(self):
+    with self.assertRaises(TypeError):
+      pass_manager.PassManager().add_pass('pass', None)
+
+  def test_run_with_no_passes(self):
+    comp = building_blocks.Data('a', tf.int32)
+    manager = pass_manager.PassManager()
+
+    transformed_comp, modified = manager.run(comp)
+
+    self.assertIs(transformed_comp, comp)
+    self.assertFalse(modified)
+    self.assertEqual(manager.stats, [])
+
+  def test_runs_passes_in_order(self):
+    comp = building_blocks.Data('a', tf.int32)
+    manager = pass_manager.PassManager()
+    manager.add_pass('wrap', _wrap_in_tuple).add_pass('identity', _identity)
+    manager.add_pass('wrap_again', _wrap_in_tuple)
+
+    transformed_comp, modified = manager.run(comp)
+
+    self.assertEqual(transformed_comp.compact_representation(), '<<a>>')
+    self.assertTrue(modified)
+    self.assertEqual([stats.name for stats in manager.stats],
+                     ['wrap', 'identity', 'wrap_again'])
+    self.assertEqual([stats.modified for stats in manager.stats],
+                     [True, False, True])
+    self.assertEqual(
+        [(stats.num_nodes_before, stats.num_nodes_after)
+         for stats in manager.stats], [(1, 2), (2, 2), (2, 3)])
+    for stats in manager.stats:
+      self.assertGreaterEqual(stats.wall_time, 0.0)
+
+  def test_stats_are_reset_between_runs(self):
+    comp = building_blocks.Data('a', tf.int32)
+    manager = pass_manager.PassManager().add_pass('wrap', _wrap_in_tuple)
+
+    manager.run(comp)
+    manager.run(comp)
+
+    self.assertLen(manager.stats, 1)
+
+  def test_add_transform_specs_applies_transforms_to_fixed_point(self):
+    comp = building_blocks.Tuple([
+        building_blocks.Data('a', tf.int32),
+        building_blocks.Data('c', tf.int32),
+    ])
+    manager = pass_manager.PassManager()
+
+    def _transform_specs(comp):
+      del comp  # Unused.
+      return [
+          _ReplaceData('a',
+                       building_blocks.Tuple(
+                           [building_blocks.Data('b', tf.int32)])),
+          _ReplaceData('b', building_blocks.Data('c', tf.int32)),
+      ]
+
+    manager.add_transform_specs('replace_data', _transform_specs)
+
+    transformed_comp, modified = manager.run(comp)
+
+    self.assertEqual(transformed_comp.compact_representation(), '<<c>,c>')
+    self.assertTrue(modified)
+    self.assertEqual(manager.stats[0].name, 'replace_data')
+    self.assertEqual(manager.stats[0].num_nodes_before, 3)
+    self.assertEqual(manager.stats[0].num_nodes_after, 4)
+
+
+if __name__ == '__main__':
+  absltest.main()
@@ -318,9 +318,150 @@ def capture_computed_value_from_graph(value, type_spec):
   return ComputedValue(to_representation_for_type(value, type_spec), type_spec)
 
 
+# The maximum number of compiled computations for which `run_tensorflow` keeps
+# a graph (and possibly a session) around for reuse.
+_COMPILED_COMPUTATION_RUNNER_CACHE_SIZE = 100
+
+
+def _make_placeholders_for_type(type_spec):
+  """Returns placeholders for a parameter of type `type_spec`.
+
+  Args:
+    type_spec: An instance of `computation_types.TensorType`, or a possibly
+      nested `computation_types.NamedTupleType` thereof.
+
+  Returns:
+    A `tf.Tensor`, or an `anonymous_tuple.AnonymousTuple` of placeholders that
+    mirrors the structure of `type_spec`, created in the default graph.
+  """
+  if isinstance(type_spec, computation_types.TensorType):
+    return tf.compat.v1.placeholder(type_spec.dtype, type_spec.shape)
+  else:
+    py_typecheck.check_type(type_spec, computation_types.NamedTupleType)
+    return anonymous_tuple.AnonymousTuple([
+        (k, _make_placeholders_for_type(v))
+        for k, v in anonymous_tuple.to_elements(type_spec)
+    ])
+
+
+class _CompiledComputationRunner(object):
+  """Runs a compiled TensorFlow computation in a graph constructed once.
+
+  The argument is fed to placeholders, rather than stamped into the graph as
+  constants, so that the same graph can be reused across calls. The session is
+  reused as well, unless the graph contains stateful ops (such as variables or
+  random number generators), in which case a new session is created for each
+  call, so that each call starts from a fresh state, just as it would if the
+  graph were constructed from scratch.
+  """
+
+  def __init__(self, comp):
+    """Constructs the graph for `comp`.
+
+    Args:
+      comp: An instance of `building_blocks.CompiledComputation` with
+        embedded TensorFlow code, with a parameter and a result (if any) that
+        do not contain sequences.
+    """
+    py_typecheck.check_type(comp, building_blocks.CompiledComputation)
+    self._result_type = comp.type_signature.result
+    with tf.Graph().as_default() as graph:
+      if comp.type_signature.parameter is not None:
+        self._placeholders = _make_placeholders_for_type(
+            comp.type_signature.parameter)
+      else:
+        self._placeholders = None
+      self._init_op, self._result = (
+          tensorflow_deserialization.deserialize_and_call_tf_computation(
+              comp.proto, self._placeholders, graph))
+    graph.finalize()
+    self._graph = graph
+    self._is_stateful = any(
+        op.op_def.is_stateful for op in graph.get_operations())
+    self._session = None
+
+  def _get_feed_dict(self, arg):
+    if self._placeholders is None:
+      return None
+    value = to_representation_for_type(arg.value, arg.type_signature)
+    if isinstance(self._placeholders, anonymous_tuple.AnonymousTuple):
+      return dict(
+          zip(
+              anonymous_tuple.flatten(self._placeholders),
+              anonymous_tuple.flatten(value)))
+    else:
+      return {self._placeholders: value}
+
+  def __call__(self, arg):
+    """Runs the computation with argument `arg`.
+
+    Args:
+      arg: An instance of `ComputedValue` that represents the argument, or
+        `None` if the compuation expects no argument.
+
+    Returns:
+      An instance of `ComputedValue` with the result.
+    """
+    feed_dict = self._get_feed_dict(arg)
+    if self._is_stateful:
+      with tf.compat.v1.Session(graph=self._graph) as sess:
+        result_val = self._run_in_session(sess, feed_dict)
+    else:
+      if self._session is None:
+        self._session = tf.compat.v1.Session(graph=self._graph)
+      result_val = self._run_in_session(self._session, feed_dict)
+    return capture_computed_value_from_graph(result_val, self._result_type)
+
+  def _run_in_session(self, sess, feed_dict):
+    if self._init_op:
+      sess.run(self._init_op, feed_dict=feed_dict)
+    return graph_utils.fetch_value_in_session(sess, self._result, feed_dict)
+
+  def close(self):
+    if self._session is not None:
+      self._session.close()
+      self._session = None
+
+
+_compiled_computation_runners = collections.OrderedDict()
+
+
+def _get_compiled_computation_runner(comp):
+  """Returns a cached `_CompiledComputationRunner` for `comp`, or `None`.
+
+  Computations whose parameter or result contain sequences are not cached,
+  since the data sets that represent them are constructed in the graph.
+
+  Args:
+    comp: An instance of `building_blocks.CompiledComputation`.
+
+  Returns:
+    An instance of `_CompiledComputationRunner`, or `None` if `comp` cannot be
+    run by one.
+  """
+  if type_utils.type_tree_contains_types(comp.type_signature,
+                                         computation_types.SequenceType):
+    return None
+  # Compiled computations are deserialized anew in each invocation, and given
+  # unique names, so the runners are keyed by the (name-free) proto instead.
+  key = comp.proto.SerializeToString(deterministic=True)
+  runner = _compiled_computation_runners.pop(key, None)
+  if runner is None:
+    runner = _CompiledComputationRunner(comp)
+    while (len(_compiled_computation_runners) >=
+           _COMPILED_COMPUTATION_RUNNER_CACHE_SIZE):
+      _, evicted_runner = _compiled_computation_runners.popitem(last=False)
+      evicted_runner.close()
+  _compiled_computation_runners[key] = runner
+  return runner
+
+
 def run_tensorflow(comp, arg):
   """Runs a compiled TensorFlow computation `comp` with argument `arg`.
 
+  The graph constructed for `comp` is cached and reused in subsequent calls
+  with the same computation, unless its parameter or result contain sequences.
+
   Args:
     comp: An instance of `building_blocks.CompiledComputation` with
       embedded TensorFlow code.
@@ -333,6 +474,9 @@ def run_tensorflow(comp, arg):
   py_typecheck.check_type(comp, building_blocks.CompiledComputation)
   if arg is not None:
     py_typecheck.check_type(arg, ComputedValue)
+  runner = _get_compiled_computation_runner(comp)
+  if runner is not None:
+    return runner(arg)
   with tf.Graph().as_default() as graph:
     stamped_arg = stamp_computed_value_into_graph(arg, graph)
     init_op, result = (
@@ -411,6 +555,81 @@ def multiply_by_scalar(value, multiplier):
             str(value.type_signature)))
 
 
+def _is_stackable_type(type_spec):
+  """Returns whether values of `type_spec` can be stacked along a new axis.
+
+  Values can be stacked if they are numeric tensors of a fully defined shape,
+  or possibly nested named tuples thereof, such that the values of all clients
+  are guaranteed to have identical shapes.
+
+  Args:
+    type_spec: An instance of `computation_types.Type`.
+  """
+  if isinstance(type_spec, computation_types.TensorType):
+    return (type_spec.shape.is_fully_defined() and
+            (type_spec.dtype.is_floating or type_spec.dtype.is_integer or
+             type_spec.dtype.is_complex))
+  elif isinstance(type_spec, computation_types.NamedTupleType):
+    return all(_is_stackable_type(v)
+               for _, v in anonymous_tuple.to_elements(type_spec))
+  else:
+    return False
+
+
+def _stack_values(values, type_spec):
+  """Stacks the `values` of a stackable `type_spec` along a leading axis.
+
+  Args:
+    values: A non-empty list of values of type `type_spec`, such as the member
+      values of a federated value placed at `tff.CLIENTS`.
+    type_spec: An instance of `computation_types.Type` for which
+      `_is_stackable_type` holds.
+
+  Returns:
+    A `np.ndarray` whose first dimension is `len(values)`, or a possibly nested
+    `anonymous_tuple.AnonymousTuple` thereof.
+  """
+  if isinstance(type_spec, computation_types.TensorType):
+    return np.array(values, dtype=type_spec.dtype.as_numpy_dtype)
+  else:
+    return anonymous_tuple.AnonymousTuple([
+        (k, _stack_values([v[idx] for v in values], elem_type))
+        for idx, (k, elem_type) in enumerate(
+            anonymous_tuple.to_elements(type_spec))
+    ])
+
+
+def _sum_stacked_values(stacked_values, type_spec, multipliers=None):
+  """Sums the values stacked by `_stack_values` over their leading axis.
+
+  Args:
+    stacked_values: The result of `_stack_values` for `type_spec`.
+    type_spec: An instance of `computation_types.Type` for which
+      `_is_stackable_type` holds.
+    multipliers: An optional one-dimensional `np.ndarray` with a multiplier
+      for each of the stacked values. Each value is multiplied by its
+      multiplier, and cast back to its dtype, before summing.
+
+  Returns:
+    A value of type `type_spec` with the sum.
+  """
+  if isinstance(type_spec, computation_types.TensorType):
+    if multipliers is not None:
+      multipliers = np.reshape(multipliers,
+                               [-1] + [1] * (stacked_values.ndim - 1))
+      stacked_values = (stacked_values * multipliers).astype(
+          stacked_values.dtype)
+    return numpy_cast(
+        np.sum(stacked_values, axis=0, dtype=stacked_values.dtype),
+        type_spec.dtype, type_spec.shape)
+  else:
+    return anonymous_tuple.AnonymousTuple([
+        (k, _sum_stacked_values(stacked_values[idx], elem_type, multipliers))
+        for idx, (k, elem_type) in enumerate(
+            anonymous_tuple.to_elements(type_spec))
+    ])
+
+
 def get_cardinalities(value):
   """Get a dictionary mapping placements to their cardinalities from `value`.
 
@@ -959,6 +1178,13 @@ class ReferenceExecutor(context_base.Context):
   def _federated_sum(self, arg):
     type_utils.check_federated_type(arg.type_signature, None,
                                     placements.CLIENTS, False)
+    member_type = arg.type_signature.member
+    if arg.value and _is_stackable_type(member_type):
+      # Sums the values of all clients in one vectorized reduction, rather than
+      # one client at a time as in the generic path below.
+      total = _sum_stacked_values(
+          _stack_values(arg.value, member_type), member_type)
+      return ComputedValue(total, type_constructors.at_server(member_type))
     collected_val = self._federated_collect(arg)
     federated_apply_arg = anonymous_tuple.AnonymousTuple([
         (None, self._sequence_sum), (None, collected_val.value)
@@ -984,12 +1210,13 @@ class ReferenceExecutor(context_base.Context):
 
   def _generic_zero(self, type_spec):
     if isinstance(type_spec, computation_types.TensorType):
-      # TODO(b/113116813): Replace this with something more efficient, probably
-      # calling some helper method from Numpy.
-      with tf.Graph().as_default() as graph:
-        zeros = tf.constant(0, type_spec.dtype, type_spec.shape)
-        with tf.compat.v1.Session(graph=graph) as sess:
-          zeros_val = sess.run(zeros)
+      if type_spec.shape.ndims is None:
+        dims = []
+      else:
+        dims = type_spec.shape.as_list()
+      zeros_val = np.zeros(dims, type_spec.dtype.as_numpy_dtype)
+      if not dims:
+        zeros_val = zeros_val[()]
       return ComputedValue(zeros_val, type_spec)
     elif isinstance(type_spec, computation_types.NamedTupleType):
       return ComputedValue(
@@ -1173,6 +1400,11 @@ class ReferenceExecutor(context_base.Context):
         arg.type_signature)
     v_type = arg.type_signature[0].member
     total = sum(arg.value[1])
+    if arg.value[0] and _is_stackable_type(v_type):
+      multipliers = np.array(arg.value[1]) / total
+      weighted_sum = _sum_stacked_values(
+          _stack_values(arg.value[0], v_type), v_type, multipliers)
+      return ComputedValue(weighted_sum, type_constructors.at_server(v_type))
     products_val = [
         multiply_by_scalar(ComputedValue(v, v_type), w / total).value
         for v, w in zip(arg.value[0], arg.value[1])
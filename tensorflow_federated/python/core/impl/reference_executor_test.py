@@ -592,6 +592,44 @@ class ReferenceExecutorTest(test.TestCase):
 
     self.assertEqual(apply_twice(5, add_one), 7)
 
+  def test_run_tensorflow_reuses_runner_for_equal_computations(self):
+
+    @computations.tf_computation(tf.int32, tf.int32)
+    def add(x, y):
+      return x + y
+
+    proto = computation_impl.ComputationImpl.get_proto(add)
+    comp_1 = building_blocks.CompiledComputation(proto, name='a')
+    comp_2 = building_blocks.CompiledComputation(proto, name='b')
+    arg_type = computation_types.NamedTupleType([tf.int32, tf.int32])
+
+    result_1 = reference_executor.run_tensorflow(
+        comp_1,
+        reference_executor.ComputedValue(
+            anonymous_tuple.AnonymousTuple([(None, 1), (None, 2)]), arg_type))
+    result_2 = reference_executor.run_tensorflow(
+        comp_2,
+        reference_executor.ComputedValue(
+            anonymous_tuple.AnonymousTuple([(None, 10), (None, 20)]),
+            arg_type))
+
+    self.assertEqual(result_1.value, 3)
+    self.assertEqual(result_2.value, 30)
+    self.assertIs(
+        reference_executor._get_compiled_computation_runner(comp_1),
+        reference_executor._get_compiled_computation_runner(comp_2))
+
+  def test_run_tensorflow_with_variables_starts_from_fresh_state(self):
+
+    @computations.tf_computation(tf.int32)
+    def add_to_variable(x):
+      v = tf.Variable(10)
+      with tf.control_dependencies([v.assign_add(x)]):
+        return tf.identity(v.read_value())
+
+    self.assertEqual(add_to_variable(1), 11)
+    self.assertEqual(add_to_variable(1), 11)
+
   def test_multiply_by_scalar_with_float_and_float(self):
     self.assertEqual(
         reference_executor.multiply_by_scalar(
@@ -840,6 +878,32 @@ class ReferenceExecutorTest(test.TestCase):
         str(foo.type_signature), '({int32}@CLIENTS -> int32@SERVER)')
     self.assertEqual(foo([1, 2, 3]), 6)
 
+  def test_federated_sum_with_tuples_of_arrays(self):
+
+    @computations.federated_computation(
+        computation_types.FederatedType(
+            [('A', computation_types.TensorType(tf.int32, [2])),
+             ('B', [tf.float32])], placements.CLIENTS))
+    def foo(x):
+      return intrinsics.federated_sum(x)
+
+    self.assertEqual(
+        str(foo.type_signature),
+        '({<A=int32[2],B=<float32>>}@CLIENTS -> '
+        '<A=int32[2],B=<float32>>@SERVER)')
+    foo_result = foo([{
+        'A': [1, 2],
+        'B': [0.5]
+    }, {
+        'A': [3, 4],
+        'B': [1.5]
+    }, {
+        'A': [5, 6],
+        'B': [2.0]
+    }])
+    self.assertTrue(np.array_equal(foo_result.A, [9, 12]))
+    self.assertEqual(foo_result.B[0], 4.0)
+
   def test_federated_value_at_clients_and_at_server(self):
 
     @computations.federated_computation(tf.int32)
@@ -1096,6 +1160,26 @@ class ReferenceExecutorTest(test.TestCase):
         '(<{float32}@CLIENTS,{float32}@CLIENTS> -> float32@SERVER)')
     self.assertEqual(foo([5.0, 2.0, 3.0], [10.0, 20.0, 30.0]), 3.0)
 
+  def test_federated_weighted_average_with_tuples(self):
+
+    @computations.federated_computation(
+        computation_types.FederatedType([('A', tf.float32),
+                                         ('B', (tf.float32, [2]))],
+                                        placements.CLIENTS),
+        computation_types.FederatedType(tf.float32, placements.CLIENTS))
+    def foo(v, w):
+      return intrinsics.federated_mean(v, w)
+
+    foo_result = foo([{
+        'A': 1.0,
+        'B': [2.0, 4.0]
+    }, {
+        'A': 4.0,
+        'B': [8.0, 1.0]
+    }], [3.0, 1.0])
+    self.assertEqual(foo_result.A, 1.75)
+    self.assertTrue(np.array_equal(foo_result.B, [3.5, 3.25]))
+
   def test_federated_broadcast_without_data_on_clients(self):
 
     @computations.federated_computation(
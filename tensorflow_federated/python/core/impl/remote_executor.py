@@ -14,11 +14,16 @@
 # limitations under the License.
 """A local proxy for a remote executor service hosted on a separate machine."""
 
+import asyncio
+import collections
+import itertools
 import queue
 import threading
 
+from absl import logging
 import grpc
 
+from tensorflow_federated.proto.v0 import computation_pb2
 from tensorflow_federated.proto.v0 import executor_pb2
 from tensorflow_federated.proto.v0 import executor_pb2_grpc
 from tensorflow_federated.python.common_libs import anonymous_tuple
@@ -27,10 +32,62 @@ from tensorflow_federated.python.core.api import computation_types
 from tensorflow_federated.python.core.impl import executor_base
 from tensorflow_federated.python.core.impl import executor_service_utils
 from tensorflow_federated.python.core.impl import executor_value_base
+from tensorflow_federated.python.core.impl import type_utils
 
 
 _STREAM_CLOSE_WAIT_SECONDS = 10
 
+_DEFAULT_DISPOSE_BATCH_SIZE = 100
+
+
+def _set_future_result(future, result):
+  if not future.done():
+    future.set_result(result)
+
+
+def _set_future_exception(future, exception):
+  if not future.done():
+    future.set_exception(exception)
+
+
+def _resolve_future_threadsafe(future, loop, result=None, exception=None):
+  """Resolves an asyncio `future` owned by `loop` from an arbitrary thread.
+
+  Args:
+    future: An asyncio future.
+    loop: The event loop that `future` is bound to.
+    result: The result to set, if `exception` is `None`.
+    exception: An optional exception to set instead of the result.
+  """
+  if exception is not None:
+    loop.call_soon_threadsafe(_set_future_exception, future, exception)
+  else:
+    loop.call_soon_threadsafe(_set_future_result, future, result)
+
+
+def _wrap_grpc_future(grpc_future):
+  """Returns an asyncio future that resolves with the given gRPC future.
+
+  Args:
+    grpc_future: An instance of `grpc.Future` returned by a non-blocking call.
+
+  Returns:
+    An asyncio future bound to the current event loop.
+  """
+  loop = asyncio.get_event_loop()
+  future = loop.create_future()
+
+  def done_callback(done_grpc_future):
+    try:
+      result = done_grpc_future.result()
+    except Exception as err:  # pylint: disable=broad-except
+      _resolve_future_threadsafe(future, loop, exception=err)
+    else:
+      _resolve_future_threadsafe(future, loop, result=result)
+
+  grpc_future.add_done_callback(done_callback)
+  return future
+
 
 class RemoteValue(executor_value_base.ExecutorValue):
   """A reference to a value embedded in a remotely deployed executor service."""
@@ -50,6 +107,21 @@ class RemoteValue(executor_value_base.ExecutorValue):
     self._value_ref = value_ref
     self._type_signature = type_spec
     self._executor = executor
+    self._disposed = False
+
+  def __del__(self):
+    self.dispose()
+
+  def dispose(self):
+    """Releases the value held by the remote executor service.
+
+    This happens automatically when this object is garbage-collected, but can
+    be done sooner by calling this method. The value must not be used after it
+    has been disposed of.
+    """
+    if not getattr(self, '_disposed', True):
+      self._disposed = True
+      self._executor._dispose(self._value_ref)  # pylint: disable=protected-access
 
   @property
   def type_signature(self):
@@ -64,22 +136,32 @@ class RemoteValue(executor_value_base.ExecutorValue):
 
 
 class _BidiStream:
-  """A bidi stream connection to the Executor service's Execute method."""
+  """A bidi stream connection to the Executor service's Execute method.
+
+  Requests are tagged with ids unique within the stream, and responses are
+  matched to the outstanding requests by those ids (falling back on the FIFO
+  order for responses that carry no id), so that any number of requests can be
+  outstanding at the same time, and responses may arrive in any order.
+  """
 
   def __init__(self, stub):
     self._request_queue = queue.Queue()
-    self._response_event_queue = queue.Queue()
+    self._lock = threading.Lock()
+    self._request_ids = itertools.count(1)
+    # Maps request ids of the outstanding requests to pairs `(future, loop)`,
+    # in which `future` is the asyncio future to resolve with the response, and
+    # `loop` is the event loop the future is bound to.
+    self._pending = collections.OrderedDict()
+    self._error = None
     self._stream_closed_event = threading.Event()
 
     def request_iter():
       """Iterator that blocks on the request Queue."""
       while True:
         val = self._request_queue.get()
-        if val:
-          py_typecheck.check_type(val[0], executor_pb2.ExecuteRequest)
-          py_typecheck.check_type(val[1], threading.Event)
-          self._response_event_queue.put_nowait(val[1])
-          yield val[0]
+        if val is not None:
+          py_typecheck.check_type(val, executor_pb2.ExecuteRequest)
+          yield val
         else:
           # None means we are done processing
           return
@@ -87,35 +169,59 @@ class _BidiStream:
     response_iter = stub.Execute(request_iter())
 
     def response_thread_fn():
-      """Consumes response iter and exposes the value on corresponding Event."""
+      """Consumes response iter and resolves the corresponding futures."""
       try:
         for response in response_iter:
-          # Get the corresponding response Event from the queue
-          response_event = self._response_event_queue.get_nowait()
-          # Attach the response as an attribute on the Event
-          response_event.response = response
-          response_event.set()
-        # Set the event indicating the stream has been closed
-        self._stream_closed_event.set()
-      except grpc.RpcError as error:
-        self._response_event_queue.put(error)
+          self._dispatch_response(response)
+        error = RuntimeError('The stream has been closed.')
+      except grpc.RpcError as err:
+        error = err
+      with self._lock:
+        self._error = error
+        pending = list(self._pending.values())
+        self._pending.clear()
+      for future, loop in pending:
+        _resolve_future_threadsafe(future, loop, exception=error)
+      # Set the event indicating the stream has been closed
+      self._stream_closed_event.set()
 
     response_thread = threading.Thread(target=response_thread_fn)
     response_thread.daemon = True
     response_thread.start()
 
-  # TODO(b/137972366) Make this method asynchronous
-  def send_request(self, request):
-    """Send a request on the bidi stream."""
+  def _dispatch_response(self, response):
+    """Resolves the future of the request that `response` corresponds to."""
+    with self._lock:
+      if response.request_id:
+        entry = self._pending.pop(response.request_id, None)
+      elif self._pending:
+        _, entry = self._pending.popitem(last=False)
+      else:
+        entry = None
+    if entry is None:
+      logging.warning('Dropping a response to an unknown request with id %d.',
+                      response.request_id)
+      return
+    future, loop = entry
+    _resolve_future_threadsafe(future, loop, result=response)
+
+  async def send_request(self, request):
+    """Send a request on the bidi stream, and asynchronously await response."""
     py_typecheck.check_type(request, executor_pb2.ExecuteRequest)
     request_type = request.WhichOneof('request')
-    response_event = threading.Event()
-    # Enqueue a tuple of request and an Event used to return the response
-    self._request_queue.put((request, response_event))
-    response_event.wait()
-    response = response_event.response
-    if isinstance(response, Exception):
-      raise response
+    loop = asyncio.get_event_loop()
+    future = loop.create_future()
+    # The request is registered and enqueued under the same lock, so that the
+    # requests are sent in the order of `self._pending`, which is what
+    # responses without a request id are matched against.
+    with self._lock:
+      if self._error is not None:
+        raise self._error
+      request_id = next(self._request_ids)
+      self._pending[request_id] = (future, loop)
+      request.request_id = request_id
+      self._request_queue.put(request)
+    response = await future
     py_typecheck.check_type(response, executor_pb2.ExecuteResponse)
     response_type = response.WhichOneof('response')
     if response_type != request_type:
@@ -132,13 +238,21 @@ class _BidiStream:
 class RemoteExecutor(executor_base.Executor):
   """The remote executor is a local proxy for a remote executor instance.
 
+  None of the methods of this executor block the event loop while waiting for
+  the remote executor service to respond, so any number of requests (e.g., from
+  a federated executor fanned out to many remote workers) can be outstanding at
+  the same time, subject to an optional limit on requests in flight.
+
   NOTE: This component is only available in Python 3.
   """
 
-  # TODO(b/134543154): Switch to using an asynchronous gRPC client so we don't
-  # have to block on all those calls.
-
-  def __init__(self, channel, rpc_mode='REQUEST_REPLY'):
+  def __init__(self,
+               channel,
+               rpc_mode='REQUEST_REPLY',
+               max_in_flight=None,
+               use_raw_tensors=False,
+               value_chunk_size=None,
+               dispose_batch_size=_DEFAULT_DISPOSE_BATCH_SIZE):
     """Creates a remote executor.
 
     Args:
@@ -147,32 +261,179 @@ class RemoteExecutor(executor_base.Executor):
       rpc_mode: Optional mode of calling the remote executor. Must be either
         'REQUEST_REPLY' or 'STREAMING' (defaults to 'REQUEST_REPLY'). This
         option will be removed after the request-reply interface is deprecated.
+      max_in_flight: The optional maximum number of requests that may be
+        outstanding at the same time. If `None`, the number is not limited.
+      use_raw_tensors: Whether to exchange dense numeric tensors with the remote
+        executor service in the raw encoding, which avoids intermediate copies
+        of large tensors. This must only be enabled if the remote service is
+        known to support the raw encoding.
+      value_chunk_size: The optional maximum number of bytes of tensor content
+        per message. If specified, values are transferred to and from the
+        remote executor service as streams of chunks of at most this size
+        (dense numeric tensors always in the raw encoding), which allows values
+        larger than the gRPC message size limit to be transferred, without ever
+        buffering their entire serialized form. If `None`, each value is sent
+        as a single message.
+      dispose_batch_size: The number of values disposed of (see
+        `RemoteValue.dispose()`) to accumulate before asking the remote service
+        to release them all with a single request.
+
+    Raises:
+      ValueError: If `rpc_mode` is not recognized, or if `max_in_flight`,
+        `value_chunk_size` or `dispose_batch_size` is not a positive integer.
     """
     py_typecheck.check_type(channel, grpc.Channel)
     py_typecheck.check_type(rpc_mode, str)
     if rpc_mode not in ['REQUEST_REPLY', 'STREAMING']:
       raise ValueError('Invalid rpc_mode: {}'.format(rpc_mode))
+    if max_in_flight is not None:
+      py_typecheck.check_type(max_in_flight, int)
+      if max_in_flight < 1:
+        raise ValueError('Invalid max_in_flight: {}'.format(max_in_flight))
+    py_typecheck.check_type(use_raw_tensors, bool)
+    if value_chunk_size is not None:
+      py_typecheck.check_type(value_chunk_size, int)
+      if value_chunk_size < 1:
+        raise ValueError(
+            'Invalid value_chunk_size: {}'.format(value_chunk_size))
+    py_typecheck.check_type(dispose_batch_size, int)
+    if dispose_batch_size < 1:
+      raise ValueError(
+          'Invalid dispose_batch_size: {}'.format(dispose_batch_size))
 
     self._stub = executor_pb2_grpc.ExecutorStub(channel)
     self._bidi_stream = None
     if rpc_mode == 'STREAMING':
       self._bidi_stream = _BidiStream(self._stub)
+    self._max_in_flight = max_in_flight
+    self._use_raw_tensors = use_raw_tensors
+    self._value_chunk_size = value_chunk_size
+    self._dispose_batch_size = dispose_batch_size
+    self._disposed_value_refs = []
+    self._disposed_value_refs_lock = threading.Lock()
+    # The semaphore is constructed lazily, so that it gets bound to the event
+    # loop in which this executor is used, rather than the one (if any) that
+    # happens to be current at construction time.
+    self._in_flight_semaphore = None
 
   def __del__(self):
+    if getattr(self, '_disposed_value_refs', None):
+      self.flush_disposed_values()
     if self._bidi_stream:
       self._bidi_stream.close()
       del self._bidi_stream
 
-  async def create_value(self, value, type_spec=None):
-    value_proto, type_spec = (
-        executor_service_utils.serialize_value(value, type_spec))
-    create_value_request = executor_pb2.CreateValueRequest(value=value_proto)
+  def _dispose(self, value_ref):
+    if not value_ref.id:
+      return
+    with self._disposed_value_refs_lock:
+      self._disposed_value_refs.append(value_ref)
+      should_flush = len(self._disposed_value_refs) >= self._dispose_batch_size
+    if should_flush:
+      self.flush_disposed_values()
+
+  def flush_disposed_values(self):
+    """Asks the remote service to release all the values disposed of so far.
+
+    This does not wait for the remote service to respond. Failures are logged,
+    and otherwise ignored, since at worst, they cause values to be held by the
+    remote service for longer than necessary.
+    """
+    with self._disposed_value_refs_lock:
+      value_refs = self._disposed_value_refs
+      self._disposed_value_refs = []
+    if not value_refs:
+      return
+
+    def done_callback(dispose_future):
+      if dispose_future.exception() is not None:
+        logging.warning('Failed to dispose of %d remote values: %s',
+                        len(value_refs), dispose_future.exception())
+
+    try:
+      self._stub.Dispose.future(
+          executor_pb2.DisposeRequest(
+              value_ref=value_refs)).add_done_callback(done_callback)
+    except Exception as err:  # pylint: disable=broad-except
+      logging.warning('Failed to dispose of %d remote values: %s',
+                      len(value_refs), err)
+
+  def get_service_metrics(self):
+    """Returns metrics about the values held by the remote service.
+
+    Returns:
+      An instance of `executor_pb2.GetMetricsResponse`.
+    """
+    return self._stub.GetMetrics(executor_pb2.GetMetricsRequest())
+
+  async def _send_request(self, request_type, request):
+    """Sends `request` to the remote service, and awaits the response.
+
+    Args:
+      request_type: The name of the `request` oneof in `ExecuteRequest` that
+        corresponds to the type of the request, e.g., 'create_value'.
+      request: The request proto, e.g., `executor_pb2.CreateValueRequest`.
+
+    Returns:
+      The response proto, e.g., `executor_pb2.CreateValueResponse`.
+    """
+    return await self._await_in_flight(
+        lambda: self._send_request_without_limit(request_type, request))
+
+  async def _await_in_flight(self, start_fn):
+    """Starts a request, and awaits it, subject to the limit on requests.
+
+    Args:
+      start_fn: A function with no arguments that starts the request, and
+        returns an awaitable for its result. It is only called once the number
+        of requests in flight is below the limit, since a request may already
+        be sent to the remote service when its awaitable is created.
+
+    Returns:
+      The result of the request.
+    """
+    if self._max_in_flight is None:
+      return await start_fn()
+    if self._in_flight_semaphore is None:
+      self._in_flight_semaphore = asyncio.Semaphore(self._max_in_flight)
+    async with self._in_flight_semaphore:
+      return await start_fn()
+
+  async def _send_request_without_limit(self, request_type, request):
     if not self._bidi_stream:
-      response = self._stub.CreateValue(create_value_request)
+      method_name = ''.join(x.capitalize() for x in request_type.split('_'))
+      return await _wrap_grpc_future(
+          getattr(self._stub, method_name).future(request))
     else:
-      response = self._bidi_stream.send_request(
-          executor_pb2.ExecuteRequest(
-              create_value=create_value_request)).create_value
+      response = await self._bidi_stream.send_request(
+          executor_pb2.ExecuteRequest(**{request_type: request}))
+      return getattr(response, request_type)
+
+  async def create_value(self, value, type_spec=None):
+    type_spec = computation_types.to_type(type_spec)
+    if (self._value_chunk_size is not None and
+        not isinstance(value, computation_pb2.Computation)):
+      if type_spec is None:
+        type_spec = type_utils.infer_type(value)
+      if type_spec is not None:
+        return await self._create_value_stream(value, type_spec)
+    value_proto, type_spec = (
+        executor_service_utils.serialize_value(value, type_spec,
+                                               self._use_raw_tensors))
+    response = await self._send_request(
+        'create_value', executor_pb2.CreateValueRequest(value=value_proto))
+    py_typecheck.check_type(response, executor_pb2.CreateValueResponse)
+    return RemoteValue(response.value_ref, type_spec, self)
+
+  async def _create_value_stream(self, value, type_spec):
+    chunks = executor_service_utils.serialize_value_to_chunks(
+        value, type_spec, self._value_chunk_size)
+    # The first chunk is produced eagerly, so that serialization errors in the
+    # common case surface here, rather than in the thread that gRPC uses to
+    # consume the request stream.
+    chunks = itertools.chain([next(chunks)], chunks)
+    response = await self._await_in_flight(
+        lambda: _wrap_grpc_future(self._stub.CreateValueStream.future(chunks)))
     py_typecheck.check_type(response, executor_pb2.CreateValueResponse)
     return RemoteValue(response.value_ref, type_spec, self)
 
@@ -184,12 +445,7 @@ class RemoteExecutor(executor_base.Executor):
     create_call_request = executor_pb2.CreateCallRequest(
         function_ref=comp.value_ref,
         argument_ref=(arg.value_ref if arg is not None else None))
-    if not self._bidi_stream:
-      response = self._stub.CreateCall(create_call_request)
-    else:
-      response = self._bidi_stream.send_request(
-          executor_pb2.ExecuteRequest(
-              create_call=create_call_request)).create_call
+    response = await self._send_request('create_call', create_call_request)
     py_typecheck.check_type(response, executor_pb2.CreateCallResponse)
     return RemoteValue(response.value_ref, comp.type_signature.result, self)
 
@@ -205,11 +461,7 @@ class RemoteExecutor(executor_base.Executor):
       type_elem.append((k, v.type_signature) if k else v.type_signature)
     result_type = computation_types.NamedTupleType(type_elem)
     request = executor_pb2.CreateTupleRequest(element=proto_elem)
-    if not self._bidi_stream:
-      response = self._stub.CreateTuple(request)
-    else:
-      response = self._bidi_stream.send_request(
-          executor_pb2.ExecuteRequest(create_tuple=request)).create_tuple
+    response = await self._send_request('create_tuple', request)
     py_typecheck.check_type(response, executor_pb2.CreateTupleResponse)
     return RemoteValue(response.value_ref, result_type, self)
 
@@ -224,20 +476,30 @@ class RemoteExecutor(executor_base.Executor):
     else:
       py_typecheck.check_type(name, str)
       result_type = getattr(source.type_signature, name)
-    response = self._stub.CreateSelection(
-        executor_pb2.CreateSelectionRequest(
-            source_ref=source.value_ref, name=name, index=index))
+    request = executor_pb2.CreateSelectionRequest(
+        source_ref=source.value_ref, name=name, index=index)
+    response = await self._send_request('create_selection', request)
     py_typecheck.check_type(response, executor_pb2.CreateSelectionResponse)
     return RemoteValue(response.value_ref, result_type, self)
 
   async def _compute(self, value_ref):
     py_typecheck.check_type(value_ref, executor_pb2.ValueRef)
-    request = executor_pb2.ComputeRequest(value_ref=value_ref)
-    if not self._bidi_stream:
-      response = self._stub.Compute(request)
-    else:
-      response = self._bidi_stream.send_request(
-          executor_pb2.ExecuteRequest(compute=request)).compute
+    if self._value_chunk_size is not None:
+      request = executor_pb2.ComputeRequest(
+          value_ref=value_ref, chunk_size=self._value_chunk_size)
+      # The stream of chunks is consumed with blocking calls, so that happens
+      # on a separate thread in order to not block the event loop.
+      def compute_stream():
+        return executor_service_utils.deserialize_value_from_chunks(
+            self._stub.ComputeStream(request))
+
+      loop = asyncio.get_event_loop()
+      value, _ = await self._await_in_flight(
+          lambda: loop.run_in_executor(None, compute_stream))
+      return value
+    request = executor_pb2.ComputeRequest(
+        value_ref=value_ref, accept_raw_tensors=self._use_raw_tensors)
+    response = await self._send_request('compute', request)
     py_typecheck.check_type(response, executor_pb2.ComputeResponse)
     value, _ = executor_service_utils.deserialize_value(response.value)
     return value
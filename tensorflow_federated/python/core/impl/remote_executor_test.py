@@ -14,12 +14,16 @@
 # limitations under the License.
 """Tests for remote_executor.py."""
 
+import asyncio
 import collections
 import contextlib
+import threading
+import time
 
 from absl.testing import absltest
 import grpc
 from grpc.framework.foundation import logging_pool
+import numpy as np
 import portpicker
 import tensorflow as tf
 
@@ -34,7 +38,11 @@ from tensorflow_federated.python.core.impl import set_default_executor
 
 
 @contextlib.contextmanager
-def test_context(rpc_mode='REQUEST_REPLY'):
+def test_context(rpc_mode='REQUEST_REPLY',
+                 max_in_flight=None,
+                 use_raw_tensors=False,
+                 value_chunk_size=None,
+                 dispose_batch_size=1):
   port = portpicker.pick_unused_port()
   server_pool = logging_pool.pool(max_workers=1)
   server = grpc.server(server_pool)
@@ -45,11 +53,18 @@ def test_context(rpc_mode='REQUEST_REPLY'):
   executor_pb2_grpc.add_ExecutorServicer_to_server(service, server)
   server.start()
   channel = grpc.insecure_channel('localhost:{}'.format(port))
-  remote_exec = remote_executor.RemoteExecutor(channel, rpc_mode)
+  remote_exec = remote_executor.RemoteExecutor(
+      channel,
+      rpc_mode,
+      max_in_flight=max_in_flight,
+      use_raw_tensors=use_raw_tensors,
+      value_chunk_size=value_chunk_size,
+      dispose_batch_size=dispose_batch_size)
   executor = lambda_executor.LambdaExecutor(remote_exec)
   set_default_executor.set_default_executor(executor)
   try:
-    yield collections.namedtuple('_', 'executor tracer')(executor, tracer)
+    yield collections.namedtuple('_', 'executor tracer remote_executor')(
+        executor, tracer, remote_exec)
   finally:
     remote_exec.__del__()
     set_default_executor.set_default_executor()
@@ -61,6 +76,28 @@ def test_context(rpc_mode='REQUEST_REPLY'):
       server.stop(None)
 
 
+class _InFlightCountingMethod(object):
+  """Wraps a gRPC method to count the calls to `future` that are in flight."""
+
+  def __init__(self, method):
+    self._method = method
+    self._lock = threading.Lock()
+    self._num_in_flight = 0
+    self.max_num_in_flight = 0
+
+  def future(self, *args, **kwargs):
+    with self._lock:
+      self._num_in_flight += 1
+      self.max_num_in_flight = max(self.max_num_in_flight, self._num_in_flight)
+    grpc_future = self._method.future(*args, **kwargs)
+    grpc_future.add_done_callback(self._done_callback)
+    return grpc_future
+
+  def _done_callback(self, _):
+    with self._lock:
+      self._num_in_flight -= 1
+
+
 class RemoteExecutorTest(absltest.TestCase):
 
   def test_no_arg_tf_computation(self):
@@ -119,6 +156,133 @@ class RemoteExecutorTest(absltest.TestCase):
     with test_context(rpc_mode='STREAMING') as context:
       executor_test_utils.test_mnist_training(self, context.executor)
 
+  def test_with_mnist_training_example_and_in_flight_limit(self):
+    with test_context(max_in_flight=1) as context:
+      executor_test_utils.test_mnist_training(self, context.executor)
+
+  def test_with_mnist_training_example_and_raw_tensors(self):
+    with test_context(use_raw_tensors=True) as context:
+      executor_test_utils.test_mnist_training(self, context.executor)
+
+  def test_large_tensor_with_raw_tensors(self):
+    with test_context(use_raw_tensors=True):
+
+      @computations.tf_computation((tf.float32, [1000, 1000]), tf.float32)
+      def comp(x, y):
+        return x * y
+
+      x = np.arange(1000 * 1000, dtype=np.float32).reshape([1000, 1000])
+      result = comp(x, 2.0)
+      self.assertIsInstance(result, np.ndarray)
+      self.assertTrue(np.array_equal(result, x * 2.0))
+
+  def test_with_mnist_training_example_and_value_chunks(self):
+    with test_context(value_chunk_size=1024) as context:
+      executor_test_utils.test_mnist_training(self, context.executor)
+
+  def test_large_tensor_with_value_chunks(self):
+    with test_context(value_chunk_size=4096):
+
+      @computations.tf_computation((tf.float32, [1000, 1000]), tf.float32)
+      def comp(x, y):
+        return x * y
+
+      x = np.arange(1000 * 1000, dtype=np.float32).reshape([1000, 1000])
+      result = comp(x, 2.0)
+      self.assertIsInstance(result, np.ndarray)
+      self.assertTrue(np.array_equal(result, x * 2.0))
+
+  def test_value_chunks_with_in_flight_limit(self):
+    with test_context(max_in_flight=1, value_chunk_size=64) as context:
+      remote_exec = context.remote_executor
+      # pylint: disable=protected-access
+      method = _InFlightCountingMethod(remote_exec._stub.CreateValueStream)
+      remote_exec._stub.CreateValueStream = method
+      # pylint: enable=protected-access
+
+      async def create_and_compute(x):
+        value = await remote_exec.create_value(
+            np.full([100], x, dtype=np.float32))
+        return await value.compute()
+
+      results = asyncio.get_event_loop().run_until_complete(
+          asyncio.gather(*[create_and_compute(x) for x in range(5)]))
+      for x, result in enumerate(results):
+        self.assertTrue(np.array_equal(result, np.full([100], x)))
+      self.assertEqual(method.max_num_in_flight, 1)
+
+  def test_concurrent_requests_streaming_rpc(self):
+    with test_context(rpc_mode='STREAMING') as context:
+
+      @computations.tf_computation(tf.int32)
+      def comp(x):
+        return x + 1
+
+      async def compute(x):
+        fn = await context.executor.create_value(comp)
+        arg = await context.executor.create_value(x, tf.int32)
+        result = await context.executor.create_call(fn, arg)
+        return await result.compute()
+
+      results = asyncio.get_event_loop().run_until_complete(
+          asyncio.gather(*[compute(x) for x in range(20)]))
+      self.assertEqual([int(r) for r in results], list(range(1, 21)))
+
+  def test_disposes_of_values(self):
+    with test_context() as context:
+      remote_exec = context.remote_executor
+      loop = asyncio.get_event_loop()
+      value = loop.run_until_complete(remote_exec.create_value(10, tf.int32))
+      self.assertEqual(loop.run_until_complete(value.compute()), 10)
+      metrics = remote_exec.get_service_metrics()
+      self.assertEqual(metrics.num_live_values, 1)
+      self.assertEqual(metrics.num_bytes_held, 4)
+      del value
+      # Disposal does not wait for the remote service to respond.
+      for _ in range(100):
+        metrics = remote_exec.get_service_metrics()
+        if metrics.num_live_values == 0:
+          break
+        time.sleep(0.05)
+      self.assertEqual(metrics.num_live_values, 0)
+      self.assertEqual(metrics.num_disposed_values, 1)
+
+  def test_batches_disposal_of_values(self):
+    with test_context(dispose_batch_size=3) as context:
+      remote_exec = context.remote_executor
+      loop = asyncio.get_event_loop()
+      values = [
+          loop.run_until_complete(remote_exec.create_value(x, tf.int32))
+          for x in range(3)
+      ]
+      values[0].dispose()
+      values[1].dispose()
+      time.sleep(0.5)
+      self.assertEqual(remote_exec.get_service_metrics().num_live_values, 3)
+      remote_exec.flush_disposed_values()
+      for _ in range(100):
+        metrics = remote_exec.get_service_metrics()
+        if metrics.num_live_values == 1:
+          break
+        time.sleep(0.05)
+      self.assertEqual(metrics.num_live_values, 1)
+      self.assertEqual(loop.run_until_complete(values[2].compute()), 2)
+
+  def test_raises_with_invalid_max_in_flight(self):
+    channel = grpc.insecure_channel('localhost:0')
+    with self.assertRaises(ValueError):
+      remote_executor.RemoteExecutor(channel, max_in_flight=0)
+
+  def test_raises_with_invalid_value_chunk_size(self):
+    channel = grpc.insecure_channel('localhost:0')
+    with self.assertRaises(ValueError):
+      remote_executor.RemoteExecutor(channel, value_chunk_size=0)
+
+  def test_raises_with_invalid_dispose_batch_size(self):
+    channel = grpc.insecure_channel('localhost:0')
+    with self.assertRaises(ValueError):
+      remote_executor.RemoteExecutor(channel, dispose_batch_size=0)
+
 
 if __name__ == '__main__':
   tf.compat.v1.enable_v2_behavior()
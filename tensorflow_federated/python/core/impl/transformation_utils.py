@@ -32,7 +32,8 @@ from tensorflow_federated.python.core.impl import type_utils
 from tensorflow_federated.python.core.impl.compiler import building_blocks
 
 
-def transform_postorder(comp, transform):
+def transform_postorder(comp, transform, should_skip=None,
+                        should_terminate=None):
   """Traverses `comp` recursively postorder and replaces its constituents.
 
   For each element of `comp` viewed as an expression tree, the transformation
@@ -49,6 +50,10 @@ def transform_postorder(comp, transform):
   Therefore, `f` is transformed into `f'`, next `x` into `x'` and finally,
   `Call(f',x')` is transformed at the end.
 
+  NOTE: The traversal is implemented with an explicit stack rather than with
+  recursion, so the depth of `comp` is not limited by the Python recursion
+  limit.
+
   Args:
     comp: A `computation_building_block.ComputationBuildingBlock` to traverse
       and transform bottom-up.
@@ -59,6 +64,16 @@ def transform_postorder(comp, transform):
       representing either the original building block or a transformed building
       block and the bool is a flag indicating if the building block was modified
       as.
+    should_skip: An optional Python function that accepts a building block, and
+      returns `True` if the building block should be left as it is, in which
+      case neither the building block nor any of the building blocks it is
+      parameterized by are traversed or transformed. Can be used to skip
+      subtrees which are known not to change.
+    should_terminate: An optional Python function that accepts a transformed
+      building block, and returns `True` if the traversal should stop. Once it
+      does, no further building blocks are transformed; the building blocks
+      which have not been visited yet are left as they are, and the ancestors of
+      the transformed building blocks are only rebuilt to contain them.
 
   Returns:
     The result of applying `transform` to parts of `comp` in a bottom-up
@@ -71,63 +86,11 @@ def transform_postorder(comp, transform):
       that is currently not recognized.
   """
   py_typecheck.check_type(comp, building_blocks.ComputationBuildingBlock)
-  if isinstance(comp, (
-      building_blocks.CompiledComputation,
-      building_blocks.Data,
-      building_blocks.Intrinsic,
-      building_blocks.Placement,
-      building_blocks.Reference,
-  )):
-    return transform(comp)
-  elif isinstance(comp, building_blocks.Selection):
-    source, source_modified = transform_postorder(comp.source, transform)
-    if source_modified:
-      comp = building_blocks.Selection(source, comp.name, comp.index)
-    comp, comp_modified = transform(comp)
-    return comp, comp_modified or source_modified
-  elif isinstance(comp, building_blocks.Tuple):
-    elements = []
-    elements_modified = False
-    for key, value in anonymous_tuple.to_elements(comp):
-      value, value_modified = transform_postorder(value, transform)
-      elements.append((key, value))
-      elements_modified = elements_modified or value_modified
-    if elements_modified:
-      comp = building_blocks.Tuple(elements)
-    comp, comp_modified = transform(comp)
-    return comp, comp_modified or elements_modified
-  elif isinstance(comp, building_blocks.Call):
-    fn, fn_modified = transform_postorder(comp.function, transform)
-    if comp.argument is not None:
-      arg, arg_modified = transform_postorder(comp.argument, transform)
-    else:
-      arg, arg_modified = (None, False)
-    if fn_modified or arg_modified:
-      comp = building_blocks.Call(fn, arg)
-    comp, comp_modified = transform(comp)
-    return comp, comp_modified or fn_modified or arg_modified
-  elif isinstance(comp, building_blocks.Lambda):
-    result, result_modified = transform_postorder(comp.result, transform)
-    if result_modified:
-      comp = building_blocks.Lambda(comp.parameter_name, comp.parameter_type,
-                                    result)
-    comp, comp_modified = transform(comp)
-    return comp, comp_modified or result_modified
-  elif isinstance(comp, building_blocks.Block):
-    variables = []
-    variables_modified = False
-    for key, value in comp.locals:
-      value, value_modified = transform_postorder(value, transform)
-      variables.append((key, value))
-      variables_modified = variables_modified or value_modified
-    result, result_modified = transform_postorder(comp.result, transform)
-    if variables_modified or result_modified:
-      comp = building_blocks.Block(variables, result)
-    comp, comp_modified = transform(comp)
-    return comp, comp_modified or variables_modified or result_modified
-  else:
-    raise NotImplementedError(
-        'Unrecognized computation building block: {}'.format(str(comp)))
+  return _transform_postorder_iteratively(
+      comp,
+      transform,
+      should_skip=should_skip,
+      should_terminate=should_terminate)
 
 
 def transform_postorder_with_symbol_bindings(comp, transform, symbol_tree):
@@ -186,114 +149,186 @@ def transform_postorder_with_symbol_bindings(comp, transform, symbol_tree):
     raise TypeError('Argument `transform` to '
                     '`transform_postorder_with_symbol_bindings` must '
                     'be callable.')
-  identifier_seq = itertools.count(start=1)
+  return _transform_postorder_iteratively(
+      comp, transform, symbol_tree=symbol_tree)
 
-  def _transform_postorder_with_symbol_bindings_switch(comp, transform_fn,
-                                                       ctxt_tree,
-                                                       identifier_sequence):
-    """Recursive helper function delegated to after binding comp_id sequence."""
-    if isinstance(comp, (building_blocks.CompiledComputation,
-                         building_blocks.Data, building_blocks.Intrinsic,
-                         building_blocks.Placement, building_blocks.Reference)):
-      return _traverse_leaf(comp, transform_fn, ctxt_tree, identifier_sequence)
-    elif isinstance(comp, building_blocks.Selection):
-      return _traverse_selection(comp, transform, ctxt_tree,
-                                 identifier_sequence)
-    elif isinstance(comp, building_blocks.Tuple):
-      return _traverse_tuple(comp, transform, ctxt_tree, identifier_sequence)
-    elif isinstance(comp, building_blocks.Call):
-      return _traverse_call(comp, transform, ctxt_tree, identifier_sequence)
-    elif isinstance(comp, building_blocks.Lambda):
-      return _traverse_lambda(comp, transform, ctxt_tree, identifier_sequence)
-    elif isinstance(comp, building_blocks.Block):
-      return _traverse_block(comp, transform, ctxt_tree, identifier_sequence)
-    else:
-      raise NotImplementedError(
-          'Unrecognized computation building block: {}'.format(str(comp)))
-
-  def _traverse_leaf(comp, transform, context_tree, identifier_seq):
-    """Helper function holding traversal logic for leaf nodes."""
-    _ = six.next(identifier_seq)
-    return transform(comp, context_tree)
-
-  def _traverse_selection(comp, transform, context_tree, identifier_seq):
-    """Helper function holding traversal logic for selection nodes."""
-    _ = six.next(identifier_seq)
-    source, source_modified = _transform_postorder_with_symbol_bindings_switch(
-        comp.source, transform, context_tree, identifier_seq)
-    if source_modified:
-      comp = building_blocks.Selection(source, comp.name, comp.index)
-    comp, comp_modified = transform(comp, context_tree)
-    return comp, comp_modified or source_modified
-
-  def _traverse_tuple(comp, transform, context_tree, identifier_seq):
-    """Helper function holding traversal logic for tuple nodes."""
-    _ = six.next(identifier_seq)
-    elements = []
-    elements_modified = False
-    for key, value in anonymous_tuple.to_elements(comp):
-      value, value_modified = _transform_postorder_with_symbol_bindings_switch(
-          value, transform, context_tree, identifier_seq)
-      elements.append((key, value))
-      elements_modified = elements_modified or value_modified
-    if elements_modified:
-      comp = building_blocks.Tuple(elements)
-    comp, comp_modified = transform(comp, context_tree)
-    return comp, comp_modified or elements_modified
-
-  def _traverse_call(comp, transform, context_tree, identifier_seq):
-    """Helper function holding traversal logic for call nodes."""
-    _ = six.next(identifier_seq)
-    fn, fn_modified = _transform_postorder_with_symbol_bindings_switch(
-        comp.function, transform, context_tree, identifier_seq)
+
+def _get_children(comp):
+  """Returns the list of building blocks `comp` is parameterized by.
+
+  The children are listed in the order in which they are traversed, i.e., the
+  order in which they are listed in the building block constructors.
+
+  Args:
+    comp: An instance of `building_blocks.ComputationBuildingBlock`.
+
+  Raises:
+    NotImplementedError: If `comp` is a kind of computation building block that
+      is currently not recognized.
+  """
+  if isinstance(comp, (
+      building_blocks.CompiledComputation,
+      building_blocks.Data,
+      building_blocks.Intrinsic,
+      building_blocks.Placement,
+      building_blocks.Reference,
+  )):
+    return []
+  elif isinstance(comp, building_blocks.Selection):
+    return [comp.source]
+  elif isinstance(comp, building_blocks.Tuple):
+    return [value for _, value in anonymous_tuple.to_elements(comp)]
+  elif isinstance(comp, building_blocks.Call):
+    if comp.argument is not None:
+      return [comp.function, comp.argument]
+    return [comp.function]
+  elif isinstance(comp, building_blocks.Lambda):
+    return [comp.result]
+  elif isinstance(comp, building_blocks.Block):
+    return [value for _, value in comp.locals] + [comp.result]
+  else:
+    raise NotImplementedError(
+        'Unrecognized computation building block: {}'.format(str(comp)))
+
+
+def _rebuild_with_children(comp, children):
+  """Returns a copy of `comp` parameterized by `children` instead."""
+  if isinstance(comp, building_blocks.Selection):
+    source, = children
+    return building_blocks.Selection(source, comp.name, comp.index)
+  elif isinstance(comp, building_blocks.Tuple):
+    names = [name for name, _ in anonymous_tuple.to_elements(comp)]
+    return building_blocks.Tuple(list(zip(names, children)))
+  elif isinstance(comp, building_blocks.Call):
     if comp.argument is not None:
-      arg, arg_modified = _transform_postorder_with_symbol_bindings_switch(
-          comp.argument, transform, context_tree, identifier_seq)
+      fn, arg = children
     else:
-      arg, arg_modified = (None, False)
-    if fn_modified or arg_modified:
-      comp = building_blocks.Call(fn, arg)
-    comp, comp_modified = transform(comp, context_tree)
-    return comp, comp_modified or fn_modified or arg_modified
-
-  def _traverse_lambda(comp, transform, context_tree, identifier_seq):
-    """Helper function holding traversal logic for lambda nodes."""
-    comp_id = six.next(identifier_seq)
-    context_tree.drop_scope_down(comp_id)
-    context_tree.ingest_variable_binding(name=comp.parameter_name, value=None)
-    result, result_modified = _transform_postorder_with_symbol_bindings_switch(
-        comp.result, transform, context_tree, identifier_seq)
-    context_tree.walk_to_scope_beginning()
-    if result_modified:
-      comp = building_blocks.Lambda(comp.parameter_name, comp.parameter_type,
-                                    result)
-    comp, comp_modified = transform(comp, context_tree)
-    context_tree.pop_scope_up()
-    return comp, comp_modified or result_modified
-
-  def _traverse_block(comp, transform, context_tree, identifier_seq):
-    """Helper function holding traversal logic for block nodes."""
+      fn, = children
+      arg = None
+    return building_blocks.Call(fn, arg)
+  elif isinstance(comp, building_blocks.Lambda):
+    result, = children
+    return building_blocks.Lambda(comp.parameter_name, comp.parameter_type,
+                                  result)
+  elif isinstance(comp, building_blocks.Block):
+    names = [name for name, _ in comp.locals]
+    return building_blocks.Block(
+        list(zip(names, children[:-1])), children[-1])
+  else:
+    raise NotImplementedError(
+        'Unrecognized computation building block: {}'.format(str(comp)))
+
+
+class _TraversalFrame(object):
+  """The state of a building block on the stack of a traversal."""
+
+  __slots__ = ('comp', 'children', 'transformed_children', 'modified',
+               'defines_scope', 'local_names')
+
+  def __init__(self, comp, defines_scope, local_names=()):
+    self.comp = comp
+    self.children = _get_children(comp)
+    self.transformed_children = []
+    self.modified = False
+    self.defines_scope = defines_scope
+    # The names bound by the children of a `building_blocks.Block`, in order.
+    self.local_names = local_names
+
+
+def _transform_postorder_iteratively(comp,
+                                     transform,
+                                     symbol_tree=None,
+                                     should_skip=None,
+                                     should_terminate=None):
+  """Implements the postorder traversals above with an explicit stack.
+
+  Each building block on the path from `comp` to the building block being
+  visited has a `_TraversalFrame` on the stack, holding its already transformed
+  children. A building block is transformed, and its transformed version handed
+  to the frame of its parent, once all its children have been.
+
+  If `symbol_tree` is given, `transform` is called with it as a second argument,
+  and the `symbol_tree` is updated in the same order as it would be by a
+  recursive traversal: a scope is entered (with the preorder identifier of the
+  scope-defining building block) when a `building_blocks.Lambda` or
+  `building_blocks.Block` is first visited; the parameter of a `Lambda` is
+  bound before its result is traversed, and each local of a `Block` is bound
+  right after it has been transformed; and the scope is left after the
+  scope-defining building block itself has been transformed.
+
+  Args:
+    comp: The `building_blocks.ComputationBuildingBlock` to transform.
+    transform: The transformation to apply to each building block.
+    symbol_tree: An optional `SymbolTree` to maintain during the traversal.
+    should_skip: See `transform_postorder`.
+    should_terminate: See `transform_postorder`.
+
+  Returns:
+    A tuple of the transformed `comp`, and a Boolean indicating whether it was
+    modified.
+  """
+  if should_skip is not None and should_skip(comp):
+    return comp, False
+  identifier_seq = itertools.count(start=1)
+  terminated = False
+
+  def _enter(comp):
     comp_id = six.next(identifier_seq)
-    context_tree.drop_scope_down(comp_id)
-    variables = []
-    variables_modified = False
-    for key, value in comp.locals:
-      value, value_modified = _transform_postorder_with_symbol_bindings_switch(
-          value, transform, context_tree, identifier_seq)
-      context_tree.ingest_variable_binding(name=key, value=value)
-      variables.append((key, value))
-      variables_modified = variables_modified or value_modified
-    result, result_modified = _transform_postorder_with_symbol_bindings_switch(
-        comp.result, transform, context_tree, identifier_seq)
-    context_tree.walk_to_scope_beginning()
-    if variables_modified or result_modified:
-      comp = building_blocks.Block(variables, result)
-    comp, comp_modified = transform(comp, context_tree)
-    context_tree.pop_scope_up()
-    return comp, comp_modified or variables_modified or result_modified
-
-  return _transform_postorder_with_symbol_bindings_switch(
-      comp, transform, symbol_tree, identifier_seq)
+    defines_scope = symbol_tree is not None and isinstance(
+        comp, (building_blocks.Lambda, building_blocks.Block))
+    if defines_scope and isinstance(comp, building_blocks.Block):
+      # `Block.locals` constructs a new list on each access, so the names are
+      # only read once.
+      frame = _TraversalFrame(comp, defines_scope,
+                              tuple(name for name, _ in comp.locals))
+    else:
+      frame = _TraversalFrame(comp, defines_scope)
+    if defines_scope:
+      symbol_tree.drop_scope_down(comp_id)
+      if isinstance(comp, building_blocks.Lambda):
+        symbol_tree.ingest_variable_binding(
+            name=comp.parameter_name, value=None)
+    return frame
+
+  def _add_transformed_child(frame, child, child_modified):
+    index = len(frame.transformed_children)
+    frame.transformed_children.append(child)
+    frame.modified = frame.modified or child_modified
+    if index < len(frame.local_names):
+      symbol_tree.ingest_variable_binding(
+          name=frame.local_names[index], value=child)
+
+  stack = [_enter(comp)]
+  while True:
+    frame = stack[-1]
+    index = len(frame.transformed_children)
+    if index < len(frame.children):
+      child = frame.children[index]
+      if terminated or (should_skip is not None and should_skip(child)):
+        _add_transformed_child(frame, child, False)
+      else:
+        stack.append(_enter(child))
+      continue
+    stack.pop()
+    comp = frame.comp
+    if frame.modified:
+      comp = _rebuild_with_children(comp, frame.transformed_children)
+    if frame.defines_scope:
+      symbol_tree.walk_to_scope_beginning()
+    comp_modified = False
+    if not terminated:
+      if symbol_tree is not None:
+        comp, comp_modified = transform(comp, symbol_tree)
+      else:
+        comp, comp_modified = transform(comp)
+      if should_terminate is not None and should_terminate(comp):
+        terminated = True
+    if frame.defines_scope:
+      symbol_tree.pop_scope_up()
+    modified = frame.modified or comp_modified
+    if not stack:
+      return comp, modified
+    _add_transformed_child(stack[-1], comp, modified)
 
 
 class SymbolTree(object):
@@ -174,6 +174,23 @@ def _get_number_of_nodes_via_transform_postorder_with_symbol_bindings(
   return count[0]
 
 
+def _create_chained_calls(depth):
+  """Returns `f(f(...f(x)...))` with `depth` nested calls, and the leaf `x`."""
+  fn = building_blocks.Reference(
+      'f', computation_types.FunctionType(tf.int32, tf.int32))
+  leaf = building_blocks.Data('x', tf.int32)
+  comp = leaf
+  for _ in range(depth):
+    comp = building_blocks.Call(fn, comp)
+  return comp, leaf
+
+
+def _get_innermost_argument(comp):
+  while isinstance(comp, building_blocks.Call):
+    comp = comp.argument
+  return comp
+
+
 class TransformationUtilsTest(parameterized.TestCase):
 
   def test_transform_postorder_fails_on_none_comp(self):
@@ -319,6 +336,71 @@ class TransformationUtilsTest(parameterized.TestCase):
 
     self.assertEqual(leaf_name_order, list(postorder_nodes))
 
+  def test_transform_postorder_transforms_deep_computation(self):
+    comp, _ = _create_chained_calls(100000)
+
+    def transform(comp):
+      if isinstance(comp, building_blocks.Data):
+        return building_blocks.Data('y', tf.int32), True
+      return comp, False
+
+    transformed_comp, modified = transformation_utils.transform_postorder(
+        comp, transform)
+
+    self.assertTrue(modified)
+    self.assertEqual(_get_innermost_argument(transformed_comp).uri, 'y')
+
+  def test_transform_postorder_skips_subtrees(self):
+    data_x = building_blocks.Data('x', tf.int32)
+    data_y = building_blocks.Data('y', tf.int32)
+    comp = building_blocks.Tuple([building_blocks.Tuple([data_x]), data_y])
+    visited_comps = []
+
+    def transform(comp):
+      visited_comps.append(comp)
+      if isinstance(comp, building_blocks.Data):
+        return building_blocks.Data('z', tf.int32), True
+      return comp, False
+
+    transformed_comp, modified = transformation_utils.transform_postorder(
+        comp,
+        transform,
+        should_skip=lambda comp: isinstance(comp, building_blocks.Tuple))
+
+    self.assertIs(transformed_comp, comp)
+    self.assertFalse(modified)
+    self.assertEmpty(visited_comps)
+
+    inner_tuple = comp[0]
+    transformed_comp, modified = transformation_utils.transform_postorder(
+        comp, transform, should_skip=lambda comp: comp is inner_tuple)
+
+    self.assertEqual(transformed_comp.compact_representation(), '<<x>,z>')
+    self.assertTrue(modified)
+    self.assertNotIn(data_x, visited_comps)
+
+  def test_transform_postorder_terminates_early(self):
+    comp = building_blocks.Tuple([
+        building_blocks.Data('x', tf.int32),
+        building_blocks.Data('y', tf.int32),
+    ])
+    visited_uris = []
+
+    def transform(comp):
+      if isinstance(comp, building_blocks.Data):
+        visited_uris.append(comp.uri)
+        return building_blocks.Data('z', tf.int32), True
+      return comp, False
+
+    transformed_comp, modified = transformation_utils.transform_postorder(
+        comp,
+        transform,
+        should_terminate=lambda comp: isinstance(comp, building_blocks.Data))
+
+    self.assertEqual(transformed_comp.compact_representation(), '<z,y>')
+    self.assertTrue(modified)
+    self.assertEqual(visited_uris, ['x'])
+
   # TODO(b/113123410): Add more tests for corner cases of `transform_preorder`.
 
   def test_transform_postorder_with_symbol_bindings_fails_on_none_comp(self):
@@ -559,6 +641,32 @@ class TransformationUtilsTest(parameterized.TestCase):
     self.assertEqual(value_holder[1].name, 'x')
     self.assertEqual(value_holder[1].value, arg2)
 
+  def test_transform_postorder_with_symbol_bindings_binds_deep_block_locals(
+      self):
+    data = building_blocks.Data('input_data', tf.int32)
+    ref = building_blocks.Reference('x', tf.int32)
+    comp = ref
+    for _ in range(100000):
+      comp = building_blocks.Block([('x', ref)], comp)
+    comp = building_blocks.Block([('x', data)], comp)
+    empty_symbol_tree = transformation_utils.SymbolTree(UpdatableTracker)
+    values = []
+
+    def transform(comp, ctxt_tree):
+      if isinstance(comp, building_blocks.Reference):
+        values.append(ctxt_tree.get_payload_with_name(comp.name).value)
+      return comp, False
+
+    transformed_comp, modified = (
+        transformation_utils.transform_postorder_with_symbol_bindings(
+            comp, transform, empty_symbol_tree))
+
+    self.assertIs(transformed_comp, comp)
+    self.assertFalse(modified)
+    self.assertLen(values, 100001)
+    self.assertIs(values[0], data)
+    self.assertIs(values[-1], ref)
+
   def test_symbol_tree_initializes(self):
     symbol_tree = transformation_utils.SymbolTree(FakeTracker)
     self.assertIsInstance(symbol_tree.active_node.payload,
@@ -76,6 +76,74 @@ def _apply_transforms(comp, transforms):
   return transformation_utils.transform_postorder(comp, _transform)
 
 
+def apply_transforms_to_fixed_point(comp, transforms):
+  """Applies all `transforms` in a single walk of `comp`, to a fixed point.
+
+  Like `_apply_transforms`, this function fuses `transforms` into a single
+  postorder walk of `comp`. Additionally, whenever any of `transforms` changes a
+  computation, the result is walked again, so that none of `transforms` apply
+  anywhere in the returned computation. The subtrees which have already been
+  walked are not walked again, which makes reaching the fixed point about as
+  expensive as the single walk, unless the transformations keep rewriting the
+  computations they produce.
+
+  The same caveats as for `_apply_transforms` apply: the transformations must
+  be local, i.e., each must depend only on the computation passed to its
+  `transform` method, and terminate when applied repeatedly.
+
+  Args:
+    comp: An instance of `building_blocks.ComputationBuildingBlock` to
+      transform with all elements of `transforms`.
+    transforms: An instance of `transformation_utils.TransformSpec` or iterable
+      thereof, the transformations to apply to `comp`.
+
+  Returns:
+    A transformed version of `comp`, with all transformations in `transforms`
+    applied, and a boolean indicating whether `comp` has changed.
+
+  Raises:
+    TypeError: If the types don't match.
+    ValueError: If any of `transforms` is a global transformation.
+  """
+  py_typecheck.check_type(comp, building_blocks.ComputationBuildingBlock)
+  if isinstance(transforms, transformation_utils.TransformSpec):
+    transforms = [transforms]
+  else:
+    transforms = list(transforms)
+    for transform in transforms:
+      py_typecheck.check_type(transform, transformation_utils.TransformSpec)
+  for transform in transforms:
+    if transform.global_transform:
+      raise ValueError(
+          'Only local transformations can be applied to a fixed point, found '
+          'a global transformation {}.'.format(transform))
+
+  # Maps the ids of the computations already at the fixed point to these
+  # computations, which also keeps them alive, so that the ids are not reused.
+  fixed_points = {}
+
+  def _is_fixed_point(comp):
+    return id(comp) in fixed_points
+
+  def _transform(comp):
+    transformed_comp = comp
+    modified = False
+    for transform in transforms:
+      transformed_comp, transform_modified = transform.transform(
+          transformed_comp)
+      modified = modified or transform_modified
+    if transformed_comp is not comp:
+      comp, _ = _walk(transformed_comp)
+    fixed_points[id(comp)] = comp
+    return comp, modified
+
+  def _walk(comp):
+    return transformation_utils.transform_postorder(
+        comp, _transform, should_skip=_is_fixed_point)
+
+  return _walk(comp)
+
+
 def remove_lambdas_and_blocks(comp):
   """Removes any called lambdas and blocks from `comp`.
 
@@ -917,6 +985,11 @@ def remove_duplicate_computations(comp):
   building blocks from `comp`. Additionally, Blocks variables whose value is a
   Reference and References pointing to References are removed.
 
+  The bound values equal to the one being referenced are found through a
+  hash-cons table keyed by their `structural_hash`, rather than by comparing the
+  value with every visible binding, so the transform takes time close to linear
+  in the size of `comp`.
+
   Args:
     comp: The computation building block in which to perform the removals.
 
@@ -962,13 +1035,8 @@ def remove_duplicate_computations(comp):
           return comp, True
         else:
           value = new_value
-      payloads_with_value = symbol_tree.get_all_payloads_with_value(
-          value, _computations_equal)
-      if payloads_with_value:
-        highest_payload = payloads_with_value[-1]
-        lower_payloads = payloads_with_value[:-1]
-        for payload in lower_payloads:
-          symbol_tree.update_payload_with_name(payload.name)
+      highest_payload = symbol_tree.update_lower_payloads_with_value(value)
+      if highest_payload is not None:
         comp = building_blocks.Reference(highest_payload.name,
                                          highest_payload.value.type_signature)
         return comp, True
@@ -992,17 +1060,146 @@ def remove_duplicate_computations(comp):
       return 'Name: {}; value: {}; removed: {}'.format(self.name, self.value,
                                                        self.removed)
 
-  symbol_tree = transformation_utils.SymbolTree(TrackRemovedReferences)
+  symbol_tree = _HashConsingSymbolTree(TrackRemovedReferences,
+                                       _computations_equal)
   return transformation_utils.transform_postorder_with_symbol_bindings(
       comp, _transform, symbol_tree)
 
 
-def remove_mapped_or_applied_identity(comp):
+class _EquivalentBindings(object):
+  """The bindings of equal values, ordered from the highest to the lowest."""
+
+  __slots__ = ('nodes', 'num_updated')
+
+  def __init__(self, node):
+    self.nodes = [node]
+    # The number of leading `nodes` whose payloads must not be updated again;
+    # the highest one, followed by the ones which already have been.
+    self.num_updated = 1
+
+
+class _HashConsingSymbolTree(transformation_utils.SymbolTree):
+  """A `SymbolTree` which indexes the bindings in the open scopes.
+
+  `SymbolTree` resolves names and values by walking from the active node
+  through all of the older siblings and parents, which makes each lookup linear
+  in the number of the visible bindings and a transformation looking up every
+  `building_blocks.Reference` quadratic in the size of the computation. This
+  class additionally maintains a table mapping the names of the bindings in the
+  currently open scopes to these bindings, and a hash-cons table grouping these
+  bindings into classes of equal values, keyed by the `structural_hash` of the
+  values. Equality is only ever tested against the highest binding in each
+  class with the same hash, which makes the lookups independent of the number
+  of bindings in scope.
+
+  The tables are maintained as the AST is walked by
+  `transformation_utils.transform_postorder_with_symbol_bindings`, and reflect
+  all the bindings ingested in the scopes which have been dropped down into and
+  not yet popped up from. This is exactly the set of bindings visible to the
+  computations being transformed, but unlike in `SymbolTree`, the lookups do
+  not account for moving `active_node` back with `walk_to_scope_beginning`.
+  This class requires the names of the bindings to be unique.
+  """
+
+  def __init__(self, payload_type, equal_fn):
+    """Initializes `_HashConsingSymbolTree`.
+
+    Args:
+      payload_type: Class which subclasses BoundVariableTracker; the type of
+        payloads to be constructed and held in this SymbolTree.
+      equal_fn: The function to use to determine equality of the values of the
+        bindings, consistent with their `structural_hash`.
+    """
+    super(_HashConsingSymbolTree, self).__init__(payload_type)
+    self._equal_fn = equal_fn
+    self._scopes = [[]]
+    self._nodes_by_name = {}
+    self._bindings_by_hash = {}
+
+  def _get_equivalent_bindings(self, value):
+    for bindings in self._bindings_by_hash.get(value.structural_hash, []):
+      if self._equal_fn(value, bindings.nodes[0].payload.value):
+        return bindings
+    return None
+
+  def get_payload_with_name(self, name):
+    node = self._nodes_by_name.get(name)
+    if node is None:
+      return super(_HashConsingSymbolTree, self).get_payload_with_name(name)
+    return node.payload
+
+  def update_payload_with_name(self, name):
+    node = self._nodes_by_name.get(name)
+    if node is None:
+      super(_HashConsingSymbolTree, self).update_payload_with_name(name)
+    else:
+      node.payload.update(name)
+
+  def update_lower_payloads_with_value(self, value):
+    """Updates all but the highest of the payloads equal to `value`.
+
+    Unlike with `update_payload_with_name`, `update` is called at most once on
+    each payload, no matter how many times this method is called.
+
+    Args:
+      value: The value to look up.
+
+    Returns:
+      The highest payload whose `value` is equal to `value`, or `None` if there
+      is no such payload.
+    """
+    bindings = self._get_equivalent_bindings(value)
+    if bindings is None:
+      return None
+    for node in bindings.nodes[bindings.num_updated:]:
+      node.payload.update(node.payload.name)
+    bindings.num_updated = len(bindings.nodes)
+    return bindings.nodes[0].payload
+
+  def pop_scope_up(self):
+    super(_HashConsingSymbolTree, self).pop_scope_up()
+    # The bindings in a scope are ingested after all the bindings in the
+    # enclosing scopes, so they are always at the end of their classes.
+    for node in reversed(self._scopes.pop()):
+      del self._nodes_by_name[node.payload.name]
+      if node.payload.value is None:
+        continue
+      key = node.payload.value.structural_hash
+      bindings = self._get_equivalent_bindings(node.payload.value)
+      bindings.nodes.pop()
+      bindings.num_updated = min(bindings.num_updated, len(bindings.nodes))
+      if not bindings.nodes:
+        self._bindings_by_hash[key].remove(bindings)
+        if not self._bindings_by_hash[key]:
+          del self._bindings_by_hash[key]
+
+  def drop_scope_down(self, comp_id):
+    super(_HashConsingSymbolTree, self).drop_scope_down(comp_id)
+    self._scopes.append([])
+
+  def ingest_variable_binding(self, name, value):
+    if name in self._nodes_by_name:
+      raise ValueError(
+          'The name \'{}\' is already bound in an open scope.'.format(name))
+    super(_HashConsingSymbolTree, self).ingest_variable_binding(name, value)
+    node = self.active_node
+    self._scopes[-1].append(node)
+    self._nodes_by_name[name] = node
+    if value is None:
+      return
+    bindings = self._get_equivalent_bindings(value)
+    if bindings is None:
+      self._bindings_by_hash.setdefault(value.structural_hash, []).append(
+          _EquivalentBindings(node))
+    else:
+      bindings.nodes.append(node)
+
+
+class RemoveMappedOrAppliedIdentity(transformation_utils.TransformSpec):
   r"""Removes all the mapped or applied identity functions in `comp`.
 
-  This transform traverses `comp` postorder, matches the following pattern, and
-  removes all the mapped or applied identity fucntions by replacing the
-  following computation:
+  This transform matches the following pattern, and removes all the mapped or
+  applied identity fucntions by replacing the following computation:
 
             Call
            /    \
@@ -1019,19 +1216,13 @@ def remove_mapped_or_applied_identity(comp):
   Comp(y)
 
   y
-
-  Args:
-    comp: The computation building block in which to perform the removals.
-
-  Returns:
-    A new computation with the transformation applied or the original `comp`.
-
-  Raises:
-    TypeError: If types do not match.
   """
-  py_typecheck.check_type(comp, building_blocks.ComputationBuildingBlock)
 
-  def _should_transform(comp):
+  def __init__(self, comp):
+    super(RemoveMappedOrAppliedIdentity, self).__init__()
+    py_typecheck.check_type(comp, building_blocks.ComputationBuildingBlock)
+
+  def should_transform(self, comp):
     """Returns `True` if `comp` is a mapped or applied identity function."""
     if (isinstance(comp, building_blocks.Call) and
         isinstance(comp.function, building_blocks.Intrinsic) and
@@ -1045,13 +1236,29 @@ def remove_mapped_or_applied_identity(comp):
       return building_block_analysis.is_identity_function(called_function)
     return False
 
-  def _transform(comp):
-    if not _should_transform(comp):
+  def transform(self, comp):
+    if not self.should_transform(comp):
       return comp, False
     transformed_comp = comp.argument[1]
     return transformed_comp, True
 
-  return transformation_utils.transform_postorder(comp, _transform)
+
+def remove_mapped_or_applied_identity(comp):
+  r"""Removes all the mapped or applied identity functions in `comp`.
+
+  This transform traverses `comp` postorder, and applies
+  `RemoveMappedOrAppliedIdentity` to each of the computations.
+
+  Args:
+    comp: The computation building block in which to perform the removals.
+
+  Returns:
+    A new computation with the transformation applied or the original `comp`.
+
+  Raises:
+    TypeError: If types do not match.
+  """
+  return _apply_transforms(comp, RemoveMappedOrAppliedIdentity(comp))
 
 
 class ReplaceCalledLambdaWithBlock(transformation_utils.TransformSpec):
@@ -1753,52 +1960,66 @@ def _computations_equal(comp_1, comp_2):
   """
   py_typecheck.check_type(comp_1, building_blocks.ComputationBuildingBlock)
   py_typecheck.check_type(comp_2, building_blocks.ComputationBuildingBlock)
-  if comp_1 is comp_2:
-    return True
-  # The unidiomatic-typecheck is intentional, for the purposes of equality this
-  # function requires that the types are identical and that a subclass will not
-  # be equal to it's baseclass.
-  if type(comp_1) != type(comp_2):  # pylint: disable=unidiomatic-typecheck
-    return False
-  if comp_1.type_signature != comp_2.type_signature:
-    return False
-  if isinstance(comp_1, building_blocks.Block):
-    if not _computations_equal(comp_1.result, comp_2.result):
+  # The pairs of computations are compared using an explicit worklist rather
+  # than recursion, so that deep computations can be compared.
+  pairs = [(comp_1, comp_2)]
+  while pairs:
+    comp_1, comp_2 = pairs.pop()
+    if comp_1 is comp_2:
+      continue
+    # The unidiomatic-typecheck is intentional, for the purposes of equality
+    # this function requires that the types are identical and that a subclass
+    # will not be equal to it's baseclass.
+    if type(comp_1) != type(comp_2):  # pylint: disable=unidiomatic-typecheck
       return False
-    if len(comp_1.locals) != len(comp_2.locals):
+    if comp_1.type_signature != comp_2.type_signature:
       return False
-    for (name_1, value_1), (name_2, value_2) in zip(comp_1.locals,
-                                                    comp_2.locals):
-      if name_1 != name_2 or not _computations_equal(value_1, value_2):
+    if isinstance(comp_1, building_blocks.Block):
+      if len(comp_1.locals) != len(comp_2.locals):
         return False
-    return True
-  elif isinstance(comp_1, building_blocks.Call):
-    return (_computations_equal(comp_1.function, comp_2.function) and
-            (comp_1.argument is None and comp_2.argument is None or
-             _computations_equal(comp_1.argument, comp_2.argument)))
-  elif isinstance(comp_1, building_blocks.CompiledComputation):
-    return comp_1.proto == comp_2.proto
-  elif isinstance(comp_1, building_blocks.Data):
-    return comp_1.uri == comp_2.uri
-  elif isinstance(comp_1, building_blocks.Intrinsic):
-    return comp_1.uri == comp_2.uri
-  elif isinstance(comp_1, building_blocks.Lambda):
-    return (comp_1.parameter_name == comp_2.parameter_name and
-            comp_1.parameter_type == comp_2.parameter_type and
-            _computations_equal(comp_1.result, comp_2.result))
-  elif isinstance(comp_1, building_blocks.Placement):
-    return comp_1.uri == comp_2.uri
-  elif isinstance(comp_1, building_blocks.Reference):
-    return comp_1.name == comp_2.name
-  elif isinstance(comp_1, building_blocks.Selection):
-    return (_computations_equal(comp_1.source, comp_2.source) and
-            comp_1.name == comp_2.name and comp_1.index == comp_2.index)
-  elif isinstance(comp_1, building_blocks.Tuple):
-    # The element names are checked as part of the `type_signature`.
-    if len(comp_1) != len(comp_2):
-      return False
-    for element_1, element_2 in zip(comp_1, comp_2):
-      if not _computations_equal(element_1, element_2):
+      for (name_1, value_1), (name_2, value_2) in zip(comp_1.locals,
+                                                      comp_2.locals):
+        if name_1 != name_2:
+          return False
+        pairs.append((value_1, value_2))
+      pairs.append((comp_1.result, comp_2.result))
+    elif isinstance(comp_1, building_blocks.Call):
+      if comp_1.argument is None or comp_2.argument is None:
+        if comp_1.argument is not comp_2.argument:
+          return False
+      else:
+        pairs.append((comp_1.argument, comp_2.argument))
+      pairs.append((comp_1.function, comp_2.function))
+    elif isinstance(comp_1, building_blocks.CompiledComputation):
+      if comp_1.proto != comp_2.proto:
+        return False
+    elif isinstance(comp_1, building_blocks.Data):
+      if comp_1.uri != comp_2.uri:
+        return False
+    elif isinstance(comp_1, building_blocks.Intrinsic):
+      if comp_1.uri != comp_2.uri:
         return False
-    return True
-  raise NotImplementedError('Unexpected type found: {}.'.format(type(comp_1)))
+    elif isinstance(comp_1, building_blocks.Lambda):
+      if (comp_1.parameter_name != comp_2.parameter_name or
+          comp_1.parameter_type != comp_2.parameter_type):
+        return False
+      pairs.append((comp_1.result, comp_2.result))
+    elif isinstance(comp_1, building_blocks.Placement):
+      if comp_1.uri != comp_2.uri:
+        return False
+    elif isinstance(comp_1, building_blocks.Reference):
+      if comp_1.name != comp_2.name:
+        return False
+    elif isinstance(comp_1, building_blocks.Selection):
+      if comp_1.name != comp_2.name or comp_1.index != comp_2.index:
+        return False
+      pairs.append((comp_1.source, comp_2.source))
+    elif isinstance(comp_1, building_blocks.Tuple):
+      # The element names are checked as part of the `type_signature`.
+      if len(comp_1) != len(comp_2):
+        return False
+      pairs.extend(zip(comp_1, comp_2))
+    else:
+      raise NotImplementedError('Unexpected type found: {}.'.format(
+          type(comp_1)))
+  return True
@@ -109,6 +109,86 @@ def _create_complex_computation():
   return building_blocks.Lambda('b', tf.int32, tup)
 
 
+class _ReplaceData(transformation_utils.TransformSpec):
+  """Replaces `Data` with the given `uri` with the given computation."""
+
+  def __init__(self, uri, replacement):
+    super(_ReplaceData, self).__init__()
+    self._uri = uri
+    self._replacement = replacement
+
+  def should_transform(self, comp):
+    return isinstance(comp, building_blocks.Data) and comp.uri == self._uri
+
+  def transform(self, comp):
+    if not self.should_transform(comp):
+      return comp, False
+    return self._replacement, True
+
+
+class ApplyTransformsToFixedPointTest(absltest.TestCase):
+
+  def test_raises_type_error_with_none(self):
+    with self.assertRaises(TypeError):
+      transformations.apply_transforms_to_fixed_point(
+          None, _ReplaceData('a', building_blocks.Data('b', tf.int32)))
+
+  def test_raises_value_error_with_global_transform(self):
+    comp = building_blocks.Data('a', tf.int32)
+    with self.assertRaises(ValueError):
+      transformations.apply_transforms_to_fixed_point(
+          comp, transformations.InlineBlock(comp))
+
+  def test_does_not_transform_comp(self):
+    comp = building_blocks.Tuple([building_blocks.Data('a', tf.int32)])
+
+    transformed_comp, modified = transformations.apply_transforms_to_fixed_point(
+        comp, _ReplaceData('b', building_blocks.Data('c', tf.int32)))
+
+    self.assertIs(transformed_comp, comp)
+    self.assertFalse(modified)
+
+  def test_transforms_computations_produced_by_transforms(self):
+    comp = building_blocks.Tuple([
+        building_blocks.Data('a', tf.int32),
+        building_blocks.Data('b', tf.int32),
+    ])
+    transforms = [
+        _ReplaceData('a',
+                     building_blocks.Tuple(
+                         [building_blocks.Data('b', tf.int32)])),
+        _ReplaceData('b', building_blocks.Data('c', tf.int32)),
+    ]
+
+    transformed_comp, modified = transformations.apply_transforms_to_fixed_point(
+        comp, transforms)
+
+    self.assertEqual(transformed_comp.compact_representation(), '<<c>,c>')
+    self.assertTrue(modified)
+
+  def test_fuses_replace_called_lambda_and_remove_mapped_identity(self):
+    called_intrinsic = computation_test_utils.create_dummy_called_federated_map(
+        parameter_name='a')
+    fn = computation_test_utils.create_identity_function(
+        'b', called_intrinsic.type_signature)
+    call = building_blocks.Call(fn, called_intrinsic)
+    comp = call
+    transforms = [
+        transformations.ReplaceCalledLambdaWithBlock(comp),
+        transformations.RemoveMappedOrAppliedIdentity(comp),
+    ]
+
+    transformed_comp, modified = transformations.apply_transforms_to_fixed_point(
+        comp, transforms)
+
+    self.assertEqual(comp.compact_representation(),
+                     '(b -> b)(federated_map(<(a -> a),data>))')
+    self.assertEqual(transformed_comp.compact_representation(),
+                     '(let b=data in b)')
+    self.assertEqual(transformed_comp.type_signature, comp.type_signature)
+    self.assertTrue(modified)
+
+
 class ExtractComputationsTest(absltest.TestCase):
 
   def test_raises_type_error_with_none(self):
@@ -3149,6 +3229,64 @@ class RemoveDuplicateComputationsTest(absltest.TestCase):
     self.assertEqual(transformed_comp.type_signature, comp.type_signature)
     self.assertTrue(modified)
 
+  def test_removes_duplicates_bound_in_enclosing_scopes(self):
+    data = building_blocks.Data('data', tf.int32)
+    inner_block = building_blocks.Block(
+        [('c', data)], building_blocks.Reference('c', tf.int32))
+    fn = building_blocks.Lambda('x', tf.int32, inner_block)
+    ref_a = building_blocks.Reference('a', tf.int32)
+    ref_b = building_blocks.Reference('b', fn.type_signature)
+    ref_d = building_blocks.Reference('d', tf.int32)
+    tup = building_blocks.Tuple([ref_a, ref_b, ref_d])
+    block = building_blocks.Block([('a', data), ('b', fn), ('d', data)], tup)
+    comp = block
+
+    transformed_comp, modified = transformations.remove_duplicate_computations(
+        comp)
+
+    self.assertEqual(
+        comp.compact_representation(),
+        '(let a=data,b=(x -> (let c=data in c)),d=data in <a,b,d>)')
+    self.assertEqual(transformed_comp.compact_representation(),
+                     '(let a=data,b=(x -> a) in <a,b,a>)')
+    self.assertEqual(transformed_comp.type_signature, comp.type_signature)
+    self.assertTrue(modified)
+
+  def test_does_not_remove_duplicates_bound_in_closed_scopes(self):
+    data = building_blocks.Data('data', tf.int32)
+    inner_block = building_blocks.Block(
+        [('b', data)], building_blocks.Reference('b', tf.int32))
+    fn = building_blocks.Lambda('x', tf.int32, inner_block)
+    block = building_blocks.Block([('a', fn), ('c', data)],
+                                  building_blocks.Reference('c', tf.int32))
+    comp = block
+
+    transformed_comp, _ = transformations.remove_duplicate_computations(comp)
+
+    self.assertEqual(transformed_comp.compact_representation(),
+                     '(let a=(x -> (let b=data in b)),c=data in c)')
+    self.assertEqual(transformed_comp.type_signature, comp.type_signature)
+
+  def test_removes_duplicates_in_long_block(self):
+    data = building_blocks.Data('data', tf.int32)
+    num_variables = 1000
+    variables = [('v{}'.format(i), data) for i in range(num_variables)]
+    elements = [
+        building_blocks.Reference('v{}'.format(i), tf.int32)
+        for i in range(num_variables)
+    ]
+    block = building_blocks.Block(variables, building_blocks.Tuple(elements))
+    comp = block
+
+    transformed_comp, modified = transformations.remove_duplicate_computations(
+        comp)
+
+    self.assertEqual(
+        transformed_comp.compact_representation(),
+        '(let v0=data in <{}>)'.format(','.join(['v0'] * num_variables)))
+    self.assertEqual(transformed_comp.type_signature, comp.type_signature)
+    self.assertTrue(modified)
+
 
 class RemoveMappedOrAppliedIdentityTest(parameterized.TestCase):
 
@@ -4652,6 +4790,22 @@ class ComputationsEqualTest(absltest.TestCase):
     tuple_2 = building_blocks.Tuple([data_2, data_2])
     self.assertTrue(transformations._computations_equal(tuple_1, tuple_2))
 
+  def test_compares_deep_computations(self):
+
+    def _create_chained_calls(uri):
+      fn = building_blocks.Reference(
+          'f', computation_types.FunctionType(tf.int32, tf.int32))
+      comp = building_blocks.Data(uri, tf.int32)
+      for _ in range(100000):
+        comp = building_blocks.Call(fn, comp)
+      return comp
+
+    comp_1 = _create_chained_calls('data')
+    comp_2 = _create_chained_calls('data')
+    comp_3 = _create_chained_calls('other')
+    self.assertTrue(transformations._computations_equal(comp_1, comp_2))
+    self.assertFalse(transformations._computations_equal(comp_1, comp_3))
+
 
 if __name__ == '__main__':
   absltest.main()
@@ -18,8 +18,10 @@ from __future__ import division
 from __future__ import print_function
 
 import collections
+import threading
 
 import attr
+import cachetools
 import numpy as np
 import six
 from six.moves import range
@@ -845,6 +847,13 @@ def is_average_compatible(type_spec):
     return False
 
 
+# The limit on the number of the results of `is_assignable_from` memoized, past
+# which the least recently used ones are discarded.
+_IS_ASSIGNABLE_FROM_CACHE_SIZE = 10000
+_is_assignable_from_cache = cachetools.LRUCache(_IS_ASSIGNABLE_FROM_CACHE_SIZE)
+_is_assignable_from_cache_lock = threading.Lock()
+
+
 def is_assignable_from(target_type, source_type):
   """Determines whether `target_type` is assignable from `source_type`.
 
@@ -863,6 +872,20 @@ def is_assignable_from(target_type, source_type):
   source_type = computation_types.to_type(source_type)
   py_typecheck.check_type(target_type, computation_types.Type)
   py_typecheck.check_type(source_type, computation_types.Type)
+  # Types are hashed and compared by their canonical ids, so the lookup takes
+  # constant time, regardless of the size of the types.
+  key = (target_type, source_type)
+  with _is_assignable_from_cache_lock:
+    result = _is_assignable_from_cache.get(key)
+  if result is None:
+    result = bool(_is_assignable_from(target_type, source_type))
+    with _is_assignable_from_cache_lock:
+      _is_assignable_from_cache[key] = result
+  return result
+
+
+def _is_assignable_from(target_type, source_type):
+  """Implements `is_assignable_from` for TFF types, without memoization."""
   if isinstance(target_type, computation_types.TensorType):
 
     def _shape_is_assignable_from(x, y):
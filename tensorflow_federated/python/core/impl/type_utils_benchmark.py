@@ -0,0 +1,105 @@
+# Lint as: python3
+# Copyright 2019, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Benchmark for comparing types, and the per-call overhead of executors."""
+
+import asyncio
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from tensorflow_federated.python.core.api import computation_types
+from tensorflow_federated.python.core.impl import caching_executor
+from tensorflow_federated.python.core.impl import eager_executor
+from tensorflow_federated.python.core.impl import type_utils
+
+_NUM_ITERATIONS = 1000
+
+
+def _make_nested_type(depth, width):
+  """Returns a named tuple type nested `depth` levels, `width` elements each."""
+  type_spec = computation_types.TensorType(tf.float32, [10])
+  for _ in range(depth):
+    type_spec = computation_types.NamedTupleType([
+        ('element_{}'.format(i), type_spec) for i in range(width)
+    ])
+  return type_spec
+
+
+def _make_nested_value(depth, width):
+  value = np.zeros([10], dtype=np.float32)
+  for _ in range(depth):
+    value = [value] * width
+  return value
+
+
+class TypeUtilsBenchmark(tf.test.Benchmark):
+  """Measures the cost of comparing types, alone and in executor calls."""
+
+  def _report(self, name, execution_array):
+    self.report_benchmark(
+        name=name,
+        wall_time=np.mean(execution_array),
+        iters=len(execution_array),
+        extras={'std_dev': np.std(execution_array)})
+
+  def benchmark_type_equality(self):
+    for depth, width in [(2, 10), (3, 10)]:
+      type_1 = _make_nested_type(depth, width)
+      type_2 = _make_nested_type(depth, width)
+      execution_array = []
+      for _ in range(_NUM_ITERATIONS):
+        start = time.time()
+        assert type_1 == type_2
+        stop = time.time()
+        execution_array.append(stop - start)
+      self._report('type equality, depth {}, width {}'.format(depth, width),
+                   execution_array)
+
+  def benchmark_are_equivalent_types(self):
+    for depth, width in [(2, 10), (3, 10)]:
+      type_1 = _make_nested_type(depth, width)
+      type_2 = _make_nested_type(depth, width)
+      execution_array = []
+      for _ in range(_NUM_ITERATIONS):
+        start = time.time()
+        assert type_utils.are_equivalent_types(type_1, type_2)
+        stop = time.time()
+        execution_array.append(stop - start)
+      self._report(
+          'are_equivalent_types, depth {}, width {}'.format(depth, width),
+          execution_array)
+
+  def benchmark_caching_executor_create_value(self):
+    loop = asyncio.get_event_loop()
+    for depth, width in [(1, 10), (2, 10)]:
+      ex = caching_executor.CachingExecutor(eager_executor.EagerExecutor())
+      value = _make_nested_value(depth, width)
+      execution_array = []
+      for _ in range(100):
+        # A new, equal type each time, as when the types are deserialized.
+        type_spec = _make_nested_type(depth, width)
+        start = time.time()
+        loop.run_until_complete(ex.create_value(value, type_spec))
+        stop = time.time()
+        execution_array.append(stop - start)
+      self._report(
+          'CachingExecutor.create_value, depth {}, width {}'.format(
+              depth, width), execution_array)
+
+
+if __name__ == '__main__':
+  tf.compat.v1.enable_v2_behavior()
+  tf.test.main()
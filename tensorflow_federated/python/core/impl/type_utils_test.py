@@ -902,6 +902,24 @@ class TypeUtilsTest(test.TestCase, parameterized.TestCase):
     self.assertFalse(type_utils.is_assignable_from(t6, t3))
     self.assertFalse(type_utils.is_assignable_from(t6, t4))
 
+  def test_is_assignable_from_memoizes_results_for_equal_types(self):
+    t1 = computation_types.to_type([('a', tf.int32), ('b', (tf.float32, [10]))])
+    t2 = computation_types.to_type([('a', tf.int32), ('b', (tf.float32, [10]))])
+    self.assertTrue(type_utils.is_assignable_from(t1, t2))
+    self.assertIn((t1, t2), type_utils._is_assignable_from_cache)
+    # The result for the pair of equal types is reused.
+    t3 = computation_types.to_type([('a', tf.int32), ('b', (tf.float32, [10]))])
+    self.assertIn((t3, t1), type_utils._is_assignable_from_cache)
+    self.assertFalse(
+        type_utils.is_assignable_from(t1, computation_types.to_type(tf.int32)))
+
+  def test_is_assignable_from_does_not_memoize_errors(self):
+    t = computation_types.AbstractType('T')
+    with self.assertRaises(TypeError):
+      type_utils.is_assignable_from(t, t)
+    with self.assertRaises(TypeError):
+      type_utils.is_assignable_from(t, t)
+
   def test_are_equivalent_types(self):
     t1 = computation_types.TensorType(tf.int32, [None])
     t2 = computation_types.TensorType(tf.int32, [10])
@@ -0,0 +1,150 @@
+# Lint as: python3
+# Copyright 2019, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Sampling of clients, and prefetching of their datasets, for training."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+import concurrent.futures
+
+import numpy as np
+
+import tensorflow_federated as tff
+
+
+class ClientSampler(object):
+  """Samples clients for each round, and builds their datasets in advance.
+
+  An instance of this class can be passed as the `client_datasets_fn` of
+  `training_loops.federated_averaging_training_loop`. When it is called with a
+  round number, it returns the datasets of the clients sampled for that round,
+  and starts building the datasets for the following rounds in background
+  threads, so that the (possibly expensive) reading and preprocessing of the
+  client data overlaps with the training of the current round.
+
+  The clients sampled for a round depend only on the `seed` and the round
+  number, so they are reproducible regardless of the order in which the rounds
+  are requested. Only the datasets for at most `num_prefetch_rounds` rounds
+  beyond the current one are held in memory.
+  """
+
+  def __init__(self,
+               client_data,
+               num_clients_per_round,
+               preprocess_fn=None,
+               seed=0,
+               num_workers=4,
+               num_prefetch_rounds=1):
+    """Constructs the sampler.
+
+    Args:
+      client_data: An instance of `tff.simulation.ClientData`.
+      num_clients_per_round: The number of distinct clients to sample for each
+        round.
+      preprocess_fn: An optional function that accepts the `tf.data.Dataset` of
+        a client, and returns the preprocessed `tf.data.Dataset`.
+      seed: An integer seed, which together with the round number determines
+        the clients sampled for each round.
+      num_workers: The number of background threads in which to build the
+        client datasets.
+      num_prefetch_rounds: The number of rounds following the last requested one
+        for which to build the client datasets in advance. If 0, the datasets
+        are still built in parallel, but only once they are requested.
+
+    Raises:
+      TypeError: If the arguments are of the wrong types.
+      ValueError: If the arguments have invalid values.
+    """
+    if not isinstance(client_data, tff.simulation.ClientData):
+      raise TypeError(
+          'Expected a `tff.simulation.ClientData`, found {}.'.format(
+              type(client_data)))
+    if preprocess_fn is not None and not callable(preprocess_fn):
+      raise TypeError('Expected a callable `preprocess_fn`, found {}.'.format(
+          type(preprocess_fn)))
+    if not 0 < num_clients_per_round <= client_data.num_clients:
+      raise ValueError(
+          'The number of clients per round must be between 1 and the number '
+          'of clients ({}), found {}.'.format(client_data.num_clients,
+                                              num_clients_per_round))
+    if num_workers < 1:
+      raise ValueError(
+          'The number of workers must be >= 1, found {}.'.format(num_workers))
+    if num_prefetch_rounds < 0:
+      raise ValueError(
+          'The number of prefetched rounds must be >= 0, found {}.'.format(
+              num_prefetch_rounds))
+    self._client_data = client_data
+    self._num_clients_per_round = num_clients_per_round
+    self._preprocess_fn = preprocess_fn
+    self._seed = seed
+    self._num_prefetch_rounds = num_prefetch_rounds
+    self._thread_pool = concurrent.futures.ThreadPoolExecutor(
+        max_workers=num_workers)
+    # Maps round numbers to lists of futures of the client datasets, in the
+    # order in which the rounds were scheduled.
+    self._pending_rounds = collections.OrderedDict()
+
+  def sample_client_ids(self, round_num):
+    """Returns the list of client ids sampled for `round_num`."""
+    return self._client_data.sample_client_ids(
+        self._num_clients_per_round,
+        random_state=np.random.RandomState([self._seed, round_num]))
+
+  def _create_dataset(self, client_id):
+    dataset = self._client_data.create_tf_dataset_for_client(client_id)
+    if self._preprocess_fn is not None:
+      dataset = self._preprocess_fn(dataset)
+    return dataset
+
+  def _schedule_round(self, round_num):
+    if round_num not in self._pending_rounds:
+      self._pending_rounds[round_num] = [
+          self._thread_pool.submit(self._create_dataset, client_id)
+          for client_id in self.sample_client_ids(round_num)
+      ]
+
+  def __call__(self, round_num):
+    """Returns the list of client datasets for `round_num`.
+
+    Args:
+      round_num: The integer round number.
+
+    Returns:
+      A list of `tf.data.Dataset`s, one per client sampled for `round_num`.
+    """
+    self._schedule_round(round_num)
+    futures = self._pending_rounds.pop(round_num)
+    # Rounds other than the prefetched ones are no longer expected to be
+    # requested, so their datasets are not built (or are released).
+    prefetched_rounds = range(round_num + 1,
+                              round_num + 1 + self._num_prefetch_rounds)
+    for stale_round_num in list(self._pending_rounds):
+      if stale_round_num not in prefetched_rounds:
+        for future in self._pending_rounds.pop(stale_round_num):
+          future.cancel()
+    for prefetched_round_num in prefetched_rounds:
+      self._schedule_round(prefetched_round_num)
+    return [future.result() for future in futures]
+
+  def close(self):
+    """Cancels the prefetching, and shuts down the background threads."""
+    for futures in self._pending_rounds.values():
+      for future in futures:
+        future.cancel()
+    self._pending_rounds.clear()
+    self._thread_pool.shutdown(wait=True)
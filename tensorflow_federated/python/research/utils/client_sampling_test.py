@@ -0,0 +1,139 @@
+# Lint as: python3
+# Copyright 2019, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for client_sampling.py."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import threading
+
+import tensorflow as tf
+
+import tensorflow_federated as tff
+from tensorflow_federated.python.research.utils import client_sampling
+
+
+def _create_client_data(num_clients=10):
+  return tff.simulation.FromTensorSlicesClientData(
+      {str(i): [i] * (i + 1) for i in range(num_clients)})
+
+
+def _get_pending_rounds(sampler):
+  return sampler._pending_rounds  # pylint: disable=protected-access
+
+
+def _wait_for_pending_rounds(sampler):
+  for futures in list(_get_pending_rounds(sampler).values()):
+    for future in futures:
+      future.result()
+
+
+class ClientSamplerTest(tf.test.TestCase):
+
+  def _create_sampler(self, client_data, **kwargs):
+    sampler = client_sampling.ClientSampler(client_data, **kwargs)
+    self.addCleanup(sampler.close)
+    return sampler
+
+  def test_raises_with_invalid_arguments(self):
+    client_data = _create_client_data()
+    with self.assertRaises(TypeError):
+      client_sampling.ClientSampler({'a': [1]}, num_clients_per_round=1)
+    with self.assertRaises(TypeError):
+      client_sampling.ClientSampler(
+          client_data, num_clients_per_round=1, preprocess_fn='not callable')
+    with self.assertRaises(ValueError):
+      client_sampling.ClientSampler(client_data, num_clients_per_round=0)
+    with self.assertRaises(ValueError):
+      client_sampling.ClientSampler(client_data, num_clients_per_round=11)
+    with self.assertRaises(ValueError):
+      client_sampling.ClientSampler(
+          client_data, num_clients_per_round=1, num_workers=0)
+    with self.assertRaises(ValueError):
+      client_sampling.ClientSampler(
+          client_data, num_clients_per_round=1, num_prefetch_rounds=-1)
+
+  def test_samples_distinct_clients_reproducibly(self):
+    client_data = _create_client_data()
+    sampler_1 = self._create_sampler(
+        client_data, num_clients_per_round=5, seed=1)
+    sampler_2 = self._create_sampler(
+        client_data, num_clients_per_round=5, seed=1)
+    sampler_3 = self._create_sampler(
+        client_data, num_clients_per_round=5, seed=2)
+
+    client_ids = sampler_1.sample_client_ids(3)
+    self.assertLen(set(client_ids), 5)
+    self.assertEqual(sampler_2.sample_client_ids(3), client_ids)
+    self.assertNotEqual(sampler_1.sample_client_ids(4), client_ids)
+    self.assertNotEqual(sampler_3.sample_client_ids(3), client_ids)
+
+  def test_returns_datasets_of_sampled_clients(self):
+    client_data = _create_client_data()
+    sampler = self._create_sampler(
+        client_data,
+        num_clients_per_round=3,
+        preprocess_fn=lambda ds: ds.take(2),
+        seed=1)
+
+    for round_num in [0, 1, 5, 2]:
+      datasets = sampler(round_num)
+      expected_values = [
+          [int(client_id)] * min(2, int(client_id) + 1)
+          for client_id in sampler.sample_client_ids(round_num)
+      ]
+      self.assertEqual([[x.numpy() for x in ds] for ds in datasets],
+                       expected_values)
+
+  def test_prefetches_next_rounds(self):
+    client_data = _create_client_data()
+    lock = threading.Lock()
+    num_preprocessed = [0]
+
+    def preprocess_fn(dataset):
+      with lock:
+        num_preprocessed[0] += 1
+      return dataset
+
+    sampler = self._create_sampler(
+        client_data,
+        num_clients_per_round=2,
+        preprocess_fn=preprocess_fn,
+        num_prefetch_rounds=2)
+
+    sampler(0)
+    # Wait for the prefetched datasets of rounds 1 and 2 to be built.
+    _wait_for_pending_rounds(sampler)
+    self.assertEqual(num_preprocessed[0], 6)
+
+    # The datasets of round 1 were prefetched, only those of round 3 are new.
+    sampler(1)
+    _wait_for_pending_rounds(sampler)
+    self.assertEqual(num_preprocessed[0], 8)
+    self.assertCountEqual(_get_pending_rounds(sampler).keys(), [2, 3])
+
+  def test_discards_rounds_that_are_not_requested(self):
+    sampler = self._create_sampler(
+        _create_client_data(), num_clients_per_round=2, num_prefetch_rounds=1)
+
+    sampler(0)
+    sampler(5)
+    self.assertCountEqual(_get_pending_rounds(sampler).keys(), [6])
+
+
+if __name__ == '__main__':
+  tf.compat.v1.enable_v2_behavior()
+  tf.test.main()
@@ -37,7 +37,9 @@ def federated_averaging_training_loop(model_fn,
     server_optimizer_fn: A no-arg function that returns a
       `tf.keras.optimizers.Optimizer`.
     client_datasets_fn: A function that takes the round number, and returns a
-      list of `tf.data.Datset`, one per client.
+      list of `tf.data.Datset`, one per client. An instance of
+      `client_sampling.ClientSampler` can be used to build the datasets for the
+      next round in the background while the current round is running.
     total_rounds: Number of rounds to train.
     rounds_per_eval: How often to call the  `metrics_hook` function.
     metrics_hook: A function taking arguments (server_state, train_metrics,
@@ -42,6 +42,66 @@ class ClientData(object):
     """The list of string identifiers for clients in this dataset."""
     pass
 
+  @property
+  def num_clients(self):
+    """The number of clients in this dataset."""
+    return len(self.client_ids)
+
+  def get_client_id(self, index):
+    """Returns the client id at position `index` in `client_ids`.
+
+    Subclasses with a large number of clients may override this (together with
+    `num_clients`) to compute the client id without materializing `client_ids`.
+
+    Args:
+      index: An integer in the range `[0, num_clients)`.
+
+    Returns:
+      The string client id.
+
+    Raises:
+      IndexError: If `index` is out of range.
+    """
+    return self.client_ids[index]
+
+  def sample_client_ids(self, num_clients, random_state=None):
+    """Samples distinct client ids uniformly at random.
+
+    The time and memory used are proportional to `num_clients`, not to the
+    total number of clients in this dataset.
+
+    Args:
+      num_clients: The number of client ids to sample, without replacement.
+      random_state: An optional `np.random.RandomState` to sample with. If
+        `None`, the global NumPy random number generator is used.
+
+    Returns:
+      A list of `num_clients` distinct client ids, in random order.
+
+    Raises:
+      ValueError: If `num_clients` is negative, or greater than `num_clients`
+        of this dataset.
+    """
+    py_typecheck.check_type(num_clients, int)
+    total_num_clients = self.num_clients
+    if not 0 <= num_clients <= total_num_clients:
+      raise ValueError(
+          'Cannot sample {} clients from a dataset of {} clients.'.format(
+              num_clients, total_num_clients))
+    if random_state is None:
+      random_state = np.random
+    # Floyd's algorithm, which draws a single random number per sampled index.
+    indices = []
+    sampled = set()
+    for j in range(total_num_clients - num_clients, total_num_clients):
+      index = random_state.randint(j + 1)
+      if index in sampled:
+        index = j
+      sampled.add(index)
+      indices.append(index)
+    random_state.shuffle(indices)
+    return [self.get_client_id(index) for index in indices]
+
   @abc.abstractmethod
   def create_tf_dataset_for_client(self, client_id):
     """Creates a new `tf.data.Dataset` containing the client training examples.
@@ -82,36 +142,89 @@ class ClientData(object):
     """
     pass
 
-  def create_tf_dataset_from_all_clients(self, seed=None):
+  def create_tf_dataset_from_all_clients(self,
+                                         seed=None,
+                                         num_parallel_calls=None,
+                                         cycle_length=1,
+                                         block_length=1,
+                                         shuffle_buffer_size=None):
     """Creates a new `tf.data.Dataset` containing _all_ client examples.
 
-    NOTE: the returned `tf.data.Dataset` is not serializable and runnable on
-    other devices, as it uses `tf.py_func` internally.
+    The returned dataset is built from a dataset of clients (in an order
+    determined by `seed`) by interleaving the client datasets. With the default
+    `cycle_length` of 1, it contains all examples from a single client in order,
+    followed by all examples from the next client, and so on, so generally
+    additional shuffling should be performed, e.g. by specifying
+    `shuffle_buffer_size`. For any fixed arguments, the order of the examples
+    is deterministic if `seed` is specified, regardless of `num_parallel_calls`.
 
-    Currently, the implementation produces a dataset that contains
-    all examples from a single client in order, and so generally additional
-    shuffling should be performed.
+    NOTE: Subclasses that cannot express their client datasets in terms of
+    TensorFlow ops (see `_get_client_keys_and_dataset_fn`) fall back to reading
+    each client's examples with `tf.py_func`, in which case the returned
+    `tf.data.Dataset` is not serializable and runnable on other devices.
 
     Args:
       seed: Optional, a seed to determine the order in which clients are
-        processed in the joined dataset.
+        processed in the joined dataset, and to use for shuffling the examples.
+      num_parallel_calls: Optional, the number of client datasets to read from
+        in parallel, as in `tf.data.Dataset.interleave`. May be set to
+        `tf.data.experimental.AUTOTUNE`.
+      cycle_length: The number of clients whose examples are interleaved
+        concurrently, as in `tf.data.Dataset.interleave`.
+      block_length: The number of consecutive examples to take from each client
+        before cycling to another one, as in `tf.data.Dataset.interleave`.
+      shuffle_buffer_size: Optional, the size of the buffer used to shuffle the
+        joined examples as they are streamed.
 
     Returns:
       A `tf.data.Dataset` object.
     """
-
     # NOTE: simply calling Dataset.concatenate() will result in too deep
     # recursion depth.
     # NOTE: Tests are via the simple concrete from_tensor_slices_client_data.
-    def _generator():
-      client_ids = list(self.client_ids)
-      np.random.RandomState(seed=seed).shuffle(client_ids)
-      for client_id in client_ids:
-        for example in self.create_tf_dataset_for_client(client_id):
-          yield example
+    client_ids = list(self.client_ids)
+    np.random.RandomState(seed=seed).shuffle(client_ids)
+    client_keys, dataset_fn = self._get_client_keys_and_dataset_fn(client_ids)
+    dataset = tf.data.Dataset.from_tensor_slices(client_keys).interleave(
+        dataset_fn,
+        cycle_length=cycle_length,
+        block_length=block_length,
+        num_parallel_calls=num_parallel_calls)
+    if shuffle_buffer_size is not None:
+      dataset = dataset.shuffle(shuffle_buffer_size, seed=seed)
+    return dataset
+
+  def _get_client_keys_and_dataset_fn(self, client_ids):
+    """Returns the keys and function to create the datasets for `client_ids`.
+
+    This is used by `create_tf_dataset_from_all_clients`, which creates a
+    `tf.data.Dataset` of the keys, and interleaves the datasets created by
+    tracing the function on each of them. Subclasses should override this to
+    create the client datasets with TensorFlow ops where possible. The default
+    implementation reads the examples of `create_tf_dataset_for_client` with
+    `tf.py_func`, one client at a time.
+
+    Args:
+      client_ids: The list of client ids, in the order in which the client
+        datasets are to be interleaved.
+
+    Returns:
+      A tuple `(client_keys, dataset_fn)`, where `client_keys` is a structure
+      suitable for passing to `tf.data.Dataset.from_tensor_slices` with one
+      slice per client in `client_ids`, and `dataset_fn` is a function that
+      accepts the tensors of a slice, and returns the `tf.data.Dataset` for the
+      corresponding client.
+    """
+
+    def _generator(index):
+      for example in self.create_tf_dataset_for_client(client_ids[index]):
+        yield example
+
+    def _dataset_fn(index):
+      return tf.data.Dataset.from_generator(
+          _generator, self.output_types, self.output_shapes, args=(index,))
 
-    return tf.data.Dataset.from_generator(_generator, self.output_types,
-                                          self.output_shapes)
+    return np.arange(len(client_ids), dtype=np.int64), _dataset_fn
 
   def preprocess(self, preprocess_fn):
     """Applies `preprocess_fn` to each client's data."""
@@ -120,7 +233,7 @@ class ClientData(object):
     def get_dataset(client_id):
       return preprocess_fn(self.create_tf_dataset_for_client(client_id))
 
-    return ConcreteClientData(self.client_ids, get_dataset)
+    return ConcreteClientData(list(self.client_ids), get_dataset)
 
 
 class ConcreteClientData(ClientData):
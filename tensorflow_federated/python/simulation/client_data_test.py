@@ -19,6 +19,7 @@ from __future__ import division
 from __future__ import print_function
 
 from absl.testing import absltest
+import numpy as np
 import tensorflow as tf
 
 from tensorflow_federated.python.simulation import client_data as cd
@@ -51,6 +52,35 @@ class FilePerUserClientDataTest(tf.test.TestCase, absltest.TestCase):
     for i in client_ids:
       self.assertEqual(length(client_data.create_tf_dataset_for_client(i)), 1)
 
+  def test_sample_client_ids(self):
+    client_data = cd.ConcreteClientData(
+        client_ids=list(range(100)),
+        create_tf_dataset_for_client_fn=tf.data.Dataset.range)
+    self.assertEqual(client_data.num_clients, 100)
+
+    client_ids = client_data.sample_client_ids(
+        10, random_state=np.random.RandomState(1))
+    self.assertLen(set(client_ids), 10)
+    self.assertEqual(
+        client_data.sample_client_ids(
+            10, random_state=np.random.RandomState(1)), client_ids)
+    self.assertCountEqual(client_data.sample_client_ids(100), range(100))
+    with self.assertRaises(ValueError):
+      client_data.sample_client_ids(101)
+
+  def test_create_tf_dataset_from_all_clients(self):
+    client_ids = [1, 2, 3]
+
+    def create_dataset_fn(client_id):
+      return tf.data.Dataset.range(client_id * 10, client_id * 10 + client_id)
+
+    client_data = cd.ConcreteClientData(
+        client_ids=client_ids,
+        create_tf_dataset_for_client_fn=create_dataset_fn)
+    ds = client_data.create_tf_dataset_from_all_clients(
+        seed=1, num_parallel_calls=2, cycle_length=2)
+    self.assertCountEqual([x.numpy() for x in ds], [10, 20, 21, 30, 31, 32])
+
 
 if __name__ == '__main__':
   tf.compat.v1.enable_v2_behavior()
@@ -0,0 +1,371 @@
+# Copyright 2019, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Implementation of a memory-mapped, columnar ClientData.
+
+The data is stored in a directory containing:
+
+  * One file per column, holding the examples of all clients concatenated
+    along the first dimension, ordered by client id. Numeric columns are
+    stored as `.npy` files. String columns are stored as the concatenation of
+    the bytes of all their strings, together with a `.npy` file holding the
+    offsets of the strings in it, so that strings are not padded to a fixed
+    width.
+  * `client_ids.npy`, holding the sorted client ids.
+  * `offsets.npy`, holding the `num_clients + 1` offsets of the first example
+    of each client in the columns (and the total number of examples).
+  * `columns.json`, describing the files and the example shapes of the
+    columns.
+
+Such a directory can be created from an HDF5 file in the format expected by
+`tff.simulation.HDF5ClientData` with `convert_hdf5_to_columnar`.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import collections
+import json
+import os
+
+import h5py
+import numpy as np
+import six
+import tensorflow as tf
+
+from tensorflow_federated.python.common_libs import py_typecheck
+from tensorflow_federated.python.simulation import client_data
+
+_CLIENT_IDS_FILENAME = 'client_ids.npy'
+_OFFSETS_FILENAME = 'offsets.npy'
+_COLUMNS_FILENAME = 'columns.json'
+
+
+class ColumnarClientData(client_data.ClientData):
+  """A `tff.simulation.ClientData` backed by memory-mapped columns.
+
+  This class expects a directory in the format created by
+  `convert_hdf5_to_columnar`. The columns are memory-mapped, so constructing
+  this object does not read any examples. By default, the `tf.data.Dataset`
+  returned by `create_tf_dataset_for_client(client_id)` is created with
+  `tf.data.Dataset.from_tensor_slices` from views of the rows of the client in
+  the columns, so only the examples of that client are read (and copied into
+  the dataset), and the dataset is made of TensorFlow ops only, and can be
+  serialized.
+
+  If `use_generator` is `True`, the client datasets instead read the examples
+  of the client in a single `tf.py_func` call when they are iterated over, so
+  creating them reads nothing, but they cannot be serialized.
+
+  The `tf.data.Dataset`s yield `collections.OrderedDict`s keyed by the column
+  names in sorted order, as `tff.simulation.HDF5ClientData` does.
+  """
+
+  def __init__(self, dirpath, use_generator=False):
+    """Constructs a `tff.simulation.ClientData` object.
+
+    Args:
+      dirpath: String path to the directory created by
+        `convert_hdf5_to_columnar`.
+      use_generator: Whether to create the client datasets with a
+        `tf.py_func` that reads the examples when the dataset is iterated over,
+        rather than from the examples read when the dataset is created.
+    """
+    py_typecheck.check_type(dirpath, str)
+    py_typecheck.check_type(use_generator, bool)
+    self._dirpath = dirpath
+    self._use_generator = use_generator
+    with open(os.path.join(dirpath, _COLUMNS_FILENAME), 'r') as f:
+      column_specs = json.load(f)
+    self._columns = collections.OrderedDict(
+        (name, _load_column(dirpath, spec))
+        for name, spec in sorted(six.iteritems(column_specs)))
+    self._offsets = np.load(
+        os.path.join(dirpath, _OFFSETS_FILENAME), mmap_mode='r')
+    self._client_ids_array = np.load(
+        os.path.join(dirpath, _CLIENT_IDS_FILENAME), mmap_mode='r')
+    # Created on first use, as they require reading all of the client ids.
+    self._client_ids = None
+    self._client_indices = None
+
+    self._output_types = collections.OrderedDict(
+        (name, _dtype_for_column(column))
+        for name, column in six.iteritems(self._columns))
+    self._output_shapes = collections.OrderedDict(
+        (name, tf.TensorShape(column.shape[1:]))
+        for name, column in six.iteritems(self._columns))
+
+  @property
+  def client_ids(self):
+    if self._client_ids is None:
+      self._client_ids = [str(x) for x in self._client_ids_array]
+    return self._client_ids
+
+  @property
+  def num_clients(self):
+    return self._client_ids_array.shape[0]
+
+  def get_client_id(self, index):
+    return str(self._client_ids_array[index])
+
+  def _get_client_index(self, client_id):
+    if self._client_indices is None:
+      self._client_indices = {x: i for i, x in enumerate(self.client_ids)}
+    try:
+      return self._client_indices[client_id]
+    except KeyError:
+      raise ValueError('Unknown client id {}.'.format(client_id))
+
+  def _get_client_examples(self, index):
+    start, end = self._offsets[index], self._offsets[index + 1]
+    return collections.OrderedDict(
+        (name, column[start:end]) for name, column in six.iteritems(
+            self._columns))
+
+  def _create_generator_dataset(self, index):
+    """Returns the `tf.data.Dataset` of the client at `index`.
+
+    The examples of the client are sliced from the columns in a single
+    `tf.py_func` call when the dataset is iterated over, rather than one call
+    per example, or when the dataset is created.
+
+    Args:
+      index: The integer index of the client, or a scalar integer tensor.
+    """
+
+    def _generator(index):
+      yield self._get_client_examples(index)
+
+    client_shapes = collections.OrderedDict(
+        (name, tf.TensorShape([None]).concatenate(shape))
+        for name, shape in six.iteritems(self._output_shapes))
+    return tf.data.Dataset.from_generator(
+        _generator, self._output_types, client_shapes,
+        args=(index,)).apply(tf.data.experimental.unbatch())
+
+  def create_tf_dataset_for_client(self, client_id):
+    index = self._get_client_index(client_id)
+    if self._use_generator:
+      return self._create_generator_dataset(index)
+    return tf.data.Dataset.from_tensor_slices(self._get_client_examples(index))
+
+  def _get_client_keys_and_dataset_fn(self, client_ids):
+    # The client datasets of the joined dataset are created from indices in
+    # the graph, so they cannot embed the examples, which are read in a single
+    # `tf.py_func` call per client instead.
+    client_indices = [self._get_client_index(x) for x in client_ids]
+    return (np.asarray(client_indices, dtype=np.int64),
+            self._create_generator_dataset)
+
+  @property
+  def output_types(self):
+    return self._output_types
+
+  @property
+  def output_shapes(self):
+    return self._output_shapes
+
+
+class _StringColumn(object):
+  """A column of strings, stored as the concatenation of their bytes.
+
+  The strings of all the examples are flattened in row-major order, and the
+  string at flat index `i` is `data[offsets[i]:offsets[i + 1]]`.
+  """
+
+  def __init__(self, data, offsets, example_shape):
+    self._data = data
+    self._offsets = offsets
+    self._example_shape = tuple(example_shape)
+    self._num_strings_per_example = int(np.prod(self._example_shape))
+    num_examples = (offsets.shape[0] - 1) // max(
+        self._num_strings_per_example, 1)
+    self.shape = (num_examples,) + self._example_shape
+
+  def __getitem__(self, rows):
+    """Returns the examples in the slice `rows` as an array of `bytes`."""
+    start, stop, _ = rows.indices(self.shape[0])
+    offsets = np.asarray(
+        self._offsets[start * self._num_strings_per_example:
+                      stop * self._num_strings_per_example + 1])
+    data = bytes(self._data[offsets[0]:offsets[-1]])
+    offsets = offsets - offsets[0]
+    values = np.empty([offsets.shape[0] - 1], dtype=np.object_)
+    for i in range(values.shape[0]):
+      values[i] = data[offsets[i]:offsets[i + 1]]
+    return values.reshape((stop - start,) + self._example_shape)
+
+
+class _StringColumnWriter(object):
+  """Writes the strings of a `_StringColumn`, in order."""
+
+  def __init__(self, data_file, offsets):
+    self._data_file = data_file
+    self._offsets = offsets
+    self._offsets[0] = 0
+    self._num_strings = 0
+
+  def write(self, strings):
+    """Appends the `bytes` in the list `strings` to the column."""
+    end = self._num_strings + len(strings)
+    self._offsets[self._num_strings + 1:end + 1] = (
+        self._offsets[self._num_strings] +
+        np.cumsum([len(x) for x in strings], dtype=np.int64))
+    self._data_file.write(b''.join(strings))
+    self._num_strings = end
+
+  def close(self):
+    self._data_file.close()
+    self._offsets.flush()
+
+
+def _load_column(dirpath, spec):
+  """Memory-maps the column described by `spec` in `dirpath`."""
+  values_filepath = os.path.join(dirpath, spec['values'])
+  if 'offsets' not in spec:
+    return np.load(values_filepath, mmap_mode='r')
+  if os.path.getsize(values_filepath):
+    data = np.memmap(values_filepath, dtype=np.uint8, mode='r')
+  else:
+    # Empty files cannot be memory-mapped.
+    data = np.zeros([0], dtype=np.uint8)
+  offsets = np.load(os.path.join(dirpath, spec['offsets']), mmap_mode='r')
+  return _StringColumn(data, offsets, spec['shape'])
+
+
+def _dtype_for_column(column):
+  if isinstance(column, _StringColumn):
+    return tf.string
+  return tf.as_dtype(column.dtype)
+
+
+def _column_dtype(dataset):
+  """Returns the dtype with which to store the HDF5 `dataset` in a column."""
+  if (h5py.check_dtype(vlen=dataset.dtype) is not None or
+      dataset.dtype.kind in ('O', 'S', 'U')):
+    return np.dtype('S')
+  return dataset.dtype
+
+
+def _read_strings(dataset):
+  """Reads the strings in the HDF5 `dataset` as a flat list of UTF-8 bytes."""
+  values = dataset[()].ravel()
+  if values.dtype.kind == 'S':
+    return values.tolist()
+  return [
+      v.encode('utf-8') if isinstance(v, six.text_type) else v for v in values
+  ]
+
+
+def convert_hdf5_to_columnar(hdf5_filepath, dirpath):
+  """Converts an HDF5 file of client data to the `ColumnarClientData` format.
+
+  The HDF5 file is expected to be in the format read by
+  `tff.simulation.HDF5ClientData`, with a top-level group `examples` containing
+  one subgroup per client, named by the client id, and holding datasets with
+  the same names, dtypes and example shapes for all of the clients.
+
+  The examples of each client are read once, and only the examples of one
+  client are in memory at a time. Numeric columns are written to memory-mapped
+  files, and string columns are appended to files as they are read.
+
+  Args:
+    hdf5_filepath: String path to the HDF5 file.
+    dirpath: String path to the directory to write to. It is created if it does
+      not exist.
+
+  Raises:
+    ValueError: If the file contains no clients, or the clients have datasets
+      of different names, dtypes or shapes.
+  """
+  py_typecheck.check_type(hdf5_filepath, str)
+  py_typecheck.check_type(dirpath, str)
+  with h5py.File(hdf5_filepath, 'r') as h5_file:
+    examples_group = h5_file['examples']
+    client_ids = sorted(examples_group.keys())
+    if not client_ids:
+      raise ValueError('No clients found in {}.'.format(hdf5_filepath))
+
+    # The first pass determines the offsets of the clients, and the dtypes and
+    # shapes of the columns, from the metadata of the datasets only.
+    first_group = examples_group[client_ids[0]]
+    dtypes = {name: _column_dtype(ds) for name, ds in first_group.items()}
+    shapes = {name: ds.shape[1:] for name, ds in first_group.items()}
+    offsets = np.zeros([len(client_ids) + 1], dtype=np.int64)
+    for i, client_id in enumerate(client_ids):
+      group = examples_group[client_id]
+      if sorted(group.keys()) != sorted(dtypes.keys()):
+        raise ValueError('Client {} has columns {}, expected {}.'.format(
+            client_id, sorted(group.keys()), sorted(dtypes.keys())))
+      num_examples = None
+      for name, ds in group.items():
+        if _column_dtype(ds) != dtypes[name] or ds.shape[1:] != shapes[name]:
+          raise ValueError(
+              'Client {} has a column {} of a different dtype or shape.'.format(
+                  client_id, name))
+        if num_examples is None:
+          num_examples = ds.shape[0]
+        elif ds.shape[0] != num_examples:
+          raise ValueError(
+              'Client {} has columns of different lengths.'.format(client_id))
+      offsets[i + 1] = offsets[i] + num_examples
+
+    # The second pass reads the examples, and writes the columns.
+    if not os.path.exists(dirpath):
+      os.makedirs(dirpath)
+    column_specs = {}
+    columns = {}
+    try:
+      for idx, name in enumerate(sorted(dtypes.keys())):
+        if dtypes[name].kind == 'S':
+          column_specs[name] = {
+              'values': 'column_{}.bin'.format(idx),
+              'offsets': 'column_{}_offsets.npy'.format(idx),
+              'shape': list(shapes[name]),
+          }
+          num_strings = int(offsets[-1]) * int(np.prod(shapes[name]))
+          columns[name] = _StringColumnWriter(
+              open(os.path.join(dirpath, column_specs[name]['values']), 'wb'),
+              np.lib.format.open_memmap(
+                  os.path.join(dirpath, column_specs[name]['offsets']),
+                  mode='w+',
+                  dtype=np.int64,
+                  shape=(num_strings + 1,)))
+        else:
+          column_specs[name] = {'values': 'column_{}.npy'.format(idx)}
+          columns[name] = np.lib.format.open_memmap(
+              os.path.join(dirpath, column_specs[name]['values']),
+              mode='w+',
+              dtype=dtypes[name],
+              shape=(int(offsets[-1]),) + tuple(shapes[name]))
+      for i, client_id in enumerate(client_ids):
+        for name, ds in examples_group[client_id].items():
+          if dtypes[name].kind == 'S':
+            columns[name].write(_read_strings(ds))
+          else:
+            columns[name][offsets[i]:offsets[i + 1]] = ds[()]
+    finally:
+      for column in columns.values():
+        if isinstance(column, _StringColumnWriter):
+          column.close()
+        else:
+          column.flush()
+      del columns
+
+  np.save(os.path.join(dirpath, _OFFSETS_FILENAME), offsets)
+  np.save(
+      os.path.join(dirpath, _CLIENT_IDS_FILENAME),
+      np.asarray(client_ids, dtype=np.str_))
+  with open(os.path.join(dirpath, _COLUMNS_FILENAME), 'w') as f:
+    json.dump(column_specs, f)
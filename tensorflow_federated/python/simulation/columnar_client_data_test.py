@@ -0,0 +1,240 @@
+# Copyright 2019, The TensorFlow Federated Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests for tensorflow_federated.python.simulation.columnar_client_data."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import json
+import os
+import shutil
+import tempfile
+
+from absl.testing import absltest
+import h5py
+import numpy as np
+import six
+from six.moves import range
+import tensorflow as tf
+
+from tensorflow_federated.python.simulation import columnar_client_data
+from tensorflow_federated.python.simulation import hdf5_client_data
+
+TEST_DATA = {
+    'CLIENT A': {
+        'w': np.asarray([100, 200, 300], dtype='i8'),
+        'x': np.asarray([[1, 2], [3, 4], [5, 6]], dtype='i4'),
+        'y': np.asarray([4.0, 5.0, 6.0], dtype='f4'),
+        'z': np.asarray(['a', 'bb', 'c'], dtype='S'),
+    },
+    'CLIENT B': {
+        'w': np.asarray([1000], dtype='i8'),
+        'x': np.asarray([[10, 11]], dtype='i4'),
+        'y': np.asarray([7.0], dtype='f4'),
+        'z': np.asarray(['dddd'], dtype='S'),
+    },
+    'CLIENT C': {
+        'w': np.asarray([10000, 20000], dtype='i8'),
+        'x': np.asarray([[100, 101], [200, 201]], dtype='i4'),
+        'y': np.asarray([8.0, 9.0], dtype='f4'),
+        'z': np.asarray(['e', 'f'], dtype='S'),
+    },
+}
+
+
+def create_fake_hdf5(test_data):
+  fd, filepath = tempfile.mkstemp()
+  # close the pre-opened file descriptor immediately to avoid leaking.
+  os.close(fd)
+  with h5py.File(filepath, 'w') as f:
+    examples_group = f.create_group('examples')
+    for user_id, data in six.iteritems(test_data):
+      user_group = examples_group.create_group(user_id)
+      for name, values in sorted(six.iteritems(data)):
+        user_group.create_dataset(name, data=values, dtype=values.dtype)
+  return filepath
+
+
+def _as_tuples(examples):
+  return [(e['w'], tuple(e['x']), e['y'], e['z']) for e in examples]
+
+
+class ColumnarClientDataTest(tf.test.TestCase, absltest.TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    super(ColumnarClientDataTest, cls).setUpClass()
+    cls.test_data_filepath = create_fake_hdf5(TEST_DATA)
+    cls.test_data_dirpath = os.path.join(tempfile.mkdtemp(), 'columnar')
+    columnar_client_data.convert_hdf5_to_columnar(cls.test_data_filepath,
+                                                  cls.test_data_dirpath)
+
+  @classmethod
+  def tearDownClass(cls):
+    os.remove(cls.test_data_filepath)
+    shutil.rmtree(os.path.dirname(cls.test_data_dirpath))
+    super(ColumnarClientDataTest, cls).tearDownClass()
+
+  def _create_client_data(self):
+    return columnar_client_data.ColumnarClientData(
+        ColumnarClientDataTest.test_data_dirpath)
+
+  def test_client_ids_property(self):
+    client_data = self._create_client_data()
+    self.assertEqual(client_data.client_ids, sorted(TEST_DATA.keys()))
+
+  def test_output_properties_match_hdf5_client_data(self):
+    client_data = self._create_client_data()
+    expected_client_data = hdf5_client_data.HDF5ClientData(
+        ColumnarClientDataTest.test_data_filepath)
+    self.assertDictEqual(client_data.output_types,
+                         expected_client_data.output_types)
+    self.assertDictEqual(client_data.output_shapes,
+                         expected_client_data.output_shapes)
+
+  def test_create_tf_dataset_for_client(self):
+    client_data = self._create_client_data()
+    for client_id, expected_data in six.iteritems(TEST_DATA):
+      tf_dataset = client_data.create_tf_dataset_for_client(client_id)
+      self.assertIsInstance(tf_dataset, tf.data.Dataset)
+      actual_examples = [self.evaluate(e) for e in tf_dataset]
+      expected_examples = [{k: v[i] for k, v in six.iteritems(expected_data)}
+                           for i in range(len(expected_data['x']))]
+      self.assertEqual(
+          _as_tuples(actual_examples), _as_tuples(expected_examples))
+
+  def test_create_tf_dataset_for_client_with_generator(self):
+    client_data = columnar_client_data.ColumnarClientData(
+        ColumnarClientDataTest.test_data_dirpath, use_generator=True)
+    for client_id, expected_data in six.iteritems(TEST_DATA):
+      tf_dataset = client_data.create_tf_dataset_for_client(client_id)
+      actual_examples = [self.evaluate(e) for e in tf_dataset]
+      expected_examples = [{k: v[i] for k, v in six.iteritems(expected_data)}
+                           for i in range(len(expected_data['x']))]
+      self.assertEqual(
+          _as_tuples(actual_examples), _as_tuples(expected_examples))
+
+  def test_create_tf_dataset_for_client_is_serializable(self):
+    client_data = self._create_client_data()
+    tf_dataset = client_data.create_tf_dataset_for_client('CLIENT B')
+    # Datasets that contain a `tf.py_func` cannot be run in another process.
+    graph_def = tf.compat.v1.GraphDef()
+    graph_def.ParseFromString(
+        self.evaluate(tf_dataset._as_serialized_graph()))  # pylint: disable=protected-access
+    ops = [node.op for node in graph_def.node] + [
+        node.op for function in graph_def.library.function
+        for node in function.node_def
+    ]
+    self.assertNotIn('EagerPyFunc', ops)
+    self.assertNotIn('PyFunc', ops)
+
+  def test_create_tf_dataset_for_unknown_client_raises(self):
+    client_data = self._create_client_data()
+    with self.assertRaises(ValueError):
+      client_data.create_tf_dataset_for_client('CLIENT D')
+
+  def test_create_tf_dataset_from_all_clients(self):
+    client_data = self._create_client_data()
+    tf_dataset = client_data.create_tf_dataset_from_all_clients(
+        seed=1, num_parallel_calls=2, cycle_length=2)
+    actual_examples = [self.evaluate(e) for e in tf_dataset]
+    expected_examples = [{k: v[i] for k, v in six.iteritems(data)}
+                         for data in six.itervalues(TEST_DATA)
+                         for i in range(len(data['x']))]
+    self.assertCountEqual(
+        _as_tuples(actual_examples), _as_tuples(expected_examples))
+
+  def test_converts_variable_length_strings(self):
+    fd, filepath = tempfile.mkstemp()
+    os.close(fd)
+    self.addCleanup(os.remove, filepath)
+    with h5py.File(filepath, 'w') as f:
+      examples_group = f.create_group('examples')
+      for client_id, tokens in [('a', [u'x', u'y z']), ('b', [u'\u00e9'])]:
+        examples_group.create_group(client_id).create_dataset(
+            'tokens',
+            data=np.asarray(tokens, dtype=object),
+            dtype=h5py.special_dtype(vlen=six.text_type))
+    dirpath = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, dirpath)
+    columnar_client_data.convert_hdf5_to_columnar(filepath, dirpath)
+
+    client_data = columnar_client_data.ColumnarClientData(dirpath)
+    self.assertEqual(client_data.output_types['tokens'], tf.string)
+    self.assertEqual([
+        self.evaluate(e['tokens'])
+        for e in client_data.create_tf_dataset_for_client('a')
+    ], [b'x', b'y z'])
+    self.assertEqual([
+        self.evaluate(e['tokens'])
+        for e in client_data.create_tf_dataset_for_client('b')
+    ], [u'\u00e9'.encode('utf-8')])
+
+  def test_stores_strings_without_padding(self):
+    with open(
+        os.path.join(ColumnarClientDataTest.test_data_dirpath,
+                     'columns.json')) as f:
+      column_specs = json.load(f)
+    strings_filepath = os.path.join(ColumnarClientDataTest.test_data_dirpath,
+                                    column_specs['z']['values'])
+    num_bytes = sum(
+        len(x) for data in six.itervalues(TEST_DATA) for x in data['z'])
+    self.assertEqual(os.path.getsize(strings_filepath), num_bytes)
+
+  def test_converts_string_columns_with_example_shapes(self):
+    filepath = create_fake_hdf5({
+        'a': {
+            'x': np.asarray([['a', 'bcd'], ['', 'ef']], dtype='S')
+        },
+        'b': {
+            'x': np.asarray([['ghij', 'k']], dtype='S')
+        },
+    })
+    self.addCleanup(os.remove, filepath)
+    dirpath = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, dirpath)
+    columnar_client_data.convert_hdf5_to_columnar(filepath, dirpath)
+
+    client_data = columnar_client_data.ColumnarClientData(dirpath)
+    self.assertEqual(client_data.output_shapes['x'].as_list(), [2])
+    self.assertEqual([
+        self.evaluate(e['x']).tolist()
+        for e in client_data.create_tf_dataset_for_client('a')
+    ], [[b'a', b'bcd'], [b'', b'ef']])
+    self.assertEqual([
+        self.evaluate(e['x']).tolist()
+        for e in client_data.create_tf_dataset_for_client('b')
+    ], [[b'ghij', b'k']])
+
+  def test_convert_raises_with_mismatched_columns(self):
+    filepath = create_fake_hdf5({
+        'a': {
+            'x': np.asarray([1, 2], dtype='i4')
+        },
+        'b': {
+            'y': np.asarray([3], dtype='i4')
+        },
+    })
+    self.addCleanup(os.remove, filepath)
+    dirpath = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, dirpath)
+    with self.assertRaises(ValueError):
+      columnar_client_data.convert_hdf5_to_columnar(filepath, dirpath)
+
+
+if __name__ == '__main__':
+  # Need eager_mode to iterate over tf.data.Dataset.
+  tf.compat.v1.enable_v2_behavior()
+  tf.test.main()
@@ -18,8 +18,12 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
 import math
 import os.path
+import threading
+import uuid
+import zlib
 
 import numpy as np
 import tensorflow as tf
@@ -31,6 +35,13 @@ from tensorflow_federated.python.simulation.transforming_client_data import Tran
 
 img = tf.contrib.image
 
+# The number of examples of a pseudo-client that are transformed at once.
+_TRANSFORM_BATCH_SIZE = 256
+
+# The number of raw clients for which to keep the transforms of all of their
+# pseudo-clients.
+_TRANSFORM_TABLE_CACHE_SIZE = 1000
+
 
 def load_data(only_digits=True, cache_dir=None):
   """Loads the Federated EMNIST dataset.
@@ -141,16 +152,14 @@ def get_synthetic(num_clients=2):
       num_pseudo_clients=num_clients)
 
 
-def _compile_transform(angle=0,
-                       shear=0,
-                       scale_x=1,
-                       scale_y=1,
-                       translation_x=0,
-                       translation_y=0):
-  """Compiles affine transform parameters into single projective transform.
+def _compile_transforms(angle, shear, scale_x, scale_y, translation_x,
+                        translation_y):
+  """Compiles affine transform parameters into projective transforms.
 
   The transformations are performed in the following order: rotation, shearing,
-  scaling, and translation.
+  scaling, and translation. All arguments are arrays of the same shape `[N]`,
+  and the transforms are computed with NumPy for all `N` of them at once, in the
+  format expected by `tf.contrib.image.transform`.
 
   Args:
     angle: The angle of counter-clockwise rotation, in degrees.
@@ -162,75 +171,189 @@ def _compile_transform(angle=0,
     translation_y: The number of pixels to translate in the y-axis.
 
   Returns:
-    A length 8 tensor representing the composed transform.
+    A float32 `np.ndarray` of shape `[N, 8]` representing the composed
+    transforms.
   """
-  angle = math.radians(angle)
+  angle = np.radians(angle)
   size = 28
-
-  # angles_to_projective_transforms performs rotations around center of image.
-  rotation = img.angles_to_projective_transforms(angle, size, size)
+  zeros = np.zeros_like(angle)
+  ones = np.ones_like(angle)
+
+  def matrices(*rows):
+    # Stacks the 9 elements of each of the `N` 3x3 matrices.
+    return np.stack([np.broadcast_to(x, angle.shape) for x in rows],
+                    axis=-1).reshape([-1, 3, 3])
+
+  def translations(dx, dy):
+    return matrices(ones, zeros, -dx, zeros, ones, -dy, zeros, zeros, ones)
+
+  # Rotations are performed around the center of the image, as in
+  # `tf.contrib.image.angles_to_projective_transforms`.
+  cos, sin = np.cos(angle), np.sin(angle)
+  rotation = matrices(cos, -sin,
+                      ((size - 1) - (cos * (size - 1) - sin * (size - 1))) / 2,
+                      sin, cos,
+                      ((size - 1) - (sin * (size - 1) + cos * (size - 1))) / 2,
+                      zeros, zeros, ones)
 
   # shearing and scaling require centering and decentering.
   half = (size - 1) / 2.0
-  center = img.translations_to_projective_transforms([-half, -half])
-  shear = [1., 0., 0., -shear, 1., 0., 0., 0.]
-  scaling = [1. / scale_x, 0., 0., 0., 1. / scale_y, 0., 0., 0.]
-  decenter = img.translations_to_projective_transforms([half, half])
+  center = translations(-half, -half)
+  shear = matrices(ones, zeros, zeros, -shear, ones, zeros, zeros, zeros, ones)
+  scaling = matrices(1. / scale_x, zeros, zeros, zeros, 1. / scale_y, zeros,
+                     zeros, zeros, ones)
+  decenter = translations(half, half)
+  translation = translations(translation_x, translation_y)
 
-  translation = img.translations_to_projective_transforms(
-      [translation_x, translation_y])
-  return img.compose_transforms(rotation, center, shear, scaling, decenter,
-                                translation)
+  # As in `tf.contrib.image.compose_transforms`.
+  composed = rotation
+  for transform in [center, shear, scaling, decenter, translation]:
+    composed = np.matmul(composed, transform)
+  composed = composed.reshape([-1, 9])
+  composed /= composed[:, 8:9]
+  return composed[:, :8].astype(np.float32)
 
 
-def _make_transform_fn(raw_client_id, index):
-  """Generates a random affine transform based on the client_id and index.
-
-  If the index is 0, `None` is returned so no transform is applied by the
-  transforming_client_data.
+def _make_transforms(raw_client_id, num_pseudo_clients):
+  """Generates random affine transforms for the pseudo-clients of a client.
 
   Args:
     raw_client_id: The raw client_id.
-    index: The index of the pseudo-client.
+    num_pseudo_clients: The number of pseudo-clients of the raw client.
 
   Returns:
-    The transformed data.
+    A float32 `np.ndarray` of shape `[num_pseudo_clients, 8]`, with the
+    projective transform of the pseudo-client with index `i` in row `i`. The
+    transforms depend only on the `raw_client_id` and the index.
   """
-  if index == 0:
-    return None
+  random_state = np.random.RandomState(
+      zlib.crc32(raw_client_id.encode('utf-8')) & 0xffffffff)
+  params = random_state.uniform(size=[num_pseudo_clients, 6])
 
-  np.random.seed((hash(raw_client_id) + index) % (2**32))
+  def uniform(u, min_val, max_val):
+    return min_val + (max_val - min_val) * u
 
-  def random_scale(min_val):
+  def random_scale(u, min_val):
     b = math.log(min_val)
-    return math.exp(np.random.uniform(b, -b))
+    return np.exp(uniform(u, b, -b))
+
+  return _compile_transforms(
+      angle=uniform(params[:, 0], -20, 20),
+      shear=uniform(params[:, 1], -0.2, 0.2),
+      scale_x=random_scale(params[:, 2], 0.8),
+      scale_y=random_scale(params[:, 3], 0.8),
+      translation_x=uniform(params[:, 4], -5, 5),
+      translation_y=uniform(params[:, 5], -5, 5))
+
+
+class _TransformTable(object):
+  """A table of the transforms of the pseudo-clients.
+
+  The transforms of all pseudo-clients of a raw client are computed at once,
+  the first time one of them is requested, and the most recently used rows of
+  the table are kept for reuse.
+  """
+
+  def __init__(self, num_pseudo_clients):
+    self._num_pseudo_clients = num_pseudo_clients
+    self._rows = collections.OrderedDict()
+    self._lock = threading.Lock()
 
-  transform = _compile_transform(
-      angle=np.random.uniform(-20, 20),
-      shear=np.random.uniform(-0.2, 0.2),
-      scale_x=random_scale(0.8),
-      scale_y=random_scale(0.8),
-      translation_x=np.random.uniform(-5, 5),
-      translation_y=np.random.uniform(-5, 5))
+  def get_transform(self, raw_client_id, index):
+    with self._lock:
+      row = self._rows.pop(raw_client_id, None)
+      if row is None:
+        row = _make_transforms(raw_client_id, self._num_pseudo_clients)
+        while len(self._rows) >= _TRANSFORM_TABLE_CACHE_SIZE:
+          self._rows.popitem(last=False)
+      self._rows[raw_client_id] = row
+    return row[index]
 
-  def _transform_fn(data):
-    """Applies a random transform to the pixels."""
-    # EMNIST background is 1.0 but img.transform assumes 0.0, so invert.
-    pixels = 1.0 - data['pixels']
+  def make_transform_fn(self, raw_client_id, index):
+    """Returns the transform to apply to a batch of data of a pseudo-client.
 
-    pixels = img.transform(pixels, transform, 'BILINEAR')
+    If the index is 0, `None` is returned so no transform is applied by the
+    transforming_client_data.
 
-    # num_bits=9 actually yields 256 unique values.
-    pixels = tf.quantization.quantize_and_dequantize(
-        pixels, 0.0, 1.0, num_bits=9, range_given=True)
+    Args:
+      raw_client_id: The raw client_id.
+      index: The index of the pseudo-client.
 
-    data['pixels'] = 1.0 - pixels
-    return data
+    Returns:
+      A function that transforms a batch of data, or `None`.
+    """
+    if index == 0:
+      return None
 
-  return _transform_fn
+    transform = self.get_transform(raw_client_id, index)
 
+    def _transform_fn(data):
+      """Applies a random transform to a batch of pixels."""
+      # EMNIST background is 1.0 but img.transform assumes 0.0, so invert.
+      pixels = tf.expand_dims(1.0 - data['pixels'], -1)
 
-def get_infinite(emnist_client_data, num_pseudo_clients):
+      pixels = img.transform(pixels, transform, 'BILINEAR')
+
+      # num_bits=9 actually yields 256 unique values.
+      pixels = tf.quantization.quantize_and_dequantize(
+          pixels, 0.0, 1.0, num_bits=9, range_given=True)
+
+      data['pixels'] = 1.0 - tf.squeeze(pixels, -1)
+      return data
+
+    return _transform_fn
+
+
+class _CachingTransformingClientData(TransformingClientData):
+  """A `TransformingClientData` caching the transformed data in files.
+
+  The data of each client is cached under its client id in `cache_dir`. Each
+  iteration over a client dataset that has not been cached yet fills a cache
+  with a unique temporary prefix, and only renames its files to the final
+  prefix once it is complete, so that any number of iterators of the same
+  client can fill the cache concurrently (TensorFlow does not allow more than
+  one iterator to write to the same cache files).
+  """
+
+  def __init__(self, cache_dir, *args, **kwargs):
+    super(_CachingTransformingClientData, self).__init__(*args, **kwargs)
+    self._cache_dir = cache_dir
+
+  def create_tf_dataset_for_client(self, client_id):
+    dataset = super(_CachingTransformingClientData,
+                    self).create_tf_dataset_for_client(client_id)
+    cache_prefix = os.path.join(self._cache_dir, client_id)
+    if tf.io.gfile.exists(cache_prefix + '.index'):
+      # A complete cache can be read by any number of iterators concurrently.
+      return dataset.cache(cache_prefix)
+
+    def _create_temp_prefix():
+      return '{}.tmp-{}'.format(cache_prefix, uuid.uuid4().hex)
+
+    def _commit_cache(temp_prefix):
+      temp_prefix = temp_prefix.numpy().decode('utf-8')
+      for path in tf.io.gfile.glob(temp_prefix + '.data-*'):
+        tf.io.gfile.rename(
+            path, cache_prefix + path[len(temp_prefix):], overwrite=True)
+      # The index is renamed last, since its presence marks a complete cache.
+      tf.io.gfile.rename(
+          temp_prefix + '.index', cache_prefix + '.index', overwrite=True)
+      return True
+
+    def _fill_cache(_):
+      # The prefix is created anew for each iteration over the dataset.
+      temp_prefix = tf.py_function(_create_temp_prefix, [], tf.string)
+      temp_prefix.set_shape([])
+      # Yields no elements, but commits the cache once it has been filled.
+      commit_dataset = tf.data.Dataset.from_tensors(temp_prefix).map(
+          lambda p: tf.py_function(_commit_cache, [p], tf.bool)).flat_map(
+              lambda _: dataset.take(0))
+      return dataset.cache(temp_prefix).concatenate(commit_dataset)
+
+    return tf.data.Dataset.range(1).flat_map(_fill_cache)
+
+
+def get_infinite(emnist_client_data, num_pseudo_clients, cache_dir=None):
   """Converts a Federated EMNIST dataset into an Infinite Federated EMNIST set.
 
   Infinite Federated EMNIST expands each writer from the EMNIST dataset into
@@ -246,6 +369,9 @@ def get_infinite(emnist_client_data, num_pseudo_clients):
     3. A random scaling between 0.8 and 1.25 (sampled log uniformly).
     4. A random translation between -5 and 5 pixels in both the x and y axes.
 
+  The transformations of a pseudo-client depend only on the id of the original
+  user and the index of the pseudo-client.
+
   Args:
     emnist_client_data: The `tff.simulation.ClientData` to convert.
     num_pseudo_clients: How many pseudo-clients to generate for each real
@@ -253,13 +379,22 @@ def get_infinite(emnist_client_data, num_pseudo_clients):
       transformation to the characters written by a given real user. The first
       pseudo-client for a given user applies the identity transformation, so the
       original users are always included.
+    cache_dir: (Optional) directory in which to cache the transformed data of
+      each pseudo-client, once its dataset has been fully iterated over. The
+      cached data is not invalidated if `emnist_client_data` changes, so a
+      different directory should be used for each dataset.
 
   Returns:
     An expanded `tff.simulation.ClientData`.
   """
-  num_client_ids = len(emnist_client_data.client_ids)
-
-  return TransformingClientData(
+  num_client_ids = emnist_client_data.num_clients
+  transform_table = _TransformTable(num_pseudo_clients)
+  kwargs = dict(
       raw_client_data=emnist_client_data,
-      make_transform_fn=_make_transform_fn,
-      num_transformed_clients=(num_client_ids * num_pseudo_clients))
+      make_transform_fn=transform_table.make_transform_fn,
+      num_transformed_clients=(num_client_ids * num_pseudo_clients),
+      transform_batch_size=_TRANSFORM_BATCH_SIZE)
+  if cache_dir is None:
+    return TransformingClientData(**kwargs)
+  tf.io.gfile.makedirs(cache_dir)
+  return _CachingTransformingClientData(cache_dir, **kwargs)
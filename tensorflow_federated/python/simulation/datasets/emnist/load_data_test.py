@@ -19,8 +19,12 @@ from __future__ import division
 from __future__ import print_function
 
 import collections
+import os
+import shutil
+import tempfile
 
 from absl.testing import absltest
+import numpy as np
 from six.moves import range
 import tensorflow as tf
 
@@ -51,6 +55,64 @@ class LoadDataTest(tf.test.TestCase, absltest.TestCase):
       self.assertEqual(images[0].shape, (28, 28))
       self.assertEqual(images[-1].shape, (28, 28))
 
+  def test_compile_transforms_identity(self):
+    compile_transforms = load_data._compile_transforms  # pylint: disable=protected-access
+    transforms = compile_transforms(
+        angle=np.zeros([2]),
+        shear=np.zeros([2]),
+        scale_x=np.ones([2]),
+        scale_y=np.ones([2]),
+        translation_x=np.zeros([2]),
+        translation_y=np.zeros([2]))
+    self.assertAllClose(transforms, [[1., 0., 0., 0., 1., 0., 0., 0.]] * 2)
+
+  def test_make_transforms_is_deterministic(self):
+    make_transforms = load_data._make_transforms  # pylint: disable=protected-access
+    transforms = make_transforms('client', 5)
+    self.assertEqual(transforms.shape, (5, 8))
+    self.assertAllEqual(transforms, make_transforms('client', 5))
+    self.assertNotAllClose(transforms, make_transforms('other', 5))
+
+  def test_infinite_with_cache_dir(self):
+    cache_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, cache_dir)
+    raw_client_data = load_data.get_synthetic(num_clients=1)
+    client_data = load_data.get_infinite(
+        raw_client_data, num_pseudo_clients=3, cache_dir=cache_dir)
+    uncached_client_data = load_data.get_infinite(
+        raw_client_data, num_pseudo_clients=3)
+    self.assertEqual(client_data.client_ids, uncached_client_data.client_ids)
+
+    for client_id in client_data.client_ids:
+      expected = self.evaluate(
+          list(uncached_client_data.create_tf_dataset_for_client(client_id)))
+      for _ in range(2):
+        data = self.evaluate(
+            list(client_data.create_tf_dataset_for_client(client_id)))
+        self.assertAllClose([x['pixels'] for x in data],
+                            [x['pixels'] for x in expected])
+
+  def test_infinite_with_cache_dir_and_concurrent_iterators(self):
+    cache_dir = tempfile.mkdtemp()
+    self.addCleanup(shutil.rmtree, cache_dir)
+    raw_client_data = load_data.get_synthetic(num_clients=1)
+    client_data = load_data.get_infinite(
+        raw_client_data, num_pseudo_clients=2, cache_dir=cache_dir)
+    client_id = client_data.client_ids[-1]
+    dataset = client_data.create_tf_dataset_for_client(client_id)
+    # Both iterators fill the cache at the same time.
+    iterators = [iter(dataset), iter(dataset)]
+    data = [[], []]
+    for x, y in zip(*iterators):
+      data[0].append(x['pixels'].numpy())
+      data[1].append(y['pixels'].numpy())
+    self.assertNotEmpty(data[0])
+    self.assertAllClose(data[0], data[1])
+    self.assertTrue(
+        tf.io.gfile.exists(os.path.join(cache_dir, client_id + '.index')))
+    cached_data = list(client_data.create_tf_dataset_for_client(client_id))
+    self.assertAllClose([x['pixels'] for x in cached_data], data[0])
+
 
 if __name__ == '__main__':
   tf.compat.v1.enable_v2_behavior()
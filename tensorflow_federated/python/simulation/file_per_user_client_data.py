@@ -21,6 +21,7 @@ from __future__ import print_function
 import os
 import os.path
 
+import numpy as np
 import tensorflow as tf
 
 from tensorflow_federated.python.common_libs import py_typecheck
@@ -48,6 +49,13 @@ class FilePerUserClientData(client_data.ClientData):
     py_typecheck.check_callable(create_tf_dataset_fn)
     self._client_ids = sorted(client_ids)
     self._create_tf_dataset_fn = create_tf_dataset_fn
+    # Set by `create_from_dir`, where the datasets are created from file paths
+    # which are known ahead of time.
+    self._client_ids_to_paths_dict = None
+    self._create_tf_dataset_from_path_fn = None
+    # Whether `self._create_tf_dataset_from_path_fn` can be traced with a
+    # `tf.string` tensor, determined on first use.
+    self._path_fn_is_traceable = None
 
     g = tf.Graph()
     with g.as_default():
@@ -67,6 +75,33 @@ class FilePerUserClientData(client_data.ClientData):
         tf.compat.v1.data.get_output_shapes(tf_dataset), self._output_shapes)
     return tf_dataset
 
+  def _get_client_keys_and_dataset_fn(self, client_ids):
+    if (self._client_ids_to_paths_dict is None or
+        not self._is_path_fn_traceable()):
+      return super(FilePerUserClientData,
+                   self)._get_client_keys_and_dataset_fn(client_ids)
+    paths = np.asarray(
+        [self._client_ids_to_paths_dict[client_id] for client_id in client_ids],
+        dtype=object)
+    return paths, self._create_tf_dataset_from_path_fn
+
+  def _is_path_fn_traceable(self):
+    """Returns whether the path function accepts a `tf.string` tensor.
+
+    Functions that expect the path as a Python `str` (e.g., to use `os.path` or
+    `open`) fail to trace, in which case the datasets are created by calling
+    the function on each path from Python instead.
+    """
+    if self._path_fn_is_traceable is None:
+      try:
+        with tf.Graph().as_default():
+          self._create_tf_dataset_from_path_fn(
+              tf.compat.v1.placeholder(tf.string, shape=[]))
+        self._path_fn_is_traceable = True
+      except Exception:  # pylint: disable=broad-except
+        self._path_fn_is_traceable = False
+    return self._path_fn_is_traceable
+
   @property
   def output_types(self):
     return self._output_types
@@ -82,6 +117,13 @@ class FilePerUserClientData(client_data.ClientData):
     Iterates over all files in `path`, using the filename as the client ID. Does
     not recursively search `path`.
 
+    If possible, the `create_tf_dataset_fn` is also traced with a scalar
+    `tf.string` tensor holding the file path by
+    `create_tf_dataset_from_all_clients`, so that the client datasets are
+    created using TensorFlow ops (as with `tf.data.TFRecordDataset`). Functions
+    that can only be called with a Python `str` are called once per client
+    instead.
+
     Args:
       path: A directory path to search for per-client files.
       create_tf_dataset_fn: A callable that creates a `tf.data.Datasaet` object
@@ -97,5 +139,10 @@ class FilePerUserClientData(client_data.ClientData):
     def create_dataset_for_filename_fn(client_id):
       return create_tf_dataset_fn(client_ids_to_paths_dict[client_id])
 
-    return FilePerUserClientData(
+    client_data = FilePerUserClientData(
         list(client_ids_to_paths_dict.keys()), create_dataset_for_filename_fn)
+    # pylint: disable=protected-access
+    client_data._client_ids_to_paths_dict = client_ids_to_paths_dict
+    client_data._create_tf_dataset_from_path_fn = create_tf_dataset_fn
+    # pylint: enable=protected-access
+    return client_data
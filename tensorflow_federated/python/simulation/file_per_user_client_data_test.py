@@ -222,6 +222,45 @@ class FilePerUserClientDataTest(tf.test.TestCase, absltest.TestCase):
     expected_client_ids = set(example[0] for example in FAKE_TEST_DATA)
     self.assertLen(data.client_ids, len(expected_client_ids))
 
+  def test_create_tf_dataset_from_all_clients(self):
+    data = self._create_fake_client_data()
+    tf_dataset = data.create_tf_dataset_from_all_clients(
+        seed=1, num_parallel_calls=2, cycle_length=2)
+    self.assertIsInstance(tf_dataset, tf.data.Dataset)
+    actual_values = [self.evaluate(actual[0]) for actual in tf_dataset]
+    self.assertCountEqual(actual_values,
+                          [example[1] for example in FAKE_TEST_DATA])
+
+  def test_create_tf_dataset_from_all_clients_from_dir(self):
+    temp_dir = FilePerUserClientDataTest.temp_dir
+    data = file_per_user_client_data.FilePerUserClientData.create_from_dir(
+        path=temp_dir)
+    tf_dataset = data.create_tf_dataset_from_all_clients(
+        seed=1, num_parallel_calls=2, cycle_length=2)
+    self.assertIsInstance(tf_dataset, tf.data.Dataset)
+    actual_examples = [self.evaluate(e) for e in tf_dataset]
+    self.assertCountEqual(actual_examples, [
+        _create_example(example[1:]) for example in FAKE_TEST_DATA
+    ])
+
+  def test_create_tf_dataset_from_all_clients_from_dir_with_python_path_fn(
+      self):
+
+    def create_tf_dataset_fn(path):
+      # Only works with a Python `str` path, so it cannot be traced.
+      if not os.path.isfile(path):
+        raise ValueError('Not a file: {}'.format(path))
+      return tf.data.TFRecordDataset(path)
+
+    temp_dir = FilePerUserClientDataTest.temp_dir
+    data = file_per_user_client_data.FilePerUserClientData.create_from_dir(
+        path=temp_dir, create_tf_dataset_fn=create_tf_dataset_fn)
+    tf_dataset = data.create_tf_dataset_from_all_clients(seed=1)
+    actual_examples = [self.evaluate(e) for e in tf_dataset]
+    self.assertCountEqual(actual_examples, [
+        _create_example(example[1:]) for example in FAKE_TEST_DATA
+    ])
+
 
 if __name__ == '__main__':
   # Need eager_mode to iterate over tf.data.Dataset.
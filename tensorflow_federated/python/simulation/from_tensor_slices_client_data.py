@@ -18,6 +18,8 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import numpy as np
+import six
 import tensorflow as tf
 
 from tensorflow_federated.python.common_libs import py_typecheck
@@ -41,13 +43,21 @@ class FromTensorSlicesClientData(client_data.ClientData):
     """
     py_typecheck.check_type(tensor_slices_dict, dict)
     self._tensor_slices_dict = tensor_slices_dict
+    self._client_ids = tuple(tensor_slices_dict.keys())
+    # The examples of all clients concatenated, and the offsets of the examples
+    # of each client, created on first use.
+    self._concatenated_slices = None
+    self._client_offsets = None
+    # Whether the examples of all clients could not be concatenated, in which
+    # case the client datasets are read one client at a time.
+    self._concatenation_failed = False
     example_dataset = self.create_tf_dataset_for_client(self.client_ids[0])
     self._output_types = tf.compat.v1.data.get_output_types(example_dataset)
     self._output_shapes = tf.compat.v1.data.get_output_shapes(example_dataset)
 
   @property
   def client_ids(self):
-    return list(self._tensor_slices_dict.keys())
+    return self._client_ids
 
   def create_tf_dataset_for_client(self, client_id):
     tensor_slices = self._tensor_slices_dict[client_id]
@@ -56,6 +66,68 @@ class FromTensorSlicesClientData(client_data.ClientData):
     else:
       raise ValueError('No data found for client {}'.format(client_id))
 
+  def _get_client_keys_and_dataset_fn(self, client_ids):
+    if self._concatenated_slices is None and not self._concatenation_failed:
+      try:
+        self._concatenate_tensor_slices()
+      except ValueError:
+        # The clients have examples of different shapes, which cannot be
+        # concatenated.
+        self._concatenation_failed = True
+    if self._concatenation_failed:
+      return super(FromTensorSlicesClientData,
+                   self)._get_client_keys_and_dataset_fn(client_ids)
+    client_keys = np.asarray(
+        [self._client_offsets[client_id] for client_id in client_ids],
+        dtype=np.int64)
+    # Converted outside of `_dataset_fn`, so that when executing eagerly the
+    # traced function captures the tensors as inputs, rather than embedding the
+    # examples of all clients as constants (which would be subject to the 2GB
+    # limit of a `GraphDef`).
+    concatenated_tensors = [
+        tf.convert_to_tensor(a) for a in self._concatenated_slices
+    ]
+
+    def _dataset_fn(bounds):
+      return tf.data.Dataset.from_tensor_slices(
+          tf.nest.pack_sequence_as(
+              self._output_types,
+              [t[bounds[0]:bounds[1]] for t in concatenated_tensors]))
+
+    return client_keys, _dataset_fn
+
+  def _concatenate_tensor_slices(self):
+    """Concatenates the examples of all clients into one tensor per component.
+
+    Sets `self._concatenated_slices` to the flat list of concatenated arrays
+    (in the order of `tf.nest.flatten(self.output_types)`), and
+    `self._client_offsets` to a dictionary mapping each client id to the start
+    and end offsets of its examples in the concatenated tensors.
+
+    Raises:
+      ValueError: If the examples of the clients cannot be concatenated.
+    """
+    flat_types = tf.nest.flatten(self._output_types)
+    flat_slices = [[] for _ in flat_types]
+    client_offsets = {}
+    num_examples = 0
+    for client_id, tensor_slices in six.iteritems(self._tensor_slices_dict):
+      flat_client_slices = tf.nest.flatten(_to_numpy_structure(tensor_slices))
+      if len(flat_client_slices) != len(flat_types):
+        raise ValueError('Client {} has examples of a different structure.'
+                         .format(client_id))
+      for slices, client_slices in zip(flat_slices, flat_client_slices):
+        slices.append(client_slices)
+      client_num_examples = flat_client_slices[0].shape[0]
+      client_offsets[client_id] = (num_examples,
+                                   num_examples + client_num_examples)
+      num_examples += client_num_examples
+    self._concatenated_slices = [
+        np.concatenate(slices).astype(dtype.as_numpy_dtype)
+        for slices, dtype in zip(flat_slices, flat_types)
+    ]
+    self._client_offsets = client_offsets
+
   @property
   def output_types(self):
     return self._output_types
@@ -63,3 +135,25 @@ class FromTensorSlicesClientData(client_data.ClientData):
   @property
   def output_shapes(self):
     return self._output_shapes
+
+
+def _to_numpy_structure(value):
+  """Converts the tensors in `value` to `np.ndarray`s, as `tf.data` would.
+
+  Args:
+    value: A structure suitable for passing to
+      `tf.data.Dataset.from_tensor_slices`, in which (unlike in `tf.nest`)
+      lists are treated as tensors.
+
+  Returns:
+    The same structure, with the tensors converted to `np.ndarray`s.
+  """
+  if isinstance(value, dict):
+    return {k: _to_numpy_structure(v) for k, v in six.iteritems(value)}
+  elif isinstance(value, tuple):
+    elements = [_to_numpy_structure(v) for v in value]
+    if hasattr(value, '_fields'):
+      return type(value)(*elements)
+    return tuple(elements)
+  else:
+    return np.asarray(value)
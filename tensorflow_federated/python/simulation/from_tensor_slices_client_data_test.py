@@ -72,6 +72,72 @@ class FromTensorSlicesClientDataTest(tf.test.TestCase):
         break
     self.assertTrue(found_not_equal)
 
+  def test_create_tf_dataset_from_all_clients_with_structure(self):
+    tensor_slices_dict = {
+        'a': {
+            'x': [[1, 2], [3, 4]],
+            'y': ['a', 'b']
+        },
+        'b': {
+            'x': [[5, 6]],
+            'y': ['c']
+        },
+    }
+    client_data = from_tensor_slices_client_data.FromTensorSlicesClientData(
+        tensor_slices_dict)
+    ds = client_data.create_tf_dataset_from_all_clients(seed=1)
+    self.assertEqual(
+        tf.compat.v1.data.get_output_types(ds), client_data.output_types)
+    examples = [(tuple(x['x'].numpy()), x['y'].numpy()) for x in ds]
+    self.assertCountEqual(examples, [((1, 2), b'a'), ((3, 4), b'b'),
+                                     ((5, 6), b'c')])
+
+  def test_create_tf_dataset_from_all_clients_with_different_shapes(self):
+    tensor_slices_dict = {'a': [[1, 2]], 'b': [[3, 4, 5], [6, 7, 8]]}
+    client_data = from_tensor_slices_client_data.FromTensorSlicesClientData(
+        tensor_slices_dict)
+    ds = client_data.create_tf_dataset_from_all_clients(seed=1)
+    self.assertCountEqual([x.numpy().tolist() for x in ds],
+                          [[1, 2], [3, 4, 5], [6, 7, 8]])
+
+  def test_create_tf_dataset_from_all_clients_does_not_embed_examples(self):
+    tensor_slices_dict = {str(i): [float(i)] * 1000 for i in range(3)}
+    client_data = from_tensor_slices_client_data.FromTensorSlicesClientData(
+        tensor_slices_dict)
+    ds = client_data.create_tf_dataset_from_all_clients(seed=1)
+    self.assertLen(list(ds), 3000)
+    # The examples must be inputs of the client dataset function, rather than
+    # constants in its body.
+    graph_def = tf.compat.v1.GraphDef()
+    graph_def.ParseFromString(
+        self.evaluate(ds._as_serialized_graph()))  # pylint: disable=protected-access
+    for function in graph_def.library.function:
+      for node in function.node_def:
+        if node.op == 'Const':
+          dims = node.attr['value'].tensor.tensor_shape.dim
+          self.assertNotIn(3000, [d.size for d in dims])
+
+  def test_interleave_is_deterministic(self):
+    tensor_slices_dict = {
+        str(i): list(range(i * 10, i * 10 + i + 1)) for i in range(10)
+    }
+    client_data = from_tensor_slices_client_data.FromTensorSlicesClientData(
+        tensor_slices_dict)
+
+    def get_flat_dataset(num_parallel_calls):
+      ds = client_data.create_tf_dataset_from_all_clients(
+          seed=1,
+          num_parallel_calls=num_parallel_calls,
+          cycle_length=4,
+          shuffle_buffer_size=10)
+      return [x.numpy() for x in ds]
+
+    d1 = get_flat_dataset(None)
+    d2 = get_flat_dataset(4)
+    self.assertEqual(d1, d2)
+    self.assertCountEqual(
+        d1, [x for slices in tensor_slices_dict.values() for x in slices])
+
 
 if __name__ == '__main__':
   tf.compat.v1.enable_v2_behavior()
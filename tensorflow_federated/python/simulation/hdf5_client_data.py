@@ -21,6 +21,7 @@ from __future__ import print_function
 import collections
 
 import h5py
+import numpy as np
 import six
 import tensorflow as tf
 
@@ -64,11 +65,31 @@ class HDF5ClientData(client_data.ClientData):
       self._output_types = tf.compat.v1.data.get_output_types(tf_dataset)
       self._output_shapes = tf.compat.v1.data.get_output_shapes(tf_dataset)
 
+  def _read_client_examples(self, client_id):
+    return collections.OrderedDict(
+        (name, ds.value) for name, ds in sorted(
+            six.iteritems(
+                self._h5_file[HDF5ClientData._EXAMPLES_GROUP][client_id])))
+
   def _create_dataset(self, client_id):
     return tf.data.Dataset.from_tensor_slices(
-        collections.OrderedDict((name, ds.value) for name, ds in sorted(
-            six.iteritems(self._h5_file[HDF5ClientData._EXAMPLES_GROUP]
-                          [client_id]))))
+        self._read_client_examples(client_id))
+
+  def _get_client_keys_and_dataset_fn(self, client_ids):
+    # The examples of each client are read from the file in a single
+    # `tf.py_func` call, rather than one call per example.
+    def _generator(index):
+      yield self._read_client_examples(client_ids[index])
+
+    client_shapes = tf.nest.map_structure(
+        lambda s: tf.TensorShape([None]).concatenate(s), self._output_shapes)
+
+    def _dataset_fn(index):
+      return tf.data.Dataset.from_generator(
+          _generator, self._output_types, client_shapes,
+          args=(index,)).apply(tf.data.experimental.unbatch())
+
+    return np.arange(len(client_ids), dtype=np.int64), _dataset_fn
 
   @property
   def client_ids(self):
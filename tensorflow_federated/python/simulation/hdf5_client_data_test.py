@@ -141,6 +141,25 @@ class HDF5ClientDataTest(tf.test.TestCase, absltest.TestCase):
       self.assertCountEqual(actual, expected)
     self.assertEmpty(expected_examples)
 
+  def test_create_tf_dataset_from_all_clients_in_parallel(self):
+    client_data = hdf5_client_data.HDF5ClientData(
+        HDF5ClientDataTest.test_data_filepath)
+
+    def get_examples(num_parallel_calls):
+      tf_dataset = client_data.create_tf_dataset_from_all_clients(
+          seed=1, num_parallel_calls=num_parallel_calls, cycle_length=2)
+      return [self.evaluate(actual) for actual in tf_dataset]
+
+    sequential_examples = get_examples(None)
+    parallel_examples = get_examples(2)
+    self.assertEqual([e['w'] for e in sequential_examples],
+                     [e['w'] for e in parallel_examples])
+    self.assertCountEqual(
+        [(e['w'], tuple(e['x']), e['y'], e['z']) for e in parallel_examples],
+        [(w, tuple(x), y, z)
+         for data in six.itervalues(TEST_DATA)
+         for w, x, y, z in zip(data['w'], data['x'], data['y'], data['z'])])
+
 
 if __name__ == '__main__':
   # Need eager_mode to iterate over tf.data.Dataset.
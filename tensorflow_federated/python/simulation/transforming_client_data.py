@@ -18,11 +18,11 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
-import bisect
 import re
 
+import numpy as np
+import six
 from six.moves import range
-
 import tensorflow as tf
 
 from tensorflow_federated.python.common_libs import py_typecheck
@@ -66,8 +66,11 @@ class TransformingClientData(client_data.ClientData):
   function if the identity is supported.
   """
 
-  def __init__(self, raw_client_data, make_transform_fn,
-               num_transformed_clients):
+  def __init__(self,
+               raw_client_data,
+               make_transform_fn,
+               num_transformed_clients,
+               transform_batch_size=None):
     """Initializes the TransformingClientData.
 
     Args:
@@ -87,52 +90,127 @@ class TransformingClientData(client_data.ClientData):
         there will be exactly k pseudo-clients per real client, with indices
         0...k-1. Any remainder g will be generated from the first g real clients
         and will be given index k.
+      transform_batch_size: Optional. If specified, the raw datasets are batched
+        with this batch size before the transform is applied, and unbatched
+        afterwards, so the functions returned by make_transform_fn are called
+        with batches of datapoints rather than single datapoints. This allows
+        expensive transforms to be vectorized.
     """
     py_typecheck.check_type(raw_client_data, client_data.ClientData)
     py_typecheck.check_callable(make_transform_fn)
     py_typecheck.check_type(num_transformed_clients, int)
+    if transform_batch_size is not None:
+      py_typecheck.check_type(transform_batch_size, int)
 
     if num_transformed_clients <= 0:
       raise ValueError('num_transformed_clients must be positive and finite.')
+    if transform_batch_size is not None and transform_batch_size <= 0:
+      raise ValueError('transform_batch_size must be positive.')
     self._raw_client_data = raw_client_data
     self._make_transform_fn = make_transform_fn
-
-    num_digits = len(str(num_transformed_clients - 1))
-    format_str = '{}_{:0' + str(num_digits) + '}'
-
-    raw_client_ids = raw_client_data.client_ids
-    k = num_transformed_clients // len(raw_client_ids)
-    self._client_ids = []
-    for raw_client_id in raw_client_ids:
-      for i in range(k):
-        self._client_ids.append(format_str.format(raw_client_id, i))
-    num_extra_client_ids = num_transformed_clients - k * len(raw_client_ids)
-    for c in range(num_extra_client_ids):
-      self._client_ids.append(format_str.format(raw_client_ids[c], k))
-
-    # Already sorted if raw_client_data.client_ids are, but just to be sure...
-    self._client_ids = sorted(self._client_ids)
+    self._num_transformed_clients = num_transformed_clients
+    self._transform_batch_size = transform_batch_size
+
+    # The client ids are not materialized, but computed from their position.
+    # The pseudo-clients of each raw client are contiguous, and ordered by
+    # index, and the raw clients are ordered by the prefix of their
+    # pseudo-client ids, so that `client_ids` is sorted.
+    self._num_digits = len(str(num_transformed_clients - 1))
+    raw_client_ids = list(raw_client_data.client_ids)
+    num_pseudo_clients = num_transformed_clients // len(raw_client_ids)
+    num_extended_clients = (
+        num_transformed_clients - num_pseudo_clients * len(raw_client_ids))
+    # Each of the first `num_extended_clients` raw clients has one more
+    # pseudo-client than the others.
+    self._num_pseudo_clients_by_raw_id = {}
+    for i, raw_client_id in enumerate(raw_client_ids):
+      num = num_pseudo_clients + (1 if i < num_extended_clients else 0)
+      if num:
+        self._num_pseudo_clients_by_raw_id[raw_client_id] = num
+    self._raw_client_ids = sorted(
+        self._num_pseudo_clients_by_raw_id, key=lambda x: x + '_')
+    # The offsets of the first pseudo-client of each raw client.
+    self._raw_client_offsets = np.cumsum(
+        [0] + [
+            self._num_pseudo_clients_by_raw_id[raw_client_id]
+            for raw_client_id in self._raw_client_ids
+        ],
+        dtype=np.int64)
+    self._client_ids = None
+    # If the prefix of one raw client extends another (e.g., 'a_' and 'a_1_'),
+    # their pseudo-client ids are interleaved in sorted order, so the ids are
+    # materialized and sorted instead.
+    self._interleaved = any(
+        y.startswith(x + '_')
+        for x, y in zip(self._raw_client_ids, self._raw_client_ids[1:]))
+    if self._interleaved:
+      self._client_ids = sorted(
+          self._format_client_id(raw_client_id, i)
+          for raw_client_id, num in six.iteritems(
+              self._num_pseudo_clients_by_raw_id) for i in range(num))
 
   @property
   def client_ids(self):
+    if self._client_ids is None:
+      self._client_ids = [
+          self.get_client_id(i) for i in range(self._num_transformed_clients)
+      ]
     return self._client_ids
 
-  def create_tf_dataset_for_client(self, client_id):
+  @property
+  def num_clients(self):
+    return self._num_transformed_clients
+
+  def _format_client_id(self, raw_client_id, index):
+    return '{}_{:0{}}'.format(raw_client_id, index, self._num_digits)
+
+  def get_client_id(self, index):
+    if not 0 <= index < self._num_transformed_clients:
+      raise IndexError('Client index {} out of range [0, {}).'.format(
+          index, self._num_transformed_clients))
+    if self._interleaved:
+      return self._client_ids[index]
+    raw_index = int(
+        np.searchsorted(self._raw_client_offsets, index, side='right')) - 1
+    return self._format_client_id(
+        self._raw_client_ids[raw_index],
+        index - int(self._raw_client_offsets[raw_index]))
+
+  def _split_client_id(self, client_id):
+    """Returns the raw client id and index of a valid pseudo-client id.
+
+    Args:
+      client_id: The pseudo-client id.
+
+    Returns:
+      A tuple (raw_client_id, index), as returned by `split_client_id`.
+
+    Raises:
+      ValueError: If `client_id` is not one of `client_ids`.
+    """
     py_typecheck.check_type(client_id, str)
-    i = bisect.bisect_left(self._client_ids, client_id)
-    if i == len(self._client_ids) or self._client_ids[i] != client_id:
+    raw_client_id, _, index_str = client_id.rpartition('_')
+    num_pseudo_clients = self._num_pseudo_clients_by_raw_id.get(raw_client_id)
+    if (num_pseudo_clients is None or len(index_str) != self._num_digits or
+        not index_str.isdigit() or int(index_str) >= num_pseudo_clients):
       raise ValueError('client_id must be a valid string from client_ids.')
+    return raw_client_id, int(index_str)
 
-    raw_client_id, index = split_client_id(client_id)
+  def create_tf_dataset_for_client(self, client_id):
+    raw_client_id, index = self._split_client_id(client_id)
     raw_dataset = self._raw_client_data.create_tf_dataset_for_client(
         raw_client_id)
 
     transform_fn = self._make_transform_fn(raw_client_id, index)
     if not transform_fn:
       return raw_dataset
-    else:
-      py_typecheck.check_callable(transform_fn)
+    py_typecheck.check_callable(transform_fn)
+    if self._transform_batch_size is None:
       return raw_dataset.map(transform_fn, tf.data.experimental.AUTOTUNE)
+    else:
+      return raw_dataset.batch(self._transform_batch_size).map(
+          transform_fn, tf.data.experimental.AUTOTUNE).apply(
+              tf.data.experimental.unbatch())
 
   @property
   def output_types(self):
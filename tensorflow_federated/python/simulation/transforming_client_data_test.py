@@ -28,6 +28,7 @@ import six
 from six.moves import range
 import tensorflow as tf
 
+from tensorflow_federated.python.simulation import from_tensor_slices_client_data
 from tensorflow_federated.python.simulation import hdf5_client_data
 from tensorflow_federated.python.simulation import transforming_client_data
 
@@ -103,6 +104,54 @@ class TransformingClientDataTest(tf.test.TestCase, absltest.TestCase):
     # Check ids are sorted.
     self.assertListEqual(client_ids, sorted(client_ids))
 
+  def test_client_ids_are_sorted_with_unsorted_and_prefix_raw_client_ids(self):
+    for raw_client_ids in [['1', '10'], ['b', 'a', 'c'], ['a', 'a_1', 'a2']]:
+      client_data = from_tensor_slices_client_data.FromTensorSlicesClientData(
+          {raw_client_id: [1] for raw_client_id in raw_client_ids})
+      for num_transformed_clients in [2, 5, 12]:
+        transformed_client_data = (
+            transforming_client_data.TransformingClientData(
+                client_data, _test_transform_cons, num_transformed_clients))
+        client_ids = transformed_client_data.client_ids
+        self.assertListEqual(client_ids, sorted(client_ids))
+        self.assertLen(set(client_ids), num_transformed_clients)
+        self.assertListEqual([
+            transformed_client_data.get_client_id(i)
+            for i in range(num_transformed_clients)
+        ], client_ids)
+
+  def test_get_client_id_matches_client_ids(self):
+    client_data = hdf5_client_data.HDF5ClientData(
+        TransformingClientDataTest.test_data_filepath)
+    for num_transformed_clients in [2, 3, 7, 12]:
+      transformed_client_data = transforming_client_data.TransformingClientData(
+          client_data, _test_transform_cons, num_transformed_clients)
+      self.assertEqual(transformed_client_data.num_clients,
+                       num_transformed_clients)
+      self.assertListEqual([
+          transformed_client_data.get_client_id(i)
+          for i in range(num_transformed_clients)
+      ], transformed_client_data.client_ids)
+      with self.assertRaises(IndexError):
+        transformed_client_data.get_client_id(num_transformed_clients)
+
+  def test_large_number_of_clients(self):
+    client_data = hdf5_client_data.HDF5ClientData(
+        TransformingClientDataTest.test_data_filepath)
+    transformed_client_data = transforming_client_data.TransformingClientData(
+        client_data, _test_transform_cons, 10**8 + 1)
+    self.assertEqual(transformed_client_data.num_clients, 10**8 + 1)
+    self.assertEqual(
+        transformed_client_data.get_client_id(0), 'CLIENT A_000000000')
+    self.assertEqual(
+        transformed_client_data.get_client_id(10**8), 'CLIENT C_033333332')
+
+    sampled_client_ids = transformed_client_data.sample_client_ids(
+        10, random_state=np.random.RandomState(1))
+    self.assertLen(set(sampled_client_ids), 10)
+    for client_id in sampled_client_ids:
+      transformed_client_data.create_tf_dataset_for_client(client_id)
+
   def test_fail_on_bad_client_id(self):
     client_data = hdf5_client_data.HDF5ClientData(
         TransformingClientDataTest.test_data_filepath)
@@ -148,6 +197,33 @@ class TransformingClientDataTest(tf.test.TestCase, absltest.TestCase):
         for k, v in six.iteritems(actual):
           self.assertAllEqual(v, expected[k])
 
+  def test_create_tf_dataset_for_client_with_transform_batch_size(self):
+    client_data = hdf5_client_data.HDF5ClientData(
+        TransformingClientDataTest.test_data_filepath)
+
+    def make_batch_transform_fn(raw_client_id, index):
+      del raw_client_id
+
+      def fn(data):
+        # Only batches of up to two datapoints are expected.
+        tf.debugging.assert_rank(data['x'], 2)
+        tf.debugging.assert_less_equal(tf.shape(data['x'])[0], 2)
+        data['x'] = data['x'] + 10 * index
+        return data
+
+      return fn
+
+    transformed_client_data = transforming_client_data.TransformingClientData(
+        client_data, make_batch_transform_fn, 9, transform_batch_size=2)
+
+    for client_id in transformed_client_data.client_ids:
+      tf_dataset = transformed_client_data.create_tf_dataset_for_client(
+          client_id)
+      raw_client_id, index = transforming_client_data.split_client_id(
+          client_id)
+      actual_x = [self.evaluate(actual['x']) for actual in tf_dataset]
+      self.assertAllEqual(actual_x, TEST_DATA[raw_client_id]['x'] + 10 * index)
+
   def test_create_tf_dataset_from_all_clients(self):
     client_data = hdf5_client_data.HDF5ClientData(
         TransformingClientDataTest.test_data_filepath)
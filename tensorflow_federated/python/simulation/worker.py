@@ -33,6 +33,10 @@ flags.DEFINE_integer('port', '8000', 'port to listen on')
 flags.DEFINE_integer('threads', '10', 'number of worker threads in thread pool')
 flags.DEFINE_string('private_key', '', 'the private key for SSL/TLS setup')
 flags.DEFINE_string('certificate_chain', '', 'the cert for SSL/TLS setup')
+flags.DEFINE_integer(
+    'value_ttl_seconds', 0,
+    'the number of seconds after which values not used by any request are '
+    'released, or 0 to only release values that clients dispose of')
 
 _ONE_DAY_IN_SECONDS = 60 * 60 * 24
 
@@ -41,7 +45,9 @@ def main(argv):
   del argv
   tf.compat.v1.enable_v2_behavior()
 
-  service = tff.framework.ExecutorService(tff.framework.create_local_executor())
+  service = tff.framework.ExecutorService(
+      tff.framework.create_local_executor(),
+      value_ttl_seconds=FLAGS.value_ttl_seconds or None)
 
   server = grpc.server(
       concurrent.futures.ThreadPoolExecutor(max_workers=FLAGS.threads))